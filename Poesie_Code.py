@@ -5,8 +5,24 @@
 from pathlib import Path
 from shared.fonts_and_styles import register_dejavu
 register_dejavu(Path(__file__).resolve().parent / "shared" / "fonts")
+# NEU: Gecachte Breitenmessung (LRU + Zeichentabelle pro Font) statt pdfmetrics.stringWidth
+from shared.text_metrics import string_width
+# NEU: Vorkompilierte Regexe (zentrale Registry)
+from shared import regex_patterns as rx
+# NEU: Token-Records (Farbmarker, Kern, Tags, Flags) – einmal pro Token-String zerlegt
+from shared.token_record import parse_token
+# NEU: Sortierter Intervall-Index Zeile → Kommentar-Farbe (statt zeilenweisem Dict)
+from shared.comment_index import LineColorIndex
 # Versmaß-Funktionalität
 from shared.versmass import has_meter_markers, extract_meter
+# NEU: Render-Kontext pro create_pdf-Aufruf (statt Modul-Globals → Varianten parallel im selben Prozess)
+from shared.render_context import RenderContext, current_render_context, activate_render_context, with_render_context
+# NEU: Leichtgewichtiges Zeilen-Flowable statt Table pro Verszeile (INTERLINEAR_ROW_FLOWABLE=0 → Table)
+from shared.interlinear_row import interlinear_table
+# NEU: Einmalige Voranalyse der Zeilen (Nummer, Art, Sprachanzahl) statt 50-Zeilen-Suchen pro Insertion
+from shared.line_index import LineIndex
+# NEU: Streamende Zeilenquelle (mmap bzw. str.find) statt read → re.sub → split
+from shared.line_source import iter_text_lines, iter_file_lines
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units    import mm as RL_MM
@@ -18,7 +34,7 @@ from reportlab.lib          import colors
 import re, os, html, unicodedata, json, argparse
 
 # WICHTIG: Füge typing Imports hinzu für Type Hints
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 # Import für Preprocessing
 try:
@@ -34,14 +50,14 @@ except ImportError:
 # ========= Optik / Einheiten =========
 MM = RL_MM
 
-# Globaler Flag für lateinische Texte (keine Versmaß-Marker-Entfernung)
+# Default für lateinische Texte (keine Versmaß-Marker-Entfernung); pro Variante: RenderContext.is_latin
 CURRENT_IS_LATIN = False
 
 # Hilfsfunktion für String-Breite
 def _sw(text: str, font_name: str, font_size: float) -> float:
     """Berechnet die Breite eines Textes in Punkten."""
     try:
-        return pdfmetrics.stringWidth(text, font_name, font_size)
+        return string_width(text, font_name, font_size)
     except:
         return len(text) * font_size * 0.6  # Fallback
 GR_SIZE = 8.4
@@ -82,7 +98,7 @@ INTRA_PAIR_ANCIENT_TO_MODERN_NOTAG = 0.2    # Ohne Tags (MAXIMAL ENG: 0.2mm wie
 # 2b. Abstand zwischen den 2 Übersetzungszeilen (nur bei 3-sprachigen PDFs)
 INTRA_PAIR_DE_TO_EN = -1.5          # Negativ = sehr eng, 0 = normal, positiv = mehr Abstand
 
-# Fallback für Kompatibilität (wird dynamisch gesetzt)
+# Fallback für Kompatibilität (pro Variante: RenderContext.inter_pair_gap_mm)
 INTER_PAIR_GAP_MM = 4.5
 
 # Sprecher-Laterne (links)
@@ -93,7 +109,7 @@ SPEAKER_EXTRA_PAD_PT = 4.0   # zusätzlicher Puffer in Punkten, verhindert Zeile
 
 CELL_PAD_LR_PT      = 0.0
 SAFE_EPS_PT         = 0.5
-CURRENT_IS_NOTAGS = False   # wird in create_pdf() anhand des Ziel-Dateinamens gesetzt
+CURRENT_IS_NOTAGS = False   # Default; pro Variante: RenderContext.is_notags (create_pdf)
 METER_ADJUST_LEFT_PT  = 1.6  # Schieberegler für Silben LINKS von |
 METER_ADJUST_RIGHT_PT = 1.6  # Schieberegler für Silben RECHTS von |
 
@@ -107,7 +123,7 @@ def center_word_in_width(word_html: str, word_width_pt: float, total_width_pt: f
         return word_html
     padding_width_needed = total_width_pt - word_width_pt
     nbsp = '\u00A0'
-    nbsp_width = pdfmetrics.stringWidth(nbsp, font_name, font_size)
+    nbsp_width = string_width(nbsp, font_name, font_size)
     if nbsp_width <= 0:
         return word_html
     total_nbsp_needed = round(padding_width_needed / nbsp_width)
@@ -150,6 +166,39 @@ SUB_TAGS = DEFAULT_SUB_TAGS.copy()
 # - "off": Tag wird unterdrückt (gar nicht angezeigt/mitsummiert)
 PLACEMENT_OVERRIDES: dict[str, str] = {}
 
+def _default_render_context() -> RenderContext:
+    """Kontext aus den Modul-Defaults (Builder-Aufrufe außerhalb von create_pdf)."""
+    return RenderContext(is_notags=CURRENT_IS_NOTAGS, is_latin=CURRENT_IS_LATIN,
+                         placement_overrides=PLACEMENT_OVERRIDES,
+                         inter_pair_gap_mm=INTER_PAIR_GAP_MM, speaker_gap_mm=SPEAKER_GAP_MM)
+
+def _render_ctx(ctx: RenderContext | None = None) -> RenderContext:
+    """ctx, sonst der aktive Kontext (create_pdf), sonst die Modul-Defaults."""
+    if ctx is not None:
+        return ctx
+    return current_render_context() or _default_render_context()
+
+def make_render_context(pdf_name: str, *, tag_mode: str = "TAGS", versmass_display: bool = False,
+                        placement_overrides: dict[str, str] | None = None) -> RenderContext:
+    """Variantenabhängiger Zustand für create_pdf (früher als Modul-Globals gesetzt)."""
+    # NoTags-Schalter basierend auf tag_mode (nicht nur Dateiname!)
+    is_notags = (tag_mode == "NO_TAGS") or pdf_name.lower().endswith("_notags.pdf")
+    # Versmaß-spezifische Abstände (abhängig von versmass_display UND tag_mode)
+    if versmass_display:
+        inter_gap = INTER_PAIR_GAP_MM_VERSMASS
+    else:
+        # Normal-PDFs: Unterscheide zwischen TAG und NOTAG
+        inter_gap = INTER_PAIR_GAP_MM_NORMAL_NOTAG if is_notags else INTER_PAIR_GAP_MM_NORMAL_TAG
+    return RenderContext(
+        is_notags=is_notags,
+        # Lateinischer Text? (keine Versmaß-Marker-Entfernung für i, r, L)
+        is_latin="_LAT_" in pdf_name.upper() or "_lat_" in pdf_name.lower(),
+        # Optionale Hoch/Tief/Off-Overrides aus Preprocess/UI
+        placement_overrides=dict(placement_overrides or {}),
+        inter_pair_gap_mm=inter_gap,
+        speaker_gap_mm=SPEAKER_GAP_MM,
+    )
+
 def load_tag_config(config_file: str = None) -> None:
     """Lädt Tag-Konfiguration aus JSON-Datei"""
     global SUP_TAGS, SUB_TAGS, PLACEMENT_OVERRIDES
@@ -187,7 +236,7 @@ def _normalize_tag_case(tag: str) -> str:
         return 'ij'
     return tag
 
-def _classify_tag_with_overrides(tag: str) -> str:
+def _classify_tag_with_overrides(tag: str, ctx: RenderContext | None = None) -> str:
     """
     Rückgabe: "sup" | "sub" | "rest" | "off"
     - Overrides haben Vorrang.
@@ -196,7 +245,7 @@ def _classify_tag_with_overrides(tag: str) -> str:
     # Normalisiere Tag für Kompatibilität
     normalized_tag = _normalize_tag_case(tag)
     
-    v = PLACEMENT_OVERRIDES.get(normalized_tag)
+    v = _render_ctx(ctx).placement_overrides.get(normalized_tag)
     if v in ("sup", "sub", "off"):
         return v
 
@@ -214,11 +263,12 @@ def _classify_tag_with_overrides(tag: str) -> str:
         return "sub"
     return "rest"
 
-def _partition_tags_for_display(tags: list[str]) -> tuple[list[str], list[str], list[str]]:
+def _partition_tags_for_display(tags: list[str], ctx: RenderContext | None = None) -> tuple[list[str], list[str], list[str]]:
     """Teile in (sups, subs, rest) auf und wende Overrides an; 'off' wird entfernt."""
+    ctx = _render_ctx(ctx)
     sups, subs, rest = [], [], []
     for t in tags:
-        cls = _classify_tag_with_overrides(t)
+        cls = _classify_tag_with_overrides(t, ctx)
         normalized_tag = _normalize_tag_case(t)  # Normalisiere für Rückgabe
         if cls == "sup":
             sups.append(normalized_tag)
@@ -230,13 +280,13 @@ def _partition_tags_for_display(tags: list[str]) -> tuple[list[str], list[str],
     return sups, subs, rest
 
 
-RE_INLINE_MARK  = re.compile(r'^\(\s*(?:[0-9]+[a-z]*|[a-z])\s*\)$', re.IGNORECASE)
-RE_TAG       = re.compile(r'\(\s*([A-Za-z/≈äöüßÄÖÜ]+)\s*\)')
-RE_TAG_NAKED = re.compile(r'\(\s*[A-Za-z0-9/≈äöüßÄÖÜ]+\s*\)')
-RE_GREEK_CHARS = re.compile(r'[\u0370-\u03FF\u1F00-\u1FFF]')
-RE_TAG_FINDALL = re.compile(r'\(\s*([A-Za-z0-9/≈äöüßÄÖÜ]+)\s*\)')  # NEU: 0-9 für Fu1, Fu2
-RE_TAG_STRIP   = re.compile(r'\(\s*[A-Za-z0-9/≈äöüßÄÖÜ]+\s*\)')  # NEU: 0-9 für Fu1, Fu2
-RE_LEADING_BAR_COLOR = re.compile(r'^\|\s*([+\-#§$])')  # |+ |# |- am Tokenanfang
+RE_INLINE_MARK  = rx.RE_INLINE_MARK
+RE_TAG       = rx.RE_PAREN_TAG_ALPHA
+RE_TAG_NAKED = rx.RE_PAREN_TAG_STRIP
+RE_GREEK_CHARS = rx.RE_HAS_GREEK
+RE_TAG_FINDALL = rx.RE_PAREN_TAG_SPACED                               # NEU: 0-9 für Fu1, Fu2
+RE_TAG_STRIP   = rx.RE_PAREN_TAG_STRIP                                # NEU: 0-9 für Fu1, Fu2
+RE_LEADING_BAR_COLOR = rx.RE_LEADING_BAR_COLOR                        # |+ |# |- am Tokenanfang
 
 # ----------------------- Defensive token-helpers -----------------------
 def _strip_tags_from_token(tok: str, block: dict = None, tok_idx: int = None, tag_mode: str = "TAGS") -> str:
@@ -316,23 +366,23 @@ def _token_display_text_from_token(tok: str) -> str:
     return html.escape(cleaned)
 
 # Sprecher-Tokens: [Χορ:] bzw. Λυσ:
-RE_SPK_BRACKET = re.compile(r'^\[[^\]]*:\]$')                         # [Χορ:]
-RE_SPEAKER_GR  = re.compile(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:$')      # Λυσ:
+RE_SPK_BRACKET = rx.RE_SPK_BRACKET                                    # [Χορ:]
+RE_SPEAKER_GR  = rx.RE_SPEAKER_GR                                     # Λυσ:
 
-RE_SECTION         = re.compile(r'^\s*\[\[\s*(.+?)\s*\]\]\s*$')
-RE_SECTION_SINGLE  = re.compile(r'^\s*\[\s*(.+?)\s*\]\s*$')
-RE_BRACE_TITLE     = re.compile(r'^\s*\{\s*(.+?)\s*\}\s*$')           # {Titel}
-RE_ZEILE_LOST      = re.compile(r'^\s*(\(\d+[a-z]*\))?\s*(\[[^\]]*:\])?\s*\[\[Zeile\s+Lost\]\]\s*$', re.IGNORECASE)  # [[Zeile Lost]] mit optionaler Zeilennummer und Sprecher
+RE_SECTION         = rx.RE_SECTION
+RE_SECTION_SINGLE  = rx.RE_SECTION_SINGLE
+RE_BRACE_TITLE     = rx.RE_BRACE_TITLE                                # {Titel}
+RE_ZEILE_LOST      = rx.RE_ZEILE_LOST                                 # [[Zeile Lost]] mit optionaler Zeilennummer und Sprecher
 
 # Gleichheitszeichen-Überschriften (wie in Prosa)
 # WICHTIG: Reihenfolge der Prüfung: ==== zuerst, dann ===, dann ==
-RE_EQ_H1 = re.compile(r'^\s*={4}\s*(.+?)\s*={4}\s*$')                 # ==== Text ====
-RE_EQ_H2 = re.compile(r'^\s*={3}\s*(.+?)\s*={3}\s*$')                 # === Text ===
-RE_EQ_H3 = re.compile(r'^\s*={2}\s*(.+?)\s*={2}\s*$')                 # == Text ==
+RE_EQ_H1 = rx.RE_EQ_H1                                                # ==== Text ====
+RE_EQ_H2 = rx.RE_EQ_H2                                                # === Text ===
+RE_EQ_H3 = rx.RE_EQ_H3                                                # == Text ==
 
 # Label-Token wie [12], [12a], (12), (12a) – optional mit Punkt
-RE_LABEL_TOKEN     = re.compile(r'^[\[\(]\s*(-?\d+)([a-z])?\s*[\]\)]\.?$', re.IGNORECASE)
-RE_LABEL_STRIP     = re.compile(r'^(?:\[\s*-?\d+[a-z]?\s*\]\.?\s*|\(\s*-?\d+[a-z]?\s*\)\.?\s*)', re.IGNORECASE)
+RE_LABEL_TOKEN     = rx.RE_LABEL_TOKEN
+RE_LABEL_STRIP     = rx.RE_LABEL_STRIP
 
 # ========= Utils =========
 def _leading_for(size: float) -> float: return round(size * 1.30 + 0.6, 1)
@@ -343,7 +393,7 @@ def is_empty_or_sep(line:str) -> bool:
     return (not t) or t.upper() in {'[FREIE ZEILE]', '[ENTERZEICHEN]'} or t.startswith('---')
 
 def normalize_spaces(s:str) -> str:
-    return re.sub(r'\s+', ' ', (s or '').strip())
+    return rx.RE_WHITESPACE_RUN.sub(' ', (s or '').strip())
 
 def pre_substitutions(s:str) -> str:
     """
@@ -363,15 +413,15 @@ def pre_substitutions(s:str) -> str:
     return s
 
 def _sw(text:str, font:str, size:float) -> float:
-    return pdfmetrics.stringWidth(text, font, size)
+    return string_width(text, font, size)
 
 # === Klassifikation: führendes Label & Sprecher nur für Klassifikation entfernen ===
 def _strip_speaker_prefix_for_classify(line: str) -> str:
     s = (line or '').strip()
     s = RE_LABEL_STRIP.sub('', s, count=1)
-    m = re.match(r'^\[[^\]]*:\]\s*(.*)$', s)  # [Χορ:]
+    m = rx.RE_SPK_BRACKET_PREFIX.match(s)  # [Χορ:]
     if m: return m.group(1)
-    m2 = re.match(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:\s*(.*)$', s)  # Χορ:
+    m2 = rx.RE_SPEAKER_GR_PREFIX.match(s)  # Χορ:
     if m2: return m2.group(1)
     return s
 
@@ -384,7 +434,7 @@ def extract_line_number(s: str) -> tuple[str | None, str]:
     """
     s = (s or '').strip()
     # NEU: Regex für Bereichs-Kommentare: (zahl-zahl+k/i) - MUSS ZUERST GEPRÜFT WERDEN!
-    m_range = re.match(r'^\((-?\d+)-(-?\d+)([a-z]?)\)\s*(.*)$', s, re.IGNORECASE)
+    m_range = rx.RE_SIGNED_LINE_RANGE_EXTRACT.match(s)
     if m_range:
         start = m_range.group(1)
         end = m_range.group(2)
@@ -395,7 +445,7 @@ def extract_line_number(s: str) -> tuple[str | None, str]:
         return (line_num, rest)
     
     # Regex für Zeilennummer: (Zahl[optionaler Buchstabe oder k/i]) - auch negative Zahlen!
-    m = re.match(r'^\((-?\d+)([a-z]?)\)\s*(.*)$', s, re.IGNORECASE)
+    m = rx.RE_SIGNED_LINE_NUM_EXTRACT.match(s)
     if m:
         num = m.group(1)
         suffix = m.group(2)
@@ -435,7 +485,7 @@ def extract_line_range(line_num: str | None) -> tuple[int | None, int | None]:
         return (None, None)
     
     # Prüfe auf Bereichs-Format: "220-222k"
-    range_match = re.match(r'^(-?\d+)-(-?\d+)', line_num)
+    range_match = rx.RE_LEADING_INT_RANGE.match(line_num)
     if range_match:
         try:
             start = int(range_match.group(1))
@@ -445,7 +495,7 @@ def extract_line_range(line_num: str | None) -> tuple[int | None, int | None]:
             return (None, None)
     
     # Einzelne Zeile: Extrahiere die Zahl
-    num_match = re.match(r'^(-?\d+)', line_num)
+    num_match = rx.RE_LEADING_INT.match(line_num)
     if num_match:
         try:
             num = int(num_match.group(1))
@@ -550,98 +600,32 @@ def expand_slash_alternatives(tokens: list[str]) -> list[list[str]]:
     
     return result
 
-def detect_language_count_from_context(lines: list, current_idx: int) -> int:
+def build_line_index(lines: list) -> LineIndex:
+    """
+    Einmalige Voranalyse eines Zeilen-Arrays (siehe shared/line_index.py): Zeilennummer,
+    Zeilenart (k/i/normal) und Zeilen pro Block für jede Zeile – danach alle Abfragen in O(1).
+    Trenner ([FREIE ZEILE], ---) werden beim Zählen übersprungen, max. 5 Zeilen pro Block.
+    """
+    return LineIndex(lines, extract_line_number, is_comment=is_comment_line,
+                     is_insertion=is_insertion_line, is_blank=is_empty_or_sep,
+                     max_count=5, run_limit=6)
+
+def detect_language_count_from_context(lines: list | LineIndex, current_idx: int) -> int:
     """
     Erkennt, ob der Text 2-, 3- oder 4-zeilig ist (1 antike + 1-3 Übersetzungen),
     indem die umgebenden Zeilen analysiert werden.
     
     Sucht nach normalen Zeilen (ohne 'i' oder 'k' Suffix) und zählt, wie viele Zeilen mit
-    der gleichen Basisnummer aufeinanderfolgen.
+    der gleichen Basisnummer aufeinanderfolgen (zuerst rückwärts, dann vorwärts, max. 50 Zeilen).
+    
+    NEU: Wird mit einem LineIndex (build_line_index) aufgerufen → O(1)-Abfrage. Eine rohe Liste
+    wird einmalig indiziert (nur für Einzelabfragen sinnvoll).
     
     Returns:
         2, 3 oder 4 (Anzahl der Zeilen pro Block: 1 antike + 1-3 Übersetzungen)
     """
-    # Suche rückwärts nach der letzten normalen Zeile (keine k, i Suffixe)
-    search_range = 50  # Suche max. 50 Zeilen vor/nach
-    
-    for offset in range(1, min(search_range, current_idx + 1)):
-        check_idx = current_idx - offset
-        if check_idx < 0:
-            break
-            
-        check_line = (lines[check_idx] or '').strip()
-        if is_empty_or_sep(check_line):
-            continue
-            
-        line_num, _ = extract_line_number(check_line)
-        if line_num is None:
-            continue
-            
-        # Ignoriere Kommentare und Insertionen
-        if is_comment_line(line_num) or is_insertion_line(line_num):
-            continue
-        
-        # Wir haben eine normale Zeile gefunden - zähle wie viele Zeilen mit dieser Nummer existieren
-        lines_with_same_num = []
-        j = check_idx
-        while j < len(lines) and len(lines_with_same_num) < 6:  # Max 6 Zeilen prüfen (um 5 zu finden)
-            test_line = (lines[j] or '').strip()
-            if is_empty_or_sep(test_line):
-                j += 1
-                continue
-                
-            test_num, _ = extract_line_number(test_line)
-            if test_num == line_num:
-                lines_with_same_num.append(test_line)
-                j += 1
-            else:
-                break
-        
-        # Wenn wir 2, 3, 4 oder 5 Zeilen gefunden haben, geben wir das zurück
-        count = len(lines_with_same_num)
-        if count >= 2:
-            return min(count, 5)  # NEU: Max 5 (1 antike + bis zu 4 Übersetzungen)
-    
-    # Fallback: Suche vorwärts
-    for offset in range(1, min(search_range, len(lines) - current_idx)):
-        check_idx = current_idx + offset
-        if check_idx >= len(lines):
-            break
-            
-        check_line = (lines[check_idx] or '').strip()
-        if is_empty_or_sep(check_line):
-            continue
-            
-        line_num, _ = extract_line_number(check_line)
-        if line_num is None:
-            continue
-            
-        # Ignoriere Kommentare und Insertionen
-        if is_comment_line(line_num) or is_insertion_line(line_num):
-            continue
-        
-        # Zähle Zeilen mit dieser Nummer
-        lines_with_same_num = []
-        j = check_idx
-        while j < len(lines) and len(lines_with_same_num) < 6:  # Max 6 Zeilen prüfen (um 5 zu finden)
-            test_line = (lines[j] or '').strip()
-            if is_empty_or_sep(test_line):
-                j += 1
-                continue
-                
-            test_num, _ = extract_line_number(test_line)
-            if test_num == line_num:
-                lines_with_same_num.append(test_line)
-                j += 1
-            else:
-                break
-        
-        count = len(lines_with_same_num)
-        if count >= 2:
-            return min(count, 5)  # NEU: Max 5 (1 antike + bis zu 4 Übersetzungen)
-    
-    # Default: 2-sprachig
-    return 2
+    index = lines if isinstance(lines, LineIndex) else build_line_index(lines)
+    return index.language_count(current_idx)
 
 def is_greek_line(line: str) -> bool:
     """
@@ -673,9 +657,9 @@ def is_latin_line(s:str) -> bool:
         return False
     s = s.strip()
     # Entferne Zeilennummer, Sprecher, Tags etc. für die Analyse
-    s_clean = re.sub(r'^\(\d+[a-z]*\)', '', s)  # Zeilennummer
-    s_clean = re.sub(r'^\[[^\]]*:\]', '', s_clean)  # Sprecher
-    s_clean = re.sub(r'\([^)]*\)', '', s_clean)  # Tags
+    s_clean = rx.RE_LINE_NUM_LEAD.sub('', s)  # Zeilennummer
+    s_clean = rx.RE_SPK_BRACKET_LEAD.sub('', s_clean)  # Sprecher
+    s_clean = rx.RE_ANY_PAREN.sub('', s_clean)  # Tags
     
     # Zähle lateinische Buchstaben (a-z, A-Z, aber keine Umlaute)
     latin_count = sum(1 for ch in s_clean if ch.isalpha() and ord(ch) < 128)
@@ -706,7 +690,7 @@ def _strip_leading_bar_color(core: str):
 def _end_has_bar(tok: str) -> bool:
     if not tok: return False
     t = RE_TAG_STRIP.sub('', tok)
-    return bool(re.search(r'\|+\s*$', t))
+    return bool(rx.RE_TRAILING_BARS.search(t))
 
 def _has_leading_bar(tok: str) -> bool:
     if not tok: return False
@@ -783,8 +767,11 @@ class ToplineTokenFlowable(Flowable):
     def __init__(self, token_raw:str, style, cfg, *, gr_bold:bool,
                  had_leading_bar:bool, end_bar_count:int,
                  bridge_to_next:bool, next_has_leading_bar:bool,
-                 is_first_in_line:bool=False, next_token_starts_with_bar:bool=False):
+                 is_first_in_line:bool=False, next_token_starts_with_bar:bool=False,
+                 ctx: RenderContext | None = None):
         super().__init__()
+        # Kontext beim Anlegen festhalten: wrap()/draw() laufen erst später in doc.build
+        self.ctx = _render_ctx(ctx)
         self.token_raw = token_raw
         self.style = style
         self.cfg = cfg
@@ -806,28 +793,28 @@ class ToplineTokenFlowable(Flowable):
         return s[1:] if s and s[0] in '#+-§$' else s
 
     def _extract_tags(self, s_raw:str):
-        body = self._strip_prefix(s_raw)
-        found = RE_TAG_FINDALL.findall(body)
+        # Präfix (#+-§$) steht nie in einer Klammer → Tags des Records sind identisch
+        found = list(parse_token(s_raw).loose_tags)
         self._tags = found
         return self._tags
 
     def _tag_visual_width(self, font:str, size:float) -> float:
         if not self._tags: return 0.0
         add = ''.join(self._tags)
-        return self.cfg['TAG_WIDTH_FACTOR'] * pdfmetrics.stringWidth(add, font, size)
+        return self.cfg['TAG_WIDTH_FACTOR'] * string_width(add, font, size)
 
     def _core_with_markers(self) -> str:
         s = self._strip_prefix(self.token_raw)
         s = RE_TAG_STRIP.sub('', s)
-        s = re.sub(r'\|+\s*$', '', s)
+        s = rx.RE_TRAILING_BARS.sub('', s)
         s, _c, _had_leading = _strip_leading_bar_color(s)
         return s
 
     def _core_visible_text(self) -> str:
         s = self._core_with_markers()
         # DEAKTIVIERT für lateinische Texte: i, r, L sind normale Buchstaben, keine Versmaß-Marker
-        if not CURRENT_IS_LATIN:
-            s = re.sub(r'[Lir]+', '', s).replace('-', '|')
+        if not self.ctx.is_latin:
+            s = rx.RE_METER_LETTERS.sub('', s).replace('-', '|')
         return s.strip()
 
     def _parse_segments(self):
@@ -846,7 +833,7 @@ class ToplineTokenFlowable(Flowable):
         acc = 0.0
         pos = [0.0]
         for ch in text_visible:
-            w = pdfmetrics.stringWidth(ch, font, size)
+            w = string_width(ch, font, size)
             acc += w
             if _is_greek_letter(ch):
                 pos.append(acc)
@@ -865,7 +852,7 @@ class ToplineTokenFlowable(Flowable):
         else:
             t_core = t_no_tags
 
-        m = re.search(r'\|+\s*$', t_core)
+        m = rx.RE_TRAILING_BARS.search(t_core)
         if m:
             core_part = t_core[:m.start()]
             trailing_bars = t_core[m.start():]
@@ -873,7 +860,7 @@ class ToplineTokenFlowable(Flowable):
             core_part = t_core
             trailing_bars = ''
 
-        bar_w = pdfmetrics.stringWidth('|', font, size)
+        bar_w = string_width('|', font, size)
         eps   = max(0.15, bar_w * 0.2)
         xs = []
         acc = 0.0
@@ -889,7 +876,7 @@ class ToplineTokenFlowable(Flowable):
             elif ch == '|':
                 xs.append(acc + 0.5*bar_w); acc += bar_w
             else:
-                acc += pdfmetrics.stringWidth(ch, font, size)
+                acc += string_width(ch, font, size)
 
         acc += self._tag_visual_width(font, size)
 
@@ -897,7 +884,7 @@ class ToplineTokenFlowable(Flowable):
             if ch == '|':
                 xs.append(acc + 0.5*bar_w); acc += bar_w
             else:
-                acc += pdfmetrics.stringWidth(ch, font, size)
+                acc += string_width(ch, font, size)
 
         xs.sort()
         dedup = []
@@ -908,7 +895,7 @@ class ToplineTokenFlowable(Flowable):
 
     def wrap(self, availWidth, availHeight):
         self._extract_tags(self.token_raw)
-        vis_markup = format_token_markup(self.token_raw, is_greek_row=True, gr_bold=self.gr_bold, remove_bars_instead=False)
+        vis_markup = format_token_markup(self.token_raw, is_greek_row=True, gr_bold=self.gr_bold, remove_bars_instead=False, ctx=self.ctx)
         self._para = Paragraph(vis_markup, self.style)
         w, h = self._para.wrap(availWidth, availHeight)
         self._w, self._h = w, h
@@ -1046,16 +1033,8 @@ def extract_hide_trans_flags(gr_tokens):
     Returns:
         List[bool]: Parallel-Liste zu gr_tokens, True wenn Token (HideTrans) hat
     """
-    flags = []
-    for token in gr_tokens:
-        # Prüfe auf HideTrans-Tag (case-insensitive)
-        has_hide_trans = (
-            '(HideTrans)' in token or 
-            '(hidetrans)' in token or 
-            '(HIDETRANS)' in token
-        )
-        flags.append(has_hide_trans)
-    return flags
+    # Prüfe auf HideTrans-Tag (case-insensitive, aus dem gecachten Token-Record)
+    return [parse_token(token).hide_trans for token in gr_tokens]
 
 def tokenize(line:str):
     # LATEINISCH: (N)(Abl) → (Abl) Transformation
@@ -1063,7 +1042,7 @@ def tokenize(line:str):
     if line and '(N)(Abl)' in line:
         # Prüfe ob es eine lateinische Zeile ist (enthält lateinische Buchstaben)
         if not RE_GREEK_CHARS.search(line):
-            line = re.sub(r'\(N\)\(Abl\)', '(Abl)', line)
+            line = rx.RE_LATIN_ABLATIVE_NOUN.sub('(Abl)', line)
     
     line = normalize_spaces(pre_substitutions(line or ''))
     if not line: return []
@@ -1195,7 +1174,8 @@ def propagate_elision_markers(gr_tokens):
 
 
 # ========= Markup & Messung =========
-def visible_measure_token(token:str, *, font:str, size:float, cfg, is_greek_row:bool) -> float:
+def visible_measure_token(token:str, *, font:str, size:float, cfg, is_greek_row:bool,
+                          ctx: RenderContext | None = None) -> float:
     t = (token or '').strip()
     if not t: return 0.0
 
@@ -1208,25 +1188,26 @@ def visible_measure_token(token:str, *, font:str, size:float, cfg, is_greek_row:
         t = t.replace(color_char, '')
     t = t.replace('~', '')
 
-    m_endbars = re.search(r'\|+\s*$', t)
+    m_endbars = rx.RE_TRAILING_BARS.search(t)
     end_bar_count = len(m_endbars.group(0).strip()) if m_endbars else 0
 
     core_all = RE_TAG_STRIP.sub('', t).strip()
-    core_no_end = re.sub(r'\|+\s*$', '', core_all)
+    core_no_end = rx.RE_TRAILING_BARS.sub('', core_all)
 
     core_no_end, _color2, had_leading_bar = _strip_leading_bar_color(core_no_end)
 
-    if is_greek_row and not CURRENT_IS_LATIN:
+    ctx = _render_ctx(ctx)
+    if is_greek_row and not ctx.is_latin:
         # DEAKTIVIERT für lateinische Texte: i, r, L sind normale Buchstaben, keine Versmaß-Marker
-        core_meas = re.sub(r'[Lir]+', '', core_no_end).replace('-', '|')
+        core_meas = rx.RE_METER_LETTERS.sub('', core_no_end).replace('-', '|')
     else:
         core_meas = core_no_end
 
-    tags = RE_TAG_FINDALL.findall(t)
+    tags = list(parse_token(t).loose_tags)
 
     # Nur Tags mitzählen, die tatsächlich angezeigt werden (Overrides beachten)
     if is_greek_row and tags:
-        sups, subs, rest = _partition_tags_for_display(tags)
+        sups, subs, rest = _partition_tags_for_display(tags, ctx)
         shown = sups + subs + rest  # "off" ist bereits entfernt
     else:
         shown = []
@@ -1243,7 +1224,8 @@ def visible_measure_token(token:str, *, font:str, size:float, cfg, is_greek_row:
     cell_pad = cfg.get('CELL_PAD_LR_PT', 0.0)
     return w + safe_eps + 2 * cell_pad
     
-def format_token_markup(token:str, *, is_greek_row:bool, gr_bold:bool, remove_bars_instead:bool = False) -> str:
+def format_token_markup(token:str, *, is_greek_row:bool, gr_bold:bool, remove_bars_instead:bool = False,
+                        ctx: RenderContext | None = None) -> str:
     raw = (token or '').strip()
     if not raw: return ''
 
@@ -1278,12 +1260,12 @@ def format_token_markup(token:str, *, is_greek_row:bool, gr_bold:bool, remove_ba
     # ~ entfernen (kein Farbsymbol, nur Marker)
     raw = raw.replace('~', '')
 
-    m_endbars = re.search(r'\|+\s*$', raw)
+    m_endbars = rx.RE_TRAILING_BARS.search(raw)
     end_bar_count = len(m_endbars.group(0).strip()) if m_endbars else 0
 
-    tags = RE_TAG_FINDALL.findall(raw)
+    tags = list(parse_token(raw).loose_tags)
     core_all = RE_TAG_STRIP.sub('', raw).strip()
-    core_no_end = re.sub(r'\|+\s*$', '', core_all)
+    core_no_end = rx.RE_TRAILING_BARS.sub('', core_all)
 
     core_no_end, color2, had_leading = _strip_leading_bar_color(core_no_end)
     if color2: color = color2 or color
@@ -1295,9 +1277,10 @@ def format_token_markup(token:str, *, is_greek_row:bool, gr_bold:bool, remove_ba
     #     core_no_end = core_no_end.replace('*','')
     #     is_bold = True
 
-    if is_greek_row and not CURRENT_IS_LATIN:
+    ctx = _render_ctx(ctx)
+    if is_greek_row and not ctx.is_latin:
         # DEAKTIVIERT für lateinische Texte: i, r, L sind normale Buchstaben, keine Versmaß-Marker
-        core_for_width = re.sub(r'[Lir]+', '', core_no_end).replace('-', '|')
+        core_for_width = rx.RE_METER_LETTERS.sub('', core_no_end).replace('-', '|')
         core_html_main = _make_core_html_with_invisible_bars(
             core_for_width,
             make_bars_invisible=(not remove_bars_instead),
@@ -1309,7 +1292,7 @@ def format_token_markup(token:str, *, is_greek_row:bool, gr_bold:bool, remove_ba
 
     if is_greek_row:
         # Partitioniere Tags nach Overrides
-        sups, subs, rest = _partition_tags_for_display(tags)
+        sups, subs, rest = _partition_tags_for_display(tags, ctx)
     else:
         # DE-Zeile: nur ≈ als Sup (wie gehabt)
         sups, subs, rest = (['≈'] if '≈' in tags else []), [], []
@@ -1351,7 +1334,9 @@ def measure_line_width(gr_tokens, de_tokens=None, *, font:str, size:float, font_
     # Nimm die breitere Zeile als Basisbreite
     return max(gr_width, de_width)
 
-def measure_rendered_line_width(gr_tokens, de_tokens, *, gr_bold:bool, is_notags:bool, remove_bars_instead:bool = False, tag_config:dict = None, hide_trans_flags:list = None) -> float:
+@with_render_context(_default_render_context)
+def measure_rendered_line_width(gr_tokens, de_tokens, *, gr_bold:bool, is_notags:bool, remove_bars_instead:bool = False, tag_config:dict = None, hide_trans_flags:list = None,
+                                ctx: RenderContext = None) -> float:
     """
     Berechnet die tatsächliche gerenderte Breite einer Zeile.
     WICHTIG: Verwendet die GLEICHEN Mechanismen wie build_tables_for_pair() für genaue Messung!
@@ -1443,16 +1428,19 @@ def measure_rendered_line_width(gr_tokens, de_tokens, *, gr_bold:bool, is_notags
     
     return total_width
 
+@with_render_context(_default_render_context)
 def measure_full_layout_width(gr_tokens, de_tokens, speaker, line_label, *,
                              token_gr_style, token_de_style, num_style, style_speaker,
-                             global_speaker_width_pt, gr_bold:bool = False, is_notags:bool = False, tag_config:dict = None) -> float:
+                             global_speaker_width_pt, gr_bold:bool = False, is_notags:bool = False, tag_config:dict = None,
+                             ctx: RenderContext = None) -> float:
     """Berechnet die Gesamtbreite einer Zeile inklusive aller Layout-Elemente."""
     # Token-Breite (robuste Berechnung)
     token_width = measure_rendered_line_width(
         gr_tokens, de_tokens,
         gr_bold=gr_bold, is_notags=is_notags,
         remove_bars_instead=False,
-        tag_config=tag_config  # NEU: Tag-Config übergeben
+        tag_config=tag_config,  # NEU: Tag-Config übergeben
+        ctx=ctx
     )
 
     # Layout-Elemente Breite
@@ -1497,15 +1485,23 @@ def process_input_file(infile: str) -> List[Dict[str, Any]]:
     # NEU: Debug-Logging am Anfang
     logger.info("Poesie_Code.process_input_file: START reading %s", infile)
     
-    with open(infile, 'r', encoding='utf-8') as f:
-        raw_text = f.read()
-    
-    # KRITISCH: Entferne ALLE Metadata-Kommentare am Anfang (<!-- ... -->)
-    # Dies verhindert, dass sie als Text im PDF erscheinen
-    import re
-    raw_text = re.sub(r'^(<!--.*?-->\s*)+', '', raw_text, flags=re.DOTALL | re.MULTILINE)
+    # NEU: Datei per mmap zeilenweise lesen (shared/line_source.py), nicht als Ganzes
+    return process_input_lines(iter_file_lines(infile))
+
+def process_input_text(raw_text: str) -> List[Dict[str, Any]]:
+    """Wie process_input_file, aber für bereits gelesenen Text (In-Process-API: poesie_pdf.render_all)."""
+    return process_input_lines(iter_text_lines(raw_text))
+
+def process_input_lines(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Gemeinsamer Kern von process_input_file / process_input_text über einen Zeilenstrom
+    (Metadaten-Kommentare bereits entfernt, siehe shared/line_source.py).
+    """
+    import logging
+    logger = logging.getLogger(__name__)
     
-    lines = raw_text.split('\n')
+    # Blockbildung und Zeilenindex brauchen Zufallszugriff → einmal materialisieren
+    lines = list(lines)
     
     # NEU: Log Zeilenanzahl
     logger.info("Poesie_Code.process_input_file: read %d lines", len(lines))
@@ -2057,10 +2053,9 @@ def process_input_file(infile: str) -> List[Dict[str, Any]]:
 def get_visible_tags_poesie(token: str, tag_config: dict = None) -> list:
     """Gibt die Liste der sichtbaren Tags für ein Token zurück (basierend auf tag_config) - Poesie-Version."""
     if not tag_config or not token:
-        tags = RE_TAG_FINDALL.findall(token)
-        return tags
+        return list(parse_token(token).loose_tags)
     
-    tags = RE_TAG_FINDALL.findall(token)
+    tags = parse_token(token).loose_tags
     if not tags:
         return []
     
@@ -2144,6 +2139,7 @@ def _calculate_column_widths(tokens: list, tag_mode: str) -> list:
         widths.append(width)
     return widths
 
+@with_render_context(_default_render_context)
 def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None, 
                           indent_pt: float = 0.0,
                           global_speaker_width_pt: float = None,
@@ -2168,7 +2164,8 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                           hide_trans_flags: list[bool] = None,  # NEU: HideTrans-Flags
                           de_tokens_alternatives: list[list[str]] = None,  # NEU: Alternative Übersetzungen
                           en_tokens_alternatives: list[list[str]] = None,
-                          trans3_tokens_alternatives: list[list[str]] = None):
+                          trans3_tokens_alternatives: list[list[str]] = None,
+                          ctx: RenderContext = None):  # NEU: Render-Kontext (siehe shared/render_context.py)
     """
     ═══════════════════════════════════════════════════════════════════════════════════════
     HAUPTFUNKTION: Erstellt ReportLab-Tabellen für ein griechisch-deutsches Verspaar
@@ -2596,7 +2593,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
     
     # Dynamischer Abstand zwischen antiker und moderner Zeile
     # Abhängig von Tag/NoTag
-    if CURRENT_IS_NOTAGS:
+    if ctx.is_notags:
         gap_ancient_to_modern = INTRA_PAIR_ANCIENT_TO_MODERN_NOTAG * MM
     else:
         gap_ancient_to_modern = INTRA_PAIR_ANCIENT_TO_MODERN_TAG * MM
@@ -2616,13 +2613,14 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
         slice_trans3 = trans3[i:j]  # NEU: Für 4-zeilige Blöcke
 
         # Zellen
-        def _p(text, st): return Paragraph(text, st)
+        # NEU: Zellen über den Paragraph-Cache des Render-Kontexts (gleiches Markup nur einmal parsen/umbrechen)
+        def _p(text, st): return ctx.paragraphs.paragraph(text, st)
         def _end_has_bar_local(s: str) -> bool: return _end_has_bar(s)
         def _has_leading_bar_local(s: str) -> bool: return _has_leading_bar(s)
 
         def cell(is_gr, tok, idx_in_slice, global_idx=None):
             if not tok:
-                return Paragraph('', token_gr_style if is_gr else token_de_style)
+                return _p('', token_gr_style if is_gr else token_de_style)
 
             if is_gr and meter_on:
                 # WICHTIG: Entferne Tags basierend auf tag_mode und token_meta, BEVOR ToplineTokenFlowable verwendet wird
@@ -2630,7 +2628,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 tok_cleaned = _strip_tags_from_token(tok, block=block, tok_idx=global_idx, tag_mode=tag_mode)
                 
                 had_lead = _has_leading_bar_local(tok_cleaned)
-                endbars_match = re.search(r'\|+\s*$', RE_TAG_STRIP.sub('', tok_cleaned))
+                endbars_match = rx.RE_TRAILING_BARS.search(RE_TAG_STRIP.sub('', tok_cleaned))
                 endbars = len(endbars_match.group(0).strip()) if endbars_match else 0
                 br_to_next = False
                 next_has_lead = False
@@ -2661,7 +2659,8 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                     bridge_to_next=br_to_next,
                     next_has_leading_bar=next_has_lead,
                     is_first_in_line=(idx_in_slice == 0),
-                    next_token_starts_with_bar=next_tok_starts_with_bar
+                    next_token_starts_with_bar=next_tok_starts_with_bar,
+                    ctx=ctx
                 )
                 
                 # Zentriere in Spaltenbreite (wie bei normalen Paragraphs!)
@@ -2681,7 +2680,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 # Verwende bereinigten Token für Breitenmessung
                 measured = visible_measure_token(tok_cleaned, font=token_gr_style.fontName, size=token_gr_style.fontSize, cfg=eff_cfg, is_greek_row=True)
                 html_centered = center_word_in_width(html_, measured, this_w, token_gr_style.fontName, token_gr_style.fontSize)
-                return Paragraph(html_centered, token_gr_style)
+                return _p(html_centered, token_gr_style)
             else:
                 # DE-Zeile: ebenfalls zentrieren
                 # idx_in_slice ist bei DE nicht gesetzt; nutze parallelen Index über enumerate weiter unten
@@ -2782,7 +2781,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
             if not t or should_hide_trans:
                 # Leeres Token ODER HideTrans → keine Übersetzung anzeigen
                 # WICHTIG: Paragraph muss trotzdem die korrekte Breite haben (aus slice_w)!
-                de_cells.append(Paragraph('', token_de_style))
+                de_cells.append(_p('', token_de_style))
                 # KEIN continue! Wir müssen slice_w[idx] korrekt zuordnen
             else:
                 # NEU: Pipes durch Leerzeichen ersetzen, wenn hide_pipes aktiviert ist
@@ -2800,7 +2799,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 de_meas  = visible_measure_token(t_processed, font=token_de_style.fontName, size=token_de_style.fontSize, cfg=eff_cfg, is_greek_row=False)
                 de_width = slice_w[idx]
                 de_html_centered = center_word_in_width(de_html, de_meas, de_width, token_de_style.fontName, token_de_style.fontSize)
-                de_cells.append(Paragraph(de_html_centered, token_de_style))
+                de_cells.append(_p(de_html_centered, token_de_style))
 
         # EN-Zellen (für 3-sprachige Texte)
         en_cells = []
@@ -2813,7 +2812,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 if not t or should_hide_trans:
                     # Leeres Token ODER HideTrans → keine Übersetzung anzeigen
                     # WICHTIG: Paragraph muss trotzdem die korrekte Breite haben (aus slice_w)!
-                    en_cells.append(Paragraph('', token_de_style))
+                    en_cells.append(_p('', token_de_style))
                     # KEIN continue! Wir müssen slice_w[idx] korrekt zuordnen
                 else:
                     # NEU: Pipes durch Leerzeichen ersetzen, wenn hide_pipes aktiviert ist
@@ -2830,7 +2829,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                     en_meas  = visible_measure_token(t_processed, font=token_de_style.fontName, size=token_de_style.fontSize, cfg=eff_cfg, is_greek_row=False)
                     en_width = slice_w[idx]
                     en_html_centered = center_word_in_width(en_html, en_meas, en_width, token_de_style.fontName, token_de_style.fontSize)
-                    en_cells.append(Paragraph(en_html_centered, token_de_style))
+                    en_cells.append(_p(en_html_centered, token_de_style))
 
         # NEU: TRANS3-Zellen (für 4-zeilige Blöcke / dritte Übersetzung)
         trans3_cells = []
@@ -2842,7 +2841,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 
                 if not t or should_hide_trans:
                     # Leeres Token ODER HideTrans → keine Übersetzung anzeigen
-                    trans3_cells.append(Paragraph('', token_de_style))
+                    trans3_cells.append(_p('', token_de_style))
                 else:
                     # NEU: Pipes durch Leerzeichen ersetzen, wenn hide_pipes aktiviert ist
                     t_processed = process_translation_token_poesie(t)
@@ -2858,7 +2857,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                     trans3_meas = visible_measure_token(t_processed, font=token_de_style.fontName, size=token_de_style.fontSize, cfg=eff_cfg, is_greek_row=False)
                     trans3_width = slice_w[idx]
                     trans3_html_centered = center_word_in_width(trans3_html, trans3_meas, trans3_width, token_de_style.fontName, token_de_style.fontSize)
-                    trans3_cells.append(Paragraph(trans3_html_centered, token_de_style))
+                    trans3_cells.append(_p(trans3_html_centered, token_de_style))
 
         # Linke Spalten: NUM → Gap → SPRECHER → Gap → INDENT → Tokens
         # WICHTIG: Zeilennummer in <font> Tag wrappen, damit "-" nicht als Farbmarker interpretiert wird
@@ -2986,7 +2985,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                     should_hide_trans = hide_trans_flags[idx] if idx < len(hide_trans_flags) else False
                     
                     if not t or should_hide_trans:
-                        de_alt_cells.append(Paragraph('', token_de_style))
+                        de_alt_cells.append(_p('', token_de_style))
                     else:
                         t_processed = process_translation_token_poesie(t)
                         
@@ -2998,7 +2997,7 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                         de_meas = visible_measure_token(t_processed, font=token_de_style.fontName, size=token_de_style.fontSize, cfg=eff_cfg, is_greek_row=False)
                         de_width = slice_w[idx]
                         de_html_centered = center_word_in_width(de_html, de_meas, de_width, token_de_style.fontName, token_de_style.fontSize)
-                        de_alt_cells.append(Paragraph(de_html_centered, token_de_style))
+                        de_alt_cells.append(_p(de_html_centered, token_de_style))
                 
                 # Baue Zeile für diese Alternative (ohne Zeilennummer/Sprecher)
                 num_para_de_alt = _p('\u00A0', num_style)
@@ -3019,9 +3018,6 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
             row_trans3 = [num_para_trans3, num_gap_trans3, sp_para_trans3, sp_gap_trans3, indent_trans3] + trans3_cells
             table_rows.append(row_trans3)
         
-        # Create table with all visible rows
-        tbl = Table(table_rows, colWidths=col_w, hAlign='LEFT')
-
         # NEU: Prüfe, ob diese Zeile von einem Kommentar referenziert wird
         # WICHTIG: Wenn comment_token_mask vorhanden ist und nicht leer, unterdrücke Hintergrundfarbe
         comment_color = None
@@ -3125,7 +3121,6 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 style_list.append(('BOTTOMPADDING', (0,en_row_idx-1), (-1,en_row_idx-1), gap_de_to_en))
                 style_list.append(('TOPPADDING',    (0,en_row_idx), (-1,en_row_idx), gap_de_to_en))
             
-            tbl.setStyle(TableStyle(style_list))
         else:
             # Nicht-Versmaß: bisheriges Padding-Verhalten
             style_list = [
@@ -3170,8 +3165,11 @@ def build_tables_for_pair(gr_tokens: list[str], de_tokens: list[str] = None,
                 # Abstand zwischen letzter DE-Alternative und EN
                 style_list.append(('BOTTOMPADDING', (0,en_row_idx-1), (-1,en_row_idx-1), gap_de_to_en))
                 style_list.append(('TOPPADDING',    (0,en_row_idx), (-1,en_row_idx), gap_de_to_en))
-            
-            tbl.setStyle(TableStyle(style_list))
+
+        # Create table with all visible rows
+        # NEU: interlinear_table → InterlinearRow statt Table (außer INTERLINEAR_ROW_FLOWABLE=0)
+        # (mit BACKGROUND für Kommentar-Hinterlegung bleibt es bei Table)
+        tbl = interlinear_table(table_rows, col_w, style_list, h_align='LEFT')
         tables.append(tbl)
         first_slice, i = False, j
 
@@ -3214,46 +3212,40 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                placement_overrides: dict[str, str] | None = None,
                tag_config: dict | None = None,
                hide_pipes:bool=False):  # NEU: Pipes (|) in Übersetzungen verstecken
+    # NEU: Variantenzustand (NoTags, Latein, Overrides, Abstände) als RenderContext statt Modul-Globals
+    ctx = make_render_context(pdf_name, tag_mode=tag_mode, versmass_display=versmass_display,
+                              placement_overrides=placement_overrides)
+    with activate_render_context(ctx):
+        return _create_pdf(blocks, pdf_name, gr_bold=gr_bold, de_bold=de_bold,
+                           versmass_display=versmass_display, tag_mode=tag_mode,
+                           placement_overrides=placement_overrides, tag_config=tag_config,
+                           hide_pipes=hide_pipes, ctx=ctx)
+
+def _create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
+                de_bold:bool = False,
+                versmass_display: bool = False,
+                tag_mode: str = "TAGS",
+                placement_overrides: dict[str, str] | None = None,
+                tag_config: dict | None = None,
+                hide_pipes:bool=False,
+                ctx: RenderContext):
 
     # Verarbeite Kommentare und weise Farben zu
     comments = process_comments_for_coloring(blocks)
     
     # Erstelle eine Map: Zeilennummer → Kommentar-Farbe (für Hinterlegung)
-    line_comment_colors = {}  # {line_num: (r, g, b)}
-    for comment in comments:
-        color = comment['color']
-        for line_num in range(comment['start_line'], comment['end_line'] + 1):
-            line_comment_colors[line_num] = color
+    # Sortierter Intervall-Index statt zeilenweisem Dict (shared/comment_index.py):
+    # gleiche Abfragen (in / [] / get), aber O(log n) und unabhängig von der Bereichslänge
+    line_comment_colors = LineColorIndex.from_comments(comments)  # {line_num: (r, g, b)}
     
     # Speichere line_comment_colors für späteres Rendering
     # (wird in build_tables_for_pair verwendet)
 
-    # NoTags-Schalter global setzen basierend auf tag_mode (nicht nur Dateiname!)
-    global CURRENT_IS_NOTAGS
-    CURRENT_IS_NOTAGS = (tag_mode == "NO_TAGS") or pdf_name.lower().endswith("_notags.pdf")
-    # Lateinischer Text? (keine Versmaß-Marker-Entfernung für i, r, L)
-    global CURRENT_IS_LATIN
-    CURRENT_IS_LATIN = "_LAT_" in pdf_name.upper() or "_lat_" in pdf_name.lower()
-    # Optionale Hoch/Tief/Off-Overrides aus Preprocess/UI aktivieren
-    global PLACEMENT_OVERRIDES
-    PLACEMENT_OVERRIDES = dict(placement_overrides or {})
-    
-    # Versmaß-spezifische Abstände setzen (abhängig von versmass_display UND tag_mode)
-    global INTER_PAIR_GAP_MM
-    if versmass_display:
-        INTER_PAIR_GAP_MM = INTER_PAIR_GAP_MM_VERSMASS
-    else:
-        # Normal-PDFs: Unterscheide zwischen TAG und NOTAG
-        if CURRENT_IS_NOTAGS:
-            INTER_PAIR_GAP_MM = INTER_PAIR_GAP_MM_NORMAL_NOTAG
-        else:
-            INTER_PAIR_GAP_MM = INTER_PAIR_GAP_MM_NORMAL_TAG
-    
     # Intra-Pair Abstand für Debug
-    intra_val = INTRA_PAIR_ANCIENT_TO_MODERN_NOTAG if CURRENT_IS_NOTAGS else INTRA_PAIR_ANCIENT_TO_MODERN_TAG
+    intra_val = INTRA_PAIR_ANCIENT_TO_MODERN_NOTAG if ctx.is_notags else INTRA_PAIR_ANCIENT_TO_MODERN_TAG
     
     # Debug-Ausgabe
-    print(f"DEBUG Poesie: versmass={versmass_display}, tag_mode={'NO_TAGS' if CURRENT_IS_NOTAGS else 'TAGS'}, INTER_PAIR={INTER_PAIR_GAP_MM}mm, INTRA_PAIR={intra_val}mm")
+    print(f"DEBUG Poesie: versmass={versmass_display}, tag_mode={'NO_TAGS' if ctx.is_notags else 'TAGS'}, INTER_PAIR={ctx.inter_pair_gap_mm}mm, INTRA_PAIR={intra_val}mm")
     
     left_margin = 10*MM
     right_margin = 10*MM
@@ -3361,7 +3353,7 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                 fontName='DejaVu', fontSize=DE_SIZE, leading=_leading_for(DE_SIZE),
                 alignment=TA_LEFT)
             elements.append(Paragraph(formatted_text, zeile_lost_style))
-            elements.append(Spacer(1, INTER_PAIR_GAP_MM * MM))  # Normaler Abstand wie zwischen Zeilen
+            elements.append(Spacer(1, ctx.inter_pair_gap_mm * MM))  # Normaler Abstand wie zwischen Zeilen
             i += 1; continue
 
         # NEU: Kommentar-Zeilen (zahlk oder zahl-zahlk)
@@ -3594,6 +3586,7 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                     # ═══════════════════════════════════════════════════════════════════
                     next_tables = build_tables_for_pair(
                         next_gr_tokens,  # GR-Zeile nur einmal
+                        ctx=ctx,
                         de_tokens=None,  # Verwende Alternativen!
                         speaker=next_display_speaker,  # Sprecher nur bei erster Alternative!
                         line_label=next_line_label,  # Zeilennummer nur bei erster Alternative!
@@ -3631,7 +3624,7 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                     if next_base_num is not None and next_line_label:
                         next_token_w = measure_rendered_line_width(
                             next_gr_tokens, next_de_tokens,
-                            gr_bold=gr_bold, is_notags=CURRENT_IS_NOTAGS,
+                            gr_bold=gr_bold, is_notags=ctx.is_notags, ctx=ctx,
                             remove_bars_instead=True,
                             tag_config=tag_config,
                             hide_trans_flags=pair_b.get('hide_trans_flags', [])
@@ -3667,12 +3660,12 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                 # 2. Erste Textzeile (wird durch keepWithNext an Überschriften gekoppelt)
                 if len(rendered_lines) > 0:
                     elements.append(rendered_lines[0])
-                    elements.append(Spacer(1, INTER_PAIR_GAP_MM * MM))
+                    elements.append(Spacer(1, ctx.inter_pair_gap_mm * MM))
                 
                 # 3. Zweite Textzeile einzeln
                 if len(rendered_lines) > 1:
                     elements.append(rendered_lines[1])
-                    elements.append(Spacer(1, INTER_PAIR_GAP_MM * MM))
+                    elements.append(Spacer(1, ctx.inter_pair_gap_mm * MM))
                 
                 # WICHTIG: last_was_heading = False, weil wir gerade Textzeilen verarbeitet haben
                 # Die nächsten Zeilen sollen normale Sprecher-Logik verwenden
@@ -3801,6 +3794,7 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
             # ═══════════════════════════════════════════════════════════════════════════
             tables = build_tables_for_pair(
                 gr_tokens,  # GR-Zeile nur einmal
+                ctx=ctx,
                 de_tokens=None,  # Verwende Alternativen!
                 indent_pt=indent_pt,
                 global_speaker_width_pt=current_speaker_width_pt,
@@ -3942,12 +3936,12 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                 next_block = blocks[next_relevant_idx]
                 if next_block['type'] == 'section':
                     # Weniger Abstand vor Überschriften
-                    elements.append(Spacer(1, INTER_PAIR_GAP_MM * MM * 0.5))
+                    elements.append(Spacer(1, ctx.inter_pair_gap_mm * MM * 0.5))
                 else:
-                    elements.append(Spacer(1, INTER_PAIR_GAP_MM * MM))
+                    elements.append(Spacer(1, ctx.inter_pair_gap_mm * MM))
             else:
                 # Letzte Zeile: normaler Abstand
-                elements.append(Spacer(1, INTER_PAIR_GAP_MM * MM))
+                elements.append(Spacer(1, ctx.inter_pair_gap_mm * MM))
 
             # Nach dem Rendern: JEDE Zeile fügt ihre Breite zur kumulative Breite hinzu
             # Logik: 18 → 18b startet bei (Sprecher_von_18 + Text_von_18)
@@ -3957,7 +3951,7 @@ def create_pdf(blocks, pdf_name:str, *, gr_bold:bool,
                 # KRITISCH: Berechne Token-Breite
                 this_token_w = measure_rendered_line_width(
                     gr_tokens, de_tokens,
-                    gr_bold=gr_bold, is_notags=CURRENT_IS_NOTAGS,
+                    gr_bold=gr_bold, is_notags=ctx.is_notags, ctx=ctx,
                     remove_bars_instead=True,
                     tag_config=tag_config,
                     hide_trans_flags=b.get('hide_trans_flags', [])  # NEU: HideTrans-Flags für korrekte Breitenberechnung!
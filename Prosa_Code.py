@@ -5,6 +5,28 @@
 from pathlib import Path
 from shared.fonts_and_styles import register_dejavu, make_gr_de_styles
 register_dejavu(Path(__file__).resolve().parent / "shared" / "fonts")
+# NEU: Gecachte Breitenmessung (LRU + Zeichentabelle pro Font) statt pdfmetrics.stringWidth
+from shared.text_metrics import string_width
+# NEU: Vorkompilierte Regexe (zentrale Registry)
+from shared import regex_patterns as rx
+# NEU: Token-Records (Farbmarker, Kern, Tags, Flags) – einmal pro Token-String zerlegt
+from shared.token_record import parse_token
+# NEU: Streamender PDF-Build (Flowables werden laufend gesetzt statt gesammelt)
+from shared.streaming_build import StreamingDocBuild, streaming_enabled
+# NEU: Sortierter Intervall-Index Zeile → Kommentar-Farbe (statt zeilenweisem Dict)
+from shared.comment_index import LineColorIndex
+# NEU: Render-Kontext pro create_pdf-Aufruf (statt Modul-Globals → Varianten parallel im selben Prozess)
+from shared.render_context import RenderContext, current_render_context, activate_render_context, with_render_context
+# NEU: Zeilenumbruch über Präfixsummen der Spaltenbreiten (gierig oder DP-optimal)
+from shared.line_breaking import ColumnBreaker, line_break_mode
+# NEU: Gebündelte Breitenmessung pro Flow (jeder verschiedene Token einmal gemessen)
+from shared.column_widths import width_table
+# NEU: Leichtgewichtiges Zeilen-Flowable statt Table pro Slice (INTERLINEAR_ROW_FLOWABLE=0 → Table)
+from shared.interlinear_row import interlinear_table, row_flowable_enabled
+# NEU: Einmalige Voranalyse der Zeilen (Nummer, Art, Sprachanzahl) statt 50-Zeilen-Suchen pro Insertion
+from shared.line_index import LineIndex
+# NEU: Streamende Zeilenquelle (mmap bzw. str.find) statt read → re.sub → split → Listen-Kopien
+from shared.line_source import iter_text_lines, iter_file_lines
 
 # Import für Preprocessing
 try:
@@ -25,7 +47,8 @@ from reportlab.pdfbase      import pdfmetrics
 from reportlab.platypus     import SimpleDocTemplate, Paragraph, Spacer, KeepTogether, Table, TableStyle
 from reportlab.lib          import colors
 
-import re, os, html, json, argparse
+import re, os, html, json, argparse, itertools
+from collections import deque
 
 # =============================================================================
 # PROSA-KONFIGURATION: Klare, separate Einstellungen für alle Parameter
@@ -61,7 +84,7 @@ CONT_PAIR_GAP_MM_TAGS = 2.0     # Abstand ZWISCHEN Tabellenzeilen bei PDFs MIT T
 CONT_PAIR_GAP_MM_NO_TAGS = 1.0  # Abstand ZWISCHEN Tabellenzeilen bei PDFs OHNE Tags (MAXIMAL ENG)
 
 # Sonstige Abstände (werden durch tag_mode-spezifische Werte überschrieben)
-# CONT_PAIR_GAP_MM wird in create_pdf basierend auf tag_mode gesetzt
+# CONT_PAIR_GAP_MM wird pro Variante basierend auf tag_mode gesetzt (make_render_context → RenderContext)
 BLANK_MARKER_GAP_MM = 4.0         # Abstand bei Leerzeilen-Marker
 
 # ----------------------- HORIZONTALE ABSTÄNDE (Wort zu Wort) -----------------------
@@ -204,7 +227,7 @@ SOURCE_RIGHT_INDENT_MM = 10.0
 # TAG_WIDTH_FACTOR wird oben definiert (keine doppelte Definition)
 # PARA_GAP_MM = 2.0 (oben definiert)
 # SPEAKER_GAP_MM = 3.0 (oben definiert)
-# CONT_PAIR_GAP_MM wird dynamisch in create_pdf gesetzt
+# CONT_PAIR_GAP_MM wird pro Variante im RenderContext gesetzt (make_render_context)
 BLANK_MARKER_GAP_MM = 4.0
 
 # Textgrößen (bleiben gleich für alle Modi)
@@ -213,7 +236,7 @@ NORMAL_DE_SIZE = 8.0
 REVERSE_GR_SIZE = 8.5
 REVERSE_DE_SIZE = 7.8
 
-# Standardwerte (werden in create_pdf überschrieben)
+# Standardwerte (pro Variante: RenderContext, siehe make_render_context)
 CONT_PAIR_GAP_MM = CONT_PAIR_GAP_MM_TAGS   # 10.0 (korrekter Abstand zwischen Tabellenzeilen)
 INTRA_PAIR_GAP_MM = INTRA_PAIR_GAP_MM_TAGS  # 1.5
 # SPEAKER_GAP_MM wird oben definiert
@@ -232,9 +255,9 @@ DEFAULT_SUB_TAGS = {'Prä','Imp','Aor','Per','Plq','Fu','Inf','Imv','Akt','Med',
 SUP_TAGS = DEFAULT_SUP_TAGS.copy()
 SUB_TAGS = DEFAULT_SUB_TAGS.copy()
 
-RE_TAG       = re.compile(r'\(([A-Za-z0-9/≈äöüßÄÖÜ]+)\)')
-RE_TAG_NAKED = re.compile(r'\([A-Za-z0-9/≈äöüßÄÖÜ]+\)')
-RE_TAG_STRIP = re.compile(r'\(\s*[A-Za-z0-9/≈äöüßÄÖÜ]+\s*\)')
+RE_TAG       = rx.RE_PAREN_TAG
+RE_TAG_NAKED = rx.RE_PAREN_TAG_NAKED
+RE_TAG_STRIP = rx.RE_PAREN_TAG_STRIP
 
 # ----------------------- Defensive token-helpers -----------------------
 def _strip_tags_from_token(tok: str, block: dict = None, tok_idx: int = None, tag_mode: str = "TAGS") -> str:
@@ -353,16 +376,52 @@ def load_tag_config(config_file: str = None) -> None:
     except Exception as e:
         print(f"Fehler beim Laden der Tag-Konfiguration: {e}")
 
-def set_tag_placement_overrides(overrides: dict | None):
-    """Von außen (unified_api) einstellbar. Werte: "sup" | "sub" | "off"."""
-    global _PLACEMENT_OVERRIDES
-    _PLACEMENT_OVERRIDES = {}
+def _clean_placement_overrides(overrides: dict | None) -> dict[str, str]:
+    """Nur gültige Werte ("sup" | "sub" | "off") übernehmen, Keys als plain Strings."""
+    cleaned: dict[str, str] = {}
     if overrides:
-        # nur gültige Werte übernehmen, Keys als plain Strings
         for k, v in overrides.items():
             v2 = (v or '').strip().lower()
             if v2 in ('sup', 'sub', 'off'):
-                _PLACEMENT_OVERRIDES[str(k)] = v2
+                cleaned[str(k)] = v2
+    return cleaned
+
+def set_tag_placement_overrides(overrides: dict | None):
+    """Von außen (unified_api) einstellbar. Werte: "sup" | "sub" | "off".
+    Gilt als Default für Aufrufe außerhalb von create_pdf (dort: RenderContext)."""
+    global _PLACEMENT_OVERRIDES
+    _PLACEMENT_OVERRIDES = _clean_placement_overrides(overrides)
+
+def _default_render_context() -> RenderContext:
+    """Kontext aus den Modul-Defaults (Builder-Aufrufe außerhalb von create_pdf)."""
+    return RenderContext(placement_overrides=_PLACEMENT_OVERRIDES,
+                         intra_pair_gap_mm=INTRA_PAIR_GAP_MM, cont_pair_gap_mm=CONT_PAIR_GAP_MM,
+                         speaker_gap_mm=SPEAKER_GAP_MM)
+
+def _render_ctx(ctx: RenderContext | None = None) -> RenderContext:
+    """ctx, sonst der aktive Kontext (create_pdf), sonst die Modul-Defaults."""
+    if ctx is not None:
+        return ctx
+    return current_render_context() or _default_render_context()
+
+def make_render_context(pdf_name: str, *, tag_mode: str = "TAGS",
+                        placement_overrides: dict | None = None) -> RenderContext:
+    """Variantenabhängiger Zustand für create_pdf (früher als Modul-Globals gesetzt)."""
+    # Setze kritische Konstanten basierend auf tag_mode
+    if tag_mode == "TAGS":
+        intra_gap = INTRA_PAIR_GAP_MM_TAGS  # 1.5mm
+        cont_gap = CONT_PAIR_GAP_MM_TAGS    # 3.0mm (minimal für Stabilität)
+    else:  # NO_TAGS
+        intra_gap = INTRA_PAIR_GAP_MM_NO_TAGS  # 1.0mm
+        cont_gap = CONT_PAIR_GAP_MM_NO_TAGS    # 6.0mm (minimal)
+    return RenderContext(
+        is_notags=(tag_mode != "TAGS"),
+        # Tag-Placement-Overrides (hoch/tief/aus)
+        placement_overrides=_clean_placement_overrides(placement_overrides),
+        intra_pair_gap_mm=intra_gap,
+        cont_pair_gap_mm=cont_gap,
+        speaker_gap_mm=1.2,  # Gleich wie PARA_GAP_MM für konsistente Formatierung
+    )
 
 def _normalize_tag_case(tag: str) -> str:
     """
@@ -373,12 +432,13 @@ def _normalize_tag_case(tag: str) -> str:
         return 'ij'
     return tag
 
-def _partition_tags_for_display(tags: list[str], *, is_greek_row: bool) -> tuple[list[str], list[str], list[str]]:
+def _partition_tags_for_display(tags: list[str], *, is_greek_row: bool,
+                                ctx: RenderContext | None = None) -> tuple[list[str], list[str], list[str]]:
     """
     Teilt tags in (sups, subs, rest) gemäß:
       - Standard (SUP_TAGS/SUB_TAGS)
       - DE-Zeile: nur '≈' im Sup sichtbar (wie gehabt)
-      - Overrides: _PLACEMENT_OVERRIDES hat Vorrang: 'sup'/'sub'/'off'
+      - Overrides: placement_overrides des RenderContext haben Vorrang: 'sup'/'sub'/'off'
     """
     if not tags:
         return [], [], []
@@ -396,10 +456,11 @@ def _partition_tags_for_display(tags: list[str], *, is_greek_row: bool) -> tuple
     rest = [t for t in normalized_tags if (t not in SUP_TAGS and t not in SUB_TAGS)]
 
     # Overrides anwenden (mit normalisierten Tags)
-    if _PLACEMENT_OVERRIDES:
+    overrides = _render_ctx(ctx).placement_overrides
+    if overrides:
         keep_sup, keep_sub, keep_off = [], [], []
         for t in normalized_tags:
-            mode = _PLACEMENT_OVERRIDES.get(t)
+            mode = overrides.get(t)
             if mode == 'sup':
                 keep_sup.append(t)
             elif mode == 'sub':
@@ -419,36 +480,36 @@ def _partition_tags_for_display(tags: list[str], *, is_greek_row: bool) -> tuple
 
     return sups, subs, rest
 
-RE_INLINE_MARK = re.compile(r'^\(\s*(?:[0-9]+[a-z]*|[a-z])\s*\)$', re.IGNORECASE)
+RE_INLINE_MARK = rx.RE_INLINE_MARK
 
-RE_EQ_H1 = re.compile(r'^\s*={4}\s*(.+?)\s*={4}\s*$')                 # ==== Text ====
-RE_EQ_H2 = re.compile(r'^\s*={3}\s*(.+?)\s*={3}\s*$')                 # === Text ===
-RE_EQ_H3 = re.compile(r'^\s*={2}\s*(.+?)\s*={2}\s*$')                 # == Text ==
-RE_EQ_PARA = re.compile(r'^\s*=\s*§\s*([0-9IVXLCDM]+)\s*=\s*$', re.IGNORECASE)
-RE_BRACE_TITLE = re.compile(r'^\s*\{\s*(.+?)\s*\}\s*$')
+RE_EQ_H1 = rx.RE_EQ_H1                                                # ==== Text ====
+RE_EQ_H2 = rx.RE_EQ_H2                                                # === Text ===
+RE_EQ_H3 = rx.RE_EQ_H3                                                # == Text ==
+RE_EQ_PARA = rx.RE_EQ_PARA
+RE_BRACE_TITLE = rx.RE_BRACE_TITLE
 
-RE_QUOTE_START   = re.compile(r'^\s*(\([^)]+\))?\s*\[Zitat\s*Anfang\]\s*$',  re.IGNORECASE)
-RE_QUOTE_END     = re.compile(r'^\s*(\([^)]+\))?\s*\[Zitat\s*Ende\]\s*$',    re.IGNORECASE)
-RE_SOURCE_START  = re.compile(r'^\s*(\([^)]+\))?\s*\[Quelle\s*Anfang\]\s*$', re.IGNORECASE)
-RE_SOURCE_END    = re.compile(r'^\s*(\([^)]+\))?\s*\[Quelle\s*Ende\]\s*$',   re.IGNORECASE)
-RE_SOURCE_INLINE = re.compile(r'^\s*(\([^)]+\))?\s*\[Quelle\s*Anfang\]\s*(.*?)\s*\[Quelle\s*Ende\]\s*$', re.IGNORECASE)
+RE_QUOTE_START   = rx.RE_QUOTE_START
+RE_QUOTE_END     = rx.RE_QUOTE_END
+RE_SOURCE_START  = rx.RE_SOURCE_START
+RE_SOURCE_END    = rx.RE_SOURCE_END
+RE_SOURCE_INLINE = rx.RE_SOURCE_INLINE
 
-RE_HAS_GREEK = re.compile(r'[\u0370-\u03FF\u1F00-\u1FFF]')
+RE_HAS_GREEK = rx.RE_HAS_GREEK
 
 # Sprecher (griechisch + Klammerform)
-RE_SPEAKER_GR    = re.compile(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:$')     # Λυσ:, Σωκ:
-RE_SPK_BRACKET   = re.compile(r'^\[[^\]]*:\]$')                         # [ΣΩΚ:]
+RE_SPEAKER_GR    = rx.RE_SPEAKER_GR                                   # Λυσ:, Σωκ:
+RE_SPK_BRACKET   = rx.RE_SPK_BRACKET                                  # [ΣΩΚ:]
 
 # ----------------------- Utils -----------------------
 def _strip_speaker_prefix_for_classify(line: str) -> str:
     """Entfernt NUR für die Klassifikation einen führenden Sprecher-Präfix."""
     s = (line or '').strip()
     # [Sprecher:] <Rest>
-    m = re.match(r'^\[[^\]]*:\]\s*(.*)$', s)
+    m = rx.RE_SPK_BRACKET_PREFIX.match(s)
     if m:
         return m.group(1)
     # ΓΡΑΦΗ: <Rest>
-    m2 = re.match(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:\s*(.*)$', s)
+    m2 = rx.RE_SPEAKER_GR_PREFIX.match(s)
     if m2:
         return m2.group(1)
     return s
@@ -461,28 +522,28 @@ def _remove_speaker_from_line(line: str) -> str:
     """
     s = (line or '').strip()
     # Extrahiere Zeilennummer (falls vorhanden)
-    line_num_match = re.match(r'^(\(\d+[a-z]*\))\s*(.*)$', s)
+    line_num_match = rx.RE_LINE_NUM_AND_REST.match(s)
     if line_num_match:
         line_num = line_num_match.group(1)
         rest = line_num_match.group(2)
         # Entferne Sprecher aus dem Rest
         # [Sprecher:] <Rest>
-        m = re.match(r'^\[[^\]]*:\]\s*(.*)$', rest)
+        m = rx.RE_SPK_BRACKET_PREFIX.match(rest)
         if m:
             return f"{line_num} {m.group(1)}"
         # ΓΡΑΦΗ: <Rest>
-        m2 = re.match(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:\s*(.*)$', rest)
+        m2 = rx.RE_SPEAKER_GR_PREFIX.match(rest)
         if m2:
             return f"{line_num} {m2.group(1)}"
         return s
     else:
         # Keine Zeilennummer, entferne nur Sprecher
         # [Sprecher:] <Rest>
-        m = re.match(r'^\[[^\]]*:\]\s*(.*)$', s)
+        m = rx.RE_SPK_BRACKET_PREFIX.match(s)
         if m:
             return m.group(1)
         # ΓΡΑΦΗ: <Rest>
-        m2 = re.match(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:\s*(.*)$', s)
+        m2 = rx.RE_SPEAKER_GR_PREFIX.match(s)
         if m2:
             return m2.group(1)
         return s
@@ -513,7 +574,7 @@ def extract_line_number(s: str) -> tuple[str | None, str]:
     """
     s = (s or '').strip()
     # NEU: Regex für Bereichs-Kommentare: (zahl-zahl+k/i)
-    m_range = re.match(r'^\((\d+)-(\d+)([a-z]?)\)\s*(.*)$', s, re.IGNORECASE)
+    m_range = rx.RE_LINE_RANGE_EXTRACT.match(s)
     if m_range:
         start = m_range.group(1)
         end = m_range.group(2)
@@ -524,7 +585,7 @@ def extract_line_number(s: str) -> tuple[str | None, str]:
     # Regex für Zeilennummer: (Zahl[optionaler Buchstabe oder k/i])
     # k = Kommentar, i = Insertion
     # Beispiele: (123), (123a), (123k), (123i), (50k), (300i)
-    m = re.match(r'^\((\d+[a-z]?)\)\s*(.*)$', s, re.IGNORECASE)
+    m = rx.RE_LINE_NUM_EXTRACT.match(s)
     if m:
         line_num = m.group(1)
         return (line_num, m.group(2))
@@ -542,97 +603,29 @@ def is_insertion_line(line_num: str | None) -> bool:
         return False
     return line_num.lower().endswith('i')
 
-def detect_language_count_from_context(lines: list, current_idx: int) -> int:
+def build_line_index(lines: list) -> LineIndex:
+    """
+    Einmalige Voranalyse eines Zeilen-Arrays (siehe shared/line_index.py): Zeilennummer,
+    Zeilenart (k/i/normal) und Sprachanzahl pro Zeile – danach alle Abfragen in O(1).
+    """
+    return LineIndex(lines, extract_line_number, is_comment=is_comment_line,
+                     is_insertion=is_insertion_line, max_count=3, run_limit=5)
+
+def detect_language_count_from_context(lines: list | LineIndex, current_idx: int) -> int:
     """
     Erkennt, ob der Text 2-sprachig oder 3-sprachig ist, indem die umgebenden Zeilen analysiert werden.
     
     Sucht nach normalen Zeilen (ohne 'i' oder 'k' Suffix) und zählt, wie viele Zeilen mit
-    der gleichen Basisnummer aufeinanderfolgen.
+    der gleichen Basisnummer aufeinanderfolgen (zuerst rückwärts, dann vorwärts, max. 50 Zeilen).
+    
+    NEU: Wird mit einem LineIndex (build_line_index) aufgerufen → O(1)-Abfrage. Eine rohe Liste
+    wird einmalig indiziert (nur für Einzelabfragen sinnvoll).
     
     Returns:
         2 oder 3 (Anzahl der Sprachen im Text)
     """
-    # Suche rückwärts nach der letzten normalen Zeile (keine k, i Suffixe)
-    search_range = 50  # Suche max. 50 Zeilen vor/nach
-    
-    for offset in range(1, min(search_range, current_idx + 1)):
-        check_idx = current_idx - offset
-        if check_idx < 0:
-            break
-            
-        check_line = (lines[check_idx] or '').strip()
-        if not check_line:
-            continue
-            
-        line_num, _ = extract_line_number(check_line)
-        if line_num is None:
-            continue
-            
-        # Ignoriere Kommentare und Insertionen
-        if is_comment_line(line_num) or is_insertion_line(line_num):
-            continue
-        
-        # Wir haben eine normale Zeile gefunden - zähle wie viele Zeilen mit dieser Nummer existieren
-        lines_with_same_num = []
-        j = check_idx
-        while j < len(lines) and len(lines_with_same_num) < 5:  # Max 5 Zeilen prüfen
-            test_line = (lines[j] or '').strip()
-            if not test_line:
-                j += 1
-                continue
-                
-            test_num, _ = extract_line_number(test_line)
-            if test_num == line_num:
-                lines_with_same_num.append(test_line)
-                j += 1
-            else:
-                break
-        
-        # Wenn wir 2 oder 3 Zeilen gefunden haben, geben wir das zurück
-        count = len(lines_with_same_num)
-        if count >= 2:
-            return min(count, 3)  # Max 3 (2 oder 3 Sprachen)
-    
-    # Fallback: Suche vorwärts
-    for offset in range(1, min(search_range, len(lines) - current_idx)):
-        check_idx = current_idx + offset
-        if check_idx >= len(lines):
-            break
-            
-        check_line = (lines[check_idx] or '').strip()
-        if not check_line:
-            continue
-            
-        line_num, _ = extract_line_number(check_line)
-        if line_num is None:
-            continue
-            
-        # Ignoriere Kommentare und Insertionen
-        if is_comment_line(line_num) or is_insertion_line(line_num):
-            continue
-        
-        # Zähle Zeilen mit dieser Nummer
-        lines_with_same_num = []
-        j = check_idx
-        while j < len(lines) and len(lines_with_same_num) < 5:
-            test_line = (lines[j] or '').strip()
-            if not test_line:
-                j += 1
-                continue
-                
-            test_num, _ = extract_line_number(test_line)
-            if test_num == line_num:
-                lines_with_same_num.append(test_line)
-                j += 1
-            else:
-                break
-        
-        count = len(lines_with_same_num)
-        if count >= 2:
-            return min(count, 3)
-    
-    # Default: 2-sprachig
-    return 2
+    index = lines if isinstance(lines, LineIndex) else build_line_index(lines)
+    return index.language_count(current_idx)
 
 def extract_line_range(line_num: str | None) -> tuple[int | None, int | None]:
     """
@@ -652,7 +645,7 @@ def extract_line_range(line_num: str | None) -> tuple[int | None, int | None]:
         return (None, None)
     
     # Prüfe auf Bereichs-Format: "220-222k"
-    range_match = re.match(r'^(-?\d+)-(-?\d+)', line_num)
+    range_match = rx.RE_LEADING_INT_RANGE.match(line_num)
     if range_match:
         try:
             start = int(range_match.group(1))
@@ -662,7 +655,7 @@ def extract_line_range(line_num: str | None) -> tuple[int | None, int | None]:
             return (None, None)
     
     # Einzelne Zeile: Extrahiere die Zahl
-    num_match = re.match(r'^(-?\d+)', line_num)
+    num_match = rx.RE_LEADING_INT.match(line_num)
     if num_match:
         try:
             num = int(num_match.group(1))
@@ -712,9 +705,9 @@ def is_latin_line(s:str) -> bool:
         return False
     s = s.strip()
     # Entferne Zeilennummer, Sprecher, Tags etc. für die Analyse
-    s_clean = re.sub(r'^\(\d+[a-z]*\)', '', s)  # Zeilennummer
-    s_clean = re.sub(r'^\[[^\]]*:\]', '', s_clean)  # Sprecher
-    s_clean = re.sub(r'\([^)]*\)', '', s_clean)  # Tags
+    s_clean = rx.RE_LINE_NUM_LEAD.sub('', s)  # Zeilennummer
+    s_clean = rx.RE_SPK_BRACKET_LEAD.sub('', s_clean)  # Sprecher
+    s_clean = rx.RE_ANY_PAREN.sub('', s_clean)  # Tags
     
     # Zähle lateinische Buchstaben (a-z, A-Z, aber keine Umlaute)
     latin_count = sum(1 for ch in s_clean if ch.isalpha() and ord(ch) < 128)
@@ -729,7 +722,7 @@ def is_empty_or_sep(line:str) -> bool:
     return (not t) or t.upper() in {'[FREIE ZEILE]', '[ENTERZEICHEN]'} or t.startswith('---')
 
 def normalize_spaces(s:str) -> str:
-    return re.sub(r'\s+', ' ', (s or '').strip())
+    return rx.RE_WHITESPACE_RUN.sub(' ', (s or '').strip())
 
 def pre_substitutions(s:str) -> str:
     """
@@ -758,25 +751,25 @@ def tokenize(line:str):
     # Diese Marker sind nur für das Parsing gedacht und sollen nicht im PDF erscheinen
     # Entferne die Marker BEVOR normalize_spaces aufgerufen wird
     # Entferne Zitat/Quelle-Marker aus der Zeile
-    line = re.sub(r'\[Zitat\s*Anfang\]', '', line, flags=re.IGNORECASE)
-    line = re.sub(r'\[Zitat\s*Ende\]', '', line, flags=re.IGNORECASE)
-    line = re.sub(r'\[Quelle\s*Anfang\]', '', line, flags=re.IGNORECASE)
-    line = re.sub(r'\[Quelle\s*Ende\]', '', line, flags=re.IGNORECASE)
+    # SCHNELLPFAD: Ohne '[' kann kein Marker vorkommen (gilt für fast alle Zeilen)
+    if '[' in line:
+        for marker_re in rx.RE_QUOTE_SOURCE_MARKERS:
+            line = marker_re.sub('', line)
     
     # Entferne auch Zeilennummern, die nur Marker enthalten (z.B. "(491) " wenn danach nichts kommt)
     # Dies verhindert, dass leere Zeilen mit nur Zeilennummern im PDF erscheinen
-    line = re.sub(r'^\s*\(\d+[a-z]?\)\s*$', '', line)
+    line = rx.RE_LINE_NUM_ONLY.sub('', line)
     
     # LATEINISCH: (N)(Abl) → (Abl) Transformation
     # Entferne (N) vor Ablativ-Tags, da Nomen mit Ablativ implizit sind
     if is_latin_line(line):
-        line = re.sub(r'\(N\)\(Abl\)', '(Abl)', line)
+        line = rx.RE_LATIN_ABLATIVE_NOUN.sub('(Abl)', line)
     
     line = normalize_spaces(pre_substitutions(line))
     return [tok for tok in line.split(' ') if tok.strip()]
 
 def _measure_string(text:str, font:str, size:float) -> float:
-    return pdfmetrics.stringWidth(text, font, size)
+    return string_width(text, font, size)
 
 def _token_extra_buffer(token_has_visible_tags:bool):
     """
@@ -862,8 +855,8 @@ def _token_has_visible_tags(token: str, tag_mode: str, tag_config: dict = None)
     if tag_mode == "NO_TAGS":
         return False
     
-    # Extrahiere Tags aus Token
-    tags = RE_TAG.findall(token)
+    # Extrahiere Tags aus Token (Record gecacht, kein erneutes Regex-Parsen)
+    tags = parse_token(token).tags
     if not tags:
         return False
     
@@ -917,7 +910,7 @@ def pop_leading_speaker(tokens):
     if len(tokens) >= 2:
         t1 = tokens[1]
         # Prüfe ob t0 eine Zeilennummer ist (z.B. "(2)" oder "(123a)")
-        if re.match(r'^\(\d+[a-z]*\)$', t0):
+        if rx.RE_LINE_NUM_TOKEN.match(t0):
             if RE_SPK_BRACKET.match(t1):
                 inner = t1[1:-1]
                 if inner.endswith(':'): inner = inner[:-1]
@@ -934,12 +927,13 @@ def _inline_badge(text_inside:str, base_font_size:float) -> str:
     small = max(4.0, base_font_size * INLINE_SCALE)
     return f'<font name="DejaVu" color="{INLINE_COLOR_HEX}" size="{small:.2f}">[{xml_escape(text_inside)}]</font>'
 
-def format_token_markup(token:str, *, reverse_mode:bool=False, is_greek_row:bool, base_font_size:float, color_mode:str="COLOR") -> str:
+def format_token_markup(token:str, *, reverse_mode:bool=False, is_greek_row:bool, base_font_size:float, color_mode:str="COLOR",
+                        ctx: RenderContext | None = None) -> str:
     raw = (token or '').strip()
     if not raw: return ''
     # Inline-Marken wie "(1)" → kleines graues Badge (nur in GR-Zeile sichtbar)
     if RE_INLINE_MARK.match(raw):
-        inner = re.sub(r'^\(|\)$', '', raw).replace(' ', '')
+        inner = rx.RE_OUTER_PARENS.sub('', raw).replace(' ', '')
         return _inline_badge(inner, base_font_size) if is_greek_row else ''
 
     # Farbcodes - finde den ersten Farbcode im Token
@@ -967,8 +961,9 @@ def format_token_markup(token:str, *, reverse_mode:bool=False, is_greek_row:bool
 
     # Stärke/Tags
     strong = '~' in raw; raw = raw.replace('~','')
-    tags = RE_TAG.findall(raw)
-    core = RE_TAG_NAKED.sub('', raw).strip()
+    rec = parse_token(raw)
+    tags = list(rec.tags)
+    core = rec.core.strip()
 
     aorS_present = 'AorS' in tags
     if aorS_present: strong = True
@@ -989,9 +984,9 @@ def format_token_markup(token:str, *, reverse_mode:bool=False, is_greek_row:bool
 
     # NEU: Partition via Overrides
     if is_greek_row:
-        sups, subs, rest = _partition_tags_for_display(tags, is_greek_row=True)
+        sups, subs, rest = _partition_tags_for_display(tags, is_greek_row=True, ctx=ctx)
     else:
-        sups, subs, rest = _partition_tags_for_display(tags, is_greek_row=False)
+        sups, subs, rest = _partition_tags_for_display(tags, is_greek_row=False, ctx=ctx)
 
     core = xml_escape(core.replace('-', '|'))
     parts = []
@@ -1006,11 +1001,12 @@ def format_token_markup(token:str, *, reverse_mode:bool=False, is_greek_row:bool
     
     return ''.join(parts)
 
-def visible_measure_token(token:str, *, font:str, size:float, is_greek_row:bool=True, reverse_mode:bool=False) -> float:
+def visible_measure_token(token:str, *, font:str, size:float, is_greek_row:bool=True, reverse_mode:bool=False,
+                          ctx: RenderContext | None = None) -> float:
     t = (token or '').strip()
     if not t: return 0.0
     if RE_INLINE_MARK.match(t):
-        inner = re.sub(r'^\(|\)$', '', t).replace(' ', '')
+        inner = rx.RE_OUTER_PARENS.sub('', t).replace(' ', '')
         w = _measure_string(f'[{inner}]', font, size)
         return w + SAFE_EPS_PT + INLINE_EXTRA_PT + 2*CELL_PAD_LR_PT
 
@@ -1019,8 +1015,9 @@ def visible_measure_token(token:str, *, font:str, size:float, is_greek_row:bool=
         t = t.replace(color_char, '')
     strong = '~' in t; t = t.replace('~','')
 
-    tags = RE_TAG.findall(t)
-    core = RE_TAG_NAKED.sub('', t).strip()
+    rec = parse_token(t)
+    tags = list(rec.tags)
+    core = rec.core.strip()
 
     star_visible = False
     aorS_present = 'AorS' in tags
@@ -1037,7 +1034,7 @@ def visible_measure_token(token:str, *, font:str, size:float, is_greek_row:bool=
     w = _measure_string(core.replace('-', '|'), font, size)
 
     # NEU: gleiche Partition wie in der Darstellung
-    sups, subs, rest = _partition_tags_for_display(tags, is_greek_row=is_greek_row)
+    sups, subs, rest = _partition_tags_for_display(tags, is_greek_row=is_greek_row, ctx=ctx)
 
     # Breite der sichtbaren Tags addieren (beschränkt)
     kept = sups + subs + rest
@@ -1134,7 +1131,7 @@ def expand_slash_alternatives(tokens: list[str]) -> list[list[str]]:
             import re
             
             # Extrahiere alles außerhalb von Klammern
-            outside_parens = re.sub(r'\([^)]*\)', '', token)
+            outside_parens = rx.RE_ANY_PAREN.sub('', token)
             
             # Hat das Token `/` AUSSERHALB von Klammern?
             if '/' not in outside_parens:
@@ -1150,14 +1147,14 @@ def expand_slash_alternatives(tokens: list[str]) -> list[list[str]]:
             core_token = token
             
             # Extrahiere Tag-Prefix (z.B. "nomen#", "verb$", "nomenD#")
-            tag_match = re.match(r'^([a-zA-Z_]+[#\$§+\-])', core_token)
+            tag_match = rx.RE_COLOR_PREFIX_TAG.match(core_token)
             if tag_match:
                 prefix_tags = tag_match.group(1)
                 core_token = core_token[len(prefix_tags):]
             
             # Extrahiere Suffix-Tags (alles in Klammern am Ende)
             suffix_tags = ''
-            tag_suffix_match = re.search(r'(\([^)]*\))+$', core_token)
+            tag_suffix_match = rx.RE_PAREN_GROUP_SUFFIX.search(core_token)
             if tag_suffix_match:
                 suffix_tags = tag_suffix_match.group(0)
                 core_token = core_token[:tag_suffix_match.start()]
@@ -1194,7 +1191,7 @@ def expand_line_with_slashes(line: str) -> list[str]:
     import re
     
     # Extrahiere Zeilennummer
-    match = re.match(r'^(\s*\(\d+[a-z]?\)\s*)(.*)', line)
+    match = rx.RE_LINE_NUM_SPLIT.match(line)
     if not match:
         return [line]
     
@@ -1210,7 +1207,7 @@ def expand_line_with_slashes(line: str) -> list[str]:
     
     for token in tokens:
         # Prüfe ob `/` außerhalb von Klammern existiert
-        outside_parens = re.sub(r'\([^)]*\)', '', token)
+        outside_parens = rx.RE_ANY_PAREN.sub('', token)
         
         if '/' not in outside_parens:
             # Kein `/` → nur in erster Zeile
@@ -1228,14 +1225,14 @@ def expand_line_with_slashes(line: str) -> list[str]:
                 core = core[1:]
             else:
                 # Prüfe auf Buchstaben + Symbol (z.B. "nomen#")
-                tag_match = re.match(r'^([a-zA-Z_]+[#\$§+\-])', core)
+                tag_match = rx.RE_COLOR_PREFIX_TAG.match(core)
                 if tag_match:
                     prefix_tag = tag_match.group(1)
                     core = core[len(prefix_tag):]
             
             # Extrahiere Suffix-Tags (z.B. "(Art)(N)")
             suffix_tag = ''
-            suffix_match = re.search(r'(\([^)]*\))+$', core)
+            suffix_match = rx.RE_PAREN_GROUP_SUFFIX.search(core)
             if suffix_match:
                 suffix_tag = suffix_match.group(0)
                 core = core[:suffix_match.start()]
@@ -1344,7 +1341,7 @@ def expand_triple_with_slashes(gr_line: str, de_line: str, en_line: str) -> tupl
         # Suche nach Sprecher-Pattern: [Name:] oder Name: nach Zeilennummer
         # Beispiel: "(17) [Χρεμύλος:] τῶν μὲν..."
         # WICHTIG: [Name:] - der Doppelpunkt ist INNERHALB der eckigen Klammern!
-        speaker_match = re.match(r'^(\s*\(\d+[a-z]?\)\s*)(\[.+?:\]\s*|([^\s:]+):\s*)(.*)', line)
+        speaker_match = rx.RE_LINE_NUM_SPEAKER_SPLIT.match(line)
         if speaker_match:
             line_prefix = speaker_match.group(1)  # "(17) "
             speaker_part = speaker_match.group(2)  # "[Χρεμύλος:] " oder "Name: "
@@ -1382,7 +1379,7 @@ def expand_triple_with_slashes(gr_line: str, de_line: str, en_line: str) -> tupl
         # GR hat nur 1 Zeile, aber max_alts > 1 → expandiere GR mit ∅
         # Extrahiere Tokens aus der ersten GR-Zeile
         import re
-        match = re.match(r'^(\s*\(\d+[a-z]?\)\s*)(.*)', gr_expanded[0])
+        match = rx.RE_LINE_NUM_SPLIT.match(gr_expanded[0])
         if match:
             prefix = match.group(1)
             content = match.group(2)
@@ -1405,7 +1402,7 @@ def expand_triple_with_slashes(gr_line: str, de_line: str, en_line: str) -> tupl
         
         # Extrahiere Zeilennummer aus erster Zeile
         if lines_list[0]:
-            match = re.match(r'^(\s*\(\d+[a-z]?\)\s*)', lines_list[0])
+            match = rx.RE_LINE_NUM_SPLIT.match(lines_list[0])
             prefix = match.group(1) if match else ''
         else:
             prefix = line_prefix if line_prefix else ''
@@ -1420,7 +1417,7 @@ def expand_triple_with_slashes(gr_line: str, de_line: str, en_line: str) -> tupl
     line_prefix = ''
     for line in [gr_line, de_line, en_line]:
         if line:
-            match = re.match(r'^(\s*\(\d+[a-z]?\)\s*)', line)
+            match = rx.RE_LINE_NUM_SPLIT.match(line)
             if match:
                 line_prefix = match.group(1)
                 break
@@ -1435,7 +1432,7 @@ def expand_triple_with_slashes(gr_line: str, de_line: str, en_line: str) -> tupl
     if speaker_prefix and gr_lines:
         # Extrahiere Zeilennummer und Rest aus der ersten GR-Zeile
         first_gr = gr_lines[0]
-        match = re.match(r'^(\s*\(\d+[a-z]?\)\s*)(.*)', first_gr)
+        match = rx.RE_LINE_NUM_SPLIT.match(first_gr)
         if match:
             line_num_prefix = match.group(1)  # "(3) "
             rest_of_line = match.group(2)      # "εἶεν(Prä)..."
@@ -1448,23 +1445,11 @@ def expand_triple_with_slashes(gr_line: str, de_line: str, en_line: str) -> tupl
     
     return gr_lines, de_lines, en_lines
 
-def process_input_file(fname:str):
+def iter_slash_groups(lines):
     """
-    Vereinheitlichte Parser-Phase:
-    - Unterstützt Prosa-Features (Titel {}, =-Überschriften, §, Zitate/Quellen).
-    - Erkennt Sprecher in GR/DE und erzeugt später (bei Bedarf) eine Sprecher-Spalte.
-    - GR/DE-Paare werden wie gehabt gebildet; reflow zu Streams in group_pairs_into_flows().
+    STRAUßLOGIK-Vorstufe von process_input_lines: expandiert `/`-Alternativen in den Rohzeilen.
+    Generator über einen Zeilenstrom; hält nur die aktuelle Zeile + 2 Zeilen Vorschau.
     """
-    with open(fname, encoding='utf-8') as f:
-        raw_text = f.read()
-    
-    # KRITISCH: Entferne ALLE Metadata-Kommentare am Anfang (<!-- ... -->)
-    # Dies verhindert, dass sie als Text im PDF erscheinen
-    import re
-    raw_text = re.sub(r'^(<!--.*?-->\s*)+', '', raw_text, flags=re.DOTALL | re.MULTILINE)
-    
-    raw = [ln.rstrip('\n') for ln in raw_text.split('\n')]
-    
     # ═══════════════════════════════════════════════════════════════════
     # STRAUßLOGIK: Expandiere GRUPPEN von 3 Zeilen (GR, DE, EN) zusammen!
     # ═══════════════════════════════════════════════════════════════════
@@ -1472,34 +1457,41 @@ def process_input_file(fname:str):
     # Wenn alle 3 Zeilen die gleiche Nummer haben, expandieren wir sie ZUSAMMEN
     # auf die MAXIMALE Anzahl Alternativen!
     
-    expanded_raw = []
-    i = 0
-    while i < len(raw):
-        line = raw[i]
+    it = iter(lines)
+    window = deque(itertools.islice(it, 3))  # aktuelle Zeile + 2 Zeilen Vorschau
+
+    def advance(k):
+        for _ in range(k):
+            window.popleft()
+            for nxt in itertools.islice(it, 1):
+                window.append(nxt)
+
+    while window:
+        line = window[0]
         
         # Prüfe ob dies eine nummerierte Zeile ist
-        line_match = re.match(r'^\s*\(\d+[a-z]?\)', line)
+        line_match = rx.RE_LINE_NUM_PREFIX.match(line)
         if not line_match:
             # Keine Zeilennummer → einfach übernehmen
-            expanded_raw.append(line)
-            i += 1
+            yield line
+            advance(1)
             continue
         
         # Extrahiere Zeilennummer
-        line_num_match = re.match(r'^\s*\((\d+[a-z]?)\)', line)
+        line_num_match = rx.RE_LINE_NUM_PREFIX.match(line)
         if not line_num_match:
-            expanded_raw.append(line)
-            i += 1
+            yield line
+            advance(1)
             continue
         
         line_num = line_num_match.group(1)
         
         # Prüfe ob die nächsten 2 Zeilen die GLEICHE Nummer haben
-        next1 = raw[i+1] if i+1 < len(raw) else ''
-        next2 = raw[i+2] if i+2 < len(raw) else ''
+        next1 = window[1] if len(window) > 1 else ''
+        next2 = window[2] if len(window) > 2 else ''
         
-        next1_match = re.match(r'^\s*\((\d+[a-z]?)\)', next1) if next1 else None
-        next2_match = re.match(r'^\s*\((\d+[a-z]?)\)', next2) if next2 else None
+        next1_match = rx.RE_LINE_NUM_PREFIX.match(next1) if next1 else None
+        next2_match = rx.RE_LINE_NUM_PREFIX.match(next2) if next2 else None
         
         # WICHTIG: Überspringe Kommentare! Kommentare enden mit 'k' wie (8k) oder (125-129k)
         # Sie sollen NICHT für Slash-Expansion verwendet werden!
@@ -1509,8 +1501,8 @@ def process_input_file(fname:str):
         
         # Wenn IRGENDEINE Zeile ein Kommentar ist → KEINE Expansion!
         if is_comment or next1_is_comment or next2_is_comment:
-            expanded_raw.append(line)
-            i += 1
+            yield line
+            advance(1)
             continue
         
         # Prüfe ob mindestens EINE der 3 Zeilen `/` enthält
@@ -1530,12 +1522,12 @@ def process_input_file(fname:str):
             # Füge alle Zeilen hinzu (interleaved: GR1, DE1, EN1, GR2, DE2, EN2, ...)
             for j in range(len(gr_lines)):
                 # ALLE Gruppen OHNE Marker → fließen zusammen!
-                expanded_raw.append(gr_lines[j])
-                expanded_raw.append(de_lines[j])
-                expanded_raw.append(en_lines[j])
+                yield gr_lines[j]
+                yield de_lines[j]
+                yield en_lines[j]
             
             print(f"STRAUßLOGIK + FLIEßTEXT: Expandierte 3 Zeilen ({line_num}) → {len(gr_lines)} Gruppen (fließen zusammen!)", flush=True)
-            i += 3  # Überspringe alle 3 Zeilen
+            advance(3)  # Überspringe alle 3 Zeilen
             continue
         
         # FALL 2: Nur 2 Zeilen mit gleicher Nummer (GR + DE, kein EN)
@@ -1551,45 +1543,87 @@ def process_input_file(fname:str):
             # Bei 2-sprachig ist EN immer leer ('')
             # WICHTIG: Füge ein Leerzeichen zu leeren EN-Zeilen hinzu, damit sie nicht übersprungen werden!
             for j in range(len(gr_lines)):
-                expanded_raw.append(gr_lines[j])
-                expanded_raw.append(de_lines[j])
+                yield gr_lines[j]
+                yield de_lines[j]
                 # KRITISCH: Wenn EN leer ist, füge die Zeilennummer mit einem Leerzeichen hinzu!
                 # Sonst wird die Zeile beim Parsing als leer übersprungen!
                 en_line = en_lines[j]
                 if not en_line or en_line.strip() == '' or en_line.strip() == line_num or en_line.strip() == f'({line_num})':
                     # EN ist leer → füge Zeilennummer + Leerzeichen hinzu
                     en_line = f'({line_num}) '
-                expanded_raw.append(en_line)
+                yield en_line
             
             print(f"STRAUßLOGIK + FLIEßTEXT: Expandierte 2 Zeilen ({line_num}) → {len(gr_lines)} Gruppen (fließen zusammen!)", flush=True)
-            i += 2
+            advance(2)
             continue
         
         # FALL 3: Einzelne Zeile mit `/`
         if has_slash:
             # Expandiere nur diese eine Zeile
             expanded_lines = expand_line_with_slashes(line)
-            expanded_raw.extend(expanded_lines)
+            yield from expanded_lines
             print(f"STRAUßLOGIK: Expandierte 1 Zeile ({line_num}) → {len(expanded_lines)} Zeilen", flush=True)
-            i += 1
+            advance(1)
             continue
         
         # FALL 4: Keine Expansion nötig
-        expanded_raw.append(line)
-        i += 1
-    
-    raw = expanded_raw
-    
-    # LATEINISCH: (N)(Abl) → (Abl) Transformation für ALLE Zeilen
-    # Prüfe ob es ein lateinischer Text ist (erste nicht-leere Zeile)
+        yield line
+        advance(1)
+
+def expand_slash_groups(raw):
+    """
+    Listen-Variante von iter_slash_groups (Projektions-Prüfung, siehe projection_exact).
+    """
+    return list(iter_slash_groups(raw))
+
+def process_input_file(fname:str):
+    """
+    Vereinheitlichte Parser-Phase:
+    - Unterstützt Prosa-Features (Titel {}, =-Überschriften, §, Zitate/Quellen).
+    - Erkennt Sprecher in GR/DE und erzeugt später (bei Bedarf) eine Sprecher-Spalte.
+    - GR/DE-Paare werden wie gehabt gebildet; reflow zu Streams in group_pairs_into_flows().
+    Die Datei wird per mmap zeilenweise gelesen (shared/line_source.py), nicht als Ganzes.
+    """
+    return process_input_lines(iter_file_lines(fname))
+
+def process_input_text(raw_text:str):
+    """
+    Wie process_input_file, aber für bereits gelesenen Text (In-Process-API: prosa_pdf.render_all).
+    """
+    return process_input_lines(iter_text_lines(raw_text))
+
+def _iter_latin_ablative(lines):
+    """
+    LATEINISCH: (N)(Abl) → (Abl) für ALLE Zeilen, sofern die erste nicht-leere Zeile lateinisch ist.
+    Puffert nur die Zeilen bis zu dieser Entscheidung.
+    """
+    it = iter(lines)
+    head = []
     is_latin_text = False
-    for line in raw:
+    for line in it:
+        head.append(line)
         if line.strip() and not is_empty_or_sep(line.strip()):
             is_latin_text = is_latin_line(line)
             break
-    
-    if is_latin_text:
-        raw = [re.sub(r'\(N\)\(Abl\)', '(Abl)', ln) for ln in raw]
+    if not is_latin_text:
+        yield from head
+        yield from it
+        return
+    sub = rx.RE_LATIN_ABLATIVE_NOUN.sub
+    for line in itertools.chain(head, it):
+        yield sub('(Abl)', line)
+
+def process_input_lines(lines):
+    """
+    Gemeinsamer Kern von process_input_file / process_input_text über einen Zeilenstrom
+    (Metadaten-Kommentare bereits entfernt, siehe shared/line_source.py).
+    """
+    # NEU: Slash-Expansion und Latein-Ersetzung laufen als Generatoren hinter der Zeilenquelle;
+    # materialisiert wird nur die fertige Zeilenliste (Index + Blockbildung brauchen Zufallszugriff)
+    raw = list(_iter_latin_ablative(iter_slash_groups(lines)))
+
+    # NEU: Jede Zeile genau einmal zerlegen; Gruppenbildung und Sprachanzahl lesen nur noch den Index
+    line_index = build_line_index(raw)
 
     blocks = []; i = 0
     while i < len(raw):
@@ -1642,8 +1676,8 @@ def process_input_file(fname:str):
         # NEUE LOGIK: Zeilennummern-basierte Paarbildung
         # FLIEßTEXT: KEINE Marker mehr! Alle Zeilen mit gleicher Nummer werden zusammengefügt!
         
-        # Extrahiere Zeilennummer der aktuellen Zeile
-        line_num, line_content = extract_line_number(line)
+        # Extrahiere Zeilennummer der aktuellen Zeile (aus der Voranalyse)
+        line_num, line_content = line_index.parsed(i)
         
         # NEU: Kommentarzeilen erkennen (k) und als Kommentar-Blocks speichern
         if line_num is not None and is_comment_line(line_num):
@@ -1702,7 +1736,7 @@ def process_input_file(fname:str):
                     continue
                 
                 # Prüfe Zeilennummer
-                next_num, _ = extract_line_number(next_line)
+                next_num = line_index.num(j)
                 if next_num == line_num:
                     lines_with_same_num.append(next_line)
                     j += 1
@@ -1721,7 +1755,7 @@ def process_input_file(fname:str):
             # Bei konsekutiven (i)-Zeilen müssen wir sie in Gruppen aufteilen
             if is_insertion_line(line_num):
                 # Erkenne, ob der Text 2-sprachig oder 3-sprachig ist
-                expected_lines_per_insertion = detect_language_count_from_context(raw, i)
+                expected_lines_per_insertion = line_index.language_count(i)
                 
                 print(f"DEBUG Prosa: Insertionszeile erkannt: {line_num}, {num_lines} Zeilen gefunden, erwarte {expected_lines_per_insertion} Zeilen pro Insertion")
                 
@@ -1744,7 +1778,7 @@ def process_input_file(fname:str):
                         en_line = _remove_line_number_from_line(_remove_speaker_from_line(insertion_group[2]))
                     
                     # Speichere die ursprüngliche Zeilennummer
-                    base_num = int(re.match(r'^(\d+)', line_num).group(1)) if re.match(r'^(\d+)', line_num) else None
+                    base_num = int(rx.RE_LEADING_UINT.match(line_num).group(1)) if rx.RE_LEADING_UINT.match(line_num) else None
                     blocks.append({'type':'pair', 'gr': gr_line, 'de': de_line, 'en': en_line, 'base': base_num})
                     
                     insertion_idx += expected_lines_per_insertion
@@ -1766,7 +1800,7 @@ def process_input_file(fname:str):
                 
                 de_line = _remove_line_number_from_line(_remove_speaker_from_line(lines_with_same_num[1]))
                 # NEU: Speichere die ursprüngliche Zeilennummer für Hinterlegung (ohne sie im PDF anzuzeigen)
-                base_num = int(re.match(r'^(\d+)', line_num).group(1)) if re.match(r'^(\d+)', line_num) else None
+                base_num = int(rx.RE_LEADING_UINT.match(line_num).group(1)) if rx.RE_LEADING_UINT.match(line_num) else None
                 pair_block = {'type':'pair', 'gr': gr_line, 'de': de_line, 'en': '', 'base': base_num}
                 blocks.append(pair_block)
                 i = j
@@ -1780,7 +1814,7 @@ def process_input_file(fname:str):
                 num_groups = (num_lines + 2) // 3  # Ganzzahl-Division mit Aufrunden
                 
                 # NEU: Speichere die ursprüngliche Zeilennummer für Hinterlegung
-                base_num = int(re.match(r'^(\d+)', line_num).group(1)) if re.match(r'^(\d+)', line_num) else None
+                base_num = int(rx.RE_LEADING_UINT.match(line_num).group(1)) if rx.RE_LEADING_UINT.match(line_num) else None
                 
                 # Erstelle für jede Gruppe einen pair-Block
                 for group_idx in range(num_groups):
@@ -1806,7 +1840,7 @@ def process_input_file(fname:str):
                 # Als Fallback: Prüfe Sprachinhalt (OHNE Sprecher zu berücksichtigen!)
                 line_without_speaker = _strip_speaker_prefix_for_classify(line_content)
                 # NEU: Speichere die ursprüngliche Zeilennummer für Hinterlegung
-                base_num = int(re.match(r'^(\d+)', line_num).group(1)) if re.match(r'^(\d+)', line_num) else None
+                base_num = int(rx.RE_LEADING_UINT.match(line_num).group(1)) if rx.RE_LEADING_UINT.match(line_num) else None
                 if is_greek_line(line_without_speaker) or is_latin_line(line_without_speaker):
                     # Antike Sprache ohne Übersetzung
                     pair_block = {'type':'pair', 'gr': line, 'de': '', 'en': '', 'base': base_num}
@@ -1841,27 +1875,12 @@ def process_input_file(fname:str):
     # WICHTIG: Filtere pair-Blöcke heraus, die nur Zitat/Quelle-Marker enthalten
     # Diese Zeilen sollen nicht im PDF erscheinen
     filtered_blocks = []
-    marker_pattern = re.compile(r'\[(?:Zitat|Quelle)\s*(?:Anfang|Ende)\]', re.IGNORECASE)
     skipped_count = 0
     
     for b in blocks:
-        if b['type'] == 'pair':
-            gr = (b.get('gr') or '').strip()
-            de = (b.get('de') or '').strip()
-            en = (b.get('en') or '').strip()
-            
-            # Entferne Zeilennummer aus gr und de
-            gr_no_num = re.sub(r'^\s*\(\d+[a-z]?\)\s*', '', gr).strip()
-            de_no_num = re.sub(r'^\s*\(\d+[a-z]?\)\s*', '', de).strip()
-            
-            # Prüfe ob die Zeile NUR Marker enthält (nichts anderes außer Marker)
-            gr_no_marker = marker_pattern.sub('', gr_no_num).strip()
-            de_no_marker = marker_pattern.sub('', de_no_num).strip()
-            
-            # Wenn nach Entfernung von Zeilennummer UND Markern nichts übrig bleibt, überspringe
-            if not gr_no_marker and not de_no_marker and not en:
-                skipped_count += 1
-                continue
+        if b['type'] == 'pair' and _is_marker_only_pair(b):
+            skipped_count += 1
+            continue
         
         filtered_blocks.append(b)
     
@@ -1869,6 +1888,106 @@ def process_input_file(fname:str):
     
     return filtered_blocks
 
+# NEU: Marker-Zeilen ([Zitat Anfang] usw.) ohne weiteren Inhalt erscheinen nicht im PDF
+RE_QUOTE_SOURCE_MARKER = re.compile(r'\[(?:Zitat|Quelle)\s*(?:Anfang|Ende)\]', re.IGNORECASE)
+
+def _is_marker_only_pair(b) -> bool:
+    """pair-Block, dessen GR/DE nach Entfernen von Zeilennummer und Markern leer ist (und ohne EN)."""
+    gr_no_num = rx.RE_LINE_NUM_STRIP.sub('', (b.get('gr') or '').strip()).strip()
+    de_no_num = rx.RE_LINE_NUM_STRIP.sub('', (b.get('de') or '').strip()).strip()
+    en = (b.get('en') or '').strip()
+    return (not RE_QUOTE_SOURCE_MARKER.sub('', gr_no_num).strip()
+            and not RE_QUOTE_SOURCE_MARKER.sub('', de_no_num).strip()
+            and not en)
+
+# ═══════════════════════════════════════════════════════════════════
+# PROJEKTION: dreisprachig (gr_de_en) → zweisprachig (gr_de / gr_en)
+# ═══════════════════════════════════════════════════════════════════
+# Die meisten Werke liegen als *_gr_de_en_*, *_gr_de_* und *_gr_en_* vor – mit denselben
+# antiken Zeilen. Statt jede Fassung neu zu parsen, wird die dreisprachige Fassung EINMAL
+# geparst und die zweisprachigen Block-Sets durch Weglassen einer Übersetzungszeile abgeleitet.
+# drop='en' → gr_de, drop='de' → gr_en (EN rückt in die Übersetzungszeile).
+# Aufrufer prüfen vorher projection_exact (sonst: zweisprachige Datei normal parsen).
+PROJECTION_DROP = {'en': 2, 'de': 1}  # weggelassene Zeile innerhalb einer (GR, DE, EN)-Gruppe
+
+def project_text_lines(lines, drop='en'):
+    """
+    Textuelle Projektion: In jeder Gruppe aus GENAU drei direkt aufeinanderfolgenden Zeilen mit
+    gleicher Nummer (GR, DE, EN) entfällt die DE- bzw. EN-Zeile; alles andere bleibt.
+    Kommentarzeilen (k) werden nie als Gruppe behandelt.
+    Dient als Vorbedingung (stimmt die Projektion mit der zweisprachigen Datei überein?) und für
+    Zitat-Blöcke, deren Zeilen erst beim Rendern geparst werden.
+    """
+    row = PROJECTION_DROP[drop]
+    out = []
+    i = 0
+    n = len(lines)
+    while i < n:
+        m = rx.RE_LINE_NUM_PREFIX.match(lines[i] or '')
+        if m and i + 2 < n and not m.group(1).lower().endswith('k'):
+            m1 = rx.RE_LINE_NUM_PREFIX.match(lines[i + 1] or '')
+            m2 = rx.RE_LINE_NUM_PREFIX.match(lines[i + 2] or '')
+            m3 = rx.RE_LINE_NUM_PREFIX.match(lines[i + 3] or '') if i + 3 < n else None
+            num = m.group(1)
+            if (m1 and m2 and m1.group(1) == num and m2.group(1) == num
+                    and not (m3 and m3.group(1) == num)):
+                group = lines[i:i + 3]
+                del group[row]
+                out += group
+                i += 3
+                continue
+        out.append(lines[i])
+        i += 1
+    return out
+
+def project_text(raw_text: str, drop='en') -> str:
+    """project_text_lines für einen ganzen Quelltext (Zeilenenden bleiben erhalten)."""
+    return '\n'.join(project_text_lines(raw_text.split('\n'), drop))
+
+def projection_exact(raw_text: str, drop='en') -> bool:
+    """
+    Liefert project_blocks für diesen Text dasselbe wie das Parsen der projizierten Fassung?
+    Nur die `/`-Expansion (expand_slash_groups) hängt von der Sprachanzahl ab: sie betrachtet
+    Fenster aus 3 Zeilen und füllt zweisprachige Gruppen mit leeren EN-Zeilen auf. Exakt ist die
+    Projektion deshalb genau dann, wenn die Expansion mit der Projektion vertauscht.
+    """
+    import contextlib, io
+    raw = list(iter_text_lines(raw_text))
+    with contextlib.redirect_stdout(io.StringIO()):  # Expansions-Protokoll nicht doppelt ausgeben
+        return (project_text_lines(expand_slash_groups(raw), drop)
+                == expand_slash_groups(project_text_lines(raw, drop)))
+
+def project_blocks(blocks, drop='en'):
+    """
+    Projiziert die Roh-Blöcke von process_input_text (dreisprachig) auf eine zweisprachige
+    Fassung – Ergebnis wie process_input_text(project_text(raw_text, drop)), aber ohne erneutes
+    Parsen, sofern projection_exact(raw_text, drop) gilt. Die Eingabe bleibt unverändert (flache Kopien).
+
+    Gibt None zurück, wenn die Blöcke STRAUßLOGIK-Alternativen enthalten: deren Gruppierung
+    (Gruppen zu 3 Zeilen) hängt von der Sprachanzahl ab → dann die zweisprachige Datei parsen.
+    """
+    if drop not in PROJECTION_DROP:
+        raise ValueError(f"project_blocks: drop muss 'de' oder 'en' sein, nicht {drop!r}")
+    projected = []
+    for b in blocks:
+        if b.get('_is_strauss_alt'):
+            return None
+        t = b.get('type')
+        if t == 'pair':
+            p = dict(b)
+            if (p.get('en') or '').strip():  # nur echte Dreiergruppen verlieren eine Zeile
+                if drop == 'de':
+                    p['de'] = p['en']
+                p['en'] = ''
+                if _is_marker_only_pair(p):
+                    continue
+            projected.append(p)
+        elif t == 'quote':
+            projected.append({**b, 'lines': project_text_lines(b.get('lines') or [], drop)})
+        else:
+            projected.append(dict(b))
+    return projected
+
 def group_pairs_into_flows(blocks):
     """
     Reflow zu „Flows" (fortlaufender Tokenstrom) mit optionaler
@@ -2151,12 +2270,14 @@ def merge_strauss_alternatives(flows):
     return flows
 
 # ----------------------- Tabellenbau -----------------------
+@with_render_context(_default_render_context)
 def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives, en_tokens_alternatives, *,
                                   doc_width_pt, token_gr_style, token_de_style,
                                   para_display, para_width_pt, style_para,
                                   speaker_display, speaker_width_pt, style_speaker,
                                   table_halign='LEFT',
-                                  hide_pipes=False, tag_config=None, tag_mode="TAGS", color_mode="COLOR"):
+                                  hide_pipes=False, tag_config=None, tag_mode="TAGS", color_mode="COLOR",
+                                  ctx: RenderContext = None):  # NEU: Render-Kontext (shared/render_context.py)
     """
     STRAUßLOGIK mit SLICE-LOGIC für Fließtext-Umbrüche!
     
@@ -2167,18 +2288,20 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
     """
     from reportlab.platypus import Table, TableStyle, Paragraph
     from reportlab.lib import colors
-    from reportlab.pdfbase.pdfmetrics import stringWidth
     from reportlab.lib.styles import ParagraphStyle
     
     # WICHTIG: Leading (Zeilenabstand) für Alternativen mit <br/> Tags!
     # Verwende fontSize * 1.1 - OPTIMAL für konsistente, enge Abstände
     # (1.0 zu eng → Überlappung, 1.1 → PERFEKT, 1.2+ → zu viel Abstand)
-    token_gr_style_tight = ParagraphStyle('TokGR_Tight', parent=token_gr_style,
+    # NEU: Styles + Token-Zellen über den Paragraph-Cache des Render-Kontexts
+    # (eine Style-Instanz pro Parametersatz, gleiches Markup wird nur einmal geparst/umbrochen)
+    token_gr_style_tight = ctx.paragraphs.style('TokGR_Tight', parent=token_gr_style,
         leading=token_gr_style.fontSize * 1.1,  # 1.1× = OPTIMAL ENGER ABSTAND
         spaceBefore=0, spaceAfter=0)
-    token_de_style_tight = ParagraphStyle('TokDE_Tight', parent=token_de_style,
+    token_de_style_tight = ctx.paragraphs.style('TokDE_Tight', parent=token_de_style,
         leading=token_de_style.fontSize * 1.1,  # 1.1× = OPTIMAL ENGER ABSTAND
         spaceBefore=0, spaceAfter=0)
+    _para = ctx.paragraphs.paragraph
     
     # Handle None inputs
     if gr_tokens_alternatives is None:
@@ -2246,19 +2369,19 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
             gr_width = visible_measure_token(gr_token, font=gr_font, size=gr_size, 
                                             is_greek_row=True) if gr_token else 0.0
         except:
-            gr_width = stringWidth(gr_token, gr_font, gr_size) if gr_token else 0.0
+            gr_width = string_width(gr_token, gr_font, gr_size) if gr_token else 0.0
         
         try:
             de_width = visible_measure_token(de_token, font=de_font, size=de_size,
                                             is_greek_row=False) if de_token else 0.0
         except:
-            de_width = stringWidth(de_token, de_font, de_size) if de_token else 0.0
+            de_width = string_width(de_token, de_font, de_size) if de_token else 0.0
         
         try:
             en_width = visible_measure_token(en_token, font=de_font, size=de_size,
                                             is_greek_row=False) if en_token else 0.0
         except:
-            en_width = stringWidth(en_token, de_font, de_size) if en_token else 0.0
+            en_width = string_width(en_token, de_font, de_size) if en_token else 0.0
         
         max_width = max(gr_width, de_width, en_width)
         padding = 2.5 if tag_mode == "TAGS" else 2.0
@@ -2353,7 +2476,7 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
                 return None
             # Suche nach <font color="...">
             import re
-            match = re.search(r'<font\s+color="([^"]+)"', html, re.IGNORECASE)
+            match = rx.RE_FONT_COLOR_ATTR.search(html)
             if match:
                 return match.group(1)
             return None
@@ -2461,14 +2584,14 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
         # Para-Spalte (nur first_slice)
         if para_display:
             if first_slice:
-                gr_row.append(Paragraph(para_display, style_para))
+                gr_row.append(_para(para_display, style_para))
             else:
                 gr_row.append('')
         
         # Speaker-Spalte (nur first_slice)
         if speaker_display:
             if first_slice:
-                gr_row.append(Paragraph(speaker_display, style_speaker))
+                gr_row.append(_para(speaker_display, style_speaker))
             else:
                 gr_row.append('')
         
@@ -2485,7 +2608,7 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
                     if tok and not is_placeholder:
                         # Formatiere Token MIT Farben (format_token_markup entfernt # + - § $ automatisch!)
                         formatted = format_token_markup(tok, is_greek_row=True, base_font_size=token_gr_style.fontSize, color_mode=color_mode)
-                        gr_row.append(Paragraph(formatted, token_gr_style_tight))
+                        gr_row.append(_para(formatted, token_gr_style_tight))
                     else:
                         gr_row.append('')
                 else:
@@ -2646,7 +2769,7 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
                 # Erstelle Paragraph für jede Alternative
                 translation_paragraphs = []
                 for trans in all_translations:
-                    translation_paragraphs.append([Paragraph(trans, token_de_style_tight)])
+                    translation_paragraphs.append([_para(trans, token_de_style_tight)])
                 
                 # Erstelle nested Table mit ALLEN Alternativen als separate Zeilen
                 nested_table = Table(translation_paragraphs, colWidths=[None])
@@ -2699,7 +2822,7 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
         
         # VEREINHEITLICHUNG: Verwende GLEICHEN SPACING-ANSATZ wie build_tables_for_stream!
         # gap_pts sorgt für konsistenten Abstand GR → DE/EN (Tag-abhängig)
-        gap_pts = INTRA_PAIR_GAP_MM * mm
+        gap_pts = ctx.intra_pair_gap_mm * mm
         
         table_style_commands = [
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
@@ -2723,6 +2846,7 @@ def build_tables_for_alternatives(gr_tokens_alternatives, de_tokens_alternatives
     
     return tables
 
+@with_render_context(_default_render_context)
 def build_tables_for_stream(gr_tokens, de_tokens=None, *,
                             doc_width_pt,
                             reverse_mode:bool=False,  # Deprecated, kept for compatibility
@@ -2741,7 +2865,8 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
                             gr_tokens_alternatives=None,  # NEU: STRAUßLOGIK - GR Alternativen (Liste von Token-Listen)
                             de_tokens_alternatives=None,  # NEU: STRAUßLOGIK - DE Alternativen (Liste von Token-Listen)
                             en_tokens_alternatives=None,  # NEU: STRAUßLOGIK - EN Alternativen (Liste von Token-Listen)
-                            is_quote=False):  # NEU: Ist dies ein Zitat? (für größeres Padding in nested tables)
+                            is_quote=False,  # NEU: Ist dies ein Zitat? (für größeres Padding in nested tables)
+                            ctx: RenderContext = None):  # NEU: Render-Kontext (shared/render_context.py)
     if en_tokens is None:
         en_tokens = []
     if de_tokens is None:
@@ -2776,6 +2901,7 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
        (en_tokens_alternatives and len(en_tokens_alternatives) > 1):
         # Rufe spezielle Alternativ-Rendering-Funktion auf
         return build_tables_for_alternatives(
+            ctx=ctx,
             gr_tokens_alternatives=gr_tokens_alternatives,
             de_tokens_alternatives=de_tokens_alternatives,
             en_tokens_alternatives=en_tokens_alternatives,
@@ -2801,9 +2927,13 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
     # - Für normalen Text: token_de_style hat 1.1× leading (eng, kompakt)
     # - Für Zitate: quote_de_style hat _leading_for() = 1.3× (normal, damit Tags nicht überlappen)
     # Indem wir das Leading vom parent übernehmen, respektieren wir die Intention des Aufrufers!
-    token_de_style_tight = ParagraphStyle('TokDE_Tight', parent=token_de_style,
+    # NEU: Style aus der Registry des Paragraph-Caches (nicht mehr pro Aufruf neu angelegt)
+    token_de_style_tight = ctx.paragraphs.style('TokDE_Tight', parent=token_de_style,
         leading=token_de_style.leading,  # Übernehme Leading vom übergebenen Style!
         spaceBefore=0, spaceAfter=0)
+    # NEU: Token-Zellen über den Paragraph-Cache (gleiches Markup nur einmal parsen/umbrechen)
+    _para = ctx.paragraphs.paragraph
+    row_flowable = row_flowable_enabled()
     
     def is_only_symbols_or_stephanus(token: str) -> bool:
         """
@@ -2824,15 +2954,13 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         # Regex: NUR Stephanus-Paginierungen, Interpunktion, Symbole, Klammern, Whitespace
         # Stephanus: [123a], [123b], [123c], [123d], [123e]
         # Symbole: . , ; : ! ? … — " ' * † ‡ § ( ) [ ] 
-        only_symbols_pattern = r'^[\[\]\(\).,;:!?…—"\'*†‡§\s]+$'
-        
+        # (vorkompiliert in shared/regex_patterns.py: RE_ONLY_SYMBOLS)
         # Prüfe ob es NUR aus diesen Zeichen besteht
-        if re.match(only_symbols_pattern, cleaned):
+        if rx.RE_ONLY_SYMBOLS.match(cleaned):
             return True
         
         # Spezielle Prüfung für Stephanus-Paginierungen: [123a-e]
-        stephanus_pattern = r'^\[?\d+[a-e]?\]?$'
-        if re.match(stephanus_pattern, cleaned):
+        if rx.RE_STEPHANUS_TOKEN.match(cleaned):
             return True
         
         return False
@@ -2857,10 +2985,9 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
     def get_visible_tags(token: str, tag_config: dict = None) -> list:
         """Gibt die Liste der sichtbaren Tags für ein Token zurück (basierend auf tag_config)."""
         if not tag_config or not token:
-            tags = RE_TAG.findall(token)
-            return tags
+            return list(parse_token(token).tags)
         
-        tags = RE_TAG.findall(token)
+        tags = parse_token(token).tags
         if not tags:
             return []
         
@@ -2908,7 +3035,7 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         # Die Tags, die noch im Token vorhanden sind, sind die sichtbaren Tags!
         # Wir müssen einfach nur die Breite des aktuellen Tokens messen.
         
-        tags_in_token = RE_TAG.findall(token)
+        tags_in_token = parse_token(token).tags
         if tags_in_token:
             # Tags vorhanden → Tag-PDF, verwende gemessene Breite mit angemessenem Puffer
             return w_with_remaining_tags + max(size * 0.03, 0.8)  # Puffer für Tag-PDFs
@@ -2917,6 +3044,51 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
             # ERHÖHT: Besonders wichtig bei Wörtern, wo Tags mit (HideTags) versteckt wurden
             return w_with_remaining_tags + max(size * 0.20, 3.0)  # Erhöht von 0.18/2.8 auf 0.20/3.0
     
+    def _translation_width(token_raw: str) -> float:
+        """Breite eines DE/EN-Tokens inkl. Pipe-Korrektur (nur für sichtbare Tokens aufgerufen)."""
+        if not token_raw.strip():
+            return 0.0
+        text = token_raw.replace('|', ' ') if hide_pipes else token_raw
+        w = visible_measure_token(text, font=token_de_style.fontName, 
+                                  size=token_de_style.fontSize, 
+                                  is_greek_row=False, reverse_mode=False)
+        # Zusätzlicher Puffer für Pipe-Ersetzung (wenn hide_pipes aktiviert)
+        if hide_pipes:
+            pipe_count = token_raw.count('|')
+            if pipe_count > 0:
+                # Leerzeichen sind breiter als Pipes: ~0.3x Font-Size Differenz pro Pipe
+                space_vs_pipe_diff = token_de_style.fontSize * 0.3
+                w += pipe_count * space_vs_pipe_diff
+                # Zusätzlicher Sicherheitspuffer (10% der Breite) für Pipe-Split-Umbrüche
+                w += w * 0.10
+        return w
+
+    # NEU: Token-Matrix des Flows gebündelt messen (shared/column_widths.py): jeder verschiedene
+    # GR-/DE-/EN-Token und jedes (GR, DE, EN)-Tripel für den dynamischen Abstand wird pro
+    # create_pdf-Aufruf nur EINMAL vorverarbeitet und gemessen (Tabellen im Render-Kontext);
+    # col_width kombiniert nur noch die Arrays.
+    gr_font, gr_size = token_gr_style.fontName, token_gr_style.fontSize
+    de_font, de_size = token_de_style.fontName, token_de_style.fontSize
+    gr_widths = width_table(ctx.width_tables, ("gr", gr_font, gr_size), lambda t: measure_token_width_with_visibility(
+        t, font=gr_font, size=gr_size, is_greek_row=True, tag_config=tag_config
+    )).widths(gr[:cols])
+    tr_table = width_table(ctx.width_tables, ("tr", de_font, de_size, hide_pipes), _translation_width)
+    de_widths, en_widths = tr_table.widths(de[:cols]), tr_table.widths(en[:cols])
+    spacing_table = width_table(
+        ctx.width_tables, ("spacing", tag_mode, hide_pipes, gr_font, gr_size, de_font, de_size, id(tag_config)),
+        lambda key: _calculate_dynamic_token_spacing(
+            gr_token=key[0],
+            de_token=key[1],
+            en_token=key[2],
+            tag_mode=tag_mode,
+            tag_config=tag_config,
+            hide_pipes=hide_pipes,
+            font_gr=gr_font,
+            size_gr=gr_size,
+            font_de=de_font,
+            size_de=de_size
+        ), anchor=tag_config)
+
     def col_width(k:int) -> float:
         """
         Berechnet die optimale Spaltenbreite für Spalte k.
@@ -2932,13 +3104,7 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         """
         # Basis-Breite für griechisches Wort (berücksichtigt Tag-Sichtbarkeit)
         gr_token = gr[k] if (k < len(gr) and gr[k]) else ''
-        w_gr = measure_token_width_with_visibility(
-            gr_token, 
-            font=token_gr_style.fontName, 
-            size=token_gr_style.fontSize, 
-            is_greek_row=True,
-            tag_config=tag_config
-        ) if gr_token else 0.0
+        w_gr = gr_widths[k] if gr_token else 0.0
         
         # Berechne DE- und EN-Text (mit/ohne Pipe-Ersetzung)
         de_token_raw = de[k] if (k < len(de) and de[k]) else ''
@@ -2949,47 +3115,9 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         en_visible = bool(en_token_raw and en_token_raw.strip())
         translations_visible = de_visible or en_visible
         
-        # Bereite DE/EN-Text für Breitenberechnung vor
-        if hide_pipes:
-            de_text = de_token_raw.replace('|', ' ') if de_token_raw else ''
-            en_text = en_token_raw.replace('|', ' ') if en_token_raw else ''
-        else:
-            de_text = de_token_raw
-            en_text = en_token_raw
-        
-        # Berechne DE- und EN-Breiten
-        w_de = 0.0
-        w_en = 0.0
-        
-        if de_visible and de_text:
-            w_de = visible_measure_token(de_text, font=token_de_style.fontName, 
-                                        size=token_de_style.fontSize, 
-                                        is_greek_row=False, reverse_mode=False)
-            
-            # Zusätzlicher Puffer für Pipe-Ersetzung (wenn hide_pipes aktiviert)
-            if hide_pipes and de_token_raw:
-                pipe_count = de_token_raw.count('|')
-                if pipe_count > 0:
-                    # Leerzeichen sind breiter als Pipes: ~0.3x Font-Size Differenz pro Pipe
-                    space_vs_pipe_diff = token_de_style.fontSize * 0.3
-                    w_de += pipe_count * space_vs_pipe_diff
-                    # Zusätzlicher Sicherheitspuffer (10% der Breite) für Pipe-Split-Umbrüche
-                    w_de += w_de * 0.10
-        
-        if en_visible and en_text:
-            w_en = visible_measure_token(en_text, font=token_de_style.fontName, 
-                                        size=token_de_style.fontSize, 
-                                        is_greek_row=False, reverse_mode=False)
-            
-            # Zusätzlicher Puffer für Pipe-Ersetzung (wenn hide_pipes aktiviert)
-            if hide_pipes and en_token_raw:
-                pipe_count = en_token_raw.count('|')
-                if pipe_count > 0:
-                    # Leerzeichen sind breiter als Pipes: ~0.3x Font-Size Differenz pro Pipe
-                    space_vs_pipe_diff = token_de_style.fontSize * 0.3
-                    w_en += pipe_count * space_vs_pipe_diff
-                    # Zusätzlicher Sicherheitspuffer (10% der Breite) für Pipe-Split-Umbrüche
-                    w_en += w_en * 0.10
+        # DE- und EN-Breiten (gebündelt gemessen, inkl. Pipe-Korrektur)
+        w_de = de_widths[k] if de_visible else 0.0
+        w_en = en_widths[k] if en_visible else 0.0
         
         # ROBUSTE BREITENBERECHNUNG BASIEREND AUF SICHTBARKEIT
         
@@ -3006,30 +3134,19 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
             is_notag = False
             if tag_config is None:
                 # Wenn tag_config None ist, wurden alle Tags entfernt (NoTag)
-                tags_in_token = RE_TAG.findall(gr_token) if gr_token else []
+                tags_in_token = parse_token(gr_token).tags
                 is_notag = len(tags_in_token) > 0
             else:
                 # Prüfe, ob alle Tags versteckt sind
                 visible_tags = get_visible_tags(gr_token, tag_config) if gr_token else []
-                all_tags = RE_TAG.findall(gr_token) if gr_token else []
+                all_tags = parse_token(gr_token).tags
                 is_notag = len(all_tags) > 0 and len(visible_tags) == 0
             
             if w_gr > 0:
                 # INTELLIGENTE ABSTANDSBERECHNUNG: Berücksichtige tatsächliche Wortlängen!
                 # Wenn GR-Wort mit Tags länger als Übersetzungen → reduzierter Abstand (0.5pt)
                 # Sonst → normaler Abstand basierend auf Tag-Sichtbarkeit
-                extra_buffer = _calculate_dynamic_token_spacing(
-                    gr_token=gr_token,
-                    de_token=de_token_raw,
-                    en_token=en_token_raw,
-                    tag_mode=tag_mode,
-                    tag_config=tag_config,
-                    hide_pipes=hide_pipes,
-                    font_gr=token_gr_style.fontName,
-                    size_gr=token_gr_style.fontSize,
-                    font_de=token_de_style.fontName,
-                    size_de=token_de_style.fontSize
-                )
+                extra_buffer = spacing_table.width((gr_token, de_token_raw, en_token_raw))
                 return w_gr + base_safety + extra_buffer
             else:
                 return base_safety
@@ -3041,18 +3158,7 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         if max_width > 0:
             # INTELLIGENTE ABSTANDSBERECHNUNG auch mit Übersetzungen!
             # Verwende dynamische Token-Spacing-Logik (wie bei NoTrans)
-            extra_buffer = _calculate_dynamic_token_spacing(
-                gr_token=gr_token,
-                de_token=de_token_raw,
-                en_token=en_token_raw,
-                tag_mode=tag_mode,
-                tag_config=tag_config,
-                hide_pipes=hide_pipes,
-                font_gr=token_gr_style.fontName,
-                size_gr=token_gr_style.fontSize,
-                font_de=token_de_style.fontName,
-                size_de=token_de_style.fontSize
-            )
+            extra_buffer = spacing_table.width((gr_token, de_token_raw, en_token_raw))
             return max_width + base_safety + extra_buffer
         else:
             # Fallback: Minimaler Puffer
@@ -3064,10 +3170,14 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
     # Dies kann passieren wenn ALLE Übersetzungen versteckt sind
     widths = [max(w or 0.1, 0.1) for w in widths]  # Mindestens 0.1pt pro Spalte
     
+    # NEU: Breiten EINMAL als Präfixsummen + DE-Indizes (shared/line_breaking.py)
+    # → Slice-Breite O(1), Slice-Ende und DE-Suche per bisect statt linearer Scans
+    breaker = ColumnBreaker(widths, de=de, gr=gr)
+    use_optimal = line_break_mode() == "optimal"
+    optimal_ends = None
+    
     tables, i, first_slice = [], 0, True
     while i < cols:
-        acc, j = 0.0, i
-
         # verfügbare Breite abzüglich optionaler Spalten
         # WICHTIG: IMMER reduzieren, damit alle Zeilen am gleichen Ort beginnen
         # Para/Speaker-Spalten werden nur beim ersten Slice angezeigt, aber der Platz wird immer reserviert
@@ -3078,53 +3188,36 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         if has_speaker and speaker_width_pt > 0:
             # Diese Zeile HAT einen Sprecher → verwende minimale Spaltenbreite
             effective_speaker_width = min(speaker_width_pt, SPEAKER_COL_MIN_MM*mm)
-            effective_speaker_gap = SPEAKER_GAP_MM*mm
+            effective_speaker_gap = ctx.speaker_gap_mm*mm
             avail_w -= (effective_speaker_width + effective_speaker_gap)
         elif speaker_width_pt > 0:
             # Sprecher-Spalte existiert, aber diese Zeile hat KEINEN Sprecher
             # WICHTIG: Verwende auch hier NUR minimale Breite (3mm), nicht die volle speaker_width_pt!
             # Sonst werden Zeilen ohne Sprecher zu stark gequetscht!
             effective_speaker_width = SPEAKER_COL_MIN_MM*mm
-            effective_speaker_gap = SPEAKER_GAP_MM*mm
+            effective_speaker_gap = ctx.speaker_gap_mm*mm
             avail_w -= (effective_speaker_width + effective_speaker_gap)
         if para_width_pt > 0:
             avail_w -= (para_width_pt + PARA_GAP_MM*mm)
 
-        # Hilfen: prüfe, ob in de[i:j] irgendein sichtbarer Inhalt steckt
-        def _has_de_content(i_start: int, i_end_excl: int) -> bool:
-            if i_start >= i_end_excl or not de:
-                return False
-            for k in range(i_start, i_end_excl):
-                if k < len(de) and (de[k] or '').strip():
-                    return True
-            return False
-
-        # finde nächstes Index >= cur, das DE-Inhalt hat
-        def _next_de_index(from_idx: int) -> int:
-            if not de:
-                return cols  # Keine DE-Inhalte vorhanden
-            p = from_idx
-            while p < cols and p < len(de) and not (de[p] or '').strip():
-                p += 1
-            return p  # kann == cols sein
-
-        # Normale Pack-Phase
-        while j < cols:
-            w = widths[j]
-            if acc + w > avail_w and j > i:
-                break
-            acc += w
-            j += 1
+        # Pack-Phase: gierig (Standard) oder DP-optimal (PROSA_LINE_BREAK=optimal).
+        # avail_w ist für alle Slices eines Flows gleich → DP-Umbrüche einmal vorab berechnen
+        if use_optimal:
+            if optimal_ends is None:
+                optimal_ends = iter(breaker.optimal_breaks(avail_w))
+            j = next(optimal_ends)
+        else:
+            j = breaker.greedy_end(i, avail_w)
+        acc = breaker.width(i, j)
 
         # --- SPEZIALFALL: erstes Slice eines Sprecher-Blocks ohne DE-Content
         # Nur ausführen, wenn DE-Übersetzungen vorhanden sind
-        if first_slice and de and not _has_de_content(i, j):
-            k = _next_de_index(j)  # erster Index mit DE-Inhalt rechts vom Slice
+        # (im DP-Modus bestraft der Optimierer DE-leere Zeilen bereits selbst)
+        if not use_optimal and first_slice and de and not breaker.has_de_content(i, j):
+            k = breaker.next_de_index(j)  # erster Index mit DE-Inhalt rechts vom Slice
             if k < cols:
                 # (1) Versuche, alle Spalten bis inkl. k zusätzlich unterzubringen
-                extra = 0.0
-                for t in range(j, k+1):
-                    extra += widths[t]
+                extra = breaker.width(j, k + 1)
                 if acc + extra <= avail_w:
                     acc += extra
                     j = k + 1
@@ -3162,17 +3255,17 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         # ob nach Filterung noch Content übrig bleibt
 
         # linke Zusatzspalten
-        sp_cell_gr = Paragraph(xml_escape(speaker_display), style_speaker) if (first_slice and speaker_width_pt>0 and speaker_display) else Paragraph('', style_speaker)
-        sp_cell_de = Paragraph('', style_speaker)
-        sp_cell_en = Paragraph('', style_speaker)  # NEU: Englische Zeile
-        sp_gap_gr  = Paragraph('', token_gr_style); sp_gap_de = Paragraph('', token_de_style)
-        sp_gap_en  = Paragraph('', token_de_style)  # NEU: Englische Zeile
-
-        para_cell_gr = Paragraph(xml_escape(para_display), style_para) if (para_width_pt>0 and first_slice and para_display) else Paragraph('', style_para)
-        para_cell_de = Paragraph('', style_para)
-        para_cell_en = Paragraph('', style_para)  # NEU: Englische Zeile
-        para_gap_gr  = Paragraph('', token_gr_style); para_gap_de = Paragraph('', token_de_style)
-        para_gap_en  = Paragraph('', token_de_style)  # NEU: Englische Zeile
+        sp_cell_gr = _para(xml_escape(speaker_display), style_speaker) if (first_slice and speaker_width_pt>0 and speaker_display) else _para('', style_speaker)
+        sp_cell_de = _para('', style_speaker)
+        sp_cell_en = _para('', style_speaker)  # NEU: Englische Zeile
+        sp_gap_gr  = _para('', token_gr_style); sp_gap_de = _para('', token_de_style)
+        sp_gap_en  = _para('', token_de_style)  # NEU: Englische Zeile
+
+        para_cell_gr = _para(xml_escape(para_display), style_para) if (para_width_pt>0 and first_slice and para_display) else _para('', style_para)
+        para_cell_de = _para('', style_para)
+        para_cell_en = _para('', style_para)  # NEU: Englische Zeile
+        para_gap_gr  = _para('', token_gr_style); para_gap_de = _para('', token_de_style)
+        para_gap_en  = _para('', token_de_style)  # NEU: Englische Zeile
 
         def cell_markup(t, is_gr, tok_idx=None):
             # DEFENSIV: Entferne Tags aus Token, falls sie noch vorhanden sind
@@ -3246,7 +3339,7 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
 
         # JETZT erst die Paragraphs erstellen (nachdem wir wissen, dass Content vorhanden ist)
         # WICHTIG: Übergebe tok_idx an cell_markup, damit _strip_tags_from_token korrekt arbeitet
-        gr_cells = [Paragraph(cell_markup(t, True, tok_idx=slice_start + idx),  token_gr_style) if t else Paragraph('', token_gr_style) for idx, t in enumerate(slice_gr)]
+        gr_cells = [_para(cell_markup(t, True, tok_idx=slice_start + idx),  token_gr_style) if t else _para('', token_gr_style) for idx, t in enumerate(slice_gr)]
         
         # KRITISCHER FIX: DE und EN in NESTED TABLES kombinieren (wie STRAUßLOGIK!)
         # WICHTIG: Nur VORHANDENE Übersetzungen hinzufügen (nicht immer 2 Zeilen!)
@@ -3271,11 +3364,15 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
                 all_translations.append(formatted_en)
             
             # Erstelle nested table NUR für vorhandene Übersetzungen
-            if all_translations:
+            if all_translations and row_flowable:
+                # NEU: Zeilen-Flowable stapelt die Übersetzungen direkt in der Zelle (keine nested Table);
+                # Paddings 0 und zentrierter Style → gleiche Lage wie die nested Table
+                de_en_combined_cells.append([_para(trans, token_de_style_tight) for trans in all_translations])
+            elif all_translations:
                 # Erstelle Paragraph für jede Übersetzung
                 translation_paragraphs = []
                 for trans in all_translations:
-                    translation_paragraphs.append([Paragraph(trans, token_de_style_tight)])
+                    translation_paragraphs.append([_para(trans, token_de_style_tight)])
                 
                 # Erstelle nested Table mit ALLEN Übersetzungen als separate Zeilen
                 nested_table = Table(translation_paragraphs, colWidths=[None])
@@ -3298,7 +3395,7 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
                 de_en_combined_cells.append(nested_table)
             else:
                 # Kein Übersetzung vorhanden - leere Zelle
-                de_en_combined_cells.append(Paragraph('', token_de_style))
+                de_en_combined_cells.append(_para('', token_de_style))
 
         # VEREINHEITLICHUNG: Nur 2 Rows (wie STRAUßLOGIK)!
         # Row 0: GR-Zeile
@@ -3309,16 +3406,16 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
         if speaker_width_pt > 0:
             row_gr.append(sp_cell_gr)
             row_gr.append(sp_gap_gr)
-            row_de_en.append(Paragraph('', token_de_style))  # Leer in DE/EN-Row
-            row_de_en.append(Paragraph('', token_de_style))  # Leer für Gap
-            colWidths += [speaker_width_pt, SPEAKER_GAP_MM*mm]
+            row_de_en.append(_para('', token_de_style))  # Leer in DE/EN-Row
+            row_de_en.append(_para('', token_de_style))  # Leer für Gap
+            colWidths += [speaker_width_pt, ctx.speaker_gap_mm*mm]
             
         # Para-Spalte (nur in GR-Row sichtbar, in DE/EN-Row leer)
         if para_width_pt > 0:
             row_gr.append(para_cell_gr)
             row_gr.append(para_gap_gr)
-            row_de_en.append(Paragraph('', token_de_style))  # Leer in DE/EN-Row
-            row_de_en.append(Paragraph('', token_de_style))  # Leer für Gap
+            row_de_en.append(_para('', token_de_style))  # Leer in DE/EN-Row
+            row_de_en.append(_para('', token_de_style))  # Leer für Gap
             colWidths += [para_width_pt, PARA_GAP_MM*mm]
 
         # Token-Spalten
@@ -3357,16 +3454,11 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
             # Warnung unterdrückt: Skalierung erfolgt automatisch, keine Log-Flut nötig
             # (Table-Breite wird automatisch angepasst, daher ist diese Warnung redundant)
 
-        # VEREINHEITLICHT: Erstelle Tabelle mit NUR 2 Rows (wie STRAUßLOGIK)!
-        # Row 0: GR
-        # Row 1: DE+EN combined (nested tables)
-        tbl = Table([row_gr, row_de_en], colWidths=colWidths, hAlign=table_halign)
-        
         # Prüfe ob Übersetzungen vorhanden sind (für Padding-Logik)
         has_de = any(slice_de)
         has_en = any(slice_en)
         
-        gap_pts = INTRA_PAIR_GAP_MM * mm
+        gap_pts = ctx.intra_pair_gap_mm * mm
         style_list = [
             ('LEFTPADDING',   (0,0), (-1,-1), 0.5),    # Minimal (wie STRAUßLOGIK)
             ('RIGHTPADDING',  (0,0), (-1,-1), 0.5),    # Minimal (wie STRAUßLOGIK)
@@ -3410,7 +3502,11 @@ def build_tables_for_stream(gr_tokens, de_tokens=None, *,
             # gap_pts wird bereits oben angewendet
             pass
         
-        tbl.setStyle(TableStyle(style_list))
+        # VEREINHEITLICHT: Erstelle Tabelle mit NUR 2 Rows (wie STRAUßLOGIK)!
+        # Row 0: GR
+        # Row 1: DE+EN combined (nested tables)
+        # NEU: interlinear_table → InterlinearRow statt Table (außer INTERLINEAR_ROW_FLOWABLE=0)
+        tbl = interlinear_table([row_gr, row_de_en], colWidths, style_list, h_align=table_halign)
         tables.append(tbl)
         first_slice, i = False, j
     return tables
@@ -3450,6 +3546,19 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                placement_overrides: dict | None = None,
                tag_config: dict | None = None,
                hide_pipes:bool=False):  # NEU: Pipes (|) in Übersetzungen verstecken
+    # NEU: Variantenzustand (Overrides, Abstände) als RenderContext statt Modul-Globals
+    ctx = make_render_context(pdf_name, tag_mode=tag_mode, placement_overrides=placement_overrides)
+    with activate_render_context(ctx):
+        return _create_pdf(blocks, pdf_name, strength=strength, color_mode=color_mode,
+                           tag_mode=tag_mode, placement_overrides=placement_overrides,
+                           tag_config=tag_config, hide_pipes=hide_pipes, ctx=ctx)
+
+def _create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
+                color_mode:str="COLOR", tag_mode:str="TAGS",
+                placement_overrides: dict | None = None,
+                tag_config: dict | None = None,
+                hide_pipes:bool=False,
+                ctx: RenderContext):
 
     # DIAGNOSE: Logging am Anfang von create_pdf
     import logging
@@ -3468,11 +3577,9 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
     comments = process_comments_for_coloring(blocks)
     
     # Erstelle eine Map: Zeilennummer → Kommentar-Farbe (für Hinterlegung)
-    line_comment_colors = {}  # {line_num: (r, g, b)}
-    for comment in comments:
-        color = comment['color']
-        for line_num in range(comment['start_line'], comment['end_line'] + 1):
-            line_comment_colors[line_num] = color
+    # Sortierter Intervall-Index statt zeilenweisem Dict (shared/comment_index.py):
+    # gleiche Abfragen (in / [] / get), aber O(log n) und unabhängig von der Bereichslänge
+    line_comment_colors = LineColorIndex.from_comments(comments)  # {line_num: (r, g, b)}
     
     # Speichere line_comment_colors für späteres Rendering
     # (wird in build_tables_for_stream und beim Rendering verwendet)
@@ -3492,29 +3599,14 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
         gr_size = NORMAL_GR_SIZE
         de_size = NORMAL_DE_SIZE
 
-    # Tag-Placement-Overrides (hoch/tief/aus) anwenden
-    set_tag_placement_overrides(placement_overrides)
-
     # =============================================================================
     # HINWEIS: Die Vorverarbeitung (Färben, Tag-Filterung) wird jetzt ZENTRAL
     # in shared/unified_api.py gehandhabt. Die 'blocks', die hier ankommen,
     # sind bereits fertig vorverarbeitet.
     # =============================================================================
 
-    # Setze kritische Konstanten basierend auf tag_mode
-    global INTRA_PAIR_GAP_MM, CONT_PAIR_GAP_MM, SPEAKER_GAP_MM
-
-    if tag_mode == "TAGS":
-        INTRA_PAIR_GAP_MM = INTRA_PAIR_GAP_MM_TAGS  # 1.5mm
-        CONT_PAIR_GAP_MM = CONT_PAIR_GAP_MM_TAGS   # 3.0mm (minimal für Stabilität)
-        SPEAKER_GAP_MM = 1.2  # Gleich wie PARA_GAP_MM für konsistente Formatierung
-    else:  # NO_TAGS
-        INTRA_PAIR_GAP_MM = INTRA_PAIR_GAP_MM_NO_TAGS  # 1.0mm
-        CONT_PAIR_GAP_MM = CONT_PAIR_GAP_MM_NO_TAGS    # 6.0mm (minimal)
-        SPEAKER_GAP_MM = 1.2  # Gleich wie PARA_GAP_MM für konsistente Formatierung
-
     # Debug-Ausgabe für Testzwecke
-    # print(f"DEBUG: tag_mode={tag_mode}, CONT_PAIR_GAP_MM={CONT_PAIR_GAP_MM}, INTRA_PAIR_GAP_MM={INTRA_PAIR_GAP_MM}")
+    # print(f"DEBUG: tag_mode={tag_mode}, CONT_PAIR_GAP_MM={ctx.cont_pair_gap_mm}, INTRA_PAIR_GAP_MM={ctx.intra_pair_gap_mm}")
 
     doc = SimpleDocTemplate(pdf_name, pagesize=A4,
                             leftMargin=10*mm, rightMargin=6*mm,  # Minimaler rechter Rand für maximale Textbreite (wie Apologie)
@@ -3591,7 +3683,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
         if '§' in text:
             # Dynamische Berechnung: Verwende die tatsächliche Breite + ausreichender Puffer
             # WICHTIG: Puffer muss groß genug sein, damit "§ 1" nicht umbricht
-            w = pdfmetrics.stringWidth(text, style_para.fontName, style_para.fontSize) + 4.0  # Ausreichender Puffer gegen Umbruch
+            w = string_width(text, style_para.fontName, style_para.fontSize) + 4.0  # Ausreichender Puffer gegen Umbruch
             # Verwende ein angemessenes Minimum, damit auch "§ 1" nicht umbricht
             return max(20.0, w)  # Minimal 20pt um sicherzustellen, dass "§ 1" nicht umbricht
         # Zeilennummern werden nicht angezeigt
@@ -3600,7 +3692,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
     def speaker_width_pt(text:str) -> float:
         if not text: return 0.0
         disp = f'[{text}]:'
-        w = pdfmetrics.stringWidth(disp, style_speaker.fontName, style_speaker.fontSize) + 0.8
+        w = string_width(disp, style_speaker.fontName, style_speaker.fontSize) + 0.8
         return max(SPEAKER_COL_MIN_MM * mm, w)
 
     def build_flow_tables(flow_block):
@@ -3628,6 +3720,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                 
                 # Verwende build_tables_for_alternatives für Multi-Row-Rendering
                 tables = build_tables_for_alternatives(
+                    ctx=ctx,
                     gr_tokens_alternatives=gr_rows,  # GR kann auch Multi-Row sein!
                     de_tokens_alternatives=de_rows,       # DE mehrfach
                     en_tokens_alternatives=en_rows,       # EN mehrfach
@@ -3644,6 +3737,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                 # Normale Zeile ohne STRAUßLOGIK
                 tables = build_tables_for_stream(
                     gr_tokens, de_tokens,
+                    ctx=ctx,
                     doc_width_pt=frame_w,
                     reverse_mode=False,  # Nicht mehr verwendet
                     token_gr_style=token_gr, token_de_style=token_de,
@@ -3663,7 +3757,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
             from reportlab.platypus import TableStyle
             for table_idx, table in enumerate(tables):
                 if table_idx > 0:  # WICHTIG: Verwende table_idx statt idx (verhindert Namenskonflikt)
-                    table.setStyle(TableStyle([('TOPPADDING', (0,0), (-1,0), CONT_PAIR_GAP_MM * mm)]))
+                    table.setStyle(TableStyle([('TOPPADDING', (0,0), (-1,0), ctx.cont_pair_gap_mm * mm)]))
             return tables
         except Exception as e:
             print(f"Prosa_Code: build_flow_tables() ERROR: {e}", flush=True)
@@ -3821,7 +3915,10 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
     except Exception:
         pass
     
-    elements, idx = [], 0
+    # NEU: Streamender Build – die Flowables werden schon während der Schleife gesetzt und
+    # danach freigegeben, statt bis zum Ende in einer Liste zu liegen (PROSA_STREAM_BUILD=0 → alte Liste)
+    stream = StreamingDocBuild(doc).start() if streaming_enabled() else None
+    elements, idx = (stream if stream is not None else []), 0
     last_block_type = None  # Speichert den Typ des letzten verarbeiteten Blocks
     processed_flow_indices = set()  # WICHTIG: Verhindere doppelte Verarbeitung von Flow-Blöcken
     processed_h3_indices = set()  # WICHTIG: Verhindere doppelte Verarbeitung von h3_eq Blöcken
@@ -3900,24 +3997,24 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
             # Falls kein line_num vorhanden, versuche aus original_line zu extrahieren
             if not line_num_prefix and original_line:
                 # Extrahiere Zeilennummer-Bereich und entferne (XYZk)-Marker
-                line_num_match = re.match(r'^\((\d+(?:-\d+)?)k\)\s*(.*)', original_line)
+                line_num_match = rx.RE_COMMENT_LINE_NUM.match(original_line)
                 if line_num_match:
                     line_num_str = line_num_match.group(1)
                     content = line_num_match.group(2).strip()
                     line_num_prefix = f"[{line_num_str}] "
                 else:
-                    content = re.sub(r'^\(\d+(?:-\d+)?k\)\s*', '', original_line).strip()
+                    content = rx.RE_COMMENT_LINE_NUM_STRIP.sub('', original_line).strip()
             
             # Fallback: Wenn immer noch kein content, verwende original_line (ohne Zeilennummer)
             if not content:
                 if original_line:
-                    line_num_match = re.match(r'^\((\d+(?:-\d+)?)k\)\s*(.*)', original_line)
+                    line_num_match = rx.RE_COMMENT_LINE_NUM.match(original_line)
                     if line_num_match:
                         line_num_str = line_num_match.group(1)
                         content = line_num_match.group(2).strip()
                         line_num_prefix = f"[{line_num_str}] "
                     else:
-                        content = re.sub(r'^\(\d+(?:-\d+)?k\)\s*', '', original_line).strip()
+                        content = rx.RE_COMMENT_LINE_NUM_STRIP.sub('', original_line).strip()
                 else:
                     content = ''
             
@@ -4041,6 +4138,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
             # NEU: Parse Zitat-Zeilen mit Zeilennummern-basierter Logik (wie normaler Text)
             # Dies ermöglicht korrekte Erkennung von 2- und 3-sprachigen Zeilen
             lines = b.get('lines', [])
+            quote_index = build_line_index(lines)
             temp_quote_blocks = []
             j = 0
             
@@ -4051,7 +4149,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                     continue
                 
                 # Extrahiere Zeilennummer
-                line_num, line_content = extract_line_number(ln)
+                line_num, line_content = quote_index.parsed(j)
                 
                 if line_num is not None:
                     # Sammle alle Zeilen mit derselben Nummer
@@ -4062,7 +4160,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                         if is_empty_or_sep(next_line):
                             k += 1
                             continue
-                        next_num, _ = extract_line_number(next_line)
+                        next_num = quote_index.num(k)
                         if next_num == line_num:
                             lines_with_same_num.append(next_line)
                             k += 1
@@ -4075,7 +4173,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                     # NEU: Spezielle Behandlung für Insertionszeilen (i) in Zitaten
                     if is_insertion_line(line_num):
                         # Erkenne, ob der Text 2-sprachig oder 3-sprachig ist
-                        expected_lines_per_insertion = detect_language_count_from_context(lines, j)
+                        expected_lines_per_insertion = quote_index.language_count(j)
                         
                         print(f"DEBUG Prosa Zitat: Insertionszeile erkannt: {line_num}, {num_lines} Zeilen gefunden, erwarte {expected_lines_per_insertion} Zeilen pro Insertion")
                         
@@ -4259,6 +4357,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                     # Erstelle eine separate Tabelle für diese Zeile
                     line_tables = build_tables_for_stream(
                         q_gr, q_de,
+                        ctx=ctx,
                         doc_width_pt=quote_width_pt,  # 10% kleiner
                         reverse_mode=False,
                         token_gr_style=style_quote_line, token_de_style=quote_de_style,
@@ -4283,7 +4382,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
             for table_idx, table in enumerate(q_tables):
                 if table_idx > 0:  # Erste Zeile braucht kein TOPPADDING
                     # 1.0× Abstand für Zitate - GLEICH wie normaler Text (enger zusammen)
-                    quote_gap = CONT_PAIR_GAP_MM * 1.0 * mm
+                    quote_gap = ctx.cont_pair_gap_mm * 1.0 * mm
                     table.setStyle(TableStyle([('TOPPADDING', (0,0), (-1,0), quote_gap)]))
             
             # Die Zeilenabstände werden jetzt durch TOPPADDING kontrolliert, nicht durch Spacer
@@ -4325,7 +4424,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
             text = (b.get('text') or '').strip()
             if text:
                 elements.append(KeepTogether([Paragraph('<i>'+xml_escape(text)+'</i>', style_source)]))
-                elements.append(Spacer(1, CONT_PAIR_GAP_MM * mm))
+                elements.append(Spacer(1, ctx.cont_pair_gap_mm * mm))
             idx += 1
             continue
 
@@ -4482,7 +4581,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                         for table in valid_tables:
                             elements.append(KeepTogether([table]))
                 
-                elements.append(Spacer(1, CONT_PAIR_GAP_MM * mm))
+                elements.append(Spacer(1, ctx.cont_pair_gap_mm * mm))
                 # WICHTIG: Übergebe combined_block statt b (enthält alle gesammelten Kommentare!)
                 render_block_comments(combined_block, elements, doc)
                 
@@ -4540,6 +4639,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                 # Rufe build_tables_for_stream direkt mit Alternativen auf
                 pair_tables = build_tables_for_stream(
                     gr_tokens, de_tokens,  # Primäre Tokens (werden ignoriert wenn alternatives vorhanden)
+                    ctx=ctx,
                     doc_width_pt=frame_w,
                     reverse_mode=False,
                     token_gr_style=token_gr, token_de_style=token_de,
@@ -4582,9 +4682,9 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                         # Abstand nach Alternativen - verwende CONT_PAIR_GAP_MM für einheitliche Abstände
                         if is_lyrik:
                             # KORREKTUR: Gleicher Abstand wie normaler Prosa-Text (CONT_PAIR_GAP_MM)
-                            elements.append(Spacer(1, CONT_PAIR_GAP_MM * mm))
+                            elements.append(Spacer(1, ctx.cont_pair_gap_mm * mm))
                         else:
-                            elements.append(Spacer(1, CONT_PAIR_GAP_MM * mm))
+                            elements.append(Spacer(1, ctx.cont_pair_gap_mm * mm))
                 
                 # Kommentare rendern (nur einmal nach allen Alternativen)
                 render_block_comments(b, elements, doc)
@@ -4633,7 +4733,7 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
                     if is_lyrik:
                         # KORREKTUR: Verwende CONT_PAIR_GAP_MM statt hartcodiertem 3.0mm
                         # Damit haben Lyrik-Bereiche identische Abstände wie § Prosa-Text
-                        elements.append(Spacer(1, CONT_PAIR_GAP_MM * mm))
+                        elements.append(Spacer(1, ctx.cont_pair_gap_mm * mm))
             
             # KRITISCH: Kommentare NACH den Tabellen rendern, damit sie nach dem Text erscheinen!
             render_block_comments(b, elements, doc)
@@ -4676,7 +4776,10 @@ def create_pdf(blocks, pdf_name:str, *, strength:str="NORMAL",
         # Actual build - this is the blocking call
         import time
         build_start = time.time()
-        doc.build(elements)
+        if stream is not None:
+            stream.finish()  # Rest des Fensters setzen + PDF schreiben
+        else:
+            doc.build(elements)
         build_duration = time.time() - build_start
         
         # Flush again after build
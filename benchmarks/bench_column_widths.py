@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_column_widths.py
+---------------------------------
+Micro-Benchmark für die Mess-Phase der Spaltenbreiten in Prosa_Code.build_tables_for_stream.
+
+Vergleicht (auf allen Flows eines Prosa-Textes, Tag-Variante):
+- einzeln:   jede Spalte separat messen (GR, DE, EN + dynamischer Abstand) – bisheriges col_width
+- gebündelt: shared/column_widths.py (jeder verschiedene Token / jedes Tripel einmal pro Dokument)
+
+Der Text-Breiten-LRU (shared/text_metrics.py) wird vor jedem Durchlauf geleert, damit beide
+Varianten dieselben Startbedingungen haben. Die Breiten müssen bitgleich sein (wird geprüft).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_column_widths.py [input.txt]
+Standard-Input: testdokument7_Platon_Gorgias_*.txt
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+
+def _flows(infile: str):
+    from bench_stream_build import _common_blocks
+    blocks, tag_config = _common_blocks(infile)
+    rows = []
+    for b in blocks:
+        if isinstance(b, dict) and b.get('type') == 'flow':
+            gr = list(b.get('gr_tokens') or [])
+            de = list(b.get('de_tokens') or [])
+            en = list(b.get('en_tokens') or [])
+            cols = max(len(gr), len(de), len(en))
+            rows.append(tuple(r + [''] * (cols - len(r)) for r in (gr, de, en)))
+    return rows, tag_config
+
+
+def main() -> None:
+    infile = sys.argv[1] if len(sys.argv) > 1 else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        import Prosa_Code as Prosa
+        from bench_stream_build import _default_input
+        flows, tag_config = _flows(infile or _default_input())
+    from shared.column_widths import TokenWidthTable
+    from shared.text_metrics import clear_width_cache
+
+    # Tokenstile wie im Normal-Modus von create_pdf
+    gr_font, gr_size = 'DejaVu', Prosa.NORMAL_GR_SIZE
+    de_font, de_size = 'DejaVu', Prosa.NORMAL_DE_SIZE
+    ctx = Prosa.make_render_context("bench_Tag.pdf", tag_mode="TAGS", placement_overrides=None)
+
+    def measure_gr(t):
+        return Prosa.visible_measure_token(t, font=gr_font, size=gr_size,
+                                           is_greek_row=True, ctx=ctx)
+
+    def measure_tr(t):
+        if not t.strip():
+            return 0.0
+        return Prosa.visible_measure_token(t, font=de_font, size=de_size,
+                                           is_greek_row=False, ctx=ctx)
+
+    def spacing(key):
+        return Prosa._calculate_dynamic_token_spacing(key[0], key[1], key[2], "TAGS", tag_config,
+                                                      font_gr=gr_font, size_gr=gr_size,
+                                                      font_de=de_font, size_de=de_size)
+
+    def single():
+        out = []
+        for gr, de, en in flows:
+            out.append([(measure_gr(g) if g else 0.0, measure_tr(d) if d else 0.0,
+                         measure_tr(e) if e else 0.0, spacing((g, d, e)))
+                        for g, d, e in zip(gr, de, en)])
+        return out
+
+    def batched():
+        out = []
+        gr_table, tr_table = TokenWidthTable(measure_gr), TokenWidthTable(measure_tr)
+        spacing_table = TokenWidthTable(spacing)
+        for gr, de, en in flows:
+            out.append(list(zip(gr_table.widths(gr), tr_table.widths(de), tr_table.widths(en),
+                                spacing_table.widths(zip(gr, de, en)))))
+        return out
+
+    cells = sum(len(f[0]) for f in flows)
+    results = {}
+    for name, fn in (("einzeln", single), ("gebündelt", batched)):
+        clear_width_cache()
+        t0 = time.perf_counter()
+        results[name] = (fn(), time.perf_counter() - t0)
+
+    print(f"{len(flows)} Flows, {cells} Spalten")
+    for name, (_, t) in results.items():
+        print(f"{name:<10} {t * 1000:>8.1f}ms")
+    print(f"Faktor: {results['einzeln'][1] / max(results['gebündelt'][1], 1e-9):.1f}x")
+    same = results["einzeln"][0] == results["gebündelt"][0]
+    print("Breiten identisch" if same else "⚠ Breiten UNTERSCHIEDLICH")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
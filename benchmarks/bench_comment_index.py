@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_comment_index.py
+---------------------------------
+Micro-Benchmark für die Kommentar-Zuordnung auf einem synthetischen Entwurf mit 5000 Kommentaren.
+
+Vergleicht:
+- linear: alte Implementierungen (lineare Suche pro Kommentar, line_comment_colors zeilenweise)
+- index:  aktuelle Implementierungen mit shared/comment_index.py (PairIndex / LineColorIndex)
+
+Gemessen werden:
+1) preprocess.assign_comment_ranges_to_blocks (Inline-Kommentare → Zielblock + comment_token_mask)
+2) Aufbau von line_comment_colors aus process_comments_for_coloring (Prosa_Code.create_pdf)
+Beide Varianten müssen identische Ergebnisse liefern (wird geprüft).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_comment_index.py [--pairs N] [--comments N] [--max-span N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+# ----------------------- Altes Verhalten (lineare Suche) -----------------------
+
+def _legacy_assign_comment_ranges_to_blocks(blocks, inline_comments):
+    pair_index = 1
+    for b in blocks:
+        if isinstance(b, dict) and b.get('type') in ('pair', 'flow'):
+            b['_pair_index'] = pair_index
+            pair_index += 1
+    for b in blocks:
+        if isinstance(b, dict) and b.get('type') in ('pair', 'flow'):
+            if 'gr_tokens' not in b:
+                b['gr_tokens'] = []
+            if 'comment_token_mask' not in b:
+                b['comment_token_mask'] = [False] * max(1, len(b.get('gr_tokens', [])))
+    for cm in inline_comments:
+        s, e, txt = cm['start_pair'], cm['end_pair'], cm['text']
+        target = None
+        for b in blocks:
+            if isinstance(b, dict) and b.get('_pair_index') == e:
+                target = b
+                break
+        if target is None:
+            for b in reversed(blocks):
+                if isinstance(b, dict) and isinstance(b.get('_pair_index'), int) and b.get('_pair_index') <= e:
+                    target = b
+                    break
+        if target is None:
+            continue
+        target.setdefault('comments', []).append({
+            'text': txt, 'pair_range': (s, e), 'token_start': 0,
+            'token_end': max(0, len(target.get('gr_tokens', [])) - 1)})
+        for b in blocks:
+            pi = b.get('_pair_index')
+            if isinstance(pi, int) and s <= pi <= e:
+                toklen = len(b.get('gr_tokens', []))
+                if toklen == 0:
+                    b['comment_token_mask'] = []
+                    continue
+                old = b.get('comment_token_mask') or [False] * toklen
+                if len(old) != toklen:
+                    new_mask = [False] * toklen
+                    for i in range(min(len(old), toklen)):
+                        new_mask[i] = old[i]
+                    old = new_mask
+                for i in range(toklen):
+                    old[i] = True
+                b['comment_token_mask'] = old
+
+def _legacy_line_comment_colors(comments):
+    line_comment_colors = {}
+    for comment in comments:
+        color = comment['color']
+        for line_num in range(comment['start_line'], comment['end_line'] + 1):
+            line_comment_colors[line_num] = color
+    return line_comment_colors
+
+
+# ----------------------- Synthetischer Entwurf -----------------------
+
+def _synthetic_blocks(pairs: int, comments: int, max_span: int, seed: int = 7):
+    rnd = random.Random(seed)
+    blocks, inline = [], []
+    for n in range(1, pairs + 1):
+        toks = [f"λόγος{n}_{k}(N)" for k in range(rnd.randint(3, 12))]
+        blocks.append({'type': 'pair', 'label': str(n), 'gr_tokens': toks,
+                       'de_tokens': [f"Wort{k}" for k in range(len(toks))]})
+        if n % 40 == 0:
+            blocks.append({'type': 'blank'})
+    for k in range(comments):
+        s = rnd.randint(1, pairs)
+        e = min(pairs + 10, s + rnd.randint(0, max_span))  # teils über das Textende hinaus
+        inline.append({'start_pair': s, 'end_pair': e, 'text': f"Kommentar {k}", 'origin_block_index': 0})
+    # Kommentar-Blöcke wie aus Prosa_Code.process_input_text ('(s-ek) …')
+    comment_blocks = [{'type': 'comment', 'line_num': f"{c['start_pair']}-{c['end_pair']}k",
+                       'content': c['text'], 'start_line': c['start_pair'], 'end_line': c['end_pair']}
+                      for c in inline]
+    return blocks, inline, comment_blocks
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=20000)
+    ap.add_argument("--comments", type=int, default=5000)
+    ap.add_argument("--max-span", type=int, default=200)
+    args = ap.parse_args()
+
+    from shared import preprocess
+    from shared.comment_index import LineColorIndex
+    with contextlib.redirect_stdout(io.StringIO()):
+        import Prosa_Code as Prosa
+
+    blocks, inline, comment_blocks = _synthetic_blocks(args.pairs, args.comments, args.max_span)
+    print(f"Synthetischer Entwurf: {args.pairs} Paare, {args.comments} Kommentare (Spanne bis {args.max_span})")
+
+    # 1) assign_comment_ranges_to_blocks
+    legacy_blocks, index_blocks = copy.deepcopy(blocks), copy.deepcopy(blocks)
+    _, t_legacy = _timed(_legacy_assign_comment_ranges_to_blocks, legacy_blocks, inline)
+    _, t_index = _timed(preprocess.assign_comment_ranges_to_blocks, index_blocks, inline)
+    same_assign = legacy_blocks == index_blocks
+
+    # 2) line_comment_colors
+    comments = Prosa.process_comments_for_coloring(comment_blocks)
+    legacy_map, t_map_legacy = _timed(_legacy_line_comment_colors, comments)
+    index_map, t_map_index = _timed(LineColorIndex.from_comments, comments)
+    probe = range(0, args.pairs + 20)
+    _, t_get_legacy = _timed(lambda: [legacy_map.get(n) for n in probe])
+    _, t_get_index = _timed(lambda: [index_map.get(n) for n in probe])
+    same_map = dict(index_map.items()) == legacy_map
+
+    print(f"{'Schritt':<34} {'linear':>10} {'index':>10} {'Faktor':>8}")
+    for name, a, b in (("assign_comment_ranges_to_blocks", t_legacy, t_index),
+                       ("line_comment_colors aufbauen", t_map_legacy, t_map_index),
+                       (f"{len(probe)} Abfragen", t_get_legacy, t_get_index)):
+        print(f"{name:<34} {a * 1000:>8.1f}ms {b * 1000:>8.1f}ms {a / max(b, 1e-9):>7.1f}x")
+    print(f"line_comment_colors: {len(legacy_map)} Dict-Einträge → {len(index_map.segments())} Segmente")
+    ok = same_assign and same_map
+    print("Ergebnisse identisch" if ok else "⚠ Ergebnisse UNTERSCHIEDLICH")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_font_startup.py
+--------------------------------
+Misst die Zeit vom Interpreter-Start bis zur ersten Textbreiten-Messung (wie prosa_pdf.py beim Start).
+
+Vergleicht:
+- TTF:    register_dejavu() parst beide DejaVu-TTFs komplett        GLYPH_METRICS_CACHE=0
+- Cache:  Metriken aus shared/fonts/.metrics/, TTF erst beim Einbetten  GLYPH_METRICS_CACHE=1
+
+Jeder Lauf ist ein frischer Interpreter (wie bei den Draft-Adaptern): import Prosa_Code
+(registriert die Fonts) + string_width + getAscentDescent. Gemessen wird der Median über N Läufe;
+vorher läuft ein Aufwärmlauf, der den Cache ggf. anlegt. Die gemessenen Breiten müssen gleich sein.
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_font_startup.py [N]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_CHILD = r"""
+import time; t0 = time.perf_counter()
+import contextlib, io, json, sys
+sys.path.insert(0, sys.argv[1])
+with contextlib.redirect_stdout(io.StringIO()):
+    import Prosa_Code
+t_import = time.perf_counter()
+from shared.text_metrics import string_width
+from reportlab.pdfbase import pdfmetrics
+w = [string_width("ἄνδρες Ἀθηναῖοι", f, 10.0) for f in ("DejaVu", "DejaVu-Bold")]
+a = pdfmetrics.getAscentDescent("DejaVu", 10.0)
+t_measure = time.perf_counter()
+print(json.dumps({"import": t_import - t0, "first": t_measure - t0, "widths": w + list(a)}))
+"""
+
+
+def _run(flag: str) -> dict:
+    env = dict(os.environ, GLYPH_METRICS_CACHE=flag)
+    out = subprocess.run([sys.executable, "-c", _CHILD, str(ROOT)],
+                         capture_output=True, text=True, cwd=str(ROOT), env=env)
+    last = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if out.returncode != 0 or not last:
+        print(out.stderr[-2000:])
+        sys.exit(f"Lauf mit GLYPH_METRICS_CACHE={flag} fehlgeschlagen")
+    return json.loads(last[-1])
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    results = {}
+    for mode, flag in (("TTF", "0"), ("Cache", "1")):
+        _run(flag)  # Aufwärmen (Dateisystem-Cache, ggf. .metrics anlegen)
+        runs = [_run(flag) for _ in range(n)]
+        results[mode] = {
+            "import": statistics.median(r["import"] for r in runs),
+            "first": statistics.median(r["first"] for r in runs),
+            "widths": runs[0]["widths"],
+        }
+
+    print(f"{n} Läufe je Modus (Median)")
+    print(f"{'Modus':<6} {'import Prosa_Code':>18} {'erste Messung':>15}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['import'] * 1000:>15.1f} ms {r['first'] * 1000:>12.1f} ms")
+    print(f"Ersparnis: {(results['TTF']['first'] - results['Cache']['first']) * 1000:.1f} ms pro Start")
+    same = results["TTF"]["widths"] == results["Cache"]["widths"]
+    print("Breiten identisch" if same else "⚠ Breiten UNTERSCHIEDLICH")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_interlinear_row.py
+-----------------------------------
+Misst die Renderzeit EINER Prosa-Variante mit reportlab-Table bzw. InterlinearRow (shared/interlinear_row.py).
+
+Vergleicht:
+- Table:          eine Table pro Slice, nested Table pro Übersetzungszelle   INTERLINEAR_ROW_FLOWABLE=0
+- InterlinearRow: ein Zeilen-Flowable pro Slice, Übersetzungen gestapelt     INTERLINEAR_ROW_FLOWABLE=1
+
+Jeder Modus läuft in einem eigenen Kindprozess (Kind-Modus von bench_stream_build.py).
+Die PDFs sind NICHT bytegleich (Table schreibt zusätzliche Grafikzustände q/Q/Font pro Zelle);
+verglichen werden daher Seitenzahl und die absoluten Textpositionen aller Tj-Operatoren.
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_interlinear_row.py [input.txt]
+Standard-Input: testdokument7_Platon_Gorgias_*.txt (lange Dialoge)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_stream_build import _default_input  # noqa: E402
+
+
+def _content_streams(pdf: Path):
+    for raw in re.findall(rb"stream\r?\n(.*?)endstream", pdf.read_bytes(), re.S):
+        for decode in (lambda s: zlib.decompress(base64.a85decode(s.strip(), adobe=True)), zlib.decompress):
+            try:
+                yield decode(raw).decode("latin-1")
+                break
+            except Exception:
+                pass
+
+
+def _text_positions(pdf: Path):
+    """(Seite, x, y, Text) aller Tj – absolute Lage über den cm-Stack (nur Translationen)."""
+    out = []
+    for page, stream in enumerate(_content_streams(pdf)):
+        dx = dy = 0.0
+        stack = []
+        for line in stream.splitlines():
+            t = line.strip()
+            if t == "q":
+                stack.append((dx, dy))
+            elif t == "Q":
+                dx, dy = stack.pop() if stack else (dx, dy)
+            elif t.endswith(" cm"):
+                a, b, c, d, e, f = (float(v) for v in t.split()[:6])
+                dx, dy = dx + e, dy + f
+            elif t.startswith("BT") and "Tj" in t:
+                m = re.search(r"1 0 0 1 ([-\d.]+) ([-\d.]+) Tm(?: ([-\d.]+) ([-\d.]+) Td)?", t)
+                x = float(m.group(1)) + float(m.group(3) or 0) if m else 0.0
+                y = float(m.group(2)) + float(m.group(4) or 0) if m else 0.0
+                for text in re.findall(r"\((.*?)\) Tj", t):
+                    out.append((page, round(x + dx, 2), round(y + dy, 2), text))
+    return out
+
+
+def main() -> None:
+    infile = sys.argv[1] if len(sys.argv) > 1 else _default_input()
+    print(f"Input: {infile}")
+    child = str(ROOT / "benchmarks" / "bench_stream_build.py")
+    results, positions = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, flag in (("Table", "0"), ("InterlinearRow", "1")):
+            out_dir = Path(tmp) / mode
+            out_dir.mkdir()
+            env = dict(os.environ, INTERLINEAR_ROW_FLOWABLE=flag, RL_invariant="1")
+            out = subprocess.run([sys.executable, child, "--child", infile, str(out_dir)],
+                                 capture_output=True, text=True, cwd=str(ROOT), env=env)
+            last = [l for l in out.stdout.splitlines() if l.startswith("{")]
+            if out.returncode != 0 or not last:
+                print(out.stderr[-2000:])
+                sys.exit(f"Modus {mode} fehlgeschlagen")
+            results[mode] = json.loads(last[-1])
+            pdf = next(out_dir.glob("*.pdf"))
+            positions[mode] = _text_positions(pdf)
+            results[mode]["pages"] = len(re.findall(rb"/Type\s*/Page[^s]", pdf.read_bytes()))
+            results[mode]["kb"] = pdf.stat().st_size / 1024
+
+    print(f"{'Modus':<15} {'Zeit':>8} {'Peak RSS':>10} {'Seiten':>7} {'PDF':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<15} {r['seconds']:>6.2f} s {r['peak_rss_mb']:>7.1f} MB {r['pages']:>7} {r['kb']:>6.0f} KB")
+    print(f"Faktor: {results['Table']['seconds'] / max(results['InterlinearRow']['seconds'], 1e-9):.2f}x")
+    same = positions["Table"] == positions["InterlinearRow"]
+    print(f"Textpositionen identisch ({len(positions['Table'])} Tj)" if same
+          else "⚠ Textpositionen UNTERSCHIEDLICH")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
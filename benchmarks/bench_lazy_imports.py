@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_lazy_imports.py
+--------------------------------
+Misst die Startkosten der Orchestratoren mit und ohne verzögerte Imports (shared/lazy_import.py).
+
+Vergleicht:
+- sofort:   Prosa_Code/Poesie_Code + ReportLab beim Modul-Import laden   LAZY_IMPORTS=0
+- lazy:     schwere Module erst beim ersten Render                          LAZY_IMPORTS=1
+
+Gemessen (frischer Interpreter, Median über N Läufe):
+- `prosa_pdf.py --help`
+- Cache-Treffer-Pfad des Prosa-Adapters: import prosa_pdf + render_cache.cache_key(...)
+  (alles, was build_prosa_drafts_adapter.run_one vor render_cache.fetch braucht)
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_lazy_imports.py [N]
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_CACHE_HIT = r"""
+import contextlib, io, sys
+sys.path.insert(0, sys.argv[1])
+with contextlib.redirect_stdout(io.StringIO()):
+    import prosa_pdf
+    from shared import render_cache
+    from shared.streaming_build import streaming_enabled
+    render_cache.cache_key("prosa", "text", None, False, {
+        "language": prosa_pdf._detect_language_from_filename("x_gr_de.txt"),
+        "size_bytes": None if streaming_enabled() else 0,
+    })
+print("platypus" if "reportlab.platypus" in sys.modules else "-")
+"""
+
+
+def _time(cmd, flag: str) -> tuple:
+    """(Sekunden, letzte stdout-Zeile) eines frischen Interpreters."""
+    env = dict(os.environ, LAZY_IMPORTS=flag)
+    t0 = time.perf_counter()
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), env=env)
+    elapsed = time.perf_counter() - t0
+    if out.returncode != 0:
+        print(out.stderr[-2000:])
+        sys.exit(f"Lauf mit LAZY_IMPORTS={flag} fehlgeschlagen: {cmd}")
+    lines = out.stdout.strip().splitlines()
+    return elapsed, (lines[-1] if lines else "")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    cases = {
+        "prosa_pdf.py --help": [sys.executable, str(ROOT / "prosa_pdf.py"), "--help"],
+        "Adapter-Cache-Treffer": [sys.executable, "-c", _CACHE_HIT, str(ROOT)],
+    }
+    print(f"{n} Läufe je Modus (Median, frischer Interpreter)")
+    print(f"{'Fall':<24} {'sofort':>10} {'lazy':>10} {'Faktor':>8}")
+    platypus = {}
+    for label, cmd in cases.items():
+        res = {}
+        for mode, flag in (("sofort", "0"), ("lazy", "1")):
+            platypus[mode] = _time(cmd, flag)[1]  # Aufwärmen (Dateisystem-Cache, .pyc)
+            res[mode] = statistics.median(_time(cmd, flag)[0] for _ in range(n))
+        print(f"{label:<24} {res['sofort'] * 1000:>7.0f} ms {res['lazy'] * 1000:>7.0f} ms "
+              f"{res['sofort'] / max(res['lazy'], 1e-9):>7.1f}x")
+    # platypus enthält nach der Schleife die Ausgabe des Cache-Treffer-Falls
+    for mode, seen in platypus.items():
+        print(f"Cache-Treffer ({mode}): reportlab.platypus "
+              f"{'geladen' if seen == 'platypus' else 'NICHT geladen'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_line_breaking.py
+---------------------------------
+Micro-Benchmark für den Spalten-Umbruch eines Prosa-Flows (build_tables_for_stream).
+
+Vergleicht:
+- linear:  alte Pack-Schleife (Breiten pro Slice sequentiell aufsummieren)
+- greedy:  ColumnBreaker.greedy_breaks (Präfixsummen + bisect, Standard-Modus)
+- optimal: ColumnBreaker.optimal_breaks (DP, PROSA_LINE_BREAK=optimal)
+
+Ausgegeben werden Laufzeit, Zeilenzahl (= Anzahl Table-Flowables) und Flatterrand
+(Summe der quadrierten Restbreiten ohne letzte Zeile). linear und greedy müssen identische
+Umbrüche liefern (wird geprüft).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_line_breaking.py [--cols N] [--avail PT] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _legacy_breaks(widths, avail_w):
+    ends, i, cols = [], 0, len(widths)
+    while i < cols:
+        acc, j = 0.0, i
+        while j < cols:
+            w = widths[j]
+            if acc + w > avail_w and j > i:
+                break
+            acc += w
+            j += 1
+        ends.append(j)
+        i = j
+    return ends
+
+
+def _raggedness(widths, ends, avail_w):
+    total, i = 0.0, 0
+    for j in ends[:-1]:
+        total += (avail_w - sum(widths[i:j])) ** 2
+        i = j
+    return total
+
+
+def _timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - t0) / repeat
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cols", type=int, default=5000)
+    ap.add_argument("--avail", type=float, default=450.0)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    from shared.line_breaking import ColumnBreaker, PUNCTUATION_TOKENS
+
+    rnd = random.Random(13)
+    puncts = sorted(PUNCTUATION_TOKENS)
+    gr = [rnd.choice(puncts) if rnd.random() < 0.08 else f"λόγος{k}" for k in range(args.cols)]
+    de = ["" if rnd.random() < 0.3 else f"Wort{k}" for k in range(args.cols)]
+    widths = [8.0 if g in PUNCTUATION_TOKENS else rnd.uniform(18.0, 70.0) for g in gr]
+    print(f"Synthetischer Flow: {args.cols} Spalten, avail_w={args.avail:.0f}pt")
+
+    legacy, t_legacy = _timed(lambda: _legacy_breaks(widths, args.avail), args.repeat)
+    breaker, t_build = _timed(lambda: ColumnBreaker(widths, de=de, gr=gr), args.repeat)
+    greedy, t_greedy = _timed(lambda: breaker.greedy_breaks(args.avail), args.repeat)
+    optimal, t_opt = _timed(lambda: breaker.optimal_breaks(args.avail), args.repeat)
+
+    print(f"{'Variante':<10} {'Zeit':>10} {'Zeilen':>8} {'Flatterrand':>14}")
+    for name, ends, t in (("linear", legacy, t_legacy), ("greedy", greedy, t_build + t_greedy),
+                          ("optimal", optimal, t_build + t_opt)):
+        print(f"{name:<10} {t * 1000:>8.2f}ms {len(ends):>8} {_raggedness(widths, ends, args.avail):>14.0f}")
+    ok = legacy == greedy and len(optimal) <= len(greedy)
+    print("Umbrüche konsistent" if ok else "⚠ Umbrüche UNTERSCHIEDLICH")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
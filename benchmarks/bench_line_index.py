@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_line_index.py
+------------------------------
+Micro-Benchmark für die Sprachanzahl-Erkennung bei Insertionszeilen auf einem synthetischen Entwurf.
+
+Vergleicht:
+- Suche: alte Implementierung (pro Insertionszeile bis zu 50 Zeilen rückwärts/vorwärts,
+         extract_line_number auf jeder besuchten Zeile)
+- Index: Prosa_Code.build_line_index (shared/line_index.py) einmal aufbauen, danach O(1)-Abfragen
+
+Gemessen wird, was process_input_text dafür braucht: Zeilennummer jeder Zeile, Gruppenbildung
+(gleiche Nummer) und language_count für jede Insertionszeile. Gezählt werden außerdem die
+extract_line_number-Aufrufe. Beide Varianten müssen identische Ergebnisse liefern (wird geprüft).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_line_index.py [--groups N] [--languages 2|3] [--insertions N] [--run N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+# ----------------------- Altes Verhalten (Kontextsuche) -----------------------
+
+def _legacy_language_count(lines, current_idx, parse, is_comment, is_insertion):
+    def count_from(check_idx, line_num):
+        same = 0
+        j = check_idx
+        while j < len(lines) and same < 5:
+            test_line = (lines[j] or '').strip()
+            if not test_line:
+                j += 1
+                continue
+            if parse(test_line)[0] == line_num:
+                same += 1
+                j += 1
+            else:
+                break
+        return same
+
+    backward = [current_idx - o for o in range(1, min(50, current_idx + 1))]
+    forward = [current_idx + o for o in range(1, min(50, len(lines) - current_idx))]
+    for check_idx in backward + forward:
+        check_line = (lines[check_idx] or '').strip()
+        if not check_line:
+            continue
+        line_num, _ = parse(check_line)
+        if line_num is None or is_comment(line_num) or is_insertion(line_num):
+            continue
+        count = count_from(check_idx, line_num)
+        if count >= 2:
+            return min(count, 3)
+    return 2
+
+
+def _legacy_scan(lines, parse, is_comment, is_insertion, is_sep):
+    """Zeilennummern, Gruppen und Sprachanzahl wie process_input_text vor dem Index."""
+    out = []
+    i = 0
+    while i < len(lines):
+        line = (lines[i] or '').strip()
+        if is_sep(line):
+            i += 1
+            continue
+        line_num, _ = parse(line)
+        j = i + 1
+        if line_num is not None:
+            while j < len(lines):
+                nxt = (lines[j] or '').strip()
+                if is_sep(nxt):
+                    j += 1
+                    continue
+                if parse(nxt)[0] != line_num:
+                    break
+                j += 1
+            if is_insertion(line_num):
+                out.append((i, line_num, _legacy_language_count(lines, i, parse, is_comment, is_insertion)))
+        i = j
+    return out
+
+
+def _index_scan(lines, build, is_insertion, is_sep):
+    index = build(lines)
+    out = []
+    i = 0
+    while i < len(lines):
+        if is_sep(lines[i]):
+            i += 1
+            continue
+        line_num = index.num(i)
+        j = i + 1
+        if line_num is not None:
+            while j < len(lines):
+                if is_sep(lines[j]):
+                    j += 1
+                    continue
+                if index.num(j) != line_num:
+                    break
+                j += 1
+            if is_insertion(line_num):
+                out.append((i, line_num, index.language_count(i)))
+        i = j
+    return out
+
+
+# ----------------------- Synthetischer Entwurf -----------------------
+
+def _synthetic_lines(groups: int, languages: int, insertions: int, run: int, seed: int = 11):
+    rnd = random.Random(seed)
+    lines = []
+    for n in range(1, groups + 1):
+        lines.append(f"({n}) λόγος{n} τις ἦν ἐν τῇ πόλει")
+        lines.append(f"({n}) Wort{n} jemand war in der Stadt")
+        if languages >= 3:
+            lines.append(f"({n}) word{n} someone was in the city")
+        if n % 25 == 0:
+            lines.append(f"({n}k) Kommentar zu Zeile {n}")
+        lines.append("")
+    for _ in range(insertions):
+        pos = rnd.randrange(len(lines))
+        block = []
+        for r in range(run):  # run aufeinanderfolgende Insertionsgruppen mit eigener Nummer
+            block += [f"({pos}{r}i) ἐντεθέν", f"({pos}{r}i) eingefügt"] + (
+                [f"({pos}{r}i) inserted"] if languages >= 3 else [])
+        lines[pos:pos] = block
+    return lines
+
+
+class _Counter:
+    def __init__(self, fn):
+        self.fn, self.calls = fn, 0
+
+    def __call__(self, s):
+        self.calls += 1
+        return self.fn(s)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", type=int, default=20000)
+    ap.add_argument("--languages", type=int, choices=(2, 3), default=3)
+    ap.add_argument("--insertions", type=int, default=1000)
+    ap.add_argument("--run", type=int, default=8, help="Insertionsgruppen pro Einfügestelle")
+    args = ap.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import Prosa_Code as Prosa
+    from shared.line_index import LineIndex
+
+    lines = _synthetic_lines(args.groups, args.languages, args.insertions, args.run)
+    print(f"Synthetischer Entwurf: {len(lines)} Zeilen, {args.groups} Gruppen, "
+          f"{args.insertions} × {args.run} Insertionsgruppen ({args.languages}-sprachig)")
+
+    legacy_parse = _Counter(Prosa.extract_line_number)
+    t0 = time.perf_counter()
+    legacy = _legacy_scan(lines, legacy_parse, Prosa.is_comment_line, Prosa.is_insertion_line,
+                          Prosa.is_empty_or_sep)
+    t_legacy = time.perf_counter() - t0
+
+    index_parse = _Counter(Prosa.extract_line_number)
+    build = lambda ls: LineIndex(ls, index_parse, is_comment=Prosa.is_comment_line,
+                                 is_insertion=Prosa.is_insertion_line, max_count=3, run_limit=5)
+    t0 = time.perf_counter()
+    indexed = _index_scan(lines, build, Prosa.is_insertion_line, Prosa.is_empty_or_sep)
+    t_index = time.perf_counter() - t0
+
+    print(f"{'Variante':<10} {'Zeit':>10} {'extract_line_number':>21}")
+    print(f"{'Suche':<10} {t_legacy * 1000:>8.1f}ms {legacy_parse.calls:>21}")
+    print(f"{'Index':<10} {t_index * 1000:>8.1f}ms {index_parse.calls:>21}")
+    print(f"Faktor: {t_legacy / max(t_index, 1e-9):.1f}x")
+    ok = legacy == indexed
+    print("Ergebnisse identisch" if ok else "⚠ Ergebnisse UNTERSCHIEDLICH")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_line_source.py
+-------------------------------
+Misst Spitzen-Speicher und Zeit der Zeilen-Vorbereitung in Prosa_Code.process_input_file
+(Datei → fertige Zeilenliste für Index und Blockbildung).
+
+Vergleicht:
+- Kopien:  f.read() → RE_HTML_COMMENT_HEADER.sub → split('\\n') → rstrip-Kopie →
+           expand_slash_groups (Liste) → Latein-Liste (bisheriger Ablauf)
+- Strom:   iter_file_lines (mmap, shared/line_source.py) → iter_slash_groups →
+           _iter_latin_ablative → list(...)
+
+Der Spitzen-Speicher wird in einem eigenen Lauf mit tracemalloc gemessen (nur Python-Allokationen;
+die mmap-Seiten zählen nicht mit). Beide Varianten müssen dieselbe Zeilenliste liefern (wird geprüft).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_line_source.py [datei.txt]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _copies(path: Path, Prosa, rx) -> list:
+    with open(path, encoding='utf-8') as f:
+        raw_text = f.read()
+    raw_text = rx.RE_HTML_COMMENT_HEADER.sub('', raw_text)
+    raw = [ln.rstrip('\n') for ln in raw_text.split('\n')]
+    raw = Prosa.expand_slash_groups(raw)
+    first = next((ln for ln in raw if ln.strip() and not Prosa.is_empty_or_sep(ln.strip())), None)
+    if first is not None and Prosa.is_latin_line(first):
+        raw = [rx.RE_LATIN_ABLATIVE_NOUN.sub('(Abl)', ln) for ln in raw]
+    return raw
+
+
+def _stream(path: Path, Prosa, rx) -> list:
+    return list(Prosa._iter_latin_ablative(Prosa.iter_slash_groups(Prosa.iter_file_lines(path))))
+
+
+def _measure(fn) -> tuple[float, float, list]:
+    """Zeit ohne tracemalloc (das verlangsamt jede Allokation), Spitze in einem zweiten Lauf."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        path = Path(sys.argv[1])
+    else:
+        path = max((ROOT / "texte").rglob("*/prosa/**/*.txt"), key=lambda p: p.stat().st_size)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import Prosa_Code as Prosa
+    from shared import regex_patterns as rx
+
+    size_mb = path.stat().st_size / 1e6
+    print(f"{path.name} ({size_mb:.2f} MB)")
+    results = {}
+    for name, fn in (("Kopien", _copies), ("Strom", _stream)):
+        results[name] = _measure(lambda: fn(path, Prosa, rx))
+
+    print(f"{'Variante':<8} {'Zeit':>10} {'Spitze':>10} {'Zeilen':>8}")
+    for name, (elapsed, peak, lines) in results.items():
+        print(f"{name:<8} {elapsed * 1000:>8.1f}ms {peak / 1e6:>8.2f}MB {len(lines):>8}")
+    ok = results["Kopien"][2] == results["Strom"][2]
+    print("Zeilen identisch" if ok else "⚠ Zeilen UNTERSCHIEDLICH")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_paragraph_cache.py
+-----------------------------------
+Misst die Renderzeit EINER Prosa-Variante mit und ohne Paragraph-Cache (shared/paragraph_cache.py).
+
+Vergleicht:
+- ohne: jede Token-Zelle wird neu geparst und umbrochen      PARAGRAPH_CACHE=0
+- mit:  gleiches Markup einmal parsen, Umbruch pro Breite teilen  PARAGRAPH_CACHE=1
+
+Jeder Modus läuft in einem eigenen Kindprozess (Kind-Modus von bench_stream_build.py).
+Die erzeugten PDFs werden (mit RL_invariant=1) per MD5 verglichen und müssen identisch sein.
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_paragraph_cache.py [input.txt]
+Standard-Input: testdokument7_Platon_Gorgias_*.txt (lange Dialoge)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_stream_build import _default_input  # noqa: E402
+
+
+def main() -> None:
+    infile = sys.argv[1] if len(sys.argv) > 1 else _default_input()
+    print(f"Input: {infile}")
+    child = str(ROOT / "benchmarks" / "bench_stream_build.py")
+    results = {}
+    for mode, flag in (("ohne", "0"), ("mit", "1")):
+        env = dict(os.environ, PARAGRAPH_CACHE=flag, RL_invariant="1")
+        with tempfile.TemporaryDirectory() as out_dir:
+            out = subprocess.run([sys.executable, child, "--child", infile, out_dir],
+                                 capture_output=True, text=True, cwd=str(ROOT), env=env)
+        last = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if out.returncode != 0 or not last:
+            print(out.stderr[-2000:])
+            sys.exit(f"Modus {mode} fehlgeschlagen")
+        results[mode] = json.loads(last[-1])
+
+    print(f"{'Cache':<6} {'Zeit':>8} {'Peak RSS':>10}  MD5")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['seconds']:>6.2f} s {r['peak_rss_mb']:>7.1f} MB  {r['md5']}")
+    print(f"Faktor: {results['ohne']['seconds'] / max(results['mit']['seconds'], 1e-9):.2f}x")
+    same = results["ohne"]["md5"] == results["mit"]["md5"]
+    print("PDFs identisch" if same else "⚠ PDFs UNTERSCHIEDLICH")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
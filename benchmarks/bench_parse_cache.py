@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_parse_cache.py
+-------------------------------
+Misst die Parser-Phase eines Orchestrators gegen das Laden derselben Blöcke aus dem Parse-Cache.
+
+Vergleicht:
+- Parse:  prosa_pdf._parse_blocks / poesie_pdf._parse_blocks (process_input_text, Kommentare,
+          bei Prosa zusätzlich group_pairs_into_flows + merge_strauss_alternatives)
+- Cache:  shared/parse_cache.load (pickle) – Eintrag vorher einmal mit store() angelegt
+
+Der Cache liegt in einem temporären Verzeichnis (PARSE_CACHE_DIR), .parse_cache/ bleibt unberührt.
+Gemessen wird der Median über N Läufe; die geladenen Blöcke müssen gleich den geparsten sein.
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_parse_cache.py [datei.txt] [--poesie] [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _largest(pattern: str) -> Path:
+    return max((ROOT / "texte").rglob(pattern), key=lambda p: p.stat().st_size)
+
+
+def _median_ms(fn, runs: int) -> tuple[float, object]:
+    times, result = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("file", nargs="?", help="Eingabe (Standard: größte passende Datei unter texte/)")
+    ap.add_argument("--poesie", action="store_true", help="poesie_pdf statt prosa_pdf")
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    kind = "poesie" if args.poesie else "prosa"
+    path = Path(args.file) if args.file else _largest("*/poesie/**/*.txt" if args.poesie else "*/prosa/**/*.txt")
+    text = path.read_text(encoding="utf-8")
+
+    os.environ["PARSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_parse_cache_")
+    with contextlib.redirect_stdout(io.StringIO()):
+        orchestrator = __import__(f"{kind}_pdf")
+        from shared import parse_cache
+
+    print(f"{kind}: {path.name} ({len(text.encode('utf-8')) / 1e6:.2f} MB), {args.runs} Läufe (Median)")
+    t_parse, parsed = _median_ms(lambda: orchestrator._parse_blocks(text), args.runs)
+    key = parse_cache.cache_key(kind, text)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse_cache.store(key, parsed)
+    t_load, loaded = _median_ms(lambda: parse_cache.load(key), args.runs)
+
+    print(f"{'Variante':<8} {'Zeit':>10}")
+    print(f"{'Parse':<8} {t_parse:>8.1f}ms")
+    print(f"{'Cache':<8} {t_load:>8.1f}ms   ({parse_cache.cache_stats()['bytes'] / 1e6:.2f} MB auf Platte)")
+    print(f"Faktor: {t_parse / max(t_load, 1e-6):.1f}x")
+    ok = parsed == loaded
+    print("Blöcke identisch" if ok else "⚠ Blöcke UNTERSCHIEDLICH")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
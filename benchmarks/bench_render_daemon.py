@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_render_daemon.py
+---------------------------------
+Misst die Wandzeit pro Draft-Adapter-Aufruf ohne und mit Render-Daemon (shared/render_daemon.py).
+
+Vergleicht:
+- kalt:   `python build_prosa_drafts_adapter.py <draft>` rendert selbst (Interpreter, Imports, Fonts)
+- Daemon: derselbe Aufruf mit RENDER_DAEMON=1 → Job an den warmen Daemon, Ausgabe wird gestreamt
+
+Läuft in einer temporären Kopie des Projekts (Adapter schreiben nach <Projekt>/pdf_drafts/) mit
+einem auf N Zeilen gekürzten Prosa-Entwurf; RENDER_CACHE=0, damit jeder Aufruf wirklich rendert.
+Die PDFs beider Modi müssen bytegleich sein (RL_invariant=1).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_render_daemon.py [Läufe] [Zeilen]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DRAFT_DIR = Path("texte_drafts/griechisch/prosa/Philosophie_Rhetorik/Lukian/Vera_Historia_1")
+
+
+def _copy_project(dst: Path, lines: int) -> Path:
+    for path in list(ROOT.glob("*.py")) + [ROOT / "shared"]:
+        if path.is_dir():
+            shutil.copytree(path, dst / path.name, ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(path, dst / path.name)
+    src = sorted((ROOT / DRAFT_DIR).glob("*.txt"))[0]
+    draft = dst / DRAFT_DIR / src.name
+    draft.parent.mkdir(parents=True)
+    with open(src, encoding="utf-8") as f:
+        draft.write_text("".join(f.readlines()[:lines]), encoding="utf-8")
+    return draft
+
+
+def _digest(project: Path) -> str:
+    h = hashlib.sha256()
+    for pdf in sorted((project / "pdf_drafts").rglob("*.pdf")):
+        h.update(pdf.name.encode("utf-8"))
+        h.update(pdf.read_bytes())
+    return h.hexdigest()
+
+
+def _run(project: Path, draft: Path, env: dict) -> float:
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "build_prosa_drafts_adapter.py", str(draft)], cwd=project,
+                         env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if out.returncode != 0:
+        print(out.stdout[-2000:], out.stderr[-2000:])
+        sys.exit("Adapter-Lauf fehlgeschlagen")
+    return elapsed
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        draft = _copy_project(project, lines)
+        sock = project / "daemon.sock"
+        env = dict(os.environ, RL_invariant="1", RENDER_CACHE="0", RENDER_DAEMON_SOCKET=str(sock),
+                   PYTHONUNBUFFERED="1")
+        print(f"Entwurf: {draft.name} ({lines} Zeilen), {n} Läufe je Modus")
+
+        cold = [_run(project, draft, env) for _ in range(n)]
+        cold_digest = _digest(project)
+
+        daemon = subprocess.Popen([sys.executable, "-m", "shared.render_daemon", "serve"], cwd=project,
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        t0 = time.perf_counter()
+        try:
+            while not sock.exists():
+                if daemon.poll() is not None or time.perf_counter() - t0 > 60:
+                    sys.exit("Render-Daemon ließ sich nicht starten")
+                time.sleep(0.05)
+            print(f"Daemon bereit nach {time.perf_counter() - t0:.2f} s (einmalig)")
+            warm_env = dict(env, RENDER_DAEMON="1")
+            warm = [_run(project, draft, warm_env) for _ in range(n)]
+            warm_digest = _digest(project)
+        finally:
+            daemon.terminate()
+            daemon.wait(timeout=30)
+
+    print(f"{'Modus':<8} {'Median':>9} {'Min':>9}")
+    for mode, times in (("kalt", cold), ("Daemon", warm)):
+        print(f"{mode:<8} {statistics.median(times):>7.2f} s {min(times):>7.2f} s")
+    print(f"Ersparnis: {statistics.median(cold) - statistics.median(warm):.2f} s pro Entwurf")
+    same = cold_digest == warm_digest
+    print("PDFs bytegleich" if same else "⚠ PDFs UNTERSCHIEDLICH")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_stream_build.py
+--------------------------------
+Misst den Spitzen-Speicher (peak RSS) beim Rendern EINER Prosa-Variante.
+
+Vergleicht:
+- list:   klassischer Build (alle Flowables in einer Liste, danach doc.build)  PROSA_STREAM_BUILD=0
+- stream: streamender Build (shared/streaming_build.py)                         PROSA_STREAM_BUILD=1
+
+Jeder Modus läuft in einem eigenen Kindprozess, damit ru_maxrss unabhängig gemessen wird.
+Die erzeugten PDFs werden (mit RL_invariant=1) per MD5 verglichen und müssen identisch sein.
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_stream_build.py [input.txt]
+Standard-Input: testdokument7_Platon_Gorgias_*.txt
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _peak_rss_mb() -> float:
+    # Linux: KB, macOS: Bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _default_input() -> str:
+    matches = sorted(ROOT.glob("testdokument7_Platon_Gorgias*.txt"))
+    if not matches:
+        sys.exit("testdokument7_Platon_Gorgias*.txt nicht gefunden")
+    return str(matches[0])
+
+
+def _common_blocks(infile: str) -> list:
+    import Prosa_Code as Prosa
+    import prosa_pdf
+    from shared import pipeline
+    from shared.preprocess import discover_and_attach_comments
+    blocks = Prosa.process_input_file(infile)
+    blocks = discover_and_attach_comments(blocks)
+    if any(b.get('type') == 'pair' for b in blocks if isinstance(b, dict)):
+        blocks = Prosa.group_pairs_into_flows(blocks)
+        blocks = Prosa.merge_strauss_alternatives(blocks)
+    tag_config = prosa_pdf._get_default_tag_config("GR_FETT")
+    return pipeline.apply_common_stage(blocks, tag_config, tokenize=Prosa.tokenize, label="bench"), tag_config
+
+
+def _child(infile: str, out_dir: str) -> None:
+    sys.path.insert(0, str(ROOT))
+    infile = os.path.abspath(infile)
+    os.chdir(out_dir)
+    devnull = open(os.devnull, "w")
+    real_stdout = sys.stdout
+    sys.stdout = devnull  # Debug-Ausgaben der Renderer unterdrücken
+    try:
+        import prosa_pdf
+        common_blocks, tag_config = _common_blocks(infile)
+        rss_after_parse = _peak_rss_mb()
+        t0 = time.perf_counter()
+        out_name = prosa_pdf._render_variant(common_blocks, "bench", "NORMAL", "COLOR", "TAGS", tag_config)
+        elapsed = time.perf_counter() - t0
+    finally:
+        sys.stdout = real_stdout
+    print(json.dumps({
+        "rss_after_parse_mb": round(rss_after_parse, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "seconds": round(elapsed, 2),
+        "md5": hashlib.md5(Path(out_name).read_bytes()).hexdigest(),
+    }))
+
+
+def main() -> None:
+    if len(sys.argv) >= 4 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+        return
+
+    infile = sys.argv[1] if len(sys.argv) > 1 else _default_input()
+    print(f"Input: {infile}")
+    results = {}
+    for mode, flag in (("list", "0"), ("stream", "1")):
+        env = dict(os.environ, PROSA_STREAM_BUILD=flag, RL_invariant="1")
+        with tempfile.TemporaryDirectory() as out_dir:
+            out = subprocess.run([sys.executable, __file__, "--child", infile, out_dir],
+                                 capture_output=True, text=True, cwd=str(ROOT), env=env)
+        last = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if out.returncode != 0 or not last:
+            print(out.stderr[-2000:])
+            sys.exit(f"Modus {mode} fehlgeschlagen")
+        results[mode] = json.loads(last[-1])
+
+    print(f"{'Modus':<8} {'RSS nach Parse':>15} {'Peak RSS':>10} {'Zeit':>8}  MD5")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['rss_after_parse_mb']:>12.1f} MB {r['peak_rss_mb']:>7.1f} MB {r['seconds']:>6.2f} s  {r['md5']}")
+    list_delta = results["list"]["peak_rss_mb"] - results["list"]["rss_after_parse_mb"]
+    stream_delta = results["stream"]["peak_rss_mb"] - results["stream"]["rss_after_parse_mb"]
+    print(f"Zusatzspeicher des Builds: list {list_delta:.1f} MB → stream {stream_delta:.1f} MB")
+    print("PDFs identisch" if results["list"]["md5"] == results["stream"]["md5"] else "⚠ PDFs UNTERSCHIEDLICH")
+
+
+if __name__ == "__main__":
+    main()
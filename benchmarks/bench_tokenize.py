@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_tokenize.py
+----------------------------
+Micro-Benchmark für die Tokenisierung (Zeilen pro Sekunde).
+
+Vergleicht:
+- inline:   altes Prosa_Code.tokenize mit Inline-Patterns (re.sub(r'...', ...) pro Aufruf)
+- registry: aktuelles Prosa_Code.tokenize mit vorkompilierten Patterns aus shared/regex_patterns.py
+
+Zusätzlich wird der Token-Filter aus build_tables_for_stream (is_only_symbols_or_stephanus)
+pro Token gemessen. Beide Varianten müssen identische Ergebnisse liefern (wird geprüft).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_tokenize.py [input.txt] [--repeat N]
+Standard-Input: testdokument7_Platon_Gorgias_*.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from shared import regex_patterns as rx  # noqa: E402
+
+
+def _default_input() -> str:
+    matches = sorted(ROOT.glob("testdokument7_Platon_Gorgias*.txt"))
+    if not matches:
+        sys.exit("testdokument7_Platon_Gorgias*.txt nicht gefunden")
+    return str(matches[0])
+
+
+# ----------------------- Altes Verhalten (Inline-Patterns) -----------------------
+
+def _legacy_is_latin_line(s: str) -> bool:
+    if not s:
+        return False
+    s = s.strip()
+    s_clean = re.sub(r'^\(\d+[a-z]*\)', '', s)
+    s_clean = re.sub(r'^\[[^\]]*:\]', '', s_clean)
+    s_clean = re.sub(r'\([^)]*\)', '', s_clean)
+    latin_count = sum(1 for ch in s_clean if ch.isalpha() and ord(ch) < 128)
+    german_count = sum(1 for ch in s_clean if ch in 'äöüÄÖÜß')
+    return latin_count > german_count and latin_count >= 2
+
+def _legacy_tokenize(line: str):
+    line = re.sub(r'\[Zitat\s*Anfang\]', '', line, flags=re.IGNORECASE)
+    line = re.sub(r'\[Zitat\s*Ende\]', '', line, flags=re.IGNORECASE)
+    line = re.sub(r'\[Quelle\s*Anfang\]', '', line, flags=re.IGNORECASE)
+    line = re.sub(r'\[Quelle\s*Ende\]', '', line, flags=re.IGNORECASE)
+    line = re.sub(r'^\s*\(\d+[a-z]?\)\s*$', '', line)
+    if _legacy_is_latin_line(line):
+        line = re.sub(r'\(N\)\(Abl\)', '(Abl)', line)
+    line = re.sub(r'\s+', ' ', (line or '').strip())
+    return [tok for tok in line.split(' ') if tok.strip()]
+
+def _legacy_only_symbols(token: str) -> bool:
+    if not token or not token.strip():
+        return True
+    cleaned = token.strip()
+    if re.match(r'^[\[\]\(\).,;:!?…—"\'*†‡§\s]+$', cleaned):
+        return True
+    if re.match(r'^\[?\d+[a-e]?\]?$', cleaned):
+        return True
+    return False
+
+
+# ----------------------- Neues Verhalten (Registry) -----------------------
+
+def _registry_only_symbols(token: str) -> bool:
+    if not token or not token.strip():
+        return True
+    cleaned = token.strip()
+    if rx.RE_ONLY_SYMBOLS.match(cleaned):
+        return True
+    if rx.RE_STEPHANUS_TOKEN.match(cleaned):
+        return True
+    return False
+
+
+def _time_lines(fn, lines, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for ln in lines:
+            fn(ln)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Tokenisierungs-Durchsatz (Zeilen/s)")
+    ap.add_argument("input", nargs="?", default=None)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    infile = args.input or _default_input()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import Prosa_Code as Prosa
+
+    lines = [ln.rstrip("\n") for ln in open(infile, encoding="utf-8") if ln.strip()]
+    tokens = [tok for ln in lines for tok in Prosa.tokenize(ln)]
+
+    # Korrektheit: beide Varianten liefern identische Ergebnisse
+    assert all(_legacy_tokenize(ln) == Prosa.tokenize(ln) for ln in lines), "tokenize weicht ab"
+    assert all(_legacy_only_symbols(t) == _registry_only_symbols(t) for t in tokens), "Symbolfilter weicht ab"
+
+    print(f"Input: {infile} ({len(lines)} Zeilen, {len(tokens)} Tokens, repeat={args.repeat})")
+    print(f"{'Stufe':<26} {'inline':>14} {'registry':>14} {'Faktor':>8}")
+    for label, legacy_fn, new_fn, items, unit in (
+        ("tokenize", _legacy_tokenize, Prosa.tokenize, lines, "Zeilen/s"),
+        ("Symbol-/Stephanus-Filter", _legacy_only_symbols, _registry_only_symbols, tokens, "Tokens/s"),
+    ):
+        t_old = _time_lines(legacy_fn, items, args.repeat)
+        t_new = _time_lines(new_fn, items, args.repeat)
+        n = len(items) * args.repeat
+        print(f"{label:<26} {n / t_old:>10.0f} {unit[:1]}/s {n / t_new:>10.0f} {unit[:1]}/s {t_old / t_new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_variant_memory.py
+----------------------------------
+Misst den Spitzen-Speicher (peak RSS) der Varianten-Vorverarbeitung.
+
+Vergleicht:
+- legacy: altes Verhalten mit copy.deepcopy() pro Variante UND in jeder preprocess-Stufe
+- cow:    neues Copy-on-Write-Verhalten (nur geänderte Blöcke/Listen werden kopiert)
+
+Jeder Modus läuft in einem eigenen Kindprozess, damit ru_maxrss unabhängig gemessen wird.
+Gerendert wird NICHT (nur die Vorverarbeitung aller 8 Prosa-Varianten).
+
+Aufruf (aus dem Projekt-Root):
+    python benchmarks/bench_variant_memory.py [input.txt]
+Standard-Input: testdokument7_Platon_Gorgias_*.txt
+"""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _peak_rss_mb() -> float:
+    # Linux: KB, macOS: Bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _default_input() -> str:
+    matches = sorted(ROOT.glob("testdokument7_Platon_Gorgias*.txt"))
+    if not matches:
+        sys.exit("testdokument7_Platon_Gorgias*.txt nicht gefunden")
+    return str(matches[0])
+
+
+def _parse(infile: str) -> list:
+    import Prosa_Code as Prosa
+    from shared.preprocess import discover_and_attach_comments
+    blocks = Prosa.process_input_file(infile)
+    blocks = discover_and_attach_comments(blocks)
+    if any(b.get('type') == 'pair' for b in blocks if isinstance(b, dict)):
+        blocks = Prosa.group_pairs_into_flows(blocks)
+    return blocks
+
+
+def _run_variants(final_blocks: list, mode: str) -> None:
+    import prosa_pdf
+    from shared import preprocess
+
+    tag_config = prosa_pdf._get_default_tag_config("GR_FETT")
+    for strength, color_mode, tag_mode in itertools.product(("NORMAL", "GR_FETT"),
+                                                            ("COLOR", "BLACK_WHITE"),
+                                                            ("TAGS", "NO_TAGS")):
+        if mode == "legacy":
+            # Altes Verhalten: Kopie pro Variante + tiefe Kopie in jeder Stufe
+            variant_blocks = copy.deepcopy(final_blocks)
+            blocks = preprocess.apply_colors(copy.deepcopy(variant_blocks), tag_config)
+            blocks = preprocess.apply_tag_visibility(copy.deepcopy(blocks), tag_config)
+            if tag_mode == "NO_TAGS":
+                blocks = preprocess.remove_all_tags(copy.deepcopy(blocks), tag_config)
+            blocks = preprocess.remove_empty_translation_lines(blocks)
+            if color_mode == "BLACK_WHITE":
+                blocks = preprocess.remove_all_color_symbols(copy.deepcopy(blocks))
+        else:
+            variant_blocks = list(final_blocks)
+            blocks = preprocess.apply_colors(variant_blocks, tag_config)
+            blocks = preprocess.apply_tag_visibility(blocks, tag_config)
+            if tag_mode == "NO_TAGS":
+                blocks = preprocess.remove_all_tags(blocks, tag_config)
+            blocks = preprocess.remove_empty_translation_lines(blocks)
+            if color_mode == "BLACK_WHITE":
+                blocks = preprocess.remove_all_color_symbols(blocks)
+        del variant_blocks, blocks
+
+
+def _child(mode: str, infile: str) -> None:
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    devnull = open(os.devnull, "w")
+    real_stdout = sys.stdout
+    sys.stdout = devnull  # Debug-Ausgaben der Pipeline unterdrücken
+    try:
+        final_blocks = _parse(infile)
+        rss_after_parse = _peak_rss_mb()
+        t0 = time.perf_counter()
+        _run_variants(final_blocks, mode)
+        elapsed = time.perf_counter() - t0
+    finally:
+        sys.stdout = real_stdout
+    print(json.dumps({
+        "mode": mode,
+        "blocks": len(final_blocks),
+        "rss_after_parse_mb": round(rss_after_parse, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "seconds": round(elapsed, 2),
+    }))
+
+
+def main() -> None:
+    if len(sys.argv) >= 3 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+        return
+
+    infile = sys.argv[1] if len(sys.argv) > 1 else _default_input()
+    print(f"Input: {infile}")
+    results = {}
+    for mode in ("legacy", "cow"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode, infile],
+                             capture_output=True, text=True, cwd=str(ROOT))
+        last = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if out.returncode != 0 or not last:
+            print(out.stderr[-2000:])
+            sys.exit(f"Modus {mode} fehlgeschlagen")
+        results[mode] = json.loads(last[-1])
+
+    print(f"{'Modus':<8} {'Blöcke':>7} {'RSS nach Parse':>15} {'Peak RSS':>10} {'Zeit':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['blocks']:>7} {r['rss_after_parse_mb']:>12.1f} MB {r['peak_rss_mb']:>7.1f} MB {r['seconds']:>6.2f} s")
+    legacy_delta = results["legacy"]["peak_rss_mb"] - results["legacy"]["rss_after_parse_mb"]
+    cow_delta = results["cow"]["peak_rss_mb"] - results["cow"]["rss_after_parse_mb"]
+    print(f"Zusatzspeicher der Varianten: legacy {legacy_delta:.1f} MB → cow {cow_delta:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
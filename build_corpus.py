@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+build_corpus.py
+---------------
+Batch-Build des gesamten Korpus: texte/<sprache>/<gattung>/<kategorie>/<autor>/<werk>/*_birkenbihl.txt
+→ pdf/<sprache>/<gattung>/<kategorie>/<autor>/<werk>/ (Layout, das generate_catalog.py erwartet).
+
+Bisher gab es nur prosa_pdf._discover_inputs_default (*.txt im CWD) und die fest verdrahteten
+generate_all_test_pdfs*.py; ein kompletter Site-Rebuild lief seriell über ~950 Quelltexte.
+
+Hier:
+- Jede Quelle geht in-process an prosa_pdf.render_all bzw. poesie_pdf.render_all (Gattung aus dem
+  Pfad), verteilt über einen Prozess-Pool (--jobs, Standard: alle Kerne; große Texte zuerst).
+- Manifest (.corpus_build/manifest.json): Quelle → SHA-256 des Inhalts, Renderer-Version
+  (render_cache.renderer_version), Optionen und die erzeugten PDFs. Unveränderte Quellen, deren
+  PDFs noch vorhanden sind, werden beim nächsten Lauf übersprungen → Rebuild nur der geänderten Werke.
+- Nach einem erfolgreichen Rebuild werden PDFs der Quelle, die nicht mehr erzeugt wurden
+  (weggefallene Varianten), gelöscht; --prune entfernt zusätzlich PDFs gelöschter Quellen.
+- Fehlgeschlagene Quellen behalten ihre alten PDFs, verlieren aber den Manifest-Eintrag
+  (→ nächster Lauf versucht es erneut). Ausgabe pro Quelle in .corpus_build/logs/.
+- Timeout pro Quelle (--timeout, Standard 600 s wie im Draft-Workflow) über Watchdog-Thread +
+  SIGUSR1 (SIGALRM ist ungeeignet, poesie_pdf setzt es pro Variante zurück).
+- Projektion (Prosa): Stehen *_de_en_* und die zweisprachigen Fassungen *_de_* / *_en_* eines
+  Werks gemeinsam an, baut EIN Worker alle drei – die dreisprachige Fassung wird einmal geparst,
+  die zweisprachigen Block-Sets werden per Prosa_Code.project_blocks abgeleitet (nur wenn die Datei
+  exakt die Projektion ist und projection_exact gilt, sonst normal geparst). Breiten- und
+  Token-Caches des Workers gelten für alle drei Fassungen. --no-projection schaltet das ab.
+
+Aufruf (aus dem Projekt-Root):
+    python build_corpus.py [--jobs N] [--force] [--dry-run] [--prune] [--kind prosa|poesie]
+                           [--hide-pipes] [--tag-config JSON] [--out DIR] [--no-projection]
+                           [texte/<teilbaum> ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).parent.resolve()
+TEXTE_ROOT = ROOT / "texte"
+PDF_ROOT = ROOT / "pdf"                       # wie generate_catalog.PDF_ROOT
+STATE_DIR = ROOT / ".corpus_build"            # Manifest + Logs (NICHT unter pdf/: Katalog liest dort Ordner)
+MANIFEST_PATH = STATE_DIR / "manifest.json"   # Logs liegen daneben in logs/
+SOURCE_GLOB = "*_birkenbihl.txt"
+WORK_TIMEOUT_SECONDS = 600                    # wie ADAPTER_TIMEOUT_SECONDS in build_drafts_local.py
+RENDERERS = {"prosa": "prosa_pdf", "poesie": "poesie_pdf"}
+# Dreisprachige Fassung → (Namensteil der zweisprachigen Fassung, weggelassene Übersetzung)
+TRILINGUAL_MARK = "_de_en_"
+PROJECTIONS = (("_de_", "en"), ("_en_", "de"))
+
+
+# ===== Helper =====
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def discover(roots: list[Path], kinds: tuple[str, ...]) -> list[tuple[str, str, Path]]:
+    """[(Schlüssel relativ zu texte/, Gattung, Pfad)] aller Quellen unter roots."""
+    found = {}
+    for root in roots:
+        paths = [root] if root.is_file() else sorted(root.rglob(SOURCE_GLOB))
+        for path in paths:
+            try:
+                rel = path.resolve().relative_to(TEXTE_ROOT)
+            except ValueError:
+                print(f"⚠ Nicht unter texte/: {path} — übersprungen")
+                continue
+            kind = rel.parts[1] if len(rel.parts) > 2 else ""
+            if kind not in RENDERERS:
+                print(f"⚠ Unbekannte Gattung ({kind or '-'}) für: {rel} — übersprungen")
+                continue
+            if kind in kinds:
+                found[rel.as_posix()] = (kind, path)
+    return [(key, kind, path) for key, (kind, path) in sorted(found.items())]
+
+
+def load_manifest(path: Path, out_root: Path) -> dict:
+    """Manifest laden; anderes Ausgabeverzeichnis oder kaputte Datei → leeres Manifest."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"out": str(out_root), "sources": {}}
+    if data.get("out") != str(out_root) or not isinstance(data.get("sources"), dict):
+        return {"out": str(out_root), "sources": {}}
+    return data
+
+
+def save_manifest(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def is_current(entry: dict | None, sha: str, options: dict, out_root: Path) -> bool:
+    """Quelle unverändert (Inhalt, Renderer, Optionen) und alle PDFs noch vorhanden?"""
+    if not entry or entry.get("sha256") != sha or entry.get("options") != options:
+        return False
+    outputs = entry.get("outputs") or []
+    return bool(outputs) and all((out_root / rel).is_file() for rel in outputs)
+
+
+def _log_name(key: str) -> str:
+    return key[:-4].replace("/", "__") + ".log"
+
+
+def _stream_handlers():
+    """StreamHandler (ohne FileHandler) – sie halten beim Import gebundene stdout/stderr-Objekte."""
+    loggers = [logging.getLogger()] + [l for l in logging.Logger.manager.loggerDict.values()
+                                       if isinstance(l, logging.Logger)]
+    for lg in loggers:
+        for h in lg.handlers:
+            if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler):
+                yield h
+
+
+def _timeout_handler(signum, frame):
+    print("build_corpus: TIMEOUT – Abbruch", flush=True)
+    raise SystemExit(124)
+
+
+# ===== Worker (läuft im Pool-Prozess) =====
+
+def _render_source(renderer, kind: str, src: Path, text: str, out_dir: Path, task: dict,
+                   blocks: list | None = None) -> dict:
+    """render_all für eine Quelle; Fehler landen im Ergebnis statt weitergereicht zu werden."""
+    t0 = time.perf_counter()
+    errors: list = []
+    extra = {"original_size_bytes": src.stat().st_size} if kind == "prosa" else {}
+    if blocks is not None:
+        extra["blocks"] = blocks
+    produced = renderer.render_all(text, task["tag_config"], task["hide_pipes"], out_dir,
+                                   name=src.name, errors=errors, **extra)
+    result = {"ok": False, "outputs": [str(p) for p in produced], "error": None,
+              "seconds": round(time.perf_counter() - t0, 2)}
+    if errors:
+        result["error"] = "; ".join(str(e) for e in errors)
+    elif not produced:
+        result["error"] = "keine PDFs erzeugt"
+    else:
+        result["ok"] = True
+    return result
+
+
+def _projected_blocks(text: str, projections: list[dict]) -> tuple[list, list]:
+    """
+    Dreisprachigen Text EINMAL parsen und die zweisprachigen Block-Sets ableiten.
+    Gibt (Roh-Blöcke, [(Projektion, Text, Blöcke oder None)]) zurück; None → normal parsen.
+    """
+    import Prosa_Code as Prosa
+    blocks = Prosa.process_input_text(text)
+    derived = []
+    for proj in projections:
+        ptext = Path(proj["path"]).read_text(encoding="utf-8")
+        pblocks = None
+        if Prosa.project_text(text, proj["drop"]) == ptext and Prosa.projection_exact(text, proj["drop"]):
+            pblocks = Prosa.project_blocks(blocks, proj["drop"])  # VOR dem Rendern (render_all verändert blocks)
+        print(f"build_corpus: {Path(proj['path']).name}: "
+              + ("aus der dreisprachigen Fassung projiziert" if pblocks is not None else "eigener Parse"), flush=True)
+        derived.append((proj, ptext, pblocks))
+    return blocks, derived
+
+
+def build_source(task: dict) -> dict:
+    """
+    Eine Quelle rendern (plus ggf. ihre Projektionen); Ausgabe ins Log.
+    Gibt {key, ok, outputs, seconds, error, projections: [{key, projected, ok, outputs, seconds, error}]} zurück.
+    """
+    src, out_dir, log_path = Path(task["path"]), Path(task["out_dir"]), Path(task["log"])
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    projections = task.get("projections") or []
+    timeout = task["timeout"] * (1 + len(projections))
+    done: dict[str, dict] = {}  # Schlüssel → Ergebnis der fertig gerenderten Quellen
+    error = None
+    t0 = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        finished, fired = threading.Event(), threading.Event()
+        rebound = []
+        try:
+            import importlib
+            renderer = importlib.import_module(RENDERERS[task["kind"]])
+            signal.alarm(0)  # globalen Import-Timeout von prosa_pdf/poesie_pdf aufheben → Watchdog
+            signal.signal(signal.SIGUSR1, _timeout_handler)
+            for h in _stream_handlers():
+                rebound.append((h, h.stream))
+                h.setStream(log)
+
+            def _watch():
+                if finished.wait(timeout):
+                    return
+                fired.set()
+                while True:  # wiederholen: ein Signal in einem Finalizer geht verloren
+                    os.kill(os.getpid(), signal.SIGUSR1)
+                    if finished.wait(1.0):
+                        return
+
+            threading.Thread(target=_watch, name="build_corpus-watchdog", daemon=True).start()
+            text = src.read_text(encoding="utf-8")
+            blocks, derived = _projected_blocks(text, projections) if projections else (None, [])
+            done[task["key"]] = _render_source(renderer, task["kind"], src, text, out_dir, task, blocks)
+            for proj, ptext, pblocks in derived:
+                sub = _render_source(renderer, task["kind"], Path(proj["path"]), ptext, Path(proj["out_dir"]),
+                                     task, pblocks)
+                done[proj["key"]] = {"projected": pblocks is not None, **sub}
+        except SystemExit as e:
+            error = f"Abbruch (exit={e.code})"
+        except Exception as e:
+            traceback.print_exc()
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            finished.set()
+            if fired.is_set():
+                error = f"Timeout nach {timeout} s"
+            for h, stream in rebound:
+                # Handler, die beim Import IN diesem Job entstanden sind, zeigen aufs Log → nicht
+                # auf eine gleich geschlossene Datei zurücksetzen
+                h.setStream(sys.__stderr__ if stream is log else stream)
+    # Abbruch/Timeout trifft nur die Quellen, die bis dahin nicht fertig gerendert waren
+    failed = {"ok": False, "outputs": [], "seconds": 0.0, "error": error}
+    result = {"key": task["key"], **done.get(task["key"], failed), "projections": [
+        {"key": proj["key"], "projected": False, **done.get(proj["key"], failed)} for proj in projections]}
+    result["seconds"] = round(time.perf_counter() - t0 - sum(sub["seconds"] for sub in result["projections"]), 2)
+    return result
+
+
+# ===== Public API =====
+
+def build_corpus(sources: list[tuple[str, str, Path]], *, out_root: Path, manifest_path: Path,
+                 jobs: int, force: bool = False, dry_run: bool = False, prune: bool = False,
+                 full_scan: bool = True, hide_pipes: bool = False, tag_config: dict | None = None,
+                 timeout: int = WORK_TIMEOUT_SECONDS, project: bool = True) -> int:
+    """Geänderte Quellen bauen, Manifest fortschreiben; Rückgabe = Anzahl fehlgeschlagener Quellen."""
+    from shared.render_cache import renderer_version
+    from shared.line_breaking import line_break_mode
+    from shared.interlinear_row import row_flowable_enabled
+    options = {
+        "renderer": renderer_version(),
+        # Layout-Schalter aus der Umgebung (gelten auch in den Worker-Prozessen)
+        "line_break": line_break_mode(),
+        "row_flowable": row_flowable_enabled(),
+        "hide_pipes": hide_pipes,
+        "tag_config": (hashlib.sha256(json.dumps(tag_config, sort_keys=True).encode("utf-8")).hexdigest()
+                       if tag_config else None),
+    }
+    manifest = load_manifest(manifest_path, out_root)
+    entries = manifest["sources"]
+
+    todo, hashes = [], {}
+    for key, kind, path in sources:
+        hashes[key] = file_sha256(path)
+        if force or not is_current(entries.get(key), hashes[key], options, out_root):
+            todo.append((key, kind, path))
+    skipped = len(sources) - len(todo)
+
+    removed = sorted(set(entries) - {key for key, _, _ in sources}) if full_scan else []
+    if removed:
+        print(f"{len(removed)} Quelle(n) nicht mehr vorhanden" + ("" if prune else " (PDFs bleiben, --prune löscht)"))
+        if prune and not dry_run:
+            for key in removed:
+                for rel in entries.pop(key).get("outputs") or []:
+                    (out_root / rel).unlink(missing_ok=True)
+                print(f"  entfernt: {key}")
+            save_manifest(manifest_path, manifest)
+
+    print(f"{len(sources)} Quellen: {len(todo)} zu bauen, {skipped} unverändert")
+    if dry_run or not todo:
+        for key, kind, _ in todo:
+            print(f"  [{kind}] {key}")
+        return 0
+
+    # Große Texte zuerst → bessere Auslastung des Pools am Ende des Laufs
+    todo.sort(key=lambda item: item[2].stat().st_size, reverse=True)
+
+    def _task(key: str, kind: str, path: Path) -> dict:
+        return {"key": key, "kind": kind, "path": str(path), "out_dir": str(out_root / Path(key).parent),
+                "log": str(manifest_path.parent / "logs" / _log_name(key))}
+
+    # Zweisprachige Fassungen, deren dreisprachige Fassung ebenfalls ansteht, laufen in deren Job mit
+    pending = {key: (kind, path) for key, kind, path in todo}
+    attached: dict[str, list] = {}
+    absorbed = set()
+    if project:
+        for key, kind, path in todo:
+            if kind != "prosa" or TRILINGUAL_MARK not in path.name:
+                continue
+            for mark, drop in PROJECTIONS:
+                sibling = (Path(key).parent / path.name.replace(TRILINGUAL_MARK, mark, 1)).as_posix()
+                if sibling in pending and pending[sibling][0] == "prosa" and sibling not in absorbed:
+                    attached.setdefault(key, []).append({**_task(sibling, "prosa", pending[sibling][1]), "drop": drop})
+                    absorbed.add(sibling)
+    tasks = []
+    for key, kind, path in todo:
+        if key in absorbed:
+            continue  # läuft als Projektion im Job der dreisprachigen Fassung
+        tasks.append({**_task(key, kind, path), "projections": attached.get(key, []),
+                      "timeout": timeout, "hide_pipes": hide_pipes, "tag_config": tag_config})
+
+    failed = 0
+    n = 0
+    t0 = time.perf_counter()
+
+    def _record(res: dict, kind: str, log: str) -> None:
+        nonlocal failed, n
+        n += 1
+        key = res["key"]
+        outputs = sorted(Path(p).resolve().relative_to(out_root).as_posix() for p in res["outputs"])
+        via = " (projiziert)" if res.get("projected") else ""
+        if res["ok"]:
+            old = set((entries.get(key) or {}).get("outputs") or [])
+            for rel in sorted(old - set(outputs)):
+                (out_root / rel).unlink(missing_ok=True)  # weggefallene Variante
+            entries[key] = {"sha256": hashes[key], "options": options, "kind": kind,
+                            "outputs": outputs, "seconds": res["seconds"], "built": int(time.time())}
+            print(f"[{n}/{len(todo)}] ✓ {key}: {len(outputs)} PDFs in {res['seconds']:.1f} s{via}", flush=True)
+        else:
+            failed += 1
+            entries.pop(key, None)
+            print(f"[{n}/{len(todo)}] ✗ {key}: {res['error']} (Log: {log})", flush=True)
+
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(build_source, task): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                res = future.result()
+            except Exception as e:  # Worker-Prozess abgestürzt (z.B. OOM-Kill)
+                crashed = {"ok": False, "outputs": [], "seconds": 0.0, "error": repr(e)}
+                res = {"key": task["key"], **crashed,
+                       "projections": [{"key": proj["key"], **crashed} for proj in task["projections"]]}
+            _record(res, task["kind"], task["log"])
+            for sub in res["projections"]:
+                _record(sub, task["kind"], task["log"])
+            save_manifest(manifest_path, manifest)  # Fortschritt bleibt bei Abbruch erhalten
+    print(f"Fertig: {len(todo) - failed} gebaut, {failed} fehlgeschlagen, {skipped} übersprungen "
+          f"in {time.perf_counter() - t0:.1f} s")
+    return failed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Korpus-Build texte/ → pdf/ mit inkrementellem Manifest")
+    ap.add_argument("paths", nargs="*", help="Teilbäume oder Dateien unter texte/ (Standard: ganz texte/)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Pool-Prozesse (Standard: alle Kerne)")
+    ap.add_argument("--out", default=str(PDF_ROOT), help="Ausgabe-Wurzel (Standard: pdf/)")
+    ap.add_argument("--manifest", default=str(MANIFEST_PATH), help="Manifest-Datei")
+    ap.add_argument("--kind", choices=sorted(RENDERERS), help="nur prosa oder nur poesie")
+    ap.add_argument("--force", action="store_true", help="alles neu bauen (Manifest ignorieren)")
+    ap.add_argument("--dry-run", action="store_true", help="nur anzeigen, was gebaut würde")
+    ap.add_argument("--prune", action="store_true", help="PDFs gelöschter Quellen entfernen")
+    ap.add_argument("--hide-pipes", action="store_true", help="Pipes (|) in Übersetzungen ausblenden")
+    ap.add_argument("--tag-config", help="JSON-Datei mit Tag-Konfiguration")
+    ap.add_argument("--timeout", type=int, default=WORK_TIMEOUT_SECONDS, help="Sekunden pro Quelle")
+    ap.add_argument("--no-projection", action="store_true",
+                    help="zweisprachige Fassungen nicht aus der dreisprachigen ableiten (eigene Jobs)")
+    args = ap.parse_args()
+
+    tag_config = None
+    if args.tag_config:
+        with open(args.tag_config, encoding="utf-8") as f:
+            tag_config = json.load(f)
+
+    roots = [Path(p).resolve() for p in args.paths] or [TEXTE_ROOT]
+    kinds = (args.kind,) if args.kind else tuple(RENDERERS)
+    sources = discover(roots, kinds)
+    if not sources:
+        print("Keine Quelltexte gefunden")
+        return 0
+    failed = build_corpus(
+        sources, out_root=Path(args.out).resolve(), manifest_path=Path(args.manifest).resolve(),
+        jobs=args.jobs, force=args.force, dry_run=args.dry_run, prune=args.prune,
+        # Gelöschte Quellen nur bei vollständigem Scan erkennen (Teilbaum ≠ gelöscht)
+        full_scan=not args.paths and not args.kind,
+        hide_pipes=args.hide_pipes, tag_config=tag_config, timeout=args.timeout,
+        project=not args.no_projection)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+build_drafts_local.py
+---------------------
+Lokaler Ersatz für den Schritt "Build Draft PDFs" aus .github/workflows/build-drafts.yml.
+
+Wie im Workflow:
+- Entwürfe gruppieren nach Werkverzeichnis (texte_drafts/<sprache>/<gattung>/…), pro Werk nur den
+  NEUESTEN Entwurf (Zeitstempel JJJJMMTT_HHMMSS im Namen) bauen, alte PDFs des Werks vorher löschen.
+- Pro Entwurf `python build_<prosa|poesie>_drafts_adapter.py <absoluter Pfad>` mit 600 s Grenze,
+  PYTHONUNBUFFERED=1; Abbruch beim ersten Fehler mit dessen Exit-Code.
+- Ohne Dateiargumente: geänderte Entwürfe aus `git diff --name-only HEAD~1 HEAD`.
+Kein git commit/push – die PDFs bleiben lokal in pdf_drafts/.
+
+Zusätzlich:
+- --daemon: Render-Daemon (shared/render_daemon.py) starten, falls keiner läuft, und die Adapter
+  im Client-Modus (RENDER_DAEMON=1) aufrufen → warme Builds ohne Startkosten.
+- --stop-daemon: einen hier gestarteten Daemon am Ende wieder beenden.
+- --queue: alle Adapter gleichzeitig im Queue-Modus (JOB_QUEUE=1, shared/job_queue.py) starten –
+  die Queue fasst überholte Entwürfe je Session zusammen und baut kleine Entwürfe zuerst.
+  Die 600 s gelten dann pro Job ab seinem Start und werden von der Queue durchgesetzt
+  (JOB_QUEUE_JOB_TIMEOUT_S); die Wartezeit in der Queue zählt nicht mit.
+
+Aufruf (aus dem Projekt-Root):
+    python build_drafts_local.py [--daemon [--stop-daemon]] [--queue] [draft.txt ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.resolve()
+ADAPTER_TIMEOUT_SECONDS = 600  # wie `timeout --preserve-status 600s` im Workflow
+
+TIMESTAMP_RE = re.compile(r'\d{8}_\d{6}')
+
+
+def changed_drafts() -> list[str]:
+    """Geänderte Draft-Dateien des letzten Commits (wie der Auto-Modus des Workflows)."""
+    try:
+        out = subprocess.run(["git", "diff", "--name-only", "HEAD~1", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return [l for l in out.splitlines() if re.search(r'texte_drafts/.*_DRAFT_.*\.txt$', l)]
+
+
+def newest_per_work(files: list[str]) -> list[tuple[Path, Path]]:
+    """[(Werkverzeichnis relativ zu texte_drafts, Draft-Datei)] – neuester Entwurf pro Werk."""
+    newest: dict[Path, tuple[str, Path]] = {}
+    for f in files:
+        path = (ROOT / f).resolve() if not Path(f).is_absolute() else Path(f)
+        try:
+            rel_dir = path.parent.relative_to(ROOT / "texte_drafts")
+        except ValueError:
+            print(f"⚠ Nicht unter texte_drafts/: {f} — übersprungen")
+            continue
+        m = TIMESTAMP_RE.search(path.name)
+        stamp = m.group(0) if m else "00000000_000000"
+        if rel_dir not in newest or stamp > newest[rel_dir][0]:
+            if rel_dir in newest:
+                print(f"Überspringe älteren Draft: {newest[rel_dir][1]}")
+            newest[rel_dir] = (stamp, path)
+        else:
+            print(f"Überspringe älteren Draft: {path}")
+    return [(rel_dir, newest[rel_dir][1]) for rel_dir in sorted(newest)]
+
+
+def ensure_daemon() -> subprocess.Popen | None:
+    """Daemon starten, falls keiner erreichbar ist; gibt den gestarteten Prozess zurück (sonst None)."""
+    from shared import render_daemon
+    if render_daemon.daemon_status() is not None:
+        print("→ Render-Daemon läuft bereits")
+        return None
+    proc = subprocess.Popen([sys.executable, "-m", "shared.render_daemon", "serve"], cwd=ROOT,
+                            env=dict(os.environ, PYTHONUNBUFFERED="1"))
+    deadline = time.monotonic() + 60
+    while render_daemon.daemon_status() is None:
+        if proc.poll() is not None or time.monotonic() > deadline:
+            sys.exit("✗ Render-Daemon ließ sich nicht starten")
+        time.sleep(0.1)
+    return proc
+
+
+def adapter_cmd(rel_dir: Path, draft: Path) -> list[str] | None:
+    """Alte PDFs des Werks löschen und den Adapter-Aufruf liefern (None: unbekannter Draft-Typ)."""
+    pdf_dir = ROOT / "pdf_drafts" / rel_dir
+    if pdf_dir.is_dir():
+        print(f"Lösche alte PDFs in: {pdf_dir}")
+        for pdf in pdf_dir.rglob("*.pdf"):
+            pdf.unlink()
+    kind = rel_dir.parts[1] if len(rel_dir.parts) > 1 else ""
+    if kind not in ("prosa", "poesie"):
+        print(f"Unbekannter Draft-Typ ({kind}) für: {draft}")
+        return None
+    cmd = [sys.executable, str(ROOT / f"build_{kind}_drafts_adapter.py"), str(draft)]
+    print(f"+ RUN: {' '.join(cmd)}", flush=True)
+    return cmd
+
+
+def build_one(rel_dir: Path, draft: Path, env: dict) -> int:
+    cmd = adapter_cmd(rel_dir, draft)
+    if cmd is None:
+        return 0
+    t0 = time.perf_counter()
+    try:
+        rc = subprocess.run(cmd, cwd=ROOT, env=env, timeout=ADAPTER_TIMEOUT_SECONDS).returncode
+    except subprocess.TimeoutExpired:
+        rc = 124
+    print(f"→ {draft.name}: exit={rc} in {time.perf_counter() - t0:.2f} s", flush=True)
+    return rc
+
+
+def build_queued(files: list[str], env: dict) -> int:
+    """
+    Alle Entwürfe gleichzeitig an die Job-Queue geben; Exit-Code = erster Fehler (sonst 0).
+    Keine Grenze auf die Adapter selbst: sie warten auch auf fremde Jobs, und ein getöteter Adapter
+    hinterließe einen verwaisten Job. Die Zeitgrenze setzt die Queue pro Job durch (exit 124).
+    """
+    env = dict(env)
+    env.setdefault("JOB_QUEUE_JOB_TIMEOUT_S", str(ADAPTER_TIMEOUT_SECONDS))
+    procs = []
+    for f in files:
+        draft = (ROOT / f).resolve() if not Path(f).is_absolute() else Path(f)
+        try:
+            rel_dir = draft.parent.relative_to(ROOT / "texte_drafts")
+        except ValueError:
+            print(f"⚠ Nicht unter texte_drafts/: {f} — übersprungen")
+            continue
+        cmd = adapter_cmd(rel_dir, draft)
+        if cmd is not None:
+            procs.append((draft, time.perf_counter(), subprocess.Popen(cmd, cwd=ROOT, env=env)))
+    rc = 0
+    for draft, t0, proc in procs:
+        code = proc.wait()
+        print(f"→ {draft.name}: exit={code} nach {time.perf_counter() - t0:.2f} s", flush=True)
+        if code != 0 and rc == 0:
+            print(f"ERROR: python step failed with exit {code} for file {draft}")
+            rc = code
+    return rc
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Lokaler Ersatz für den Draft-PDF-Workflow")
+    ap.add_argument("drafts", nargs="*", help="Draft-Dateien (Standard: geänderte Entwürfe aus HEAD~1..HEAD)")
+    ap.add_argument("--daemon", action="store_true", help="über den Render-Daemon bauen (ggf. starten)")
+    ap.add_argument("--stop-daemon", action="store_true", help="hier gestarteten Daemon am Ende beenden")
+    ap.add_argument("--queue", action="store_true", help="alle Adapter gleichzeitig über die Job-Queue")
+    args = ap.parse_args()
+
+    files = args.drafts or changed_drafts()
+    if not files:
+        print("Keine Draft-Dateien zu verarbeiten")
+        return 0
+
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    daemon = None
+    if args.daemon:
+        daemon = ensure_daemon()
+        env["RENDER_DAEMON"] = "1"
+
+    rc = 0
+    t0 = time.perf_counter()
+    try:
+        if args.queue:
+            rc = build_queued(files, dict(env, JOB_QUEUE="1"))
+        else:
+            for rel_dir, draft in newest_per_work(files):
+                print(f"Verarbeite neuesten Draft: {draft}")
+                rc = build_one(rel_dir, draft, env)
+                if rc != 0:
+                    print(f"ERROR: python step failed with exit {rc} for file {draft}")
+                    break
+    finally:
+        if daemon is not None and args.stop_daemon:
+            from shared import render_daemon
+            render_daemon.stop_daemon()
+            daemon.wait(timeout=30)
+    print(f"Gesamt: {time.perf_counter() - t0:.2f} s")
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,12 @@
 ######## START: build_poesie_drafts_adapter.py ########
 from pathlib import Path
-import subprocess, sys, json, re, shlex, time, traceback, os
+import sys, json, re, traceback, os, threading
 
 ROOT = Path(__file__).parent.resolve()
 SRC_ROOT = ROOT / "texte_drafts" / "poesie_drafts"       # Eingaben
 DST_BASE = ROOT / "pdf_drafts" / "poesie_drafts"         # Ausgaben (spiegelbildlich)
 
-RUNNER = ROOT / "poesie_pdf.py"                          # 24 Varianten (Poesie)
+RUNNER = ROOT / "poesie_pdf.py"                          # Poesie-Varianten, in-process via render_all()
 
 META_HEADER_RE = re.compile(
     r'<!--\s*(TAG_CONFIG|RELEASE_BASE|PATH_PREFIX|RELEASE_NAME|VERSMASS|METER_MODE|HIDE_PIPES|SPRACHE|GATTUNG|KATEGORIE|AUTOR|WERK|ORIGINAL_SIZE_BYTES):(.*?)\s*-->',
@@ -121,220 +121,118 @@ def run_one(input_path: Path) -> None:
 
     clean_text = strip_metadata_comments(text_content)
     
-    # KRITISCH: Füge Original-Dateigröße als Metadata hinzu!
-    # poesie_pdf.py könnte dies später für Varianten-Reduktion brauchen
-    size_metadata = f"<!-- ORIGINAL_SIZE_BYTES:{original_size_bytes} -->\n"
-    clean_text_with_size = size_metadata + clean_text
+    # NEU: In-Process-Aufruf statt Subprozess (python -u poesie_pdf.py temp_*.txt):
+    # - keine Temp-Datei und keine temp_tag_config.json mehr
+    # - kein zweiter Interpreter-Start (ReportLab-Import + Font-Registrierung nur einmal)
+    # - render_all() liefert die erzeugten PDFs direkt → kein Glob-Diff über ROOT/*.pdf
+    # Timeout: main() begrenzt den Aufruf (POESIE_PDF_CALL_TIMEOUT, start_call_watchdog); der
+    # Render-Daemon ruft run_one() direkt auf und hat einen eigenen Watchdog pro Job
+    print(f"→ Erzeuge PDFs für: {input_path.name}")
+    if force_meter:
+        print(f"→ Aufruf mit force_meter=True")
+    if hide_pipes:
+        print(f"→ Aufruf mit hide_pipes=True")
+    sys.stdout.flush()
     
-    # Schreibe bereinigten Text in temporäre Datei
-    temp_input = ROOT / f"temp_{input_path.name}"
-    temp_input.write_text(clean_text_with_size, encoding="utf-8")
+    import poesie_pdf
+    from shared import render_cache
+    from shared.naming import base_from_input_path
+    from shared.interlinear_row import row_flowable_enabled
     
-    # NEUE Position (RICHTIG) - Zeile ~145 (NACH temp_input.write_text, VOR subprocess.Popen):
-    before = {p.name for p in ROOT.glob("*.pdf")}  # ← GENAU HIER!
-    print(f"→ Erzeuge PDFs für: {temp_input.name}")
-
-    # Erstelle temporäre Konfigurationsdatei für Tag-Einstellungen, falls eine Konfig vorhanden ist
-    config_file = None
-    if tag_config:
-        config_file = ROOT / "temp_tag_config.json"
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(tag_config, f, ensure_ascii=False, indent=2)
+    # NEU: Inhaltsadressierter Render-Cache (shared/render_cache.py)
+    # Identischer Text + TAG_CONFIG + HIDE_PIPES + Optionen + Renderer-Version → PDFs nur kopieren
+    # (Optionen: alles, was das Layout ändert – auch INTERLINEAR_ROW_FLOWABLE)
+    base = base_from_input_path(input_path)
+    cache_key = render_cache.cache_key("poesie", clean_text, tag_config, hide_pipes, {
+        "language": poesie_pdf._detect_language_from_filename(input_path.name),
+        "force_meter": bool(force_meter),
+        "row_flowable": row_flowable_enabled(),
+    })
+    produced = render_cache.fetch(cache_key, target_dir, base)
     
-    # --- START robust subprocess invocation of poesie_pdf.py ---
-    # This will stream poesie_pdf output live, enforce a per-call timeout,
-    # and report a clear error/exit code to the outer CI.
-    try:
-        POESIE_PDF_CALL_TIMEOUT = int(os.environ.get("POESIE_PDF_CALL_TIMEOUT", "600"))
-    except Exception:
-        POESIE_PDF_CALL_TIMEOUT = 600
-
-    poesie_script = str(RUNNER)
-
-    cmd = [sys.executable, "-u", poesie_script, str(temp_input)]
-
-    if force_meter:
-        cmd.append("--force-meter")
-        print(f"→ Kommando enthält --force-meter Flag")
+    if produced is None:
+        errors = []  # wie bisher (Subprozess rc=0): fertige Varianten trotzdem übernehmen
+        try:
+            produced = poesie_pdf.render_all(
+                clean_text,
+                tag_config or None,
+                hide_pipes,
+                target_dir,
+                name=input_path.name,
+                force_meter=True if force_meter else None,
+                errors=errors,
+            )
+        except Exception as e:
+            print("build_poesie_drafts_adapter.py: Exception while running poesie_pdf:", str(e))
+            traceback.print_exc()
+            sys.stdout.flush()
+            raise
+        # Nur vollständige Läufe cachen
+        if produced and not errors:
+            render_cache.store(cache_key, produced, base)
     
-    # WICHTIG: Tag-Config IMMER hinzufügen, wenn vorhanden (nicht nur bei force_meter!)
-    if config_file:
-        cmd.extend(["--tag-config", str(config_file)])
-        print(f"→ Kommando enthält --tag-config: {config_file}")
+    if not produced:
+        print("⚠ Keine PDFs erzeugt."); return
     
-    if hide_pipes:
-        cmd.extend(["--hide-pipes"])
-        print(f"→ Kommando enthält --hide-pipes Flag")
-
-    print("build_poesie_drafts_adapter.py: INVOCATION CMD: %s" % shlex.join(cmd))
-    sys.stdout.flush()
+    # Basis ohne SESSION + DRAFT_TIMESTAMP (nur für den Fallback unten)
+    # Format: agamemnon_gr_de_en_stil1_birkenbihl_draft_translinear_SESSION_c2b74016d1731d08_DRAFT_20251130_040907
+    match = re.match(r'^(.+?)_draft_translinear_SESSION_[a-f0-9]{16}_DRAFT_\d{8}_\d{6}$', input_stem)
+    if not match:
+        # Fallback: Altes Format ohne SESSION (für Kompatibilität)
+        match = re.match(r'^(.+?)_draft_translinear_DRAFT_\d{8}_\d{6}$', input_stem)
+    clean_base = match.group(1) if match else input_stem
 
-    proc = None
-    start = time.time()
-    try:
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            cwd=str(ROOT)
-        )
-
-        # stream stdout lines live, enforce timeout
-        while True:
-            line = proc.stdout.readline()
-            if line:
-                # Print streamed line exactly as produced
-                print(line.rstrip("\n"))
-                sys.stdout.flush()
-            else:
-                # no immediate line; check if process finished
-                if proc.poll() is not None:
-                    break
-                # check timeout
-                if time.time() - start > POESIE_PDF_CALL_TIMEOUT:
-                    print("ERROR: poesie_pdf subprocess exceeded timeout (%ds) — killing." % POESIE_PDF_CALL_TIMEOUT)
-                    sys.stdout.flush()
-                    try:
-                        proc.kill()
-                    except Exception:
-                        pass
-                    raise TimeoutError("poesie_pdf call timeout")
-                # small sleep to avoid busy loop
-                time.sleep(0.1)
+    # KRITISCH: Verwende IMMER den Upload-Filename (input_stem), NICHT RELEASE_BASE!
+    # Grund: Browser muss PDFs anhand des Upload-Filenames finden können
+    # RELEASE_BASE kann normalisiert sein (z.B. gr_de statt gr_de_en), was zu 404s führt
+    # Lösung: PDF-Name = Upload-Filename + Variant-Suffix (OHNE path_prefix!)
+    
+    # WICHTIG: Wir verwenden NICHT mehr PATH_PREFIX oder RELEASE_BASE für den PDF-Namen!
+    # Grund: Frontend (work.js) extrahiert nur Autor_Werk aus Upload-Filename
+    # Beispiel Upload: Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy.txt
+    # Frontend erwartet: Homer_Ilias_1__Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy_Normal_BlackWhite_Tag.pdf
+    # NICHT: GR_poesie_Epos_Homer_Ilias_1__Homer_Ilias_1_gr_de_...pdf
 
-        rc = proc.poll()
-        if rc is None:
-            rc = proc.wait()
-        print("build_poesie_drafts_adapter.py: poesie_pdf exited with rc=%s" % rc)
-        sys.stdout.flush()
-        if rc != 0:
-            print("ERROR: poesie_pdf returned non-zero exit status %s" % rc)
-            raise SystemExit(rc)
+    for src in produced:
+        name = src.name
+        bare = name[:-4] if name.lower().endswith(".pdf") else name
         
-        # KRITISCH: PDF-Matching HIER (innerhalb try, VOR finally)!
-        print(f"→ Prüfe ROOT-Verzeichnis: {ROOT}")
-        all_pdfs_in_root = list(ROOT.glob("*.pdf"))
-        print(f"→ Alle PDFs in ROOT: {[p.name for p in all_pdfs_in_root]}")
+        # KRITISCH: Entferne clean_base Präfix, um nur Variant-Suffix zu bekommen
+        # bare ist z.B.: "agamemnon_gr_de_en_stil1_Versmass_birkenbihl_draft_translinear_DRAFT_20251129_232252_GR_Fett_BlackWhite_NoTags"
+        # clean_base ist: "agamemnon_gr_de_en_stil1_Versmass_birkenbihl"
+        # suffix soll sein: "_GR_Fett_BlackWhite_NoTags" (OHNE _draft_translinear_DRAFT_...)
         
-        after = {p.name for p in ROOT.glob("*.pdf")}
-        new_pdfs = sorted(after - before)
+        # Finde den Variant-Suffix (ab _Normal oder _GR_Fett oder _LAT_Fett)
+        variant_match = re.search(r'_(Normal|GR_Fett|LAT_Fett)_', bare)
+        if variant_match:
+            suffix = '_' + bare[variant_match.start()+1:]  # Ab dem Variant-Teil
+        else:
+            # Fallback: Verwende alles nach clean_base
+            if bare.startswith(clean_base):
+                remainder = bare[len(clean_base):]
+                # Entferne _draft_translinear_DRAFT_... Teil
+                remainder = re.sub(r'_draft_translinear_DRAFT_\d{8}_\d{6}', '', remainder)
+                suffix = remainder
+            else:
+                suffix = '_' + bare
         
-        print(f"→ Snapshot AFTER subprocess: {len(after)} PDFs, {len(new_pdfs)} neue PDFs")
+        # NEUE LOGIK: Extrahiere Autor_Werk aus input_stem (wie Frontend!)
+        # Format input_stem: Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy
+        # Wir wollen: Homer_Ilias_1__Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy_Normal_BlackWhite_Tag.pdf
+        autor_werk_match = re.match(r'^([^_]+_[^_]+)_(?:gr|lat|translinear)', input_stem, re.IGNORECASE)
+        if autor_werk_match:
+            autor_werk = autor_werk_match.group(1)  # z.B. "Homer_Ilias_1"
+            final_bare = f"{autor_werk}__{input_stem}{suffix}"
+        else:
+            # Fallback: Nur Upload-Filename + Suffix
+            final_bare = f"{input_stem}{suffix}"
         
-        if new_pdfs:
-            # KRITISCH: Die PDFs heißen "temp_agamemnon_..." (mit temp_ Präfix!)
-            temp_stem = temp_input.stem  # z.B. "temp_agamemnon_gr_de_en_stil1_birkenbihl_draft_translinear_DRAFT_20251128_232610"
-            
-            # Entferne "temp_" Präfix und SESSION + DRAFT_TIMESTAMP
-            base_without_temp = temp_stem[5:] if temp_stem.startswith('temp_') else temp_stem
-            
-            # Entferne SESSION_xxx_DRAFT_TIMESTAMP Suffix
-            # Format: agamemnon_gr_de_en_stil1_birkenbihl_draft_translinear_SESSION_c2b74016d1731d08_DRAFT_20251130_040907
-            match = re.match(r'^(.+?)_draft_translinear_SESSION_[a-f0-9]{16}_DRAFT_\d{8}_\d{6}$', base_without_temp)
-            if not match:
-                # Fallback: Altes Format ohne SESSION (für Kompatibilität)
-                match = re.match(r'^(.+?)_draft_translinear_DRAFT_\d{8}_\d{6}$', base_without_temp)
-            
-            if match:
-                clean_base = match.group(1)  # z.B. "agamemnon_gr_de_en_stil1_birkenbihl"
-            else:
-                clean_base = base_without_temp
-            
-            print(f"→ Suche PDFs mit Basis: temp_{clean_base}")
-            
-            # Finde ALLE PDFs, die mit "temp_" + clean_base beginnen
-            relevant_pdfs = []
-            for name in new_pdfs:
-                if name.startswith(f'temp_{clean_base}'):
-                    relevant_pdfs.append(name)
-            
-            if not relevant_pdfs:
-                print(f"⚠ Keine passenden PDFs gefunden für Basis: temp_{clean_base}")
-                print(f"   Gefundene PDFs: {new_pdfs[:3] if len(new_pdfs) > 0 else 'keine'}")
-                return
-
-            # KRITISCH: Verwende IMMER den Upload-Filename (input_stem), NICHT RELEASE_BASE!
-            # Grund: Browser muss PDFs anhand des Upload-Filenames finden können
-            # RELEASE_BASE kann normalisiert sein (z.B. gr_de statt gr_de_en), was zu 404s führt
-            # Lösung: PDF-Name = Upload-Filename + Variant-Suffix (OHNE path_prefix!)
-            
-            # WICHTIG: Wir verwenden NICHT mehr PATH_PREFIX oder RELEASE_BASE für den PDF-Namen!
-            # Grund: Frontend (work.js) extrahiert nur Autor_Werk aus Upload-Filename
-            # Beispiel Upload: Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy.txt
-            # Frontend erwartet: Homer_Ilias_1__Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy_Normal_BlackWhite_Tag.pdf
-            # NICHT: GR_poesie_Epos_Homer_Ilias_1__Homer_Ilias_1_gr_de_...pdf
-
-            for name in relevant_pdfs:
-                bare = name[:-4] if name.lower().endswith(".pdf") else name
-                
-                # Entferne "temp_" Präfix
-                if bare.startswith('temp_'):
-                    bare = bare[5:]
-                
-                # KRITISCH: Entferne clean_base Präfix, um nur Variant-Suffix zu bekommen
-                # bare ist jetzt z.B.: "agamemnon_gr_de_en_stil1_Versmass_birkenbihl_draft_translinear_DRAFT_20251129_232252_GR_Fett_BlackWhite_NoTags"
-                # clean_base ist: "agamemnon_gr_de_en_stil1_Versmass_birkenbihl"
-                # suffix soll sein: "_GR_Fett_BlackWhite_NoTags" (OHNE _draft_translinear_DRAFT_...)
-                
-                # Finde den Variant-Suffix (ab _Normal oder _GR_Fett oder _LAT_Fett)
-                variant_match = re.search(r'_(Normal|GR_Fett|LAT_Fett)_', bare)
-                if variant_match:
-                    suffix = '_' + bare[variant_match.start()+1:]  # Ab dem Variant-Teil
-                else:
-                    # Fallback: Verwende alles nach clean_base
-                    if bare.startswith(clean_base):
-                        remainder = bare[len(clean_base):]
-                        # Entferne _draft_translinear_DRAFT_... Teil
-                        remainder = re.sub(r'_draft_translinear_DRAFT_\d{8}_\d{6}', '', remainder)
-                        suffix = remainder
-                    else:
-                        suffix = '_' + bare
-                
-                # NEUE LOGIK: Extrahiere Autor_Werk aus input_stem (wie Frontend!)
-                # Format input_stem: Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy
-                # Wir wollen: Homer_Ilias_1__Homer_Ilias_1_gr_de_translinear_SESSION_xxx_DRAFT_yyy_Normal_BlackWhite_Tag.pdf
-                autor_werk_match = re.match(r'^([^_]+_[^_]+)_(?:gr|lat|translinear)', input_stem, re.IGNORECASE)
-                if autor_werk_match:
-                    autor_werk = autor_werk_match.group(1)  # z.B. "Homer_Ilias_1"
-                    final_bare = f"{autor_werk}__{input_stem}{suffix}"
-                else:
-                    # Fallback: Nur Upload-Filename + Suffix
-                    final_bare = f"{input_stem}{suffix}"
-                
-                final_name = f"{final_bare}.pdf"
-                
-                src = ROOT / name
-                dst = target_dir / final_name
-                src.replace(dst)
-                print(f"✓ PDF → {dst}")
-
-    except TimeoutError as te:
-        print("build_poesie_drafts_adapter.py: TimeoutError while running poesie_pdf: %s" % str(te))
-        traceback.print_exc()
-        sys.stdout.flush()
-        raise
-    except Exception as e:
-        print("build_poesie_drafts_adapter.py: Exception while running poesie_pdf:", str(e))
-        traceback.print_exc()
-        sys.stdout.flush()
-        raise
-    finally:
-        # Cleanup NACH dem PDF-Verschieben
-        # --- Cleanup: delete temp files ---
-        try:
-            if config_file and config_file.exists():
-                config_file.unlink()
-        except Exception:
-            pass
-        try:
-            if temp_input.exists():
-                temp_input.unlink()
-        except Exception:
-            pass
+        final_name = f"{final_bare}.pdf"
+        
+        dst = target_dir / final_name
+        src.replace(dst)
+        print(f"✓ PDF → {dst}")
 
-    # --- END robust subprocess invocation ---
     
 def apply_bold_if_needed(text, bold_text):
     """Apply bold formatting if needed, preserving existing styles"""
@@ -348,6 +246,27 @@ def apply_bold_if_needed(text, bold_text):
             return f"<b>{text}</b>"
     return text
 
+def start_call_watchdog(label: str, env_name: str) -> threading.Timer:
+    """
+    Timeout pro Render-Aufruf wie früher beim Subprozess (POESIE_PDF_CALL_TIMEOUT, Standard 600 s):
+    beendet den Prozess hart mit exit 124 (früher proc.kill()). Ein Thread statt SIGALRM,
+    weil poesie_pdf seinen Alarm nach jeder Variante aufhebt (signal.alarm(0)).
+    """
+    try:
+        seconds = int(os.environ.get(env_name, "600"))
+    except Exception:
+        seconds = 600
+
+    def _expire():
+        print("ERROR: %s call exceeded timeout (%ds) — killing." % (label, seconds))
+        sys.stdout.flush()
+        os._exit(124)
+
+    timer = threading.Timer(seconds, _expire)
+    timer.daemon = True
+    timer.start()
+    return timer
+
 def main():
     # Dieser Adapter wird typischerweise mit genau einem Dateipfad aufgerufen.
     if len(sys.argv) < 2:
@@ -360,7 +279,26 @@ def main():
         print(f"✗ Eingabedatei nicht gefunden: {input_file}")
         sys.exit(1)
 
-    run_one(input_file)
+    # NEU: Queue-Modus (JOB_QUEUE=1, shared/job_queue.py): Job eintragen, überholte Entwürfe
+    # zusammenfassen, kleine Entwürfe zuerst; der Job selbst läuft als Adapter-Aufruf mit JOB_QUEUE=0
+    from shared import job_queue
+    if job_queue.job_queue_enabled():
+        sys.exit(job_queue.submit_and_wait("poesie", input_file))
+
+    # NEU: Client-Modus (RENDER_DAEMON=1): Job an den warmen Render-Daemon (shared/render_daemon.py)
+    # übergeben – kein ReportLab-Import, keine Font-Registrierung in diesem Prozess.
+    # Kein Daemon erreichbar oder anderer Renderer-Code → wie bisher selbst rendern
+    from shared import render_daemon
+    if render_daemon.daemon_client_enabled():
+        rc = render_daemon.submit("poesie", input_file)
+        if rc is not None:
+            sys.exit(rc)
+
+    watchdog = start_call_watchdog("poesie_pdf", "POESIE_PDF_CALL_TIMEOUT")
+    try:
+        run_one(input_file)
+    finally:
+        watchdog.cancel()
 
 if __name__ == "__main__":
     main()
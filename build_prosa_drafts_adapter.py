@@ -1,12 +1,12 @@
 ######## START: build_prosa_drafts_adapter.py ########
 from pathlib import Path
-import subprocess, sys, json, re, shlex, time, traceback, os
+import sys, json, re, traceback, os, threading
 
 ROOT = Path(__file__).parent.resolve()
 SRC_ROOT = ROOT / "texte_drafts" / "prosa_drafts"        # Eingaben
 DST_BASE = ROOT / "pdf_drafts" / "prosa_drafts"          # Ausgaben (spiegelbildlich)
 
-RUNNER = ROOT / "prosa_pdf.py"                           # 12 Varianten (Prosa)
+RUNNER = ROOT / "prosa_pdf.py"                           # 8 Varianten (Prosa), in-process via render_all()
 
 META_HEADER_RE = re.compile(
     r'<!--\s*(TAG_CONFIG|RELEASE_BASE|PATH_PREFIX|RELEASE_NAME|VERSMASS|METER_MODE|HIDE_PIPES|ORIGINAL_SIZE_BYTES):(.*?)\s*-->',
@@ -85,136 +85,61 @@ def run_one(input_path: Path, tag_config: dict = None) -> None:
     # Entferne Metadaten-Kommentare aus dem Text für die Verarbeitung
     clean_text = strip_metadata_comments(text_content)
     
-    # KRITISCH: Füge Original-Dateigröße als Metadata hinzu!
-    # prosa_pdf.py braucht dies für die stufenweise Varianten-Reduktion
-    size_metadata = f"<!-- ORIGINAL_SIZE_BYTES:{original_size_bytes} -->\n"
-    clean_text_with_size = size_metadata + clean_text
-    
-    # Schreibe bereinigten Text in temporäre Datei
-    temp_input = ROOT / f"temp_{input_path.name}"
-    temp_input.write_text(clean_text_with_size, encoding="utf-8")
-    
-    before = {p.name for p in ROOT.glob("*.pdf")}
+    # NEU: In-Process-Aufruf statt Subprozess (python -u prosa_pdf.py temp_*.txt):
+    # - keine Temp-Datei und keine temp_tag_config.json mehr
+    # - kein zweiter Interpreter-Start (ReportLab-Import + Font-Registrierung nur einmal)
+    # - render_all() liefert die erzeugten PDFs direkt → kein Glob-Diff über ROOT/*.pdf
+    # KRITISCH: Die Original-Dateigröße wird direkt übergeben (früher ORIGINAL_SIZE_BYTES-Kommentar),
+    # prosa_pdf.py braucht sie für die stufenweise Varianten-Reduktion
+    # Timeout: main() begrenzt den Aufruf (PROSA_PDF_CALL_TIMEOUT, start_call_watchdog); der
+    # Render-Daemon ruft run_one() direkt auf und hat einen eigenen Watchdog pro Job
     print(f"→ Erzeuge PDFs für: {input_path}")
     sys.stdout.flush()
     
-    # Erstelle temporäre Konfigurationsdatei für Tag-Einstellungen
-    config_file = None
-    if tag_config:
-        config_file = ROOT / "temp_tag_config.json"
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(tag_config, f, ensure_ascii=False, indent=2)
-    
-    # --- START robust subprocess invocation of prosa_pdf.py ---
-    # This will stream prosa_pdf output live, enforce a per-call timeout,
-    # and report a clear error/exit code to the outer CI.
-    try:
-        PROSA_PDF_CALL_TIMEOUT = int(os.environ.get("PROSA_PDF_CALL_TIMEOUT", "600"))
-    except Exception:
-        PROSA_PDF_CALL_TIMEOUT = 600
-
-    prosa_script = str(RUNNER)
-
-    cmd = [sys.executable, "-u", prosa_script, str(temp_input)]
-
-    # If there were extra flags in the previous implementation (e.g. --tag-config,
-    # --force-meter, --hide-pipes) we should append them here. Try to preserve
-    # optional variables if available in local variables (best-effort).
-    if config_file:
-        cmd.extend(["--tag-config", str(config_file)])
-    if hide_pipes:
-        cmd.extend(["--hide-pipes"])
-
-    print("build_prosa_drafts_adapter.py: INVOCATION CMD: %s" % shlex.join(cmd))
-    sys.stdout.flush()
-
-    proc = None
-    start = time.time()
-    try:
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            cwd=str(ROOT)
-        )
-
-        # stream stdout lines live, enforce timeout
-        while True:
-            line = proc.stdout.readline()
-            if line:
-                # Print streamed line exactly as produced
-                print(line.rstrip("\n"))
-                sys.stdout.flush()
-            else:
-                # no immediate line; check if process finished
-                if proc.poll() is not None:
-                    break
-                # check timeout
-                if time.time() - start > PROSA_PDF_CALL_TIMEOUT:
-                    print("ERROR: prosa_pdf subprocess exceeded timeout (%ds) — killing." % PROSA_PDF_CALL_TIMEOUT)
-                    sys.stdout.flush()
-                    try:
-                        proc.kill()
-                    except Exception:
-                        pass
-                    raise TimeoutError("prosa_pdf call timeout")
-                # small sleep to avoid busy loop
-                time.sleep(0.1)
-
-        rc = proc.poll()
-        if rc is None:
-            rc = proc.wait()
-        print("build_prosa_drafts_adapter.py: prosa_pdf exited with rc=%s" % rc)
-        sys.stdout.flush()
-        if rc != 0:
-            print("ERROR: prosa_pdf returned non-zero exit status %s" % rc)
-            # Intentionally don't crash the whole adapter — report and continue/abort
-            # Here we re-raise to make CI step fail so you get visible failure
-            raise SystemExit(rc)
-
-    except TimeoutError as te:
-        print("build_prosa_drafts_adapter.py: TimeoutError while running prosa_pdf: %s" % str(te))
-        traceback.print_exc()
-        sys.stdout.flush()
-        raise
-    except Exception as e:
-        print("build_prosa_drafts_adapter.py: Exception while running prosa_pdf:", str(e))
-        traceback.print_exc()
-        sys.stdout.flush()
-        raise
-    finally:
+    import prosa_pdf
+    from shared import render_cache
+    from shared.naming import base_from_input_path
+    from shared.streaming_build import streaming_enabled
+    from shared.line_breaking import line_break_mode
+    from shared.interlinear_row import row_flowable_enabled
+    
+    # NEU: Inhaltsadressierter Render-Cache (shared/render_cache.py)
+    # Identischer Text + TAG_CONFIG + HIDE_PIPES + Optionen + Renderer-Version → PDFs nur kopieren
+    # (Optionen: alles, was das Layout ändert – auch PROSA_LINE_BREAK und INTERLINEAR_ROW_FLOWABLE)
+    base = base_from_input_path(input_path)
+    cache_key = render_cache.cache_key("prosa", clean_text, tag_config, hide_pipes, {
+        "language": prosa_pdf._detect_language_from_filename(input_path.name),
+        # Größenabhängige Varianten-Reduktion gibt es nur noch beim Listen-Build
+        "size_bytes": None if streaming_enabled() else original_size_bytes,
+        "line_break": line_break_mode(),
+        "row_flowable": row_flowable_enabled(),
+    })
+    produced = render_cache.fetch(cache_key, target_dir, base)
+    
+    if produced is None:
+        errors = []  # wie bisher (Subprozess rc=0): fertige Varianten trotzdem übernehmen
         try:
-            if proc and proc.stdout:
-                proc.stdout.close()
-        except Exception:
-            pass
-        # Lösche temporäre Dateien
-        if config_file and config_file.exists():
-            config_file.unlink()
-        if temp_input.exists():
-            temp_input.unlink()
-
-    # --- END robust subprocess invocation ---
-    
-    after = {p.name for p in ROOT.glob("*.pdf")}
-    new_pdfs = sorted(after - before)
-
-    if not new_pdfs:
+            produced = prosa_pdf.render_all(
+                clean_text,
+                tag_config or None,
+                hide_pipes,
+                target_dir,
+                name=input_path.name,
+                original_size_bytes=original_size_bytes,
+                errors=errors,
+            )
+        except Exception as e:
+            print("build_prosa_drafts_adapter.py: Exception while running prosa_pdf:", str(e))
+            traceback.print_exc()
+            sys.stdout.flush()
+            raise
+        # Nur vollständige Läufe cachen
+        if produced and not errors:
+            render_cache.store(cache_key, produced, base)
+    
+    if not produced:
         print("⚠ Keine PDFs erzeugt."); return
 
-    # Filtere nur die PDFs, die zu dieser Eingabedatei gehören
-    # Berücksichtige sowohl den ursprünglichen Namen als auch den temp_ Namen
-    temp_prefix = f"temp_{input_stem}"
-    relevant_pdfs = [
-        name for name in new_pdfs
-        if name.startswith(input_stem) or name.startswith(temp_prefix)
-    ]
-    
-    if not relevant_pdfs:
-        print(f"⚠ Keine passenden PDFs für {input_stem} gefunden."); return
-
     # KRITISCH: Verwende IMMER den Upload-Filename (input_stem), NICHT RELEASE_BASE!
     # Grund: Browser muss PDFs anhand des Upload-Filenames finden können
     # RELEASE_BASE kann normalisiert sein (z.B. gr_de statt gr_de_en), was zu 404s führt
@@ -224,11 +149,12 @@ def run_one(input_path: Path, tag_config: dict = None) -> None:
     # WICHTIG: Wir verwenden NICHT mehr PATH_PREFIX oder RELEASE_BASE für den PDF-Namen!
     # Grund: Frontend (work.js) extrahiert nur Autor_Werk aus Upload-Filename
     
-    for name in relevant_pdfs:
+    for src in produced:
+        name = src.name
         bare = name[:-4] if name.lower().endswith(".pdf") else name
         
         # KRITISCH: Extrahiere nur den Variant-Suffix (ab _Normal oder _GR_Fett oder _LAT_Fett)
-        # Das PDF heißt z.B.: "temp_epistulaemorales1_lat_de_en_stil1_birkenbihl_draft_translinear_DRAFT_20251130_023827_LAT_Fett_BlackWhite_NoTags"
+        # Das PDF heißt z.B.: "epistulaemorales1_lat_de_en_stil1_birkenbihl_draft_translinear_DRAFT_20251130_023827_LAT_Fett_BlackWhite_NoTags"
         # Wir wollen nur: "_LAT_Fett_BlackWhite_NoTags"
         
         import re
@@ -237,10 +163,7 @@ def run_one(input_path: Path, tag_config: dict = None) -> None:
             suffix = '_' + bare[variant_match.start()+1:]  # Ab dem Variant-Teil
         else:
             # Fallback: Alte Logik
-            temp_prefix = f"temp_{input_stem}"
-            if bare.startswith(temp_prefix):
-                suffix = bare[len(temp_prefix):]
-            elif bare.startswith(input_stem):
+            if bare.startswith(input_stem):
                 suffix = bare[len(input_stem):]
             else:
                 suffix = bare
@@ -258,11 +181,31 @@ def run_one(input_path: Path, tag_config: dict = None) -> None:
         
         final_name = f"{final_bare}.pdf"
         
-        src = ROOT / name
         dst = target_dir / final_name
         src.replace(dst)
         print(f"✓ PDF → {dst}")
 
+def start_call_watchdog(label: str, env_name: str) -> threading.Timer:
+    """
+    Timeout pro Render-Aufruf wie früher beim Subprozess (PROSA_PDF_CALL_TIMEOUT, Standard 600 s):
+    beendet den Prozess hart mit exit 124 (früher proc.kill()). Ein Thread statt SIGALRM,
+    weil prosa_pdf den (einzigen) Alarm schon für seinen globalen Timeout belegt.
+    """
+    try:
+        seconds = int(os.environ.get(env_name, "600"))
+    except Exception:
+        seconds = 600
+
+    def _expire():
+        print("ERROR: %s call exceeded timeout (%ds) — killing." % (label, seconds))
+        sys.stdout.flush()
+        os._exit(124)
+
+    timer = threading.Timer(seconds, _expire)
+    timer.daemon = True
+    timer.start()
+    return timer
+
 def main():
     if len(sys.argv) < 2:
         print("Verwendung: python build_prosa_drafts_adapter.py <input_file> [tag_config.json]")
@@ -282,7 +225,27 @@ def main():
                 print(f"⚠ Fehler beim Laden der JSON-Konfiguration: {e}")
                 tag_config = None
     
-    run_one(input_file, tag_config)
+    # NEU: Queue-Modus (JOB_QUEUE=1, shared/job_queue.py): Job eintragen, überholte Entwürfe
+    # zusammenfassen, kleine Entwürfe zuerst; der Job selbst läuft als Adapter-Aufruf mit JOB_QUEUE=0
+    from shared import job_queue
+    if job_queue.job_queue_enabled():
+        extra = [str(Path(sys.argv[2]).resolve())] if len(sys.argv) > 2 else []
+        sys.exit(job_queue.submit_and_wait("prosa", input_file, extra))
+    
+    # NEU: Client-Modus (RENDER_DAEMON=1): Job an den warmen Render-Daemon (shared/render_daemon.py)
+    # übergeben – kein ReportLab-Import, keine Font-Registrierung in diesem Prozess.
+    # Kein Daemon erreichbar oder anderer Renderer-Code → wie bisher selbst rendern
+    from shared import render_daemon
+    if render_daemon.daemon_client_enabled():
+        rc = render_daemon.submit("prosa", input_file, tag_config)
+        if rc is not None:
+            sys.exit(rc)
+    
+    watchdog = start_call_watchdog("prosa_pdf", "PROSA_PDF_CALL_TIMEOUT")
+    try:
+        run_one(input_file, tag_config)
+    finally:
+        watchdog.cancel()
 
 if __name__ == "__main__":
     main()
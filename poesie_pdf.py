@@ -14,9 +14,22 @@ Erzeugt 4 Varianten pro Input:
 - Color (COLOR|BLACK_WHITE) × Tags (TAGS|NO_TAGS)
 - Optional: Versmaß-Varianten wenn Versmaß-Marker vorhanden
 
+Parallel-Modus:
+- --jobs N rendert die Varianten in N Worker-Prozessen (0 = alle CPU-Kerne).
+  Geparste und kommentierte Blöcke werden einmal an die Worker übergeben.
+
+In-Process-API:
+- render_all(text, tag_config, hide_pipes, out_dir, *, name=…, force_meter=…) rendert alle
+  Varianten direkt aus einem String (genutzt von build_poesie_drafts_adapter.py).
+
 Die Sprache wird automatisch aus dem Dateinamen erkannt:
 - *_gr_* → GR_FETT
 - *_lat_* → LAT_FETT
+
+Parse-Cache:
+- Die geparsten und kommentierten Blöcke werden pro Text und Parser-Version in .parse_cache/
+  abgelegt (shared/parse_cache.py); ein unveränderter Text wird beim nächsten Lauf nicht neu
+  geparst. --no-parse-cache bzw. PARSE_CACHE=0 → immer parsen.
 """
 
 from __future__ import annotations
@@ -31,9 +44,12 @@ import time
 import signal
 import traceback
 import inspect
-from reportlab.platypus import Paragraph
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib import colors
+
+# NEU: --profile-import → Importzeit pro Modul/Paket (aggregiert) bei Programmende nach stderr.
+# Steht VOR allen schweren Imports, damit sie mitgemessen werden.
+if "--profile-import" in sys.argv:
+    from shared.lazy_import import start_import_profile
+    start_import_profile()
 
 # Reduce noisy DEBUG output - set root logger to INFO
 logging.getLogger().setLevel(logging.INFO)
@@ -138,23 +154,23 @@ except Exception:
 # Ensure final_blocks always exists to avoid NameError in except blocks
 final_blocks = None
 
-import Poesie_Code as Poesie
-from shared.unified_api import create_pdf_unified, PdfRenderOptions
+# NEU: Schwere Module (Poesie_Code + ReportLab-platypus, Vorverarbeitung, Worker-Pool) erst beim
+# ersten Render laden – --help und Cache-Treffer der Draft-Adapter importieren sie gar nicht
+from shared.lazy_import import lazy_module
+Poesie = lazy_module("Poesie_Code")
+unified_api = lazy_module("shared.unified_api")
 from shared.naming import base_from_input_path, output_pdf_name, PdfRenderOptions as NameOpts
-from shared import preprocess
-from shared.versmass import has_meter_markers
+preprocess = lazy_module("shared.preprocess")
+versmass = lazy_module("shared.versmass")
+variant_pool = lazy_module("shared.variant_pool")
+pipeline = lazy_module("shared.pipeline")
+parse_cache = lazy_module("shared.parse_cache")
 
 
 def _discover_inputs_default() -> list[str]:
     root = Path(".")
     return sorted(str(p) for p in root.glob("*.txt"))
 
-def _args_or_default() -> list[str]:
-    # Wenn Argumente übergeben wurden, nimm GENAU diese Dateien
-    if len(sys.argv) > 1:
-        return [str(Path(a)) for a in sys.argv[1:]]
-    return _discover_inputs_default()
-
 def _add_suffix_before_ext(filename: str, suffix: str) -> str:
     p = Path(filename)
     return p.with_name(p.stem + suffix + p.suffix).name
@@ -250,46 +266,132 @@ def _get_default_tag_config(language: str) -> dict:
     
     return config
 
-def _process_one_input(infile: str,
-                       tag_config: dict = None,
-                       force_meter: Optional[bool] = None,
-                       hide_pipes: bool = False) -> None:
-    if not os.path.isfile(infile):
-        print(f"⚠ Datei fehlt: {infile} — übersprungen"); return
+def _render_variant(common_blocks: list, base: str, strength: str, color_mode: str, tag_mode: str,
+                    meter_on: bool, final_tag_config: dict, hide_pipes: bool = False,
+                    out_dir: str | None = None) -> str:
+    """
+    Rendert EINE Variante (strength × color × tag × meter) aus den Blöcken der COMMON-Stufe
+    (bereits gefärbt und mit angewendeter Tag-Sichtbarkeit, siehe shared/pipeline.py).
+    Die übergebenen common_blocks werden nicht verändert (Copy-on-Write in den preprocess-Stufen).
+    Gibt den Pfad des erzeugten PDFs zurück (in out_dir, sonst im aktuellen Verzeichnis).
+    """
+    # WICHTIG: Farben (Schritt 1) und Tag-Sichtbarkeit (Schritt 2) sind für alle Varianten gleich
+    # und liefen bereits EINMAL in der COMMON-Stufe. Hier nur noch die variantenabhängigen Schritte.
+    blocks_after_visibility = list(common_blocks)
 
-    print(f"\n{'='*60}")
-    print(f"Verarbeite: {infile}")
-    print(f"force_meter: {force_meter}")
-    print(f"{'='*60}\n")
+    # Schritt 3: Entferne leere Übersetzungszeilen
+    blocks_no_empty_trans = preprocess.remove_empty_translation_lines(blocks_after_visibility)
 
-    base = base_from_input_path(Path(infile))
-    base_name = str(base)  # for logging
-    print(f"→ Base-Name aus Datei: {base}")
+    # Schritt 4: Farbsymbole entfernen (für BLACK_WHITE)
+    if color_mode == "BLACK_WHITE":
+        variant_final_blocks = preprocess.remove_all_color_symbols(blocks_no_empty_trans)
+    else: # COLOR
+        variant_final_blocks = blocks_no_empty_trans
+
+    # Schritt 5: PDF rendern
+    name_no_meter = output_pdf_name(base, NameOpts(strength=strength, color_mode=color_mode, tag_mode=tag_mode))
     
-    logger.info("poesie_pdf: START processing file=%s", base_name)
+    # WICHTIG: Prüfe, ob alle Übersetzungen ausgeblendet sind
+    has_no_translations = all(
+        not b.get('de_tokens') and not b.get('en_tokens')
+        for b in variant_final_blocks
+        if b.get('type') == 'pair'
+    )
+    
+    # Füge _NoTrans hinzu, wenn alle Übersetzungen ausgeblendet sind
+    if has_no_translations:
+        name_no_meter = _add_suffix_before_ext(name_no_meter, "_NoTrans")
+    
+    # WICHTIG: Wir fügen NICHT mehr automatisch "_Versmass" zum Namen hinzu
+    # Versmaß-Erkennung erfolgt NUR über tatsächliche Meter-Marker im Text!
+    # Der Output-Name bleibt wie der Input-Name (ohne Modifikation)
+    out_name = name_no_meter
+    out_path = os.path.join(out_dir, out_name) if out_dir else out_name
+        
+    versmass_mode = "KEEP_MARKERS" if meter_on else "REMOVE_MARKERS"
+    opts = unified_api.PdfRenderOptions(strength=strength, color_mode=color_mode, tag_mode=tag_mode, versmass_mode=versmass_mode)
+    
+    # build the PDF document (via create_pdf_unified which calls Poesie.create_pdf which calls doc.build())
+    logger.info("poesie_pdf: about to call reportlab build() for %s (blocks=%d)", out_name, len(variant_final_blocks))
     try:
         sys.stdout.flush()
     except Exception:
         pass
-    start_time = time.time()
-    
-    # KRITISCH: Debug-Logging VOR process_input_file
-    logger.info("poesie_pdf: ABOUT TO CALL Poesie.process_input_file(%s)", infile)
     try:
-        sys.stdout.flush()
+        unified_api.create_pdf_unified("poesie", Poesie, variant_final_blocks, out_path, opts, payload=None, tag_config=final_tag_config, hide_pipes=hide_pipes)
+        logger.info("poesie_pdf: reportlab build() finished for %s", out_name)
+        print(f"✓ PDF erstellt → {out_name}")
     except Exception:
-        pass
-    
-    # KRITISCH: Lade Input-Datei mit Timeout-Protection
+        logger.exception("poesie_pdf: reportlab build() FAILED for %s", out_name)
+        raise
+    finally:
+        try:
+            signal.alarm(0)
+        except Exception:
+            pass
+    return out_path
+
+def render_all(text: str, tag_config: dict | None = None, hide_pipes: bool = False,
+               out_dir: str | os.PathLike = ".", *, name: str = "input_gr_de.txt",
+               force_meter: Optional[bool] = None, jobs: int = 1,
+               errors: list | None = None, use_parse_cache: bool = True) -> list[Path]:
+    """
+    In-Process-API (ohne Temp-Datei, ohne zweiten Interpreter): rendert alle Varianten für text
+    nach out_dir und gibt die Pfade der erzeugten PDFs in Varianten-Reihenfolge zurück.
+    name: ursprünglicher Dateiname → Base-Name der PDFs und Spracherkennung (*_gr_* / *_lat_*).
+    errors: Liste → Fehler werden dort gesammelt und ausgegeben statt weitergereicht (wie main()),
+    die bis dahin erzeugten PDFs werden trotzdem zurückgegeben.
+    use_parse_cache: False → Parse-Cache (shared/parse_cache.py) umgehen.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    produced: list[str] = []
     try:
-        blocks = Poesie.process_input_file(infile)
-        logger.info("poesie_pdf: Poesie.process_input_file() RETURNED %d blocks", len(blocks) if isinstance(blocks, list) else -1)
+        _process_text(text, name, tag_config, force_meter, hide_pipes, jobs,
+                      out_dir=str(out), identity=pipeline.text_identity(text), produced=produced,
+                      use_parse_cache=use_parse_cache)
+    except Exception as e:
+        if errors is None:
+            raise
+        errors.append(e)
+        print(f"✗ Fehler bei {name}: {e}")
+    return [Path(p) for p in produced]
+
+def _process_one_input(infile: str,
+                       tag_config: dict = None,
+                       force_meter: Optional[bool] = None,
+                       hide_pipes: bool = False,
+                       jobs: int = 1,
+                       *,
+                       use_parse_cache: bool = True) -> list[str]:
+    if not os.path.isfile(infile):
+        print(f"⚠ Datei fehlt: {infile} — übersprungen"); return []
+
+    # NEU: Datei wird nicht als Ganzes gelesen – der Parser bekommt den mmap-Zeilenstrom
+    # (Poesie.process_input_file, shared/line_source.py), der Parse-Cache-Schlüssel die Dateibytes
+    return _process_text(None, infile, tag_config, force_meter, hide_pipes, jobs,
+                         identity=pipeline.input_identity(infile), use_parse_cache=use_parse_cache,
+                         source_file=infile)
+
+def _parse_blocks(text: str | None, *, source_file: str | None = None) -> list:
+    """
+    Parser-Phase: Poesie.process_input_text → discover_and_attach_comments.
+    source_file statt text → Poesie.process_input_file (Zeilenstrom per mmap, gleiches Ergebnis).
+    Das Ergebnis hängt nur vom Eingabetext ab und wird im Parse-Cache abgelegt (shared/parse_cache.py).
+    """
+    try:
+        if source_file is not None:
+            logger.info("poesie_pdf: ABOUT TO CALL Poesie.process_input_file(%s)", source_file)
+            blocks = Poesie.process_input_file(source_file)
+        else:
+            blocks = Poesie.process_input_text(text)
+        logger.info("poesie_pdf: Poesie parser RETURNED %d blocks", len(blocks) if isinstance(blocks, list) else -1)
         try:
             sys.stdout.flush()
         except Exception:
             pass
     except Exception as e:
-        logger.exception("poesie_pdf: Poesie.process_input_file() FAILED")
+        logger.exception("poesie_pdf: Poesie parser FAILED")
         raise
     
     # WICHTIG: Für Poesie werden Kommentare NICHT automatisch als separate Blöcke erkannt
@@ -304,6 +406,59 @@ def _process_one_input(infile: str,
         logger.exception("poesie_pdf: discover_and_attach_comments() FAILED")
         # Fallback: Verwende Original-Blöcke ohne Kommentar-Verarbeitung
         logger.warning("poesie_pdf: falling back to original blocks (no comment processing)")
+    return blocks
+
+def _process_text(text: str | None,
+                  infile: str,
+                  tag_config: dict = None,
+                  force_meter: Optional[bool] = None,
+                  hide_pipes: bool = False,
+                  jobs: int = 1,
+                  *,
+                  out_dir: str | None = None,
+                  identity: tuple = (),
+                  produced: list | None = None,
+                  use_parse_cache: bool = True,
+                  source_file: str | None = None) -> list[str]:
+    """
+    Gemeinsamer Kern von _process_one_input (Datei) und render_all (Text).
+    infile dient nur noch als Name (Base-Name, Spracherkennung); gibt die erzeugten PDF-Pfade zurück.
+    produced (optional) sammelt die Pfade laufend – bei einem Fehler enthält es die bis dahin erzeugten PDFs.
+    Die geparsten Blöcke kommen aus dem Parse-Cache (use_parse_cache=False → immer parsen).
+    source_file (text=None): Eingabe direkt aus der Datei streamen statt aus text.
+    """
+    if produced is None:
+        produced = []
+    print(f"\n{'='*60}")
+    print(f"Verarbeite: {infile}")
+    print(f"force_meter: {force_meter}")
+    print(f"{'='*60}\n")
+
+    base = base_from_input_path(Path(infile))
+    base_name = str(base)  # for logging
+    print(f"→ Base-Name aus Datei: {base}")
+    
+    logger.info("poesie_pdf: START processing file=%s", base_name)
+    try:
+        sys.stdout.flush()
+    except Exception:
+        pass
+    start_time = time.time()
+    
+    # KRITISCH: Debug-Logging VOR process_input_text
+    try:
+        sys.stdout.flush()
+    except Exception:
+        pass
+    
+    # KRITISCH: Parse Input mit Timeout-Protection
+    # NEU: geparste Blöcke persistent cachen (shared/parse_cache.py, --no-parse-cache)
+    if source_file is not None:
+        blocks = parse_cache.cached_file_blocks("poesie", source_file,
+                                                lambda: _parse_blocks(None, source_file=source_file),
+                                                enabled=use_parse_cache)
+    else:
+        blocks = parse_cache.cached_blocks("poesie", text, lambda: _parse_blocks(text), enabled=use_parse_cache)
 
     # Debug: Zähle Kommentar-Blöcke NACH discover_and_attach_comments
     comment_blocks = [b for b in blocks if isinstance(b, dict) and b.get('type') == 'comment']
@@ -341,7 +496,7 @@ def _process_one_input(infile: str,
         # Nur für griechische Texte: Prüfe auf Versmaß-Marker
         for block in blocks:
             if block.get('type') == 'pair':
-                if has_meter_markers(block.get('gr_tokens', [])):
+                if versmass.has_meter_markers(block.get('gr_tokens', [])):
                     content_has_meter = True
                     break
     
@@ -368,92 +523,41 @@ def _process_one_input(infile: str,
         hide_count = sum(1 for conf in final_tag_config.values() if isinstance(conf, dict) and (conf.get('hide') == True or conf.get('hide') == 'hide' or conf.get('hide') == 'true'))
         print(f"DEBUG poesie_pdf: {hide_count} Regeln mit hide=true gefunden")
     
+    # NEU: COMMON-Stufe (Farben, Tag-Sichtbarkeit) EINMAL für alle Varianten
+    # WICHTIG: Versmaß-Erkennung oben läuft auf den ungefärbten Blöcken und bleibt davon unberührt
+    common_key = ("poesie", identity, pipeline.tag_config_key(final_tag_config))
+    common_blocks = pipeline.cached_common_stage(
+        common_key,
+        lambda: pipeline.apply_common_stage(final_blocks, final_tag_config, label="poesie_pdf"),
+    )
+    
     total_blocks = len(final_blocks) if isinstance(final_blocks, list) else 0
     num_variants = len(list(itertools.product(strengths, colors, tags, meters)))
     logger.info("poesie_pdf: Starting PDF generation loop for %d variants, total_blocks=%d", num_variants, total_blocks)
     
-    variant_index = 0
-    for strength, color_mode, tag_mode, meter_on in itertools.product(strengths, colors, tags, meters):
-        variant_index += 1
-        logger.info("poesie_pdf: processing variant %d/%d (strength=%s, color=%s, tag=%s, meter=%s)", variant_index, num_variants, strength, color_mode, tag_mode, meter_on)
-        try:
-            sys.stdout.flush()
-        except Exception:
-            pass
-        
-        # KRITISCH: Wir müssen für JEDE Variante eine FRISCHE KOPIE der Blöcke verwenden
-        # und die Preprocessing-Schritte NEU durchführen!
-        # Sonst werden die Farben/Tags/etc. von vorherigen Varianten wiederverwendet.
-        import copy
-        variant_blocks = copy.deepcopy(final_blocks)
-        
-        # Schritt 1: Farben hinzufügen (basierend auf tag_config) - FÜR JEDE VARIANTE NEU!
-        try:
-            disable_comment_bg_flag = (final_tag_config.get('disable_comment_bg', False) if isinstance(final_tag_config, dict) else False)
-            blocks_with_colors = preprocess.apply_colors(variant_blocks, final_tag_config, disable_comment_bg=disable_comment_bg_flag)
-        except Exception:
-            print("ERROR poesie_pdf: apply_colors failed:")
-            traceback.print_exc()
-            blocks_with_colors = variant_blocks
-        
-        # Schritt 2: Tag-Sichtbarkeit anwenden (basierend auf tag_config) - FÜR JEDE VARIANTE NEU!
-        try:
-            hidden_by_wortart = (final_tag_config.get('hidden_tags_by_wortart') if isinstance(final_tag_config, dict) else None)
-            blocks_after_visibility = preprocess.apply_tag_visibility(blocks_with_colors, final_tag_config, hidden_tags_by_wortart=hidden_by_wortart)
-        except Exception:
-            print("ERROR poesie_pdf: apply_tag_visibility failed:")
-            traceback.print_exc()
-            blocks_after_visibility = blocks_with_colors
-
-        # Schritt 3: Entferne leere Übersetzungszeilen
-        blocks_no_empty_trans = preprocess.remove_empty_translation_lines(blocks_after_visibility)
-
-        # Schritt 4: Farbsymbole entfernen (für BLACK_WHITE)
-        if color_mode == "BLACK_WHITE":
-            variant_final_blocks = preprocess.remove_all_color_symbols(blocks_no_empty_trans)
-        else: # COLOR
-            variant_final_blocks = blocks_no_empty_trans
-
-        # Schritt 5: PDF rendern
-        name_no_meter = output_pdf_name(base, NameOpts(strength=strength, color_mode=color_mode, tag_mode=tag_mode))
-        
-        # WICHTIG: Prüfe, ob alle Übersetzungen ausgeblendet sind
-        has_no_translations = all(
-            not b.get('de_tokens') and not b.get('en_tokens')
-            for b in variant_final_blocks
-            if b.get('type') == 'pair'
-        )
-        
-        # Füge _NoTrans hinzu, wenn alle Übersetzungen ausgeblendet sind
-        if has_no_translations:
-            name_no_meter = _add_suffix_before_ext(name_no_meter, "_NoTrans")
-        
-        # WICHTIG: Wir fügen NICHT mehr automatisch "_Versmass" zum Namen hinzu
-        # Versmaß-Erkennung erfolgt NUR über tatsächliche Meter-Marker im Text!
-        # Der Output-Name bleibt wie der Input-Name (ohne Modifikation)
-        out_name = name_no_meter
-            
-        versmass_mode = "KEEP_MARKERS" if meter_on else "REMOVE_MARKERS"
-        opts = PdfRenderOptions(strength=strength, color_mode=color_mode, tag_mode=tag_mode, versmass_mode=versmass_mode)
-        
-        # build the PDF document (via create_pdf_unified which calls Poesie.create_pdf which calls doc.build())
-        logger.info("poesie_pdf: about to call reportlab build() for %s (blocks=%d)", out_name, len(variant_final_blocks))
-        try:
-            sys.stdout.flush()
-        except Exception:
-            pass
-        try:
-            create_pdf_unified("poesie", Poesie, variant_final_blocks, out_name, opts, payload=None, tag_config=final_tag_config, hide_pipes=hide_pipes)
-            logger.info("poesie_pdf: reportlab build() finished for %s", out_name)
-            print(f"✓ PDF erstellt → {out_name}")
-        except Exception:
-            logger.exception("poesie_pdf: reportlab build() FAILED for %s", out_name)
-            raise
-        finally:
+    variant_jobs = list(itertools.product(strengths, colors, tags, meters))
+    jobs = variant_pool.resolve_jobs(jobs)
+    
+    if jobs > 1 and len(variant_jobs) > 1:
+        # NEU: Parallelmodus - eine Variante pro Worker-Prozess, Logs geordnet pro Variante
+        for variant_index, (strength, color_mode, tag_mode, meter_on) in enumerate(variant_jobs, 1):
+            logger.info("poesie_pdf: queueing variant %d/%d (strength=%s, color=%s, tag=%s, meter=%s)", variant_index, num_variants, strength, color_mode, tag_mode, meter_on)
+        produced.extend(variant_pool.run_variants(
+            _render_variant,
+            dict(common_blocks=common_blocks, base=base, final_tag_config=final_tag_config, hide_pipes=hide_pipes, out_dir=out_dir),
+            [dict(strength=strength, color_mode=color_mode, tag_mode=tag_mode, meter_on=meter_on)
+             for strength, color_mode, tag_mode, meter_on in variant_jobs],
+            jobs,
+            label="poesie_pdf",
+        ))
+    else:
+        for variant_index, (strength, color_mode, tag_mode, meter_on) in enumerate(variant_jobs, 1):
+            logger.info("poesie_pdf: processing variant %d/%d (strength=%s, color=%s, tag=%s, meter=%s)", variant_index, num_variants, strength, color_mode, tag_mode, meter_on)
             try:
-                signal.alarm(0)
+                sys.stdout.flush()
             except Exception:
                 pass
+            produced.append(_render_variant(common_blocks, base, strength, color_mode, tag_mode, meter_on, final_tag_config, hide_pipes, out_dir))
     
     # turn off the alarm now that the heavy section finished
     try:
@@ -477,6 +581,7 @@ def _process_one_input(infile: str,
         total_suppressed = sum(1 for c in f._counts.values() if c > 100)
         if total_suppressed > 0:
             logger.info("Suppressed repeated Table/Comment warnings (patterns suppressed: %d)", total_suppressed)
+    return produced
 
 def main():
     # Parse command line arguments for tag config
@@ -487,6 +592,13 @@ def main():
     parser.add_argument('--force-meter', action='store_true', help='Versmaß-Ausgabe erzwingen')
     parser.add_argument('--force-no-meter', action='store_true', help='Versmaß deaktivieren')
     parser.add_argument('--hide-pipes', action='store_true', help='Hide pipe characters in translations')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes for variant rendering (0 = all CPU cores, default: 1 = serial)')
+    # NEU: wird schon beim Modul-Import ausgewertet (sys.argv), hier nur für --help / Argument-Prüfung
+    parser.add_argument('--profile-import', action='store_true',
+                        help='Report aggregated per-module import times on exit (stderr)')
+    parser.add_argument('--no-parse-cache', action='store_true',
+                        help='Always parse the input (bypass the pre-parsed block cache in .parse_cache/)')
     args = parser.parse_args()
     
     if args.force_meter and args.force_no_meter:
@@ -501,7 +613,8 @@ def main():
         force_meter_flag = None
     
     # Use input files from arguments, or fallback to default discovery
-    inputs = args.input_files if args.input_files else _args_or_default()
+    # (Discovery statt sys.argv, sonst landen reine Optionen wie --profile-import in der Dateiliste)
+    inputs = args.input_files if args.input_files else _discover_inputs_default()
     if not inputs:
         print("⚠ Keine .txt gefunden."); return
     
@@ -532,7 +645,8 @@ def main():
     for infile in inputs:
         print(f"→ Verarbeite: {infile}")
         try:
-            _process_one_input(infile, tag_config, force_meter=force_meter_flag, hide_pipes=args.hide_pipes)
+            _process_one_input(infile, tag_config, force_meter=force_meter_flag, hide_pipes=args.hide_pipes, jobs=args.jobs,
+                               use_parse_cache=not args.no_parse_cache)
         except Exception as e:
             print(f"✗ Fehler bei {infile}: {e}")
 
@@ -16,6 +16,24 @@ Erzeugt 4 Varianten pro Input:
 Die Sprache wird automatisch aus dem Dateinamen erkannt:
 - *_gr_* → GR_FETT
 - *_lat_* → LAT_FETT
+
+Parallel-Modus:
+- --jobs N rendert die Varianten in N Worker-Prozessen (0 = alle CPU-Kerne).
+  Die Eingabe wird nur einmal geparst; die größenabhängige Varianten-Reduktion entfällt.
+
+In-Process-API:
+- render_all(text, tag_config, hide_pipes, out_dir, *, name=…) rendert alle Varianten direkt
+  aus einem String und gibt die erzeugten PDF-Pfade zurück (genutzt von build_prosa_drafts_adapter.py).
+
+Streamender Build:
+- Die Flowables werden während der Element-Erstellung gesetzt (shared/streaming_build.py),
+  der Speicherbedarf wächst nicht mehr mit der Dateigröße; daher entfällt die
+  größenabhängige Varianten-Reduktion auch seriell. PROSA_STREAM_BUILD=0 → alter Listen-Build.
+
+Parse-Cache:
+- Die geparsten Blöcke (bis einschließlich merge_strauss_alternatives) werden pro Text und
+  Parser-Version in .parse_cache/ abgelegt (shared/parse_cache.py); ein unveränderter Text wird
+  beim nächsten Lauf nicht neu geparst. --no-parse-cache bzw. PARSE_CACHE=0 → immer parsen.
 """
 
 from __future__ import annotations
@@ -30,9 +48,12 @@ import time
 import signal
 import sys
 import traceback
-from reportlab.platypus import Paragraph
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib import colors
+
+# NEU: --profile-import → Importzeit pro Modul/Paket (aggregiert) bei Programmende nach stderr.
+# Steht VOR allen schweren Imports, damit sie mitgemessen werden.
+if "--profile-import" in sys.argv:
+    from shared.lazy_import import start_import_profile
+    start_import_profile()
 
 # Reduce noisy DEBUG output - set root logger to INFO
 logging.getLogger().setLevel(logging.INFO)
@@ -151,24 +172,25 @@ def _install_global_timeout():
 # Try to install the timeout immediately (defensive)
 _install_global_timeout()
 
-import Prosa_Code as Prosa
-from Prosa_Code import group_pairs_into_flows, merge_strauss_alternatives  # ← HINZUFÜGEN
+# NEU: Schwere Module (Prosa_Code + ReportLab-platypus, Vorverarbeitung, Worker-Pool) erst beim
+# ersten Render laden – --help und Cache-Treffer der Draft-Adapter importieren sie gar nicht
+from shared.lazy_import import lazy_module
+Prosa = lazy_module("Prosa_Code")
 
 # Ensure final_blocks always exists to avoid NameError in except blocks
 final_blocks = None
-from shared.unified_api import create_pdf_unified, PdfRenderOptions
+unified_api = lazy_module("shared.unified_api")
 from shared.naming import base_from_input_path, output_pdf_name, PdfRenderOptions as NameOpts
-from shared import preprocess
+preprocess = lazy_module("shared.preprocess")
+variant_pool = lazy_module("shared.variant_pool")
+pipeline = lazy_module("shared.pipeline")
+parse_cache = lazy_module("shared.parse_cache")
+from shared.streaming_build import streaming_enabled
 
 def _discover_inputs_default() -> list[str]:
     root = Path(".")
     return sorted(str(p) for p in root.glob("*.txt"))
 
-def _args_or_default() -> list[str]:
-    if len(sys.argv) > 1:
-        return [str(Path(a)) for a in sys.argv[1:]]
-    return _discover_inputs_default()
-
 def _detect_language_from_filename(filename: str) -> str:
     """
     Erkennt die Sprache aus dem Dateinamen.
@@ -243,45 +265,143 @@ def _get_default_tag_config(language: str) -> dict:
     
     return config
 
-def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool = False) -> None:
-    if not os.path.isfile(infile):
-        print(f"⚠ Datei fehlt: {infile} — übersprungen"); return
+def _render_variant(common_blocks: list, base: str, strength: str, color_mode: str, tag_mode: str,
+                    final_tag_config: dict, hide_pipes: bool = False, out_dir: str | None = None) -> str:
+    """
+    Rendert EINE Variante (strength × color × tag) aus den Blöcken der COMMON-Stufe
+    (bereits tokenisiert, gefärbt und mit angewendeter Tag-Sichtbarkeit, siehe shared/pipeline.py).
+    Hier laufen nur noch die billigen VARIANT-Stufen (NO_TAGS, leere Übersetzungen, BLACK_WHITE).
+    Die übergebenen common_blocks werden nicht verändert (Copy-on-Write in den preprocess-Stufen).
+    Gibt den Pfad des erzeugten PDFs zurück (in out_dir, sonst im aktuellen Verzeichnis).
+    """
+    logger = logging.getLogger(__name__)
+    
+    # WICHTIG: apply_colors/apply_tag_visibility sind für alle Varianten gleich und liefen bereits
+    # EINMAL in der COMMON-Stufe. KEIN copy.deepcopy() - die Stufen arbeiten Copy-on-Write.
+    blocks_after_visibility = list(common_blocks)
+    
+    # 1) Entferne ALLE Tags für NO_TAGS-Varianten (NUR bei NO_TAGS!)
+    if tag_mode != "TAGS":  # NO_TAGS - wie in Poesie
+        # Bei NO_TAGS-Varianten: Entferne ALLE Tags komplett
+        # WICHTIG: Verwende blocks_after_visibility (die bereits durch apply_tag_visibility verarbeitet wurde)
+        blocks_after_visibility = preprocess.remove_all_tags(blocks_after_visibility, final_tag_config)
+        # NO_TAG variant: strip any remaining tags from tokens
+        for b in blocks_after_visibility:
+            if b.get("type") not in ("pair", "flow"):
+                continue
+            for i, t in enumerate(b.get("gr_tokens", [])):
+                if t:
+                    b["gr_tokens"][i] = preprocess.remove_all_tags_from_token(t)
+        logging.getLogger(__name__).info("prosa_pdf: NO_TAGS mode - removed all tags")
+    # Bei TAGS-Varianten: blocks_after_visibility ist bereits korrekt, keine weitere Aktion nötig
+
+    # 2) Entferne leere Übersetzungszeilen (wenn alle Übersetzungen ausgeblendet)
+    blocks_no_empty_trans = preprocess.remove_empty_translation_lines(blocks_after_visibility)
+    
+    # Prüfe, ob alle Übersetzungen ausgeblendet sind (für _NoTrans Tag)
+    has_no_translations = preprocess.all_blocks_have_no_translations(blocks_no_empty_trans)
+
+    # 3) Farbsymbole entfernen (für _BlackWhite-Versionen).
+    # WICHTIG: Bei BLACK_WHITE werden automatische Farbsymbole entfernt (force_color=False),
+    # aber händisch gesetzte Symbole (force_color=True) bleiben erhalten!
+    # Dies ermöglicht es, in BlackWhite-PDFs einzelne Wörter gezielt zu färben.
+    if color_mode == "BLACK_WHITE":
+        variant_final_blocks = preprocess.remove_all_color_symbols(blocks_no_empty_trans)
+    else:
+        variant_final_blocks = blocks_no_empty_trans  # Bei COLOR alle Farben behalten
 
-    print(f"→ Verarbeite: {infile}")
-    base = base_from_input_path(Path(infile))
-    print(f"→ Base-Name aus Datei: {base}")
+    # 4) PDF rendern mit dem final prozessierten Block-Set.
+    out_name = output_pdf_name(base, NameOpts(strength=strength, color_mode=color_mode, tag_mode=tag_mode))
     
-    # KRITISCH: Lese Metadaten aus der Datei (für ORIGINAL_SIZE_BYTES UND TAG_CONFIG)
-    metadata = {}
+    # Füge _NoTrans hinzu, wenn alle Übersetzungen ausgeblendet sind
+    if has_no_translations:
+        p = Path(out_name)
+        out_name = p.with_name(p.stem + "_NoTrans" + p.suffix).name
+    
+    # WICHTIG: PDFs werden im aktuellen Verzeichnis (ROOT) erstellt, bei render_all() in out_dir
+    # Der Adapter (build_prosa_drafts_adapter.py) verschiebt sie dann in den korrekten Ordner
+    out_path = os.path.join(out_dir, out_name) if out_dir else out_name
+    
+    opts = unified_api.PdfRenderOptions(strength=strength, color_mode=color_mode, tag_mode=tag_mode, versmass_mode="REMOVE_MARKERS")
+    
+    # build the PDF via unified API
+    logger.info("prosa_pdf: about to call reportlab build() for %s (blocks=%d)", out_name, len(variant_final_blocks))
     try:
-        import re
-        import json
-        with open(infile, 'r', encoding='utf-8') as f:
-            first_lines = ''.join(f.readline() for _ in range(20))  # Erste 20 Zeilen
-        meta_pattern = re.compile(r'<!--\s*(\w+):(.*?)\s*-->', re.DOTALL | re.IGNORECASE)
-        for key, value in meta_pattern.findall(first_lines):
-            key_upper = key.strip().upper()
-            value_stripped = value.strip()
-            
-            # Spezialbehandlung für TAG_CONFIG: JSON parsen
-            if key_upper == 'TAG_CONFIG':
-                try:
-                    parsed_tag_config = json.loads(value_stripped)
-                    metadata[key_upper] = parsed_tag_config
-                    print(f"→ TAG_CONFIG aus Datei gelesen: {len(parsed_tag_config)} Einträge", flush=True)
-                except json.JSONDecodeError as e:
-                    print(f"⚠ TAG_CONFIG JSON parsing fehlgeschlagen: {e}", flush=True)
-                    metadata[key_upper] = value_stripped
-            else:
-                metadata[key_upper] = value_stripped
+        sys.stdout.flush()
+    except Exception:
+        pass
+    try:
+        unified_api.create_pdf_unified("prosa", Prosa, variant_final_blocks, out_path, opts, payload=None, tag_config=final_tag_config, hide_pipes=hide_pipes)
+        logger.info("prosa_pdf: reportlab build() finished for %s", out_name)
+        print(f"✓ PDF erstellt → {out_name}")
+    except Exception:
+        logger.exception("prosa_pdf: reportlab build() FAILED for %s", out_name)
+        raise
+    return out_path
+
+def render_all(text: str, tag_config: dict | None = None, hide_pipes: bool = False,
+               out_dir: str | os.PathLike = ".", *, name: str = "input_gr_de.txt",
+               original_size_bytes: int | None = None, jobs: int = 1,
+               errors: list | None = None, blocks: list | None = None,
+               use_parse_cache: bool = True) -> list[Path]:
+    """
+    In-Process-API (ohne Temp-Datei, ohne zweiten Interpreter): rendert alle Varianten für text
+    nach out_dir und gibt die Pfade der erzeugten PDFs in Varianten-Reihenfolge zurück.
+
+    - name: ursprünglicher Dateiname → Base-Name der PDFs und Spracherkennung (*_gr_* / *_lat_*)
+    - original_size_bytes: Größe der Original-Datei (für die Varianten-Reduktion beim Listen-Build),
+      Standard: UTF-8-Länge von text
+    - errors: Liste → Fehler werden dort gesammelt und ausgegeben statt weitergereicht (wie main()),
+      die bis dahin erzeugten PDFs werden trotzdem zurückgegeben.
+    - blocks: bereits geparste Roh-Blöcke (Prosa.process_input_text bzw. Prosa.project_blocks) →
+      text wird nicht erneut geparst, sondern liefert nur noch Metadaten-Kopf und Cache-Identität.
+      Die Liste wird dabei verändert (Kommentar-Zuordnung) – Projektionen also VORHER ableiten.
+    - use_parse_cache: False → Parse-Cache (shared/parse_cache.py) umgehen
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    if original_size_bytes is None:
+        original_size_bytes = len(text.encode("utf-8"))
+    print(f"→ Verarbeite (in-process): {name}")
+    produced: list[str] = []
+    try:
+        _process_text(text, name, tag_config, hide_pipes, jobs, out_dir=str(out),
+                      input_size_bytes=original_size_bytes, identity=pipeline.text_identity(text),
+                      produced=produced, raw_blocks=blocks, use_parse_cache=use_parse_cache)
     except Exception as e:
-        print(f"⚠ Fehler beim Lesen der Metadaten: {e}")
-    
+        if errors is None:
+            raise
+        errors.append(e)
+        print(f"✗ Fehler bei {name}: {e}")
+    return [Path(p) for p in produced]
+
+def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool = False, jobs: int = 1, *,
+                       use_parse_cache: bool = True) -> list[str]:
+    if not os.path.isfile(infile):
+        print(f"⚠ Datei fehlt: {infile} — übersprungen"); return []
+
+    print(f"→ Verarbeite: {infile}")
+    # NEU: Datei wird nicht als Ganzes gelesen – der Parser bekommt den mmap-Zeilenstrom
+    # (Prosa.process_input_file, shared/line_source.py), der Parse-Cache-Schlüssel die Dateibytes
+    return _process_text(None, infile, tag_config, hide_pipes, jobs,
+                         input_size_bytes=os.path.getsize(infile), identity=pipeline.input_identity(infile),
+                         use_parse_cache=use_parse_cache, source_file=infile)
+
+def _parse_blocks(text: str | None, raw_blocks: list | None = None, *,
+                  source_file: str | None = None) -> list | None:
+    """
+    Parser-Phase: process_input_text → discover_and_attach_comments → (bei reinen pair-Blöcken)
+    group_pairs_into_flows → merge_strauss_alternatives. None = kein Translinear-Text.
+    source_file statt text → Prosa.process_input_file (Zeilenstrom per mmap, gleiches Ergebnis).
+    Das Ergebnis hängt nur vom Eingabetext ab und wird im Parse-Cache abgelegt (shared/parse_cache.py).
+    """
     logger = logging.getLogger(__name__)
-    logger.info("prosa_pdf: START processing file=%s", str(base))
-    start_time = time.time()
-    
-    blocks = Prosa.process_input_file(infile)
+    if raw_blocks is not None:
+        blocks = raw_blocks
+    elif source_file is not None:
+        blocks = Prosa.process_input_file(source_file)
+    else:
+        blocks = Prosa.process_input_text(text)
     
     # DEBUG: Prüfe ob Sprecher in den RAW blocks vorhanden sind
     for idx, b in enumerate(blocks[:5]):  # Erste 5 Blöcke
@@ -308,7 +428,7 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
     # KRITISCH: Wenn pair_count > 0 und flow_count == 0, rufe group_pairs_into_flows() auf!
     if pair_count > 0 and flow_count == 0:
         logger.info(f"Converting {pair_count} pair blocks to flow blocks...")
-        blocks = group_pairs_into_flows(blocks)
+        blocks = Prosa.group_pairs_into_flows(blocks)
         
         # Re-check nach Konvertierung
         flow_count_after = sum(1 for b in blocks if isinstance(b, dict) and b.get('type') == 'flow')
@@ -316,7 +436,7 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
         logger.info(f"After conversion: flow_blocks={flow_count_after}, pair_blocks={pair_count_after}")
         
         # STRAUßLOGIK: Verschmelze Alternativen zu Multi-Row-Struktur
-        blocks = merge_strauss_alternatives(blocks)
+        blocks = Prosa.merge_strauss_alternatives(blocks)
         
         # Re-check nach STRAUßLOGIK
         flow_count_final = sum(1 for b in blocks if isinstance(b, dict) and b.get('type') == 'flow')
@@ -324,8 +444,72 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
         logger.info(f"After STRAUßLOGIK merge: flow_blocks={flow_count_final}, pair_blocks={pair_count_final}")
     
     if flow_count == 0 and pair_count == 0:
+        return None
+    return blocks
+
+def _process_text(text: str | None, infile: str, tag_config: dict = None, hide_pipes: bool = False, jobs: int = 1, *,
+                  out_dir: str | None = None, input_size_bytes: int = 0, identity: tuple = (),
+                  produced: list | None = None, raw_blocks: list | None = None,
+                  use_parse_cache: bool = True, source_file: str | None = None) -> list[str]:
+    """
+    Gemeinsamer Kern von _process_one_input (Datei) und render_all (Text).
+    infile dient nur noch als Name (Base-Name, Spracherkennung); gibt die erzeugten PDF-Pfade zurück.
+    produced (optional) sammelt die Pfade laufend – bei einem Fehler enthält es die bis dahin erzeugten PDFs.
+    raw_blocks (optional) ersetzt Prosa.process_input_text(text) (siehe render_all(blocks=...)).
+    Ohne raw_blocks kommen die geparsten Blöcke aus dem Parse-Cache (use_parse_cache=False → immer parsen).
+    source_file (text=None): Eingabe direkt aus der Datei streamen statt aus text.
+    """
+    if produced is None:
+        produced = []
+    base = base_from_input_path(Path(infile))
+    print(f"→ Base-Name aus Datei: {base}")
+    
+    # KRITISCH: Lese Metadaten aus der Datei (für ORIGINAL_SIZE_BYTES UND TAG_CONFIG)
+    metadata = {}
+    try:
+        import re
+        import json
+        if text is None:
+            with open(source_file, 'r', encoding='utf-8') as f:
+                first_lines = '\n'.join(line.rstrip('\n') for line in itertools.islice(f, 20))
+        else:
+            first_lines = '\n'.join(text.split('\n', 20)[:20])  # Erste 20 Zeilen
+        meta_pattern = re.compile(r'<!--\s*(\w+):(.*?)\s*-->', re.DOTALL | re.IGNORECASE)
+        for key, value in meta_pattern.findall(first_lines):
+            key_upper = key.strip().upper()
+            value_stripped = value.strip()
+            
+            # Spezialbehandlung für TAG_CONFIG: JSON parsen
+            if key_upper == 'TAG_CONFIG':
+                try:
+                    parsed_tag_config = json.loads(value_stripped)
+                    metadata[key_upper] = parsed_tag_config
+                    print(f"→ TAG_CONFIG aus Datei gelesen: {len(parsed_tag_config)} Einträge", flush=True)
+                except json.JSONDecodeError as e:
+                    print(f"⚠ TAG_CONFIG JSON parsing fehlgeschlagen: {e}", flush=True)
+                    metadata[key_upper] = value_stripped
+            else:
+                metadata[key_upper] = value_stripped
+    except Exception as e:
+        print(f"⚠ Fehler beim Lesen der Metadaten: {e}")
+    
+    logger = logging.getLogger(__name__)
+    logger.info("prosa_pdf: START processing file=%s", str(base))
+    start_time = time.time()
+    
+    if raw_blocks is not None:
+        blocks = _parse_blocks(text, raw_blocks)
+    elif source_file is not None:
+        blocks = parse_cache.cached_file_blocks("prosa", source_file,
+                                                lambda: _parse_blocks(None, source_file=source_file),
+                                                enabled=use_parse_cache)
+    else:
+        # NEU: geparste Blöcke persistent cachen (shared/parse_cache.py, --no-parse-cache)
+        blocks = parse_cache.cached_blocks("prosa", text, lambda: _parse_blocks(text), enabled=use_parse_cache)
+    
+    if blocks is None:
         logger.error("ERROR: KEIN TRANSLINEAR-TEXT!")
-        return  # WICHTIG: Abbrechen, da keine verarbeitbaren Blöcke vorhanden sind
+        return produced  # WICHTIG: Abbrechen, da keine verarbeitbaren Blöcke vorhanden sind
     
     final_blocks = blocks
     
@@ -362,10 +546,7 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
             input_size_bytes = int(original_size_from_meta)
             print(f"✓ Verwende Original-Dateigröße aus Metadaten: {input_size_bytes / 1024:.1f} KB")
         except (ValueError, TypeError):
-            input_size_bytes = os.path.getsize(infile)
             print(f"⚠ ORIGINAL_SIZE_BYTES ungültig, verwende Fallback: {input_size_bytes / 1024:.1f} KB")
-    else:
-        input_size_bytes = os.path.getsize(infile)
     
     input_size_kb = input_size_bytes / 1024
     input_size_mb = input_size_kb / 1024
@@ -378,13 +559,24 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
     reduction_level = 0
     skipped_variant_names = []
     
-    if input_size_kb >= 975:
+    # NEU: Im Parallel-Modus (--jobs N > 1) ist die Reduktion nicht nötig,
+    # da die Varianten gleichzeitig gerendert werden und den Timeout nicht mehr summieren.
+    # NEU: Mit streamendem Build (shared/streaming_build.py, Standard) bleibt der Speicherbedarf
+    # pro Variante unabhängig von der Dateigröße → ebenfalls keine Reduktion.
+    # Die Schwellen gelten nur noch für PROSA_STREAM_BUILD=0 (klassischer Listen-Build).
+    jobs = variant_pool.resolve_jobs(jobs)
+    reduce_by_size = jobs <= 1 and not streaming_enabled()
+    if jobs > 1:
+        print(f"→ Parallel-Modus aktiv (--jobs {jobs}): keine größenabhängige Varianten-Reduktion")
+    elif not reduce_by_size:
+        print("→ Streamender PDF-Build aktiv: keine größenabhängige Varianten-Reduktion")
+    elif input_size_kb >= 975:
         reduction_level = 1
         skipped_variant_names.append("Normal_Colour_NoTag")
-    if input_size_kb >= 1110:
+    if reduce_by_size and input_size_kb >= 1110:
         reduction_level = 2
         skipped_variant_names.append("Normal_BlackWhite_NoTag")
-    if input_size_kb >= 1290:
+    if reduce_by_size and input_size_kb >= 1290:
         reduction_level = 3
         skipped_variant_names.append("Normal_BlackWhite_Tag")
     
@@ -430,6 +622,14 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
     
     # Kommentare sind bereits in final_blocks['comments'] vorhanden
     
+    # NEU: COMMON-Stufe (Tokenisierung, Farben, Tag-Sichtbarkeit) EINMAL für alle Varianten
+    # Ergebnis wird pro (Input, tag_config) im Speicher gehalten und von allen Varianten geteilt
+    common_key = ("prosa", identity, pipeline.tag_config_key(final_tag_config))
+    common_blocks = pipeline.cached_common_stage(
+        common_key,
+        lambda: pipeline.apply_common_stage(final_blocks, final_tag_config, tokenize=Prosa.tokenize, label="prosa_pdf"),
+    )
+    
     num_variants = len(list(itertools.product(strengths, colors, tags)))
     total_blocks = len(final_blocks) if isinstance(final_blocks, list) else 0
     logging.getLogger(__name__).info("prosa_pdf: Starting PDF generation loop for %d variants, total_blocks=%d", num_variants, total_blocks)
@@ -467,6 +667,7 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
     
     variant_index = 0
     skipped_variants = []
+    variant_jobs = []
     for strength, color_mode, tag_mode in itertools.product(strengths, colors, tags):
         variant_index += 1
         
@@ -482,132 +683,28 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
             print(f"  ⏩ Überspringe Variante {variant_index}/{num_variants}: {variant_name} (Datei zu groß, Level {reduction_level})")
             continue
         
-        logging.getLogger(__name__).info("prosa_pdf: processing variant %d/%d (strength=%s, color=%s, tag=%s)", variant_index, num_variants, strength, color_mode, tag_mode)
-        try:
-            sys.stdout.flush()
-        except Exception:
-            pass
-        
-        # KRITISCH: Wir müssen für JEDE Variante eine FRISCHE KOPIE der Blöcke verwenden
-        # und die Preprocessing-Schritte NEU durchführen!
-        import copy
-        variant_blocks = copy.deepcopy(final_blocks)
-        
-        # Pipeline: apply_colors -> apply_tag_visibility (NUR wenn tag_config vorhanden) -> optional remove_all_tags (NO_TAGS)
-        try:
-            t1 = time.time()
-            logging.getLogger(__name__).info("prosa_pdf: apply_colors START (strength=%s, color=%s, tag=%s)", strength, color_mode, tag_mode)
-            disable_comment_bg_flag = (final_tag_config.get('disable_comment_bg', False) if isinstance(final_tag_config, dict) else False)
-            
-            # SCHRITT 1: Tokenisiere pair-Blöcke BEVOR apply_colors!
-            # WICHTIG: apply_colors erwartet gr_tokens/de_tokens/en_tokens (Listen), nicht gr/de/en (Strings)!
-            # Wir tokenisieren OHNE zu flow-Blöcken zu gruppieren, damit jedes pair einzeln gefärbt wird.
-            from Prosa_Code import tokenize
-            for block in variant_blocks:
-                if isinstance(block, dict) and block.get('type') == 'pair':
-                    # Tokenisiere gr, de, en Strings zu Listen
-                    if 'gr' in block and 'gr_tokens' not in block:
-                        block['gr_tokens'] = tokenize(block['gr']) if block.get('gr') else []
-                    if 'de' in block and 'de_tokens' not in block:
-                        block['de_tokens'] = tokenize(block['de']) if block.get('de') else []
-                    if 'en' in block and 'en_tokens' not in block:
-                        block['en_tokens'] = tokenize(block['en']) if block.get('en') else []
-            
-            # SCHRITT 2: Wende Farben an (NACH Tokenisierung!)
-            # WICHTIG: apply_colors wird IMMER aufgerufen (auch bei BLACK_WHITE)!
-            # Grund: Es setzt token_meta mit Farbsymbolen und computed_color, die später verwendet werden.
-            # Bei BLACK_WHITE werden nur die automatischen Farben entfernt, händische Symbole bleiben.
-            blocks_with_colors = preprocess.apply_colors(variant_blocks, final_tag_config, disable_comment_bg=disable_comment_bg_flag)
-            
-            # WICHTIG: group_pairs_into_flows() wird NICHT mehr hier aufgerufen!
-            # Grund: variant_blocks sind bereits flow-Blöcke (von der ersten Konvertierung in Zeile 280).
-            # Ein zweiter Aufruf würde die Speaker-Informationen verlieren, weil flow-Blöcke
-            # keine Sprecher-Tokens mehr enthalten (die wurden bereits in Zeile 280 extrahiert).
-            # Die Farbsymbole aus apply_colors() sind bereits in den Token-Strings enthalten.
-            
-            t2 = time.time()
-            logging.getLogger(__name__).info("prosa_pdf: apply_colors END (%.2fs)", t2 - t1)
-        except Exception as e:
-            tb = traceback.format_exc()
-            logging.getLogger(__name__).error("prosa_pdf: apply_colors failed: %s", str(e))
-            logging.getLogger(__name__).debug("prosa_pdf: apply_colors traceback:\n%s", tb[:800])
-            blocks_with_colors = variant_blocks
-        
-        # 2) Tag-Sichtbarkeit anwenden (wenn tag_config vorhanden)
-        try:
-            # WICHTIG: Tag-Sichtbarkeit basierend auf tag_config anwenden (wie in Poesie)
-            # apply_tag_visibility wird IMMER aufgerufen (auch bei TAGS), um die Tag-Sichtbarkeit zu steuern
-            # Bei TAGS-Varianten: Entfernt nur die Tags, die in tag_config als "hide" markiert sind
-            # Bei NO_TAGS-Varianten: Werden später alle Tags entfernt
-            hidden_by_wortart = (final_tag_config.get("hidden_tags_by_wortart") if isinstance(final_tag_config, dict) else None)
-            blocks_after_visibility = preprocess.apply_tag_visibility(blocks_with_colors, final_tag_config, hidden_tags_by_wortart=hidden_by_wortart)
-            logging.getLogger(__name__).info("prosa_pdf: applied tag visibility (tag_mode=%s)", tag_mode)
-        except Exception as e:
-            tb = traceback.format_exc()
-            logging.getLogger(__name__).error("prosa_pdf: apply_colors/apply_tag_visibility failed (continuing): %s", str(e))
-            logging.getLogger(__name__).debug("prosa_pdf: apply_colors/apply_tag_visibility traceback (first 800 chars):\n%s", tb[:800])
-            # WICHTIG: Verwende blocks_with_colors falls verfügbar, sonst variant_blocks
-            blocks_after_visibility = blocks_with_colors if 'blocks_with_colors' in locals() else variant_blocks
-        
-        # 3) Entferne ALLE Tags für NO_TAGS-Varianten (NUR bei NO_TAGS!)
-        if tag_mode != "TAGS":  # NO_TAGS - wie in Poesie
-            # Bei NO_TAGS-Varianten: Entferne ALLE Tags komplett
-            # WICHTIG: Verwende blocks_after_visibility (die bereits durch apply_tag_visibility verarbeitet wurde)
-            blocks_after_visibility = preprocess.remove_all_tags(blocks_after_visibility, final_tag_config)
-            # NO_TAG variant: strip any remaining tags from tokens
-            for b in blocks_after_visibility:
-                if b.get("type") not in ("pair", "flow"):
-                    continue
-                for i, t in enumerate(b.get("gr_tokens", [])):
-                    if t:
-                        b["gr_tokens"][i] = preprocess.remove_all_tags_from_token(t)
-            logging.getLogger(__name__).info("prosa_pdf: NO_TAGS mode - removed all tags")
-        # Bei TAGS-Varianten: blocks_after_visibility wurde bereits oben gesetzt (oder ist blocks_with_colors)
-        # Es ist bereits korrekt, keine weitere Aktion nötig
-
-        # Schritt 3: Entferne leere Übersetzungszeilen (wenn alle Übersetzungen ausgeblendet)
-        # WICHTIG: Verwende blocks_after_visibility, nicht blocks_with_colors!
-        blocks_no_empty_trans = preprocess.remove_empty_translation_lines(blocks_after_visibility)
-        
-        # Prüfe, ob alle Übersetzungen ausgeblendet sind (für _NoTrans Tag)
-        has_no_translations = preprocess.all_blocks_have_no_translations(blocks_no_empty_trans)
-
-        # Schritt 4: Farbsymbole entfernen (für _BlackWhite-Versionen).
-        # WICHTIG: Bei BLACK_WHITE werden automatische Farbsymbole entfernt (force_color=False),
-        # aber händisch gesetzte Symbole (force_color=True) bleiben erhalten!
-        # Dies ermöglicht es, in BlackWhite-PDFs einzelne Wörter gezielt zu färben.
-        if color_mode == "BLACK_WHITE":
-            variant_final_blocks = preprocess.remove_all_color_symbols(blocks_no_empty_trans)
-        else:
-            variant_final_blocks = blocks_no_empty_trans  # Bei COLOR alle Farben behalten
-
-        # Schritt 5: PDF rendern mit dem final prozessierten Block-Set.
-        out_name = output_pdf_name(base, NameOpts(strength=strength, color_mode=color_mode, tag_mode=tag_mode))
-        
-        # Füge _NoTrans hinzu, wenn alle Übersetzungen ausgeblendet sind
-        if has_no_translations:
-            p = Path(out_name)
-            out_name = p.with_name(p.stem + "_NoTrans" + p.suffix).name
-        
-        # WICHTIG: PDFs werden im aktuellen Verzeichnis (ROOT) erstellt
-        # Der Adapter (build_prosa_drafts_adapter.py) verschiebt sie dann in den korrekten Ordner
-        out_path = out_name
-        
-        opts = PdfRenderOptions(strength=strength, color_mode=color_mode, tag_mode=tag_mode, versmass_mode="REMOVE_MARKERS")
-        
-        # build the PDF via unified API
-        logger.info("prosa_pdf: about to call reportlab build() for %s (blocks=%d)", out_name, len(variant_final_blocks))
-        try:
-            sys.stdout.flush()
-        except Exception:
-            pass
-        try:
-            create_pdf_unified("prosa", Prosa, variant_final_blocks, out_path, opts, payload=None, tag_config=final_tag_config, hide_pipes=hide_pipes)
-            logger.info("prosa_pdf: reportlab build() finished for %s", out_name)
-            print(f"✓ PDF erstellt → {out_name}")
-        except Exception:
-            logger.exception("prosa_pdf: reportlab build() FAILED for %s", out_name)
-            raise
+        variant_jobs.append((variant_index, strength, color_mode, tag_mode))
+    
+    if jobs > 1 and len(variant_jobs) > 1:
+        # NEU: Parallelmodus - eine Variante pro Worker-Prozess
+        # Die Blöcke werden nur einmal an die Worker übergeben, Logs kommen geordnet pro Variante zurück
+        for variant_index, strength, color_mode, tag_mode in variant_jobs:
+            logging.getLogger(__name__).info("prosa_pdf: queueing variant %d/%d (strength=%s, color=%s, tag=%s)", variant_index, num_variants, strength, color_mode, tag_mode)
+        produced.extend(variant_pool.run_variants(
+            _render_variant,
+            dict(common_blocks=common_blocks, base=base, final_tag_config=final_tag_config, hide_pipes=hide_pipes, out_dir=out_dir),
+            [dict(strength=strength, color_mode=color_mode, tag_mode=tag_mode) for _, strength, color_mode, tag_mode in variant_jobs],
+            jobs,
+            label="prosa_pdf",
+        ))
+    else:
+        for variant_index, strength, color_mode, tag_mode in variant_jobs:
+            logging.getLogger(__name__).info("prosa_pdf: processing variant %d/%d (strength=%s, color=%s, tag=%s)", variant_index, num_variants, strength, color_mode, tag_mode)
+            try:
+                sys.stdout.flush()
+            except Exception:
+                pass
+            produced.append(_render_variant(common_blocks, base, strength, color_mode, tag_mode, final_tag_config, hide_pipes, out_dir))
     
     # ═══════════════════════════════════════════════════════════════════════════════════════
     # ZUSAMMENFASSUNG: Zeige übersprungene Varianten (falls vorhanden)
@@ -642,6 +739,7 @@ def _process_one_input(infile: str, tag_config: dict = None, hide_pipes: bool =
             pass
     except Exception:
         pass
+    return produced
 
 def main():
     # Parse command line arguments for tag config
@@ -650,10 +748,18 @@ def main():
     parser.add_argument('input_files', nargs='*', help='Input files to process')
     parser.add_argument('--tag-config', help='JSON file with tag configuration')
     parser.add_argument('--hide-pipes', action='store_true', help='Hide pipes (|) in translations')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes for variant rendering (0 = all CPU cores, default: 1 = serial)')
+    # NEU: wird schon beim Modul-Import ausgewertet (sys.argv), hier nur für --help / Argument-Prüfung
+    parser.add_argument('--profile-import', action='store_true',
+                        help='Report aggregated per-module import times on exit (stderr)')
+    parser.add_argument('--no-parse-cache', action='store_true',
+                        help='Always parse the input (bypass the pre-parsed block cache in .parse_cache/)')
     args = parser.parse_args()
     
     # Use input files from arguments, or fallback to default discovery
-    inputs = args.input_files if args.input_files else _args_or_default()
+    # (Discovery statt sys.argv, sonst landen reine Optionen wie --profile-import in der Dateiliste)
+    inputs = args.input_files if args.input_files else _discover_inputs_default()
     if not inputs:
         print("⚠ Keine .txt gefunden."); return
     
@@ -688,7 +794,8 @@ def main():
     for infile in inputs:
         print(f"→ Verarbeite: {infile}")
         try:
-            _process_one_input(infile, tag_config, hide_pipes=args.hide_pipes)
+            _process_one_input(infile, tag_config, hide_pipes=args.hide_pipes, jobs=args.jobs,
+                               use_parse_cache=not args.no_parse_cache)
         except Exception as e:
             print(f"✗ Fehler bei {infile}: {e}")
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/column_widths.py
+-----------------------
+Gebündelte Breitenmessung für die Token-Matrix eines ganzen Flows (GR/DE/EN → Spaltenbreiten).
+
+Hintergrund:
+- col_width(k) in Prosa_Code.build_tables_for_stream hat jede Spalte einzeln gemessen: GR, DE, EN
+  über visible_measure_token (Farbcodes entfernen, Token zerlegen, Tag-Partition, Glyphbreiten),
+  danach _calculate_dynamic_token_spacing, das dieselben Strings noch einmal misst.
+- Über die Flows eines Dokuments wiederholen sich die meisten Zellen (Artikel, Partikel, 'und',
+  'der', Satzzeichen). TokenWidthTable misst jeden VERSCHIEDENEN Wert genau einmal und liefert
+  die Breiten einer ganzen Zeile in einem Durchgang als array('d') in Spaltenreihenfolge.
+- Die Glyphbreiten selbst kommen weiter aus shared/text_metrics.py (Zeichentabelle pro Font);
+  hier wird nur die teure Vorverarbeitung pro Token eingespart.
+
+Öffentliche API:
+- TokenWidthTable(measure)      (.widths(row) -> array('d') / .width(key) / hits / misses / len)
+- width_table(tables, key, measure, *, anchor=None) -> TokenWidthTable
+
+Konventionen:
+- Reines Python (array('d'), bitgleich zu float); NumPy ist keine Abhängigkeit des Projekts.
+- Schlüssel sind beliebige hashbare Werte (Token-String oder Tupel mehrerer Zellen).
+- Leere Zellen ('' / None) → 0.0, ohne measure aufzurufen.
+- Eine Tabelle gilt für EINE Mess-Konfiguration (Font, Größe, tag_config, Render-Kontext).
+  Die Renderer halten ihre Tabellen in RenderContext.width_tables (Schlüssel = Konfiguration),
+  also pro create_pdf-Aufruf – kein prozessweiter Zustand.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+
+# =============================== Public API =================================
+
+class TokenWidthTable:
+    """Memo key → Breite für eine Mess-Konfiguration; misst jeden Schlüssel höchstens einmal."""
+
+    __slots__ = ("_measure", "_table", "_anchor", "hits", "misses")
+
+    def __init__(self, measure: Callable[[Any], float], *, anchor: Any = None):
+        self._measure = measure
+        self._anchor = anchor  # hält ein per id() im Schlüssel referenziertes Objekt am Leben
+        self._table: Dict[Hashable, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def width(self, key: Hashable) -> float:
+        """Breite für einen Schlüssel (gemessen beim ersten Zugriff)."""
+        if not key:
+            return 0.0
+        try:
+            w = self._table[key]
+            self.hits += 1
+            return w
+        except KeyError:
+            w = self._table[key] = self._measure(key)
+            self.misses += 1
+            return w
+
+    def widths(self, row: Iterable[Hashable]) -> array:
+        """Breiten einer ganzen Zeile (Spaltenreihenfolge) in einem Durchgang."""
+        width = self.width
+        return array('d', [width(key) for key in row])
+
+
+def width_table(tables: Dict[Hashable, TokenWidthTable], key: Hashable,
+                measure: Callable[[Any], float], *, anchor: Any = None) -> TokenWidthTable:
+    """
+    Tabelle für key aus tables (beim ersten Zugriff mit measure angelegt).
+    anchor: Objekt, dessen id() in key steckt (z.B. tag_config) – bleibt so lange referenziert
+    wie die Tabelle, die id kann also nicht neu vergeben werden.
+    """
+    table = tables.get(key)
+    if table is None:
+        table = tables[key] = TokenWidthTable(measure, anchor=anchor)
+    return table
+
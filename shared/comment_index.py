@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/comment_index.py
+-----------------------
+Sortierte Intervall-Indizes für Kommentar-Bereiche (Zeilen/Paare → Block bzw. Farbe).
+
+Hintergrund:
+- assign_comment_ranges_to_blocks suchte für JEDEN Inline-Kommentar linear nach dem Zielblock
+  und lief danach noch einmal über ALLE Blöcke, um comment_token_mask für den Bereich zu setzen
+  → O(Kommentare × Blöcke). Kommentarlastige Entwürfe mit hunderten '(n-mk)'-Zeilen merken das.
+- create_pdf (Prosa/Poesie) hat line_comment_colors Zeile für Zeile aufgefüllt; ein einziger
+  Kommentar '(1-90000k)' erzeugte so 90000 Dict-Einträge.
+- Beide Strukturen werden hier einmal sortiert aufgebaut und per bisect in O(log n) abgefragt.
+
+Öffentliche API:
+- PairIndex(keys, items)                 (exact(k) / at_or_before(k) / between(s, e))
+- PairIndex.from_blocks(blocks)          (_pair_index der pair/flow-Blöcke → Block)
+- LineColorIndex.from_comments(comments) (Zeile → Kommentar-Farbe, Mapping-kompatibel)
+
+Konventionen:
+- Schlüssel sind ints; bei doppelten Schlüsseln gewinnt (wie beim Dict) der LETZTE Eintrag.
+- LineColorIndex verhält sich wie das bisherige Dict {zeile: farbe}: überlappen sich Kommentare,
+  gewinnt der später in der Liste stehende. Iteration liefert die abgedeckten Zeilen aufsteigend.
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# =============================== Paar-Index =================================
+
+class PairIndex:
+    """
+    Sortierter Index int-Schlüssel → Objekt (z.B. _pair_index → Block).
+
+    exact(k)          Objekt mit Schlüssel k oder None
+    at_or_before(k)   Objekt mit dem größten Schlüssel <= k oder None
+    between(s, e)     alle Objekte mit s <= Schlüssel <= e (aufsteigend)
+    """
+    __slots__ = ("_keys", "_items")
+
+    def __init__(self, keys: Iterable[int], items: Iterable[Any]):
+        pairs: Dict[int, Any] = {}
+        for k, item in zip(keys, items):
+            pairs[k] = item  # letzter gewinnt (wie bisher beim Dict/linearen Suchen von hinten)
+        self._keys: List[int] = sorted(pairs)
+        self._items: List[Any] = [pairs[k] for k in self._keys]
+
+    @classmethod
+    def from_blocks(cls, blocks: Sequence[Any]) -> "PairIndex":
+        """Index über die bereits vergebenen _pair_index-Werte der Blöcke."""
+        keys, items = [], []
+        for b in blocks:
+            if isinstance(b, dict) and isinstance(b.get('_pair_index'), int):
+                keys.append(b['_pair_index'])
+                items.append(b)
+        return cls(keys, items)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def exact(self, key: int) -> Optional[Any]:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._items[i]
+        return None
+
+    def at_or_before(self, key: int) -> Optional[Any]:
+        i = bisect_right(self._keys, key)
+        return self._items[i - 1] if i else None
+
+    def between(self, start: int, end: int) -> List[Any]:
+        if end < start:
+            return []
+        return self._items[bisect_left(self._keys, start):bisect_right(self._keys, end)]
+
+
+# =============================== Zeilen-Farben ==============================
+
+class LineColorIndex(Mapping):
+    """
+    Zeile → Kommentar-Farbe als disjunkte, sortierte Segmente [start, end] (inklusive).
+    Ersetzt das zeilenweise aufgefüllte Dict line_comment_colors; Abfragen per bisect.
+    """
+    __slots__ = ("_starts", "_ends", "_colors")
+
+    def __init__(self, segments: Iterable[Tuple[int, int, Any]] = ()):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._colors: List[Any] = []
+        for s, e, color in segments:
+            self._starts.append(s)
+            self._ends.append(e)
+            self._colors.append(color)
+
+    @classmethod
+    def from_comments(cls, comments: Iterable[Dict[str, Any]]) -> "LineColorIndex":
+        """
+        comments: Ergebnis von process_comments_for_coloring (start_line, end_line, color).
+        Sweep über die Bereichsgrenzen; aktiv ist jeweils der zuletzt gelistete Kommentar.
+        """
+        ranges = []
+        for order, c in enumerate(comments):
+            s, e = c.get('start_line'), c.get('end_line')
+            if s is None or e is None or e < s:
+                continue
+            ranges.append((s, e, order, c.get('color')))
+        if not ranges:
+            return cls()
+
+        ranges.sort(key=lambda r: r[0])
+        bounds = sorted({r[0] for r in ranges} | {r[1] + 1 for r in ranges})
+        active: List[Tuple[int, int, Any]] = []  # Heap: (-order, end, color)
+        segments: List[Tuple[int, int, Any]] = []
+        j = 0
+        for k, pos in enumerate(bounds[:-1]):
+            while j < len(ranges) and ranges[j][0] == pos:
+                s, e, order, color = ranges[j]
+                heapq.heappush(active, (-order, e, color))
+                j += 1
+            while active and active[0][1] < pos:
+                heapq.heappop(active)
+            if not active:
+                continue
+            color = active[0][2]
+            seg_end = bounds[k + 1] - 1
+            if segments and segments[-1][1] == pos - 1 and segments[-1][2] == color:
+                segments[-1] = (segments[-1][0], seg_end, color)
+            else:
+                segments.append((pos, seg_end, color))
+        return cls(segments)
+
+    def _find(self, line: Any) -> int:
+        if not isinstance(line, int):
+            return -1
+        i = bisect_right(self._starts, line) - 1
+        if i >= 0 and line <= self._ends[i]:
+            return i
+        return -1
+
+    def __getitem__(self, line: int) -> Any:
+        i = self._find(line)
+        if i < 0:
+            raise KeyError(line)
+        return self._colors[i]
+
+    def __contains__(self, line: object) -> bool:
+        return self._find(line) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        for s, e in zip(self._starts, self._ends):
+            yield from range(s, e + 1)
+
+    def __len__(self) -> int:
+        return sum(e - s + 1 for s, e in zip(self._starts, self._ends))
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def segments(self) -> List[Tuple[int, int, Any]]:
+        """Die disjunkten Segmente (start, end, farbe) in aufsteigender Reihenfolge."""
+        return list(zip(self._starts, self._ends, self._colors))
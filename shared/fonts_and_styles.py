@@ -19,6 +19,8 @@ Ziele:
 Konventionen:
 - Font-Familie im ReportLab-Register: "DejaVu" (Regular) und "DejaVu-Bold" (Bold).
 - Standard-Suchpfad:  ../shared/fonts/ relativ zu dieser Datei.
+- Registriert werden LazyTTFonts (shared/glyph_metrics.py): Messen ohne TTF-Parsing,
+  volles Laden erst beim Einbetten der Glyphen (GLYPH_METRICS_CACHE=0 → klassischer TTFont).
 """
 
 from __future__ import annotations
@@ -27,9 +29,11 @@ from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
 
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 
+# NEU: Glyph-Metriken aus dem Platten-Cache; die TTF wird erst beim Einbetten vollständig geladen
+from .glyph_metrics import make_ttfont
+
 # ========================== Modulzustand / Defaults ==========================
 
 DEFAULT_FAMILY = {
@@ -95,8 +99,8 @@ def register_dejavu(font_dir: Optional[str | Path] = None) -> Dict[str, str]:
     fdir = _resolve_font_dir(Path(font_dir) if font_dir is not None else None)
     reg_ttf, bld_ttf = _font_files_exist(fdir)
 
-    pdfmetrics.registerFont(TTFont(family["regular"], str(reg_ttf)))
-    pdfmetrics.registerFont(TTFont(family["bold"],    str(bld_ttf)))
+    pdfmetrics.registerFont(make_ttfont(family["regular"], reg_ttf))
+    pdfmetrics.registerFont(make_ttfont(family["bold"],    bld_ttf))
 
     try:
         from reportlab.pdfbase.pdfmetrics import registerFontFamily
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/glyph_metrics.py
+-----------------------
+Vorkompilierte Glyph-Metriken für die DejaVu-TTFs (Zeichenbreiten, Ascent/Descent) mit Platten-Cache.
+
+Hintergrund:
+- register_dejavu() hat bei JEDEM Interpreter-Start DejaVuSans.ttf und DejaVuSans-Bold.ttf
+  komplett mit TTFont geparst (alle Tabellen, ~6000 Zeichenbreiten je Font). Die Draft-Adapter
+  starten pro Entwurf einen frischen Interpreter – der Preis fällt also jedes Mal an.
+- Zum MESSEN (text_metrics.string_width, Paragraph.wrap, getAscentDescent) braucht reportlab nur
+  face.charWidths, face.defaultWidth, face.ascent/descent und face.name. Diese Werte liegen
+  serialisiert (marshal) neben den Fonts und werden in ~1 ms geladen.
+- LazyTTFont ist ein TTFont, dessen face zunächst nur diese Metriken liefert. Erst wenn reportlab
+  mehr braucht (charToGlyph beim Einbetten von Glyphen, Subset-Erzeugung …), wird die TTF-Datei
+  wie bisher vollständig geladen. Die PDFs bleiben dadurch bytegleich.
+
+Öffentliche API:
+- glyph_metrics_cache_enabled() -> bool
+- load_metrics(path) -> dict            (aus dem Cache; bei fehlendem/veraltetem Eintrag neu erzeugt)
+- LazyTTFont(name, path, metrics)       (TTFont mit verzögert geladenem face)
+- make_ttfont(name, path) -> TTFont     (LazyTTFont oder – abgeschaltet – klassischer TTFont)
+
+Konventionen:
+- Ablage: GLYPH_METRICS_DIR (Standard shared/fonts/.metrics/), eine Datei <ttf-name>.metrics pro Font.
+- Invalidierung über den Hash der Font-Datei (BLAKE2b): jede geänderte TTF erzeugt den Eintrag neu.
+  Größe + mtime werden mitgespeichert; sind sie unverändert, entfällt das Hashen (wie der Git-Index).
+- Schreiben atomar (tmp + os.replace); ist das Verzeichnis nicht beschreibbar, wird ohne Cache
+  weitergemacht (Metriken dann direkt aus der geladenen TTF).
+- Abschalten über GLYPH_METRICS_CACHE=0 (dann TTFont wie bisher).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import uuid
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, Tuple
+from weakref import WeakKeyDictionary
+
+from reportlab import rl_config
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFont, TTFontFace, unShapedFontGlob
+
+# ========================== Modulzustand / Defaults ==========================
+
+GLYPH_METRICS_DIR = Path(os.environ.get(
+    "GLYPH_METRICS_DIR", str(Path(__file__).resolve().parent / "fonts" / ".metrics")))
+
+# Formatversion der .metrics-Dateien (bei Strukturänderungen erhöhen)
+_FORMAT = 1
+# Attribute, die das Metrik-Face ohne TTF-Parsing liefert
+_METRIC_ATTRS = ("name", "charWidths", "defaultWidth", "ascent", "descent", "unitsPerEm")
+
+
+# =============================== Helper =====================================
+
+def _file_hash(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+def _cache_file(path: Path) -> Path:
+    return GLYPH_METRICS_DIR / f"{path.name}.metrics"
+
+def _read_cache(path: Path) -> Dict[str, Any] | None:
+    try:
+        data = marshal.loads(_cache_file(path).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != _FORMAT:
+        return None
+    return data
+
+def _write_cache(path: Path, data: Dict[str, Any]) -> None:
+    target = _cache_file(path)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(marshal.dumps(data))
+        os.replace(tmp, target)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+def _metrics_from_face(face: TTFontFace, digest: str) -> Dict[str, Any]:
+    data = {attr: getattr(face, attr) for attr in _METRIC_ATTRS}
+    data["charWidths"] = dict(face.charWidths)
+    data.update(format=_FORMAT, hash=digest)
+    return data
+
+def _load(path: Path) -> Tuple[Dict[str, Any], TTFontFace | None]:
+    """(Metriken, geparstes Face oder None) – das Face nur bei Cache-Miss (nicht doppelt parsen)."""
+    st = path.stat()
+    stamp = [st.st_size, st.st_mtime_ns]
+    data = _read_cache(path)
+    if data is not None and data.get("stat") == stamp:
+        return data, None  # Datei unverändert seit dem Hashen → kein erneutes Hashen
+    digest = _file_hash(path)
+    if data is not None and data.get("hash") == digest:
+        data["stat"] = stamp  # nur berührt (z.B. Checkout), Inhalt gleich
+        _write_cache(path, data)
+        return data, None
+    face = TTFontFace(str(path))
+    data = _metrics_from_face(face, digest)
+    data["stat"] = stamp
+    _write_cache(path, data)
+    return data, face
+
+
+class _MetricsFace:
+    """
+    Leichtgewichtiges face: Metriken aus dem Cache; jeder andere Attributzugriff lädt die TTF
+    über den Besitzer (LazyTTFont) und delegiert an das echte TTFontFace.
+    """
+
+    builtIn = 0
+
+    def __init__(self, owner: "LazyTTFont", metrics: Dict[str, Any]):
+        self._owner = owner
+        for attr in _METRIC_ATTRS:
+            setattr(self, attr, metrics[attr])
+
+    def getCharWidth(self, code):
+        return self.charWidths.get(code, self.defaultWidth)
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self._owner.full_face(), attr)
+
+
+# =============================== Public API =================================
+
+def glyph_metrics_cache_enabled() -> bool:
+    """Glyph-Metrik-Cache aktiv? (Standard: ja; GLYPH_METRICS_CACHE=0 schaltet ab)"""
+    return os.environ.get("GLYPH_METRICS_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def load_metrics(path: str | Path) -> Dict[str, Any]:
+    """Metriken für eine TTF-Datei – aus dem Platten-Cache oder (einmalig) aus der geparsten TTF."""
+    return _load(Path(path))[0]
+
+
+class LazyTTFont(TTFont):
+    """TTFont, der die TTF-Datei erst lädt, wenn mehr als Messwerte gebraucht werden (Einbetten)."""
+
+    def __init__(self, name: str, filename: str | Path, metrics: Dict[str, Any],
+                 asciiReadable=None, shapable=True):
+        # WICHTIG: TTFont.__init__ NICHT aufrufen – es parst die komplette TTF
+        self.fontName = name
+        self.filename = str(filename)
+        self._full_face = None
+        self._metrics_face = _MetricsFace(self, metrics)
+        self.encoding = TTEncoding()
+        self.state = WeakKeyDictionary()
+        if asciiReadable is None:
+            asciiReadable = rl_config.ttfAsciiReadable
+        self._asciiReadable = asciiReadable
+        # shapable wie in TTFont.__init__ (unShapedFontGlob prüft nur den Namen)
+        self.shapable = shapable and not any(fnmatch(name, g) for g in unShapedFontGlob)
+
+    @property
+    def face(self):
+        return self._full_face if self._full_face is not None else self._metrics_face
+
+    @face.setter
+    def face(self, value):
+        self._full_face = value
+
+    def full_face(self) -> TTFontFace:
+        """Echtes TTFontFace (lädt die TTF beim ersten Aufruf)."""
+        if self._full_face is None:
+            self._full_face = TTFontFace(self.filename)
+        return self._full_face
+
+
+def make_ttfont(name: str, path: str | Path) -> TTFont:
+    """TTFont für register_dejavu: LazyTTFont mit Cache-Metriken oder (abgeschaltet) klassisch."""
+    if not glyph_metrics_cache_enabled():
+        return TTFont(name, str(path))
+    metrics, face = _load(Path(path))
+    font = LazyTTFont(name, path, metrics)
+    if face is not None:
+        font.face = face  # Cache-Miss: TTF ist schon geparst
+    return font
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/interlinear_row.py
+-------------------------
+Leichtgewichtiges Zeilen-Flowable für interlineare Token-Zeilen (GR / DE / EN …) statt reportlab-Table.
+
+Hintergrund:
+- Jedes Slice eines Prosa-Flows (build_tables_for_stream) und jede Verszeile (build_tables_for_pair)
+  wird bisher als reportlab-Table mit einem Paragraph pro Zelle gesetzt; Übersetzungen stehen in
+  Prosa zusätzlich in einer verschachtelten Table pro Spalte.
+- Table ist für beliebige Tabellen gebaut (Spans, Linien, Hintergründe, Zeilenumbruch über Seiten)
+  und rechnet bei jedem wrap()/split() – auch bei jedem KeepTogether-Versuch – alles neu.
+- InterlinearRow kennt nur, was die Renderer tatsächlich nutzen: feste Spaltenbreiten (bereits
+  vorgemessen), Zellen aus Flowables oder Flowable-Listen (untereinander gestapelt), Paddings,
+  ALIGN und VALIGN pro Zelle. Das Layout wird EINMAL berechnet (O(Zellen)) und gecacht; split()
+  liefert [] (eine interlineare Zeile wird nie zwischen GR und Übersetzung getrennt) – wie
+  Poesie_Code.ToplineTokenFlowable für die Versmaß-Zeilen.
+- Geometrie und Zeichenpositionen folgen Table._calc_height / Table._drawCell: alle Texte stehen
+  an denselben absoluten Positionen (benchmarks/bench_interlinear_row.py prüft das), es fehlen nur
+  die Grafikzustände (q/Q/Font), die Table pro Zelle schreibt.
+
+Öffentliche API:
+- row_flowable_enabled() -> bool
+- InterlinearRow(rows, col_widths, style_cmds=(), *, h_align='LEFT')   (.setStyle wie Table)
+- interlinear_table(rows, col_widths, style_cmds, *, h_align='LEFT')
+    → InterlinearRow, wenn aktiviert und alle Befehle/Zellen unterstützt werden, sonst Table
+
+Konventionen:
+- Abschalten über INTERLINEAR_ROW_FLOWABLE=0 → wieder reportlab-Table (bytegleich zum alten Stand).
+- Unterstützte Style-Befehle: LEFTPADDING, RIGHTPADDING, TOPPADDING, BOTTOMPADDING, ALIGN, VALIGN
+  (mit Bereichen wie bei TableStyle, negative Indizes erlaubt). Alles andere (BACKGROUND, SPAN,
+  GRID …) oder Text-Zellen (str) → Fallback auf Table.
+- Wie bei Table gilt: Padding-Defaults 6/6/3/3, ALIGN LEFT, VALIGN BOTTOM.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Sequence, Tuple
+
+from reportlab.platypus import Flowable, Table, TableStyle
+
+# ========================== Modulzustand / Defaults ==========================
+
+# Table-Defaults (reportlab.platypus.tables.CellStyle)
+_DEFAULTS = {"LEFTPADDING": 6.0, "RIGHTPADDING": 6.0, "TOPPADDING": 3.0, "BOTTOMPADDING": 3.0,
+             "ALIGN": "LEFT", "VALIGN": "BOTTOM"}
+_SUPPORTED = frozenset(_DEFAULTS)
+
+
+# =============================== Helper =====================================
+
+def _cell_list(v: Any) -> Tuple[Flowable, ...] | None:
+    """Zelle → Tupel von Flowables (wie Table); None, wenn nicht unterstützt (z.B. str)."""
+    if isinstance(v, Flowable):
+        return (v,)
+    if isinstance(v, (list, tuple)) and all(isinstance(f, Flowable) for f in v):
+        return tuple(v)
+    return None
+
+def _resolve_styles(style_cmds: Sequence[tuple], nrows: int, ncols: int) -> dict:
+    """Wendet die Befehle in Reihenfolge an (spätere überschreiben frühere, wie TableStyle)."""
+    grid = {op: [[val] * ncols for _ in range(nrows)] for op, val in _DEFAULTS.items()}
+    for cmd in style_cmds:
+        op, (sc, sr), (ec, er), value = cmd[0], cmd[1], cmd[2], cmd[3]
+        if sc < 0: sc += ncols
+        if ec < 0: ec += ncols
+        if sr < 0: sr += nrows
+        if er < 0: er += nrows
+        if op == "ALIGN" and value == "CENTRE":
+            value = "CENTER"
+        target = grid[op]
+        for r in range(sr, min(er, nrows - 1) + 1):
+            row = target[r]
+            for c in range(sc, min(ec, ncols - 1) + 1):
+                row[c] = value
+    return grid
+
+
+# =============================== Public API =================================
+
+def row_flowable_enabled() -> bool:
+    """Zeilen-Flowable statt Table? (Standard: ja; INTERLINEAR_ROW_FLOWABLE=0 schaltet ab)"""
+    return os.environ.get("INTERLINEAR_ROW_FLOWABLE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class InterlinearRow(Flowable):
+    """
+    Raster aus Zeilen × vorgemessenen Spalten. Zellen sind Flowables oder Listen von Flowables.
+    wrap() berechnet die Zeilenhöhen einmal (Ergebnis gecacht), draw() setzt die Zellen direkt.
+    """
+
+    def __init__(self, rows: Sequence[Sequence[Any]], col_widths: Sequence[float],
+                 style_cmds: Sequence[tuple] = (), *, h_align: str = "LEFT"):
+        super().__init__()
+        self._cells = [[_cell_list(v) for v in row] for row in rows]
+        self._col_widths = [float(w) for w in col_widths]
+        self._cmds = list(style_cmds)
+        self._style = _resolve_styles(self._cmds, len(self._cells), len(self._col_widths))
+        self.hAlign = h_align
+        self._layout = None  # (Zeilenhöhen, Zell-Geometrie)
+
+    def setStyle(self, tblstyle):
+        """Wie Table.setStyle (TableStyle oder Befehlsliste) – die Aufrufer setzen z.B. TOPPADDING nach."""
+        cmds = tblstyle.getCommands() if hasattr(tblstyle, "getCommands") else list(tblstyle)
+        unsupported = [cmd[0] for cmd in cmds if cmd[0] not in _SUPPORTED]
+        if unsupported:
+            raise ValueError(f"InterlinearRow: Style-Befehl(e) nicht unterstützt: {unsupported}")
+        self._cmds.extend(cmds)
+        self._style = _resolve_styles(self._cmds, len(self._cells), len(self._col_widths))
+        self._layout = None
+
+    def _cell_geom(self, r: int, c: int, cell: Tuple[Flowable, ...]):
+        """Wie Table._listCellGeom: (Breiten, Höhen, Gesamthöhe) der gestapelten Flowables."""
+        st = self._style
+        canv = getattr(self, "canv", None)
+        # Spaltenbreite 0 → natürliche Breite (wie Table: w or self._listValueWidth(v))
+        w = self._col_widths[c] or max(v.wrapOn(canv, 72000, 72000)[0] for v in cell)
+        aW = w - st["LEFTPADDING"][r][c] - st["RIGHTPADDING"][r][c]
+        if aW < 0:
+            raise ValueError(f"{self.identity()}: flowable given negative availWidth={aW} width={w}")
+        aH = 72000 - st["TOPPADDING"][r][c] - st["BOTTOMPADDING"][r][c]
+        W, H, t, sb0, sa = [], [], 0.0, None, 0.0
+        for v in cell:
+            vw, vh = v.wrapOn(canv, aW, aH)
+            sb, sa = v.getSpaceBefore(), v.getSpaceAfter()
+            W.append(vw)
+            H.append(vh)
+            t += vh + sa + sb
+            if sb0 is None:
+                sb0 = sb
+        return W, H, (t - sb0 - sa) if cell else 0.0
+
+    def _compute_layout(self):
+        st = self._style
+        heights, geoms = [], []
+        for r, row in enumerate(self._cells):
+            h, row_geom = 0.0, []
+            for c, cell in enumerate(row):
+                geom = self._cell_geom(r, c, cell) if cell else ([], [], 0.0)
+                row_geom.append(geom)
+                h = max(h, geom[2] + st["TOPPADDING"][r][c] + st["BOTTOMPADDING"][r][c])
+            heights.append(h)
+            geoms.append(row_geom)
+        self._layout = (heights, geoms)
+        self.width = sum(self._col_widths)
+        self.height = sum(heights)
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout is None:
+            self._compute_layout()
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        return []  # GR und Übersetzungen bleiben zusammen
+
+    def draw(self):
+        heights, geoms = self._layout
+        st = self._style
+        canv = self.canv
+        rowpos = self.height
+        for r, row in enumerate(self._cells):
+            rowheight = heights[r]
+            rowpos -= rowheight
+            colpos = 0.0
+            for c, cell in enumerate(row):
+                colwidth = self._col_widths[c]
+                if cell:
+                    W, H, h = geoms[r][c]
+                    lp, rp = st["LEFTPADDING"][r][c], st["RIGHTPADDING"][r][c]
+                    tp, bp = st["TOPPADDING"][r][c], st["BOTTOMPADDING"][r][c]
+                    valign, just = st["VALIGN"][r][c], st["ALIGN"][r][c]
+                    if valign == "TOP":
+                        y = rowpos + rowheight - tp
+                    elif valign == "BOTTOM":
+                        y = rowpos + bp + h
+                    else:
+                        y = rowpos + (rowheight + bp - tp + h) / 2.0
+                    y += cell[0].getSpaceBefore()
+                    for v, w, vh in zip(cell, W, H):
+                        if just == "RIGHT":
+                            x = colpos + colwidth - rp - w
+                        elif just == "CENTER":
+                            x = colpos + (colwidth + lp - rp - w) / 2.0
+                        else:
+                            x = colpos + lp
+                        y -= v.getSpaceBefore()
+                        y -= vh
+                        v.drawOn(canv, x, y)
+                        y -= v.getSpaceAfter()
+                colpos += colwidth
+
+
+def interlinear_table(rows: Sequence[Sequence[Any]], col_widths: Sequence[float],
+                      style_cmds: Sequence[tuple], *, h_align: str = "LEFT") -> Flowable:
+    """InterlinearRow, wenn aktiviert und unterstützt – sonst Table mit TableStyle (wie bisher)."""
+    if (row_flowable_enabled()
+            and all(cmd[0] in _SUPPORTED for cmd in style_cmds)
+            and all(_cell_list(v) is not None for row in rows for v in row)):
+        return InterlinearRow(rows, col_widths, style_cmds, h_align=h_align)
+    tbl = Table(rows, colWidths=col_widths, hAlign=h_align)
+    tbl.setStyle(TableStyle(style_cmds))
+    return tbl
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/job_queue.py
+-------------------
+Lokale Job-Queue (SQLite) für Draft-Builds: Zusammenfassen überholter Entwürfe, kleine Entwürfe zuerst,
+Zeiten pro Job.
+
+Hintergrund:
+- Der Workflow entdoppelt nur über die Concurrency-Group und eine Shell-Schleife (neuester Entwurf
+  pro Werkverzeichnis). Lokal/auf einem eigenen Runner laufen Adapter-Aufrufe sonst ungeordnet
+  nebeneinander – ein kurzer Entwurf aus work.html wartet u.U. hinter einem Gorgias-Build (~1 MB).
+- Mit JOB_QUEUE=1 tragen die Adapter ihren Job hier ein und warten auf sein Ende. Jeder wartende
+  Adapter arbeitet dabei selbst Jobs aus der Queue ab (in Prioritätsreihenfolge, höchstens
+  JOB_QUEUE_MAX_RUNNING gleichzeitig) – ein separater Worker ist nicht nötig, aber möglich
+  (python -m shared.job_queue work).
+- Ein Job wird als Subprozess `python build_<art>_drafts_adapter.py <datei> …` mit JOB_QUEUE=0
+  ausgeführt (also exakt wie bisher, inkl. RENDER_DAEMON-Client-Modus, falls gesetzt).
+- Die Zeitgrenze gilt pro Job ab seinem Start (JOB_QUEUE_JOB_TIMEOUT_S, Standard 600 s wie
+  `timeout 600s` im Workflow) – die Wartezeit in der Queue zählt nicht mit.
+
+Öffentliche API:
+- job_queue_enabled() -> bool
+- enqueue(kind, input_path, extra_args=()) -> int             (Job-ID)
+- claim(worker=None) -> Job | None                           (nächster Job nach Priorität)
+- run_job(job) -> int                                        (ausführen + finish)
+- finish(job_id, exit_code, seconds) -> None
+- submit_and_wait(kind, input_path, extra_args=(), *, out=None) -> int
+- work(*, once=False, idle_exit=None) -> int                 (Worker-Schleife)
+- job_stats(limit=20) -> str                                 (letzte Jobs + Zeiten je Größenklasse)
+- CLI: python -m shared.job_queue [work|stats|enqueue KIND DATEI]
+
+Konventionen:
+- Ablage: JOB_QUEUE_DIR (Standard <Projekt>/.job_queue): queue.sqlite3 (WAL) + logs/<id>.log.
+- Zusammenfassen: Schlüssel = Werkverzeichnis unter texte_drafts + SESSION-ID aus dem Dateinamen.
+  Ein neuerer Entwurf (Zeitstempel JJJJMMTT_HHMMSS) markiert ältere wartende Jobs desselben
+  Schlüssels als 'superseded'; ein älterer Entwurf hinter einem neueren wird gar nicht erst gebaut.
+  Laufende Jobs werden nie abgebrochen.
+- Priorität: Größenklasse (log2 der KB) minus Wartezeit / JOB_QUEUE_AGING_S (Standard 60 s) –
+  kleine Entwürfe zuerst, große verhungern nicht. Große Entwürfe (≥ JOB_QUEUE_LARGE_KB, Standard
+  300) belegen nie den letzten freien Platz → kurze Jobs haben immer eine Spur.
+- Zustände: queued → running → done | failed; oder superseded. Laufende Jobs toter Prozesse
+  (pid auf diesem Rechner) gehen zurück in die Queue.
+- WICHTIG: Der Job-Subprozess läuft in einer eigenen Prozessgruppe (start_new_session), und die
+  worker-Spalte trägt SEINE pid, nicht die des wartenden Adapters. Stirbt der Adapter (kill,
+  Ctrl-C, äußeres timeout), wird der Job erst neu vergeben, wenn auch der Render beendet ist –
+  nie zwei Prozesse auf denselben pdf_drafts-Dateien. Bei Ausnahmen beendet run_job die Gruppe.
+- Zeitüberschreitung: run_job beendet die Gruppe nach JOB_QUEUE_JOB_TIMEOUT_S (exit 124 wie
+  timeout(1); 0 = keine Grenze). Läuft ein verwaister Job (Adapter tot) länger als Grenze +
+  _KILL_GRACE_S, beendet ihn der nächste claim() und schließt ihn als failed (124) ab.
+- Abgeschlossene Jobs älter als JOB_QUEUE_KEEP_DAYS (Standard 14) werden samt Log entfernt.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, TextIO
+
+# ========================== Modulzustand / Defaults ==========================
+
+ROOT = Path(__file__).resolve().parent.parent
+
+JOB_QUEUE_DIR = Path(os.environ.get("JOB_QUEUE_DIR", str(ROOT / ".job_queue")))
+JOB_QUEUE_MAX_RUNNING = max(1, int(os.environ.get("JOB_QUEUE_MAX_RUNNING", "2")))
+JOB_QUEUE_LARGE_KB = float(os.environ.get("JOB_QUEUE_LARGE_KB", "300"))
+JOB_QUEUE_AGING_S = float(os.environ.get("JOB_QUEUE_AGING_S", "60"))
+JOB_QUEUE_KEEP_DAYS = float(os.environ.get("JOB_QUEUE_KEEP_DAYS", "14"))
+JOB_QUEUE_JOB_TIMEOUT_S = float(os.environ.get("JOB_QUEUE_JOB_TIMEOUT_S", "600"))
+
+_POLL_S = 0.2
+_KILL_GRACE_S = 30.0  # Vorsprung für run_job, bevor claim() einen verwaisten Job beendet
+_TERMINAL = ("done", "failed", "superseded")
+_ADAPTERS = {"prosa": "build_prosa_drafts_adapter.py", "poesie": "build_poesie_drafts_adapter.py"}
+
+SESSION_RE = re.compile(r'SESSION_([0-9a-fA-F]+)')
+TIMESTAMP_RE = re.compile(r'\d{8}_\d{6}')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind          TEXT NOT NULL,
+    input         TEXT NOT NULL,
+    extra_args    TEXT NOT NULL DEFAULT '',
+    coalesce_key  TEXT NOT NULL,
+    stamp         TEXT NOT NULL,
+    size_bytes    INTEGER NOT NULL,
+    state         TEXT NOT NULL,
+    worker        TEXT,
+    superseded_by INTEGER,
+    exit_code     INTEGER,
+    enqueued_at   REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    run_seconds   REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs(coalesce_key, state);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    input: str
+    extra_args: tuple
+    size_bytes: int
+
+
+# =============================== Helper =====================================
+
+def _connect() -> sqlite3.Connection:
+    JOB_QUEUE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(JOB_QUEUE_DIR / "queue.sqlite3"), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class _Tx:
+    """BEGIN IMMEDIATE … COMMIT/ROLLBACK (Schreibsperre sofort, wie ein kurzer Mutex über Prozesse)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _log_path(job_id: int) -> Path:
+    return JOB_QUEUE_DIR / "logs" / f"{job_id}.log"
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _kill_group(pid: int) -> None:
+    """Prozessgruppe eines Job-Subprozesses beenden (start_new_session → pgid == pid)."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _set_worker(job_id: int, worker: str) -> None:
+    conn = _connect()
+    try:
+        conn.execute("UPDATE jobs SET worker=? WHERE id=? AND state='running'", (worker, job_id))
+    finally:
+        conn.close()
+
+
+def _coalesce_key(input_path: Path) -> str:
+    """Werkverzeichnis relativ zu texte_drafts (sonst Elternverzeichnis) + SESSION-ID."""
+    parts = input_path.parts
+    if "texte_drafts" in parts:
+        work = "/".join(parts[parts.index("texte_drafts") + 1:-1])
+    else:
+        work = str(input_path.parent)
+    m = SESSION_RE.search(input_path.name)
+    return f"{work}|{m.group(1) if m else ''}"
+
+
+def _size_class(size_bytes: int) -> int:
+    return int(size_bytes // 1024 + 1).bit_length()
+
+
+def _requeue_orphans(conn: sqlite3.Connection) -> None:
+    """
+    Laufende Jobs, deren Prozess (auf diesem Rechner) nicht mehr lebt, zurück in die Queue;
+    noch lebende, aber längst überfällige (Grenze + _KILL_GRACE_S) beenden und als failed abschließen.
+    """
+    host = socket.gethostname()
+    now = time.time()
+    for row in conn.execute("SELECT id, worker, started_at FROM jobs WHERE state='running'").fetchall():
+        w_host, _, w_pid = (row["worker"] or "").rpartition(":")
+        if w_host != host or not w_pid.isdigit():
+            continue
+        if not _pid_alive(int(w_pid)):
+            conn.execute("UPDATE jobs SET state='queued', worker=NULL, started_at=NULL WHERE id=?", (row["id"],))
+        elif JOB_QUEUE_JOB_TIMEOUT_S and row["started_at"] and \
+                now - row["started_at"] > JOB_QUEUE_JOB_TIMEOUT_S + _KILL_GRACE_S:
+            _kill_group(int(w_pid))
+            conn.execute("UPDATE jobs SET state='failed', exit_code=124, finished_at=?, run_seconds=? WHERE id=?",
+                         (now, now - row["started_at"], row["id"]))
+
+
+def _prune(conn: sqlite3.Connection) -> None:
+    cutoff = time.time() - JOB_QUEUE_KEEP_DAYS * 86400
+    old = conn.execute("SELECT id FROM jobs WHERE state IN (?,?,?) AND enqueued_at < ?",
+                       (*_TERMINAL, cutoff)).fetchall()
+    for row in old:
+        try:
+            _log_path(row["id"]).unlink()
+        except OSError:
+            pass
+    conn.execute("DELETE FROM jobs WHERE state IN (?,?,?) AND enqueued_at < ?", (*_TERMINAL, cutoff))
+
+
+class _Tail(threading.Thread):
+    """Gibt das Log eines Jobs laufend aus (egal welcher Prozess den Job ausführt)."""
+
+    def __init__(self, path: Path, out: TextIO):
+        super().__init__(name="job_queue-tail", daemon=True)
+        self._path = path
+        self._out = out
+        self._pos = 0
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        while not self._halt.wait(_POLL_S):
+            self._drain()
+
+    def _drain(self) -> None:
+        try:
+            with open(self._path, "rb") as f:
+                f.seek(self._pos)
+                data = f.read()
+        except OSError:
+            return
+        if data:
+            self._pos += len(data)
+            self._out.write(data.decode("utf-8", errors="replace"))
+            self._out.flush()
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+        self._drain()
+
+
+# =============================== Public API =================================
+
+def job_queue_enabled() -> bool:
+    """Adapter tragen ihre Jobs in die Queue ein? (Standard: nein; JOB_QUEUE=1 schaltet ein)"""
+    return os.environ.get("JOB_QUEUE", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def enqueue(kind: str, input_path: str | os.PathLike, extra_args: Sequence[str] = ()) -> int:
+    """Job eintragen und überholte Entwürfe desselben Werks/derselben Session zusammenfassen."""
+    if kind not in _ADAPTERS:
+        raise ValueError(f"Unbekannte Job-Art: {kind}")
+    path = Path(input_path).resolve()
+    key = _coalesce_key(path)
+    m = TIMESTAMP_RE.search(path.name)
+    stamp = m.group(0) if m else "00000000_000000"
+    size = path.stat().st_size
+    conn = _connect()
+    try:
+        with _Tx(conn):
+            _prune(conn)
+            newer = conn.execute(
+                "SELECT id FROM jobs WHERE coalesce_key=? AND stamp>? AND state IN ('queued','running','done') "
+                "ORDER BY stamp DESC LIMIT 1", (key, stamp)).fetchone()
+            cur = conn.execute(
+                "INSERT INTO jobs (kind, input, extra_args, coalesce_key, stamp, size_bytes, state, "
+                "superseded_by, enqueued_at) VALUES (?,?,?,?,?,?,?,?,?)",
+                (kind, str(path), "\x1f".join(extra_args), key, stamp, size,
+                 "superseded" if newer else "queued", newer["id"] if newer else None, time.time()))
+            job_id = cur.lastrowid
+            if not newer:
+                conn.execute("UPDATE jobs SET state='superseded', superseded_by=?, finished_at=? "
+                             "WHERE coalesce_key=? AND state='queued' AND stamp<=? AND id<>?",
+                             (job_id, time.time(), key, stamp, job_id))
+    finally:
+        conn.close()
+    return job_id
+
+
+def claim(worker: Optional[str] = None) -> Optional[Job]:
+    """Nächsten Job nach Priorität übernehmen (oder None: nichts frei bzw. alle Plätze belegt)."""
+    now = time.time()
+    large_bytes = JOB_QUEUE_LARGE_KB * 1024
+    conn = _connect()
+    try:
+        with _Tx(conn):
+            _requeue_orphans(conn)
+            running = conn.execute("SELECT size_bytes FROM jobs WHERE state='running'").fetchall()
+            free = JOB_QUEUE_MAX_RUNNING - len(running)
+            if free <= 0:
+                return None
+            candidates = conn.execute(
+                "SELECT * FROM jobs WHERE state='queued' ORDER BY id").fetchall()
+            candidates.sort(key=lambda r: (_size_class(r["size_bytes"])
+                                           - (now - r["enqueued_at"]) / JOB_QUEUE_AGING_S, r["id"]))
+            for row in candidates:
+                # Große Entwürfe nie auf den letzten freien Platz (außer es gibt nur einen Platz)
+                if row["size_bytes"] >= large_bytes and free == 1 and JOB_QUEUE_MAX_RUNNING > 1:
+                    continue
+                conn.execute("UPDATE jobs SET state='running', worker=?, started_at=? WHERE id=?",
+                             (worker or _worker_id(), now, row["id"]))
+                return Job(row["id"], row["kind"], row["input"],
+                           tuple(a for a in row["extra_args"].split("\x1f") if a), row["size_bytes"])
+            return None
+    finally:
+        conn.close()
+
+
+def finish(job_id: int, exit_code: int, seconds: float) -> None:
+    conn = _connect()
+    try:
+        conn.execute("UPDATE jobs SET state=?, exit_code=?, finished_at=?, run_seconds=? WHERE id=?",
+                     ("done" if exit_code == 0 else "failed", exit_code, time.time(), seconds, job_id))
+    finally:
+        conn.close()
+
+
+def run_job(job: Job) -> int:
+    """
+    Job als Adapter-Subprozess ausführen (Ausgabe → logs/<id>.log) und abschließen.
+    Eigene Prozessgruppe, pid als worker, Grenze JOB_QUEUE_JOB_TIMEOUT_S (siehe Konventionen).
+    """
+    log = _log_path(job.id)
+    log.parent.mkdir(parents=True, exist_ok=True)
+    cmd = [sys.executable, str(ROOT / _ADAPTERS[job.kind]), job.input, *job.extra_args]
+    env = dict(os.environ, JOB_QUEUE="0", PYTHONUNBUFFERED="1")
+    t0 = time.perf_counter()
+    with open(log, "ab") as f:
+        try:
+            proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=f, stderr=subprocess.STDOUT,
+                                    start_new_session=True)
+        except OSError as e:
+            f.write(f"✗ Job {job.id} nicht startbar: {e}\n".encode("utf-8"))
+            rc = 1
+        else:
+            try:
+                _set_worker(job.id, f"{socket.gethostname()}:{proc.pid}")
+                rc = proc.wait(timeout=JOB_QUEUE_JOB_TIMEOUT_S or None)
+            except subprocess.TimeoutExpired:
+                f.write(f"✗ Job {job.id} nach {JOB_QUEUE_JOB_TIMEOUT_S:.0f} s abgebrochen\n".encode("utf-8"))
+                rc = 124
+            finally:
+                # Auch bei Ctrl-C/Ausnahme: keinen Render ohne Besitzer zurücklassen
+                if proc.poll() is None:
+                    _kill_group(proc.pid)
+                    proc.wait()
+    finish(job.id, rc, time.perf_counter() - t0)
+    return rc
+
+
+def submit_and_wait(kind: str, input_path: str | os.PathLike, extra_args: Sequence[str] = (), *,
+                    out: Optional[TextIO] = None) -> int:
+    """
+    Job eintragen, bis zu seinem Ende Jobs aus der Queue abarbeiten (auch fremde, nach Priorität)
+    und das Log des eigenen Jobs laufend ausgeben. Rückgabe: Exit-Code (überholt → 0).
+    """
+    out = out or sys.stdout
+    job_id = enqueue(kind, input_path, extra_args)
+    print(f"→ Job {job_id} in der Queue ({JOB_QUEUE_DIR})", file=out, flush=True)
+    tail = _Tail(_log_path(job_id), out)
+    tail.start()
+    try:
+        while True:
+            conn = _connect()
+            try:
+                row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+            finally:
+                conn.close()
+            if row["state"] == "superseded":
+                print(f"→ Job {job_id} überholt durch Job {row['superseded_by']} (neuerer Entwurf) – nichts zu tun",
+                      file=out, flush=True)
+                return 0
+            if row["state"] in _TERMINAL:
+                wait_s = (row["started_at"] or row["enqueued_at"]) - row["enqueued_at"]
+                tail.stop()
+                print(f"→ Job {job_id} {row['state']}: exit={row['exit_code']}, "
+                      f"gewartet {wait_s:.1f} s, Laufzeit {row['run_seconds'] or 0:.1f} s", file=out, flush=True)
+                return int(row["exit_code"] or 0)
+            job = claim()
+            if job is None:
+                time.sleep(_POLL_S)
+            elif job.id != job_id:
+                print(f"→ führe zuerst Job {job.id} aus ({Path(job.input).name}, {job.size_bytes / 1024:.0f} KB)",
+                      file=out, flush=True)
+                run_job(job)
+            else:
+                run_job(job)
+    finally:
+        tail.stop()
+
+
+def work(*, once: bool = False, idle_exit: Optional[float] = None) -> int:
+    """Worker-Schleife: Jobs nach Priorität ausführen; once → nur bis die Queue leer ist."""
+    done = 0
+    idle_since = time.monotonic()
+    while True:
+        job = claim()
+        if job is None:
+            conn = _connect()
+            try:
+                queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE state='queued'").fetchone()[0]
+            finally:
+                conn.close()
+            if (once and not queued) or (idle_exit and time.monotonic() - idle_since >= idle_exit):
+                return done
+            time.sleep(_POLL_S)
+            continue
+        print(f"→ Job {job.id}: {job.kind} {Path(job.input).name} ({job.size_bytes / 1024:.0f} KB)", flush=True)
+        rc = run_job(job)
+        print(f"  exit={rc}", flush=True)
+        done += 1
+        idle_since = time.monotonic()
+
+
+def job_stats(limit: int = 20) -> str:
+    """Letzte Jobs (Wartezeit, Laufzeit) + Median je Größenklasse der abgeschlossenen Jobs."""
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        finished = conn.execute("SELECT size_bytes, started_at, enqueued_at, run_seconds FROM jobs "
+                                "WHERE state IN ('done','failed') AND run_seconds IS NOT NULL").fetchall()
+    finally:
+        conn.close()
+    lines = [f"{'ID':>5} {'Zustand':<10} {'Art':<6} {'KB':>6} {'Warten':>8} {'Lauf':>8}  Datei"]
+    for r in rows:
+        wait = f"{r['started_at'] - r['enqueued_at']:.1f} s" if r["started_at"] else "-"
+        run = f"{r['run_seconds']:.1f} s" if r["run_seconds"] is not None else "-"
+        lines.append(f"{r['id']:>5} {r['state']:<10} {r['kind']:<6} {r['size_bytes'] / 1024:>6.0f} "
+                     f"{wait:>8} {run:>8}  {Path(r['input']).name}")
+    by_class: dict = {}
+    for r in finished:
+        by_class.setdefault(_size_class(r["size_bytes"]), []).append(
+            (r["started_at"] - r["enqueued_at"], r["run_seconds"]))
+    if by_class:
+        lines.append(f"{'bis KB':>8} {'Jobs':>5} {'Warten (Median)':>16} {'Lauf (Median)':>14}")
+        for cls in sorted(by_class):
+            vals = sorted(by_class[cls])
+            waits = sorted(v[0] for v in vals)
+            runs = sorted(v[1] for v in vals)
+            lines.append(f"{2 ** cls - 1:>8} {len(vals):>5} {waits[len(waits) // 2]:>14.1f} s "
+                         f"{runs[len(runs) // 2]:>12.1f} s")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m shared.job_queue", description="Lokale Job-Queue für Draft-Builds")
+    sub = ap.add_subparsers(dest="command", required=True)
+    w = sub.add_parser("work", help="Jobs abarbeiten")
+    w.add_argument("--once", action="store_true", help="beenden, sobald die Queue leer ist")
+    w.add_argument("--idle-exit", type=float, default=None, help="beenden nach S Sekunden ohne Job")
+    s = sub.add_parser("stats", help="letzte Jobs und Zeiten")
+    s.add_argument("--limit", type=int, default=20)
+    e = sub.add_parser("enqueue", help="Job eintragen (ohne zu warten)")
+    e.add_argument("kind", choices=sorted(_ADAPTERS))
+    e.add_argument("input")
+    e.add_argument("extra", nargs="*")
+    args = ap.parse_args(argv)
+
+    if args.command == "work":
+        print(f"{work(once=args.once, idle_exit=args.idle_exit)} Jobs ausgeführt")
+    elif args.command == "stats":
+        print(job_stats(args.limit))
+    else:
+        print(enqueue(args.kind, args.input, args.extra))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/lazy_import.py
+---------------------
+Verzögerte Modul-Imports für die Orchestratoren + aggregiertes Import-Zeitprofil (--profile-import).
+
+Hintergrund:
+- prosa_pdf.py / poesie_pdf.py haben Prosa_Code bzw. Poesie_Code (register_dejavu, kompletter
+  ReportLab-platypus-Stack, Logging-Filter, viele Modul-Strukturen) schon auf Modulebene geladen –
+  vor dem Argument-Parsing, also auch für --help und für Cache-Treffer der Draft-Adapter.
+- lazy_module(name) liefert ein Modulobjekt über importlib.util.LazyLoader: der Modulcode läuft
+  erst beim ersten Attributzugriff (Prosa.process_input_text(...) beim ersten Render).
+- ImportProfiler misst wie `python -X importtime` die Ausführungszeit jedes Moduls (gesamt und
+  ohne Untermodule) und fasst sie pro Top-Level-Paket zusammen (reportlab, PIL, shared …).
+
+Öffentliche API:
+- lazy_imports_enabled() -> bool
+- lazy_module(name) -> ModuleType
+- ImportProfiler()          (.start() / .stop() / .report(top=15) -> str)
+- start_import_profile(stream=None) -> ImportProfiler   (Bericht automatisch bei Programmende)
+
+Konventionen:
+- Module, die schon geladen sind, werden direkt zurückgegeben (kein zweites Modulobjekt).
+- Abschalten über LAZY_IMPORTS=0 (dann sofortiger Import wie bisher).
+- Aufrufer greifen nur über das Modulobjekt zu (Prosa.x), NICHT per `from X import y` – das
+  würde den Import sofort auslösen.
+- Das Profil ist reine Diagnose: es läuft nur mit --profile-import und schreibt nach stderr.
+"""
+
+from __future__ import annotations
+
+import atexit
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from collections import defaultdict
+from types import ModuleType
+from typing import Dict, List, Optional, TextIO
+
+
+# =============================== Helper =====================================
+
+class _TimingLoader:
+    """Loader-Hülle: misst exec_module (gesamt) und zieht die Zeit geschachtelter Imports ab (selbst)."""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        prof = self._profiler
+        prof._stack.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - t0
+            nested = prof._stack.pop()
+            if prof._stack:
+                prof._stack[-1] += total
+            prof.modules[module.__name__] = (total, total - nested)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _TimingFinder:
+    """Meta-Path-Finder an erster Stelle: fragt die übrigen Finder und hüllt deren Loader ein."""
+
+    def __init__(self, profiler: "ImportProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+# =============================== Public API =================================
+
+def lazy_imports_enabled() -> bool:
+    """Verzögerte Imports aktiv? (Standard: ja; LAZY_IMPORTS=0 schaltet ab)"""
+    return os.environ.get("LAZY_IMPORTS", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def lazy_module(name: str) -> ModuleType:
+    """Modul `name`, dessen Code erst beim ersten Attributzugriff ausgeführt wird."""
+    if name in sys.modules or not lazy_imports_enabled():
+        return importlib.import_module(name)
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None or not hasattr(spec.loader, "exec_module"):
+        return importlib.import_module(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)  # wie der normale Import (shared.preprocess …)
+    return module
+
+
+class ImportProfiler:
+    """Misst Import-Zeiten pro Modul; report() fasst pro Top-Level-Paket zusammen."""
+
+    def __init__(self):
+        self.modules: Dict[str, tuple] = {}  # name -> (gesamt_s, selbst_s)
+        self._stack: List[float] = []
+        self._finder = _TimingFinder(self)
+        self._t0 = None
+        self._elapsed = 0.0
+
+    def start(self) -> "ImportProfiler":
+        if self._finder not in sys.meta_path:
+            sys.meta_path.insert(0, self._finder)
+            self._t0 = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+            self._elapsed += time.perf_counter() - self._t0
+
+    def report(self, top: int = 15) -> str:
+        packages: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+        for name, (_total, self_s) in self.modules.items():
+            agg = packages[name.partition(".")[0]]
+            agg[0] += self_s
+            agg[1] += 1
+        total_self = sum(self_s for _t, self_s in self.modules.values())
+        elapsed = self._elapsed + ((time.perf_counter() - self._t0) if self._finder in sys.meta_path else 0.0)
+        lines = [f"Import-Profil: {len(self.modules)} Module, {total_self * 1000:.1f} ms Importzeit "
+                 f"(Laufzeit seit Start {elapsed * 1000:.1f} ms)",
+                 f"  {'Paket':<28} {'selbst':>10} {'Module':>7}"]
+        for pkg, (self_s, count) in sorted(packages.items(), key=lambda kv: -kv[1][0])[:top]:
+            lines.append(f"  {pkg:<28} {self_s * 1000:>7.1f} ms {count:>7}")
+        lines.append(f"  {'Modul':<44} {'selbst':>10} {'gesamt':>10}")
+        for name, (total, self_s) in sorted(self.modules.items(), key=lambda kv: -kv[1][1])[:top]:
+            lines.append(f"  {name:<44} {self_s * 1000:>7.1f} ms {total * 1000:>7.1f} ms")
+        return "\n".join(lines)
+
+
+def start_import_profile(stream: Optional[TextIO] = None) -> ImportProfiler:
+    """Profil starten; der Bericht wird bei Programmende nach stream (Standard stderr) geschrieben."""
+    profiler = ImportProfiler().start()
+
+    def _report():
+        profiler.stop()
+        print(profiler.report(), file=stream or sys.stderr, flush=True)
+
+    atexit.register(_report)
+    return profiler
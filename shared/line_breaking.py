@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/line_breaking.py
+-----------------------
+Zeilenumbruch-Engine für die Spalten eines Prosa-Flows (Slices in build_tables_for_stream).
+
+Hintergrund:
+- build_tables_for_stream packt die Wort-Spalten bisher gierig: Breiten aufsummieren, bis die
+  verfügbare Breite überschritten ist. Für den Sonderfall „erstes Slice ohne DE-Inhalt“ wurde
+  dabei mit linearen Scans (_has_de_content / _next_de_index) nach DE-Inhalt gesucht.
+- ColumnBreaker berechnet die Spaltenbreiten EINMAL als Präfixsummen:
+    Breite eines Slices i..j      → prefix[j] - prefix[i]            O(1)
+    gieriges Slice-Ende           → bisect auf den Präfixsummen       O(log n)
+    DE-Inhalt in i..j / nächster  → bisect auf den DE-Indizes         O(log n)
+- optimal_breaks() wählt die Umbruchstellen per dynamischer Programmierung (Knuth–Plass-Stil):
+  minimale Ungleichmäßigkeit (Flatterrand) der Zeilen, Strafen für einen Umbruch VOR einem
+  Satzzeichen und für Zeilen ohne DE-Inhalt. Die letzte Zeile darf kurz sein.
+
+Öffentliche API:
+- line_break_mode() -> "greedy" | "optimal"
+- ColumnBreaker(widths, *, de=None, gr=None)
+    .width(i, j) / .greedy_end(i, avail_w) / .has_de_content(i, j) / .next_de_index(k)
+    .optimal_breaks(avail_w) -> list[int]   (Slice-Enden, exklusiv, letztes == n)
+- PUNCTUATION_TOKENS
+
+Konventionen:
+- Standard ist "greedy" (Layout wie bisher). PROSA_LINE_BREAK=optimal schaltet den
+  DP-Optimierer ein; er erzeugt nie mehr Zeilen als der gierige Umbruch (der bereits
+  die minimale Zeilenzahl liefert), verteilt die Spalten aber gleichmäßiger.
+- Eine Spalte, die allein breiter als avail_w ist, bildet (wie bisher) ein eigenes Slice.
+- greedy_end rundet exakt wie die bisherige Pack-Schleife (auch bei Zeilen, die avail_w genau
+  füllen): nur innerhalb des Bands FIT_TOLERANCE wird die laufende Summe nachgerechnet.
+"""
+
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence
+
+# ========================== Modulzustand / Defaults ==========================
+
+# Satzzeichen, vor denen nicht umbrochen werden soll (identisch zur Swap-Prüfung im Prosa-Code)
+PUNCTUATION_TOKENS = frozenset(['.', ',', ';', ':', '?', '!', '·'])
+
+# DP-Gewichte (TeX-ähnlich): Zeilenstrafe, Strafe Umbruch vor Satzzeichen, Strafe DE-leere Zeile
+LINE_PENALTY = float(os.environ.get("LINE_BREAK_LINE_PENALTY", "10"))
+PUNCT_PENALTY = float(os.environ.get("LINE_BREAK_PUNCT_PENALTY", "5000"))
+DE_EMPTY_PENALTY = float(os.environ.get("LINE_BREAK_DE_EMPTY_PENALTY", "3000"))
+
+# Relatives Unsicherheitsband für greedy_end: Präfixdifferenz und laufende Summe weichen um
+# höchstens ~n·2⁻⁵² der Gesamtbreite ab; 1e-9 deckt das bis weit über 10⁶ Spalten ab.
+FIT_TOLERANCE = 1e-9
+
+
+# =============================== Public API =================================
+
+def line_break_mode() -> str:
+    """ "greedy" (Standard) oder "optimal" (PROSA_LINE_BREAK=optimal)."""
+    mode = os.environ.get("PROSA_LINE_BREAK", "greedy").strip().lower()
+    return "optimal" if mode in ("optimal", "dp", "knuth") else "greedy"
+
+
+class ColumnBreaker:
+    """Präfixsummen über die Spaltenbreiten + sortierte DE-Indizes eines Flows."""
+
+    __slots__ = ("n", "widths", "prefix", "gr", "_de", "_de_len", "_de_idx")
+
+    def __init__(self, widths: Sequence[float], *, de: Optional[Sequence[str]] = None,
+                 gr: Optional[Sequence[str]] = None):
+        self.n = len(widths)
+        self.widths = list(widths)
+        self.prefix: List[float] = list(accumulate(self.widths, initial=0.0))
+        self.gr = gr or []
+        self._de = bool(de)
+        self._de_len = len(de) if de else 0
+        # Indizes der Spalten mit sichtbarem DE-Inhalt (aufsteigend)
+        self._de_idx: List[int] = ([k for k in range(min(self.n, self._de_len)) if (de[k] or '').strip()]
+                                   if de else [])
+
+    # ------------------------------------------------------------- Abfragen
+    def width(self, i: int, j: int) -> float:
+        """Summe der Breiten der Spalten i..j-1."""
+        return self.prefix[j] - self.prefix[i]
+
+    def greedy_end(self, i: int, avail_w: float) -> int:
+        """
+        Größtes j, sodass i..j-1 in avail_w passt – mindestens eine Spalte (j > i).
+        Ergebnis identisch zur bisherigen Pack-Schleife (laufende Summe ab Spalte i, acc + w > avail_w):
+        Präfixdifferenzen runden anders als diese Summe, daher entscheidet bei einer Zeile, die
+        avail_w bis auf FIT_TOLERANCE genau füllt, die laufende Summe selbst.
+        """
+        n = self.n
+        if i >= n:
+            return i
+        prefix = self.prefix
+        tol = FIT_TOLERANCE * (prefix[n] + abs(avail_w))
+        limit = prefix[i] + avail_w
+        # Enden, die sicher passen (lo) bzw. bis zum Rand des Unsicherheitsbands reichen (hi)
+        lo = bisect_right(prefix, limit - tol, i + 1) - 1
+        hi = bisect_right(prefix, limit + tol, i + 1) - 1
+        if lo == hi:
+            return max(lo, i + 1)
+        return self._sequential_end(i, avail_w, max(lo, i))
+
+    def _sequential_end(self, i: int, avail_w: float, start: int) -> int:
+        """Bisherige Pack-Schleife ab Spalte i; die Spalten i..start-1 passen sicher (nur aufsummiert)."""
+        widths = self.widths
+        acc = 0.0
+        for k in range(i, start):
+            acc += widths[k]
+        j = start
+        while j < self.n:
+            w = widths[j]
+            if acc + w > avail_w and j > i:
+                break
+            acc += w
+            j += 1
+        return j
+
+    def has_de_content(self, i: int, j: int) -> bool:
+        """Gibt es in de[i:j] sichtbaren Inhalt?"""
+        if i >= j or not self._de:
+            return False
+        p = bisect_left(self._de_idx, i)
+        return p < len(self._de_idx) and self._de_idx[p] < j
+
+    def next_de_index(self, from_idx: int) -> int:
+        """Erster Index >= from_idx mit DE-Inhalt (sonst Ende von de bzw. n)."""
+        if not self._de:
+            return self.n
+        if from_idx >= min(self.n, self._de_len):
+            return from_idx
+        p = bisect_left(self._de_idx, from_idx)
+        if p < len(self._de_idx):
+            return self._de_idx[p]
+        return min(self.n, self._de_len)
+
+    def _breaks_before_punct(self, j: int) -> bool:
+        return j < len(self.gr) and bool(self.gr[j]) and self.gr[j].strip() in PUNCTUATION_TOKENS
+
+    # ------------------------------------------------------------- DP
+    def optimal_breaks(self, avail_w: float) -> List[int]:
+        """
+        Umbruchstellen mit minimalen Gesamtkosten (Slice-Enden, exklusiv; letztes == n).
+        Kosten je Zeile: (LINE_PENALTY + 100·(Rest/avail_w)³)² + Strafen; letzte Zeile ohne Rest-Kosten.
+        Optimiert wird lexikographisch (Zeilenzahl, Kosten): so wenige Zeilen wie der gierige
+        Umbruch, innerhalb dieser Zeilenzahl die gleichmäßigste Verteilung.
+        """
+        n = self.n
+        if n == 0:
+            return []
+        avail = max(avail_w, 1e-6)
+        prefix = self.prefix
+
+        INF = float("inf")
+        cost = [INF] * (n + 1)
+        rows = [n + 1] * (n + 1)
+        back = [0] * (n + 1)
+        cost[0], rows[0] = 0.0, 0
+        for j in range(1, n + 1):
+            # frühestes i, sodass i..j-1 passt (einzelne Überbreite-Spalte immer erlaubt)
+            lo = min(bisect_left(prefix, prefix[j] - avail), j - 1)
+            last = (j == n)
+            for i in range(lo, j):
+                if cost[i] == INF:
+                    continue
+                slack = avail - (prefix[j] - prefix[i])
+                if last:
+                    c = LINE_PENALTY * LINE_PENALTY
+                else:
+                    badness = 100.0 * (max(slack, 0.0) / avail) ** 3
+                    c = (LINE_PENALTY + badness) ** 2
+                if j < n and self._breaks_before_punct(j):
+                    c += PUNCT_PENALTY
+                if self._de and self._de_idx and not self.has_de_content(i, j):
+                    c += DE_EMPTY_PENALTY
+                total = cost[i] + c
+                if (rows[i] + 1, total) < (rows[j], cost[j]):
+                    cost[j], rows[j], back[j] = total, rows[i] + 1, i
+
+        ends: List[int] = []
+        j = n
+        while j > 0:
+            ends.append(j)
+            j = back[j]
+        ends.reverse()
+        return ends
+
+    def greedy_breaks(self, avail_w: float) -> List[int]:
+        """Gieriger Umbruch (wie die bisherige Pack-Schleife), Slice-Enden exklusiv."""
+        ends, i = [], 0
+        while i < self.n:
+            i = self.greedy_end(i, avail_w)
+            ends.append(i)
+        return ends
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/line_index.py
+--------------------
+Einmalige Voranalyse eines Zeilen-Arrays: Zeilennummer, Zeilenart und Sprachanzahl pro Zeile.
+
+Hintergrund:
+- detect_language_count_from_context (Prosa/Poesie) lief für JEDE Insertionszeile bis zu 50 Zeilen
+  rückwärts und vorwärts und rief dabei extract_line_number auf jeder Zeile auf – für jede
+  gefundene normale Zeile zusätzlich noch einmal über deren Gruppe. Dazu kam die Gruppenbildung in
+  process_input_text, die dieselben Zeilen erneut parste → O(Insertionen × 50) Regex-Aufrufe,
+  und jede Zeile wurde mehrfach zerlegt.
+- LineIndex zerlegt jede Zeile GENAU EINMAL und berechnet die Sprachanzahl für alle Positionen in
+  zwei linearen Durchläufen; alle späteren Abfragen sind O(1).
+
+Öffentliche API:
+- LineIndex(lines, parse, is_comment=..., is_insertion=..., is_blank=..., max_count=..., run_limit=...)
+  - num(i) / rest(i) / parsed(i)   (Ergebnis von parse(lines[i]), (None, zeile) ohne Nummer)
+  - kind(i)                        (KIND_COMMENT / KIND_INSERTION / KIND_NORMAL, None ohne Nummer)
+  - language_count(i)              (wie detect_language_count_from_context(lines, i))
+- KIND_COMMENT, KIND_INSERTION, KIND_NORMAL
+
+Konventionen:
+- parse ist das extract_line_number des jeweiligen Orchestrators (Prosa/Poesie unterscheiden sich
+  bei negativen Nummern); es wird pro Zeile genau einmal mit der gestrippten Zeile aufgerufen.
+- language_count bildet die bisherige Suche exakt nach: nächste normale Zeile mit ≥ 2 gleich
+  nummerierten Folgezeilen zuerst rückwärts, dann vorwärts, je höchstens search_range - 1 Zeilen
+  entfernt; Folgezeilen zählen bis run_limit, Ergebnis min(Anzahl, max_count); sonst 2.
+- is_blank entscheidet (auf der gestrippten Zeile), welche Zeilen beim Zählen einer Gruppe
+  übersprungen werden: Prosa nur leere Zeilen, Poesie zusätzlich Trenner ([FREIE ZEILE], ---).
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# ===== Modulzustand / Defaults =====
+
+KIND_COMMENT = 'comment'
+KIND_INSERTION = 'insertion'
+KIND_NORMAL = 'normal'
+
+SEARCH_RANGE = 50       # wie bisher: max. 50 Zeilen vor/nach (range(1, 50) → Abstand ≤ 49)
+DEFAULT_LANGUAGES = 2   # ohne Kontext: 2-sprachig
+
+
+# ===== Helper =====
+
+def _suffix_check(suffix: str) -> Callable[[Optional[str]], bool]:
+    return lambda line_num: bool(line_num) and line_num.lower().endswith(suffix)
+
+
+# ===== Public API =====
+
+class LineIndex:
+    """
+    Voranalyse eines Zeilen-Arrays (Rohzeilen bzw. Zitat-Zeilen eines Blocks).
+
+    Die Liste darf nach dem Aufbau nicht mehr verändert werden – der Index hält nur die
+    abgeleiteten Daten, nicht die Zeilen selbst.
+    """
+
+    __slots__ = ('_parsed', '_kinds', '_counts')
+
+    def __init__(self, lines: Sequence[Optional[str]],
+                 parse: Callable[[str], Tuple[Optional[str], str]], *,
+                 is_comment: Optional[Callable[[Optional[str]], bool]] = None,
+                 is_insertion: Optional[Callable[[Optional[str]], bool]] = None,
+                 is_blank: Optional[Callable[[str], bool]] = None,
+                 max_count: int = 3, run_limit: int = 5,
+                 search_range: int = SEARCH_RANGE):
+        n = len(lines)
+        comment = is_comment or _suffix_check('k')
+        insertion = is_insertion or _suffix_check('i')
+        stripped = [(raw_line or '').strip() for raw_line in lines]
+        parsed: List[Tuple[Optional[str], str]] = list(map(parse, stripped))
+        nums = [res[0] for res in parsed]
+        kind_of = {None: None}  # Gruppen teilen ihre Nummer → Art pro Nummer nur einmal bestimmen
+        for num in nums:
+            if num not in kind_of:
+                kind_of[num] = (KIND_COMMENT if comment(num) else
+                                KIND_INSERTION if insertion(num) else KIND_NORMAL)
+        kinds: List[Optional[str]] = [kind_of[num] for num in nums]
+        skip = [not s for s in stripped] if is_blank is None else list(map(is_blank, stripped))
+
+        # Gruppenlänge ab Zeile j: j selbst + direkt folgende Zeilen gleicher Nummer
+        # (übersprungene Zeilen dazwischen zählen nicht), gedeckelt bei run_limit.
+        # Kandidaten für die Sprachanzahl: normale Zeilen mit ≥ 2 Gruppenzeilen.
+        run = [0] * n
+        value = [0] * n
+        nxt = -1  # nächste nicht übersprungene Zeile hinter j
+        for j in range(n - 1, -1, -1):
+            if skip[j]:
+                continue
+            num = nums[j]
+            if num is not None:
+                r = min(run[nxt] + 1, run_limit) if nxt >= 0 and nums[nxt] == num else 1
+                run[j] = r
+                if r >= 2 and kinds[j] == KIND_NORMAL:
+                    value[j] = min(r, max_count)
+            nxt = j
+
+        # Pro Position: nächster Kandidat davor (Vorrang), sonst danach – je im Suchradius.
+        reach = search_range - 1
+        counts = [DEFAULT_LANGUAGES] * n
+        last = -1
+        for i in range(n - 1, -1, -1):
+            if last >= 0 and last - i <= reach:
+                counts[i] = value[last]
+            if value[i]:
+                last = i
+        last = -1
+        for i in range(n):
+            if last >= 0 and i - last <= reach:
+                counts[i] = value[last]
+            if value[i]:
+                last = i
+
+        self._parsed = parsed
+        self._kinds = kinds
+        self._counts = counts
+
+    def __len__(self) -> int:
+        return len(self._parsed)
+
+    def parsed(self, i: int) -> Tuple[Optional[str], str]:
+        """(Zeilennummer, Rest) wie parse(lines[i])."""
+        return self._parsed[i]
+
+    def num(self, i: int) -> Optional[str]:
+        return self._parsed[i][0]
+
+    def rest(self, i: int) -> str:
+        return self._parsed[i][1]
+
+    def kind(self, i: int) -> Optional[str]:
+        """KIND_COMMENT / KIND_INSERTION / KIND_NORMAL; None für Zeilen ohne Nummer."""
+        return self._kinds[i]
+
+    def language_count(self, i: int) -> int:
+        """Zeilen pro Sprachgruppe im Umfeld von Zeile i (2 ohne Kontext)."""
+        return self._counts[i]
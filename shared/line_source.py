@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/line_source.py
+---------------------
+Streamende Zeilenquelle für die Parser (Prosa_Code / Poesie_Code): Text oder Datei → Zeilen.
+
+Hintergrund:
+- process_input_file/-text lasen die Datei komplett (f.read()), entfernten die Metadaten-Kommentare
+  per re.sub über den GANZEN Text (neue Kopie), zerlegten ihn per split('\\n') (Liste aller Zeilen),
+  kopierten sie per rstrip-Comprehension erneut und bei Prosa noch einmal in expanded_raw
+  (STRAUßLOGIK) bzw. in die Latein-Liste (Abl) → mehrere vollständige Kopien gleichzeitig.
+- Hier werden die Zeilen als Generator geliefert: aus einem String per str.find (keine Zwischenliste)
+  oder aus einer Datei per mmap (Zeile für Zeile dekodiert, der Dateiinhalt liegt nie als str vor).
+  Die Parser-Stufen (Slash-Expansion mit 2 Zeilen Vorschau, Latein-Ersetzung) hängen sich als
+  weitere Generatoren dahinter; erst die Zeilenliste für Index und Blockbildung wird materialisiert.
+
+Öffentliche API:
+- iter_text_lines(text) -> Iterator[str]
+- iter_file_lines(path) -> Iterator[str]
+- strip_comment_runs(lines) -> Iterator[str]
+
+Konventionen:
+- Ergebnis exakt wie rx.RE_HTML_COMMENT_HEADER.sub('', text).split('\\n'). Das Muster ist MULTILINE:
+  <!-- … -->-Folgen werden an JEDEM Zeilenanfang entfernt (samt folgendem Leerraum), nicht nur im
+  Dateikopf. Nur Zeilen, die mit '<!--' beginnen, werden dafür kurz gepuffert.
+- iter_file_lines liest UTF-8 und übersetzt Zeilenenden wie open(..., 'r') (\\r\\n und \\r → \\n).
+- Die Generatoren sind einmalig; wer Zufallszugriff braucht, bildet selbst list(...).
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from typing import Iterable, Iterator
+
+from shared import regex_patterns as rx
+
+# ===== Modulzustand / Defaults =====
+
+COMMENT_OPEN = '<!--'
+COMMENT_CLOSE = '-->'
+
+
+# ===== Helper =====
+
+def _split_text(text: str) -> Iterator[str]:
+    """Wie text.split('\\n'), aber als Generator (keine Liste aller Zeilen)."""
+    pos = 0
+    while True:
+        nl = text.find('\n', pos)
+        if nl < 0:
+            yield text[pos:]
+            return
+        yield text[pos:nl]
+        pos = nl + 1
+
+def _split_mmap(mm: mmap.mmap) -> Iterator[str]:
+    """Zeilen eines mmap-Puffers (UTF-8) mit Universal-Newlines wie der Textmodus von open()."""
+    size = len(mm)
+    pos = 0
+    while True:
+        nl = mm.find(b'\n', pos)
+        end = size if nl < 0 else nl
+        line = mm[pos:end].decode('utf-8')
+        if '\r' in line:
+            if nl >= 0 and line.endswith('\r'):
+                line = line[:-1]  # \r\n
+            yield from line.split('\r')  # einzelnes \r ist ebenfalls ein Zeilenende
+        else:
+            yield line
+        if nl < 0:
+            return
+        pos = nl + 1
+
+
+# ===== Public API =====
+
+def strip_comment_runs(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Entfernt <!-- … -->-Folgen an Zeilenanfängen aus einem Zeilenstrom – Ergebnis wie
+    RE_HTML_COMMENT_HEADER.sub('', '\\n'.join(lines)).split('\\n').
+    """
+    pattern = rx.RE_HTML_COMMENT_HEADER
+    it = iter(lines)
+    for line in it:
+        if not line.startswith(COMMENT_OPEN):
+            yield line
+            continue
+        # Ab hier puffern, bis feststeht, wo der Treffer endet: hinter dem letzten Kommentar
+        # folgt ein Zeichen, das weder Leerraum noch Beginn eines weiteren Kommentars ist.
+        buf = [line]
+        at_eof = False
+        check = True
+        while True:
+            if check:
+                chunk = '\n'.join(buf) + '\n'
+                m = pattern.match(chunk)
+                if m and m.end() < len(chunk) and not chunk.startswith(COMMENT_OPEN, m.end()):
+                    break
+            nxt = next(it, None)
+            if nxt is None:
+                at_eof = True
+                chunk = '\n'.join(buf)
+                m = pattern.match(chunk)
+                break
+            buf.append(nxt)
+            # Nur Zeilen mit Inhalt oder Kommentar-Ende können den Ausgang noch ändern
+            check = COMMENT_CLOSE in nxt or bool(nxt.strip())
+        rest = chunk[m.end():] if m else chunk
+        parts = rest.split('\n')
+        yield from (parts if at_eof else parts[:-1])
+        if at_eof:
+            return
+
+def iter_text_lines(text: str) -> Iterator[str]:
+    """Zeilen eines bereits gelesenen Textes ohne Metadaten-Kommentare (siehe Konventionen)."""
+    return strip_comment_runs(_split_text(text))
+
+def iter_file_lines(path: str | os.PathLike) -> Iterator[str]:
+    """Zeilen einer UTF-8-Datei per mmap, ohne Metadaten-Kommentare (siehe Konventionen)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield ''  # wie ''.split('\n'); leere Dateien lassen sich nicht mappen
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from strip_comment_runs(_split_mmap(mm))
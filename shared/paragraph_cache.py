@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/paragraph_cache.py
+-------------------------
+Flyweight-Cache für die Token-Zellen der Tabellen-Builder (Paragraph + ParagraphStyle).
+
+Hintergrund:
+- Jede Token-Zelle in build_tables_for_stream / build_tables_for_alternatives (Prosa) und
+  build_tables_for_pair (Poesie) ist ein eigener Paragraph aus format_token_markup. Identische
+  Tokens wie 'καὶ(Kon)' oder 'δὲ(Pt)' erzeugen identisches Markup, das reportlab jedes Mal neu
+  parst (ParaParser/HTMLParser) und in jeder Tabelle neu umbricht (breakLines).
+- build_tables_for_stream legte außerdem bei JEDEM Aufruf einen neuen ParagraphStyle
+  'TokDE_Tight' an – damit war auch die Style-Identität pro Flow verschieden.
+- ParagraphCache hält pro Render:
+    1) Style-Registry     (name, parent, Parameter) → ParagraphStyle (eine Instanz)
+    2) Fragment-Cache     (markup, style)           → geparste Fragmente (einmal geparst)
+    3) Wrap-Memo          (markup, style, Breite)   → Umbruch-Ergebnis (blPara, Höhe …)
+  paragraph() liefert weiterhin für JEDE Zelle ein eigenes Paragraph-Objekt (Tabellen dürfen
+  Flowables nicht teilen), aber ohne erneutes Parsen und – bei gleicher Breite – ohne erneuten
+  Umbruch.
+
+Öffentliche API:
+- paragraph_cache_enabled() -> bool
+- ParagraphCache()        (.paragraph(markup, style) / .style(name, parent, **params) / .stats())
+- CachedParagraph         (Paragraph-Unterklasse mit geteiltem Wrap-Memo)
+
+Konventionen:
+- Ein ParagraphCache gehört zu EINEM create_pdf-Aufruf (RenderContext.paragraphs) – Styles und
+  Fonts sind dort fest; kein prozessweiter Zustand.
+- Styles, die über den Cache laufen, werden nach dem Anlegen nicht mehr verändert.
+- Abschalten über PARAGRAPH_CACHE=0 (dann entstehen normale Paragraphs wie bisher).
+- Speicher: höchstens PARAGRAPH_CACHE_MAX Einträge (LRU, Standard 4096) mit je höchstens
+  PARAGRAPH_WRAP_MEMO_MAX gemerkten Breiten (Standard 4) – häufige Tokens bleiben, seltene fallen raus.
+- RTL-Styles werden nicht memoisiert (drawPara dreht dort die Wortlisten in blPara um).
+"""
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+from reportlab.platypus.paragraph import _FUZZ
+
+# ========================== Modulzustand / Defaults ==========================
+
+# Attribute, die Paragraph.__init__ bzw. Paragraph.wrap (inkl. breakLines) am Objekt setzen
+_INIT_STATE = ("caseSensitive", "encoding", "text", "frags", "style", "bulletText", "debug")
+# Max. Einträge (markup, style) pro Render (LRU) – hält den Speicher beim Streaming-Build flach
+PARAGRAPH_CACHE_MAX = int(os.environ.get("PARAGRAPH_CACHE_MAX", "4096"))
+# Max. gemerkte Breiten pro Eintrag – Leerzellen werden sonst in tausenden Breiten gemerkt
+WRAP_MEMO_MAX = int(os.environ.get("PARAGRAPH_WRAP_MEMO_MAX", "4"))
+
+_WRAP_STATE = ("width", "height", "_wrapWidths", "blPara", "frags",
+               "_width_max", "_splitLongWordCount", "_hyphenations")
+
+
+# =============================== Paragraph ==================================
+
+class CachedParagraph(Paragraph):
+    """Paragraph, dessen wrap() das Ergebnis pro Breite mit gleichen Zellen teilt."""
+
+    _wrap_memo: Dict[float, Dict[str, Any]] | None = None
+
+    def wrap(self, availWidth, availHeight):
+        memo = self._wrap_memo
+        if memo is None or availWidth < _FUZZ:
+            return Paragraph.wrap(self, availWidth, availHeight)
+        state = memo.get(availWidth)
+        if state is None:
+            result = Paragraph.wrap(self, availWidth, availHeight)
+            if len(memo) < WRAP_MEMO_MAX:
+                memo[availWidth] = {k: self.__dict__[k] for k in _WRAP_STATE if k in self.__dict__}
+            return result
+        self.__dict__.update(state)
+        return self.width, self.height
+
+
+class _Entry:
+    __slots__ = ("init_state", "wraps")
+
+    def __init__(self, init_state: Dict[str, Any], wraps: Dict[float, Dict[str, Any]] | None):
+        self.init_state = init_state
+        self.wraps = wraps
+
+
+# =============================== Public API =================================
+
+def paragraph_cache_enabled() -> bool:
+    """Paragraph-Cache aktiv? (Standard: ja; PARAGRAPH_CACHE=0 schaltet ab)"""
+    return os.environ.get("PARAGRAPH_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class ParagraphCache:
+    """Style-Registry + Fragment-Cache + Wrap-Memo für einen Render (siehe Modul-Docstring)."""
+
+    def __init__(self, enabled: bool | None = None):
+        self.enabled = paragraph_cache_enabled() if enabled is None else enabled
+        self._styles: Dict[Tuple, ParagraphStyle] = {}
+        self._entries: "OrderedDict[Tuple[str, int], _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def style(self, name: str, parent: ParagraphStyle | None = None, **params) -> ParagraphStyle:
+        """ParagraphStyle(name, parent=parent, **params) – pro Parameter-Satz EINE Instanz."""
+        key = (name, id(parent), repr(sorted(params.items())))
+        st = self._styles.get(key)
+        if st is None:
+            # parent bleibt über st.parent referenziert → id(parent) wird nicht neu vergeben
+            st = self._styles[key] = ParagraphStyle(name, parent=parent, **params)
+        return st
+
+    def paragraph(self, markup: str, style: ParagraphStyle) -> Paragraph:
+        """Neuer Paragraph für (markup, style); Parsen/Umbruch nur beim ersten Mal."""
+        if not self.enabled:
+            return Paragraph(markup, style)
+        key = (markup, id(style))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            p = CachedParagraph(markup, style)
+            init_state = {k: p.__dict__[k] for k in _INIT_STATE}
+            init_state["frags"] = list(p.frags)
+            wraps = None if (getattr(style, "wordWrap", None) or "").upper() == "RTL" else {}
+            entry = self._entries[key] = _Entry(init_state, wraps)
+            if len(self._entries) > PARAGRAPH_CACHE_MAX:
+                self._entries.popitem(last=False)
+            p._wrap_memo = entry.wraps
+            return p
+        self.hits += 1
+        self._entries.move_to_end(key)
+        p = CachedParagraph.__new__(CachedParagraph)
+        p.__dict__.update(entry.init_state)
+        p.frags = list(entry.init_state["frags"])
+        p._wrap_memo = entry.wraps
+        return p
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+            "styles": len(self._styles),
+        }
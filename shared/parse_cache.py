@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/parse_cache.py
+---------------------
+Persistenter Cache für geparste Blöcke (Ergebnis der Parser-Phase, vor der COMMON-Stufe).
+
+Hintergrund:
+- process_input_text → discover_and_attach_comments (→ group_pairs_into_flows →
+  merge_strauss_alternatives bei Prosa) ist reine Text → Block-Listen-Arbeit (~0,5 s pro MB),
+  läuft aber bei JEDEM Build einer unveränderten Quelle erneut (Korpus-Build, Draft-Adapter, CLI).
+- Hier wird die fertige Block-Liste binär (pickle) abgelegt; ein Treffer lädt sie in Millisekunden.
+
+Öffentliche API:
+- parse_cache_enabled() -> bool
+- parser_version(kind) -> str
+- cache_key(kind, text) -> str
+- file_cache_key(kind, path) -> str
+- load(key) -> list | None
+- store(key, blocks) -> bool
+- cached_blocks(kind, text, parse_fn, *, enabled=True) -> list
+- cached_file_blocks(kind, path, parse_fn, *, enabled=True) -> list
+- cache_stats() -> dict
+
+Konventionen:
+- Schlüssel: SHA-256 über Art (prosa/poesie), SHA-256 des Textes und die Parser-Version
+  (Hash über Prosa_Code.py bzw. Poesie_Code.py, den Orchestrator und shared/*.py).
+  Jede Code-Änderung macht alte Einträge unerreichbar; sie altern per LRU heraus.
+- Für Dateien (CLI-Pfad der Orchestratoren) wird der Text-Hash blockweise über die Dateibytes
+  gebildet, ohne die Datei als str zu lesen. Für UTF-8 mit \n-Zeilenenden ist das derselbe
+  Schlüssel wie cache_key(kind, text); \r\n-Dateien bekommen eigene Einträge.
+- Ablage: PARSE_CACHE_DIR (Standard <Projekt>/.parse_cache), eine Datei pro Schlüssel
+  (<key[:2]>/<key>.pickle), atomar geschrieben. Überschreitet der Cache PARSE_CACHE_MAX_MB
+  (Standard 512), werden die am längsten nicht benutzten Einträge gelöscht.
+- pickle erhält auch geteilte Referenzen (z.B. _gr_rows[0] is gr_tokens in Prosa-Flows).
+  Der Cache ist ein lokales Arbeitsverzeichnis wie .render_cache – NICHT für fremde Dateien.
+- Abschalten über PARSE_CACHE=0 oder enabled=False (CLI: --no-parse-cache).
+  Cache-Fehler brechen den Build nie ab (nur Ausgabe, dann normal parsen).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+# ========================== Modulzustand / Defaults ==========================
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PARSE_CACHE_DIR = Path(os.environ.get("PARSE_CACHE_DIR", str(ROOT / ".parse_cache")))
+PARSE_CACHE_MAX_MB = float(os.environ.get("PARSE_CACHE_MAX_MB", "512"))
+
+SUFFIX = ".pickle"
+_HASH_CHUNK = 1 << 20
+FORMAT = 1  # Layout der Datei (Tupel unten); bei Änderung hochzählen
+
+# Quelltexte, die das Parse-Ergebnis bestimmen (zusätzlich immer shared/*.py)
+_VERSION_SOURCES = {
+    "prosa": ("Prosa_Code.py", "prosa_pdf.py"),
+    "poesie": ("Poesie_Code.py", "poesie_pdf.py"),
+}
+
+
+# =============================== Helper =====================================
+
+def _entry_path(key: str) -> Path:
+    return PARSE_CACHE_DIR / key[:2] / f"{key}{SUFFIX}"
+
+def _key(kind: str, text_hash: str) -> str:
+    return hashlib.sha256(f"{kind}\0{text_hash}\0{parser_version(kind)}".encode("utf-8")).hexdigest()
+
+def _cached(key: str, parse_fn: Callable[[], List[Any]]) -> List[Any]:
+    blocks = load(key)
+    if blocks is not None:
+        print(f"  → Parse-Cache HIT {key[:12]}…: {len(blocks)} Blöcke")
+        return blocks
+    blocks = parse_fn()
+    if isinstance(blocks, list) and store(key, blocks):
+        print(f"  → Parse-Cache: {len(blocks)} Blöcke gespeichert ({key[:12]}…)")
+    return blocks
+
+def _evict(max_bytes: float) -> None:
+    """Löscht die am längsten nicht benutzten Einträge, bis der Cache unter max_bytes liegt."""
+    entries = []
+    for path in PARSE_CACHE_DIR.glob(f"*/*{SUFFIX}"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, path, st.st_size))
+    total = sum(size for _, _, size in entries)
+    for _, path, size in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+# =============================== Public API =================================
+
+def parse_cache_enabled() -> bool:
+    """Parse-Cache aktiv? (Standard: ja; PARSE_CACHE=0 schaltet ab)"""
+    return os.environ.get("PARSE_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+@lru_cache(maxsize=None)
+def parser_version(kind: str) -> str:
+    """Hash über die Parser-Quelltexte + Python-Version (ändert sich bei jeder Code-Änderung)."""
+    h = hashlib.sha256(f"{kind}:{FORMAT}:{sys.version_info[0]}.{sys.version_info[1]}".encode("utf-8"))
+    sources = [ROOT / name for name in _VERSION_SOURCES[kind]] + sorted((ROOT / "shared").glob("*.py"))
+    for path in sources:
+        try:
+            h.update(path.name.encode("utf-8"))
+            h.update(path.read_bytes())
+        except OSError:
+            continue
+    return h.hexdigest()
+
+def cache_key(kind: str, text: str) -> str:
+    return _key(kind, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+def file_cache_key(kind: str, path: str | os.PathLike) -> str:
+    """Wie cache_key, aber über die Bytes der Datei (blockweise gelesen, siehe Konventionen)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return _key(kind, h.hexdigest())
+
+def load(key: str) -> Optional[List[Any]]:
+    """Treffer → Block-Liste (frische Objekte); kein Treffer oder defekter Eintrag → None."""
+    path = _entry_path(key)
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"  ⚠ Parse-Cache: Eintrag {key[:12]}… nicht lesbar ({e})")
+        return None
+    try:
+        fmt, blocks = pickle.loads(data)
+        if fmt != FORMAT or not isinstance(blocks, list):
+            raise ValueError(f"unerwartetes Format {fmt!r}")
+        os.utime(path)  # LRU: zuletzt benutzt
+    except Exception as e:
+        print(f"  ⚠ Parse-Cache: Eintrag {key[:12]}… unlesbar ({e}) – wird neu geparst")
+        path.unlink(missing_ok=True)
+        return None
+    return blocks
+
+def store(key: str, blocks: List[Any]) -> bool:
+    """Legt die Block-Liste unter key ab (atomar) und räumt per LRU auf."""
+    path = _entry_path(key)
+    tmp = path.with_name(f".tmp_{key}_{uuid.uuid4().hex[:8]}")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(pickle.dumps((FORMAT, blocks), protocol=pickle.HIGHEST_PROTOCOL))
+        tmp.replace(path)
+    except Exception as e:
+        print(f"  ⚠ Parse-Cache: Speichern fehlgeschlagen ({e})")
+        tmp.unlink(missing_ok=True)
+        return False
+    _evict(PARSE_CACHE_MAX_MB * 1024 * 1024)
+    return True
+
+def cached_blocks(kind: str, text: str, parse_fn: Callable[[], List[Any]], *,
+                  enabled: bool = True) -> List[Any]:
+    """
+    Geparste Blöcke für text: aus dem Cache oder per parse_fn() (Ergebnis wird abgelegt).
+    parse_fn muss für gleichen text und gleiche Parser-Version dasselbe liefern.
+    """
+    if not (enabled and parse_cache_enabled()):
+        return parse_fn()
+    return _cached(cache_key(kind, text), parse_fn)
+
+def cached_file_blocks(kind: str, path: str | os.PathLike, parse_fn: Callable[[], List[Any]], *,
+                       enabled: bool = True) -> List[Any]:
+    """Wie cached_blocks für eine Datei: Schlüssel aus den Dateibytes, parse_fn liest die Datei selbst."""
+    if not (enabled and parse_cache_enabled()):
+        return parse_fn()
+    return _cached(file_cache_key(kind, path), parse_fn)
+
+def cache_stats() -> dict:
+    """Anzahl Einträge und Gesamtgröße des Caches."""
+    sizes = [p.stat().st_size for p in PARSE_CACHE_DIR.glob(f"*/*{SUFFIX}")]
+    return {"entries": len(sizes), "bytes": sum(sizes), "max_bytes": int(PARSE_CACHE_MAX_MB * 1024 * 1024),
+            "dir": str(PARSE_CACHE_DIR)}
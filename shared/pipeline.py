@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/pipeline.py
+------------------
+Zweistufige Vorverarbeitung für die Orchestratoren (prosa_pdf / poesie_pdf).
+
+Aufteilung:
+- COMMON-Stufe (einmal pro Input und pro tag_config, für ALLE Varianten gleich):
+    Parsen, Kommentare, Flow-Gruppierung, Tokenisierung, Farbsymbole (apply_colors)
+    und Tag-Sichtbarkeit (apply_tag_visibility). Diese Schritte hängen nur von
+    Input und tag_config ab, NICHT von strength/color/tag/meter.
+- VARIANT-Stufen (billig, pro Variante im Orchestrator):
+    NO_TAGS (remove_all_tags), leere Übersetzungszeilen, BLACK_WHITE (remove_all_color_symbols).
+
+Das Ergebnis der COMMON-Stufe wird im Speicher gehalten (kleiner LRU-Cache) und von allen
+Varianten wiederverwendet. Die preprocess-Stufen arbeiten Copy-on-Write, d.h. die Varianten
+verändern die gemeinsamen Blöcke nicht.
+
+Öffentliche API:
+- input_identity(path) -> tuple
+- text_identity(text) -> tuple
+- tag_config_key(tag_config) -> str
+- apply_common_stage(blocks, tag_config, *, tokenize=None, label="pipeline") -> list
+- cached_common_stage(key, build_fn) -> Any
+- clear_common_cache() -> None
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+import traceback
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from shared import preprocess
+from shared.token_record import parse_tokens
+
+# ========================== Modulzustand / Defaults ==========================
+
+# Anzahl gehaltener COMMON-Ergebnisse (Input × tag_config)
+COMMON_CACHE_MAX = int(os.environ.get("COMMON_STAGE_CACHE_MAX", "4"))
+
+_COMMON_CACHE: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+
+# =============================== Helper =====================================
+
+def input_identity(path: str | os.PathLike) -> tuple:
+    """Identität einer Eingabedatei für den Cache: (absoluter Pfad, Größe, mtime_ns)."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+def text_identity(text: str) -> tuple:
+    """Identität eines Eingabe-Strings (In-Process-API ohne Datei): SHA-256 des Inhalts."""
+    return ("text", hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+def tag_config_key(tag_config: Optional[Dict[str, Any]]) -> str:
+    """Stabiler Schlüssel für eine tag_config (sortiertes JSON)."""
+    if not tag_config:
+        return ""
+    return json.dumps(tag_config, sort_keys=True, ensure_ascii=False, default=str)
+
+
+# =============================== Public API =================================
+
+def apply_common_stage(blocks: List[Dict[str, Any]],
+                       tag_config: Optional[Dict[str, Any]],
+                       *,
+                       tokenize: Optional[Callable[[str], List[str]]] = None,
+                       label: str = "pipeline") -> List[Dict[str, Any]]:
+    """
+    Führt die variantenunabhängigen Schritte EINMAL aus:
+    1) (optional) pair-Blöcke tokenisieren (gr/de/en → *_tokens), falls noch nicht geschehen,
+       und Token-Records vorab erzeugen (shared/token_record.py)
+    2) apply_colors  (Farbsymbole + token_meta, IMMER – auch BLACK_WHITE braucht token_meta)
+    3) apply_tag_visibility  (Tags laut tag_config ausblenden, Übersetzungen verstecken)
+    Fehler in 2) oder 3) werden geloggt; dann wird mit dem letzten gültigen Stand weitergearbeitet.
+    """
+    logger = logging.getLogger(label)
+    common_blocks = list(blocks)
+
+    # SCHRITT 1: Tokenisiere pair-Blöcke BEVOR apply_colors!
+    # WICHTIG: apply_colors erwartet gr_tokens/de_tokens/en_tokens (Listen), nicht gr/de/en (Strings)!
+    if tokenize is not None:
+        for block_idx, block in enumerate(common_blocks):
+            if isinstance(block, dict) and block.get('type') == 'pair':
+                missing = [k for k in ('gr', 'de', 'en') if k in block and f'{k}_tokens' not in block]
+                if not missing:
+                    continue
+                # Copy-on-Write: Block flach kopieren, bevor neue Token-Felder gesetzt werden
+                block = dict(block)
+                for k in missing:
+                    block[f'{k}_tokens'] = tokenize(block[k]) if block.get(k) else []
+                common_blocks[block_idx] = block
+
+    # SCHRITT 1b: Token-Records EINMAL vorab erzeugen (gecacht pro Token-String).
+    # Alle späteren Stufen (Farben, Tag-Sichtbarkeit, Versmaß, Markup) lesen daraus;
+    # im Parallel-Modus erben die Worker den gefüllten Cache per fork.
+    for block in common_blocks:
+        if isinstance(block, dict) and block.get('type') in ('pair', 'flow'):
+            for key in ('gr_tokens', 'de_tokens', 'en_tokens'):
+                tokens = block.get(key)
+                if tokens:
+                    parse_tokens(tokens)
+
+    # SCHRITT 2: Farben anwenden
+    try:
+        t1 = time.time()
+        logger.info("%s: apply_colors START (common stage)", label)
+        disable_comment_bg_flag = (tag_config.get('disable_comment_bg', False) if isinstance(tag_config, dict) else False)
+        blocks_with_colors = preprocess.apply_colors(common_blocks, tag_config, disable_comment_bg=disable_comment_bg_flag)
+        logger.info("%s: apply_colors END (%.2fs)", label, time.time() - t1)
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("%s: apply_colors failed: %s", label, str(e))
+        logger.debug("%s: apply_colors traceback:\n%s", label, tb[:800])
+        blocks_with_colors = common_blocks
+
+    # SCHRITT 3: Tag-Sichtbarkeit anwenden
+    try:
+        hidden_by_wortart = (tag_config.get("hidden_tags_by_wortart") if isinstance(tag_config, dict) else None)
+        blocks_after_visibility = preprocess.apply_tag_visibility(blocks_with_colors, tag_config, hidden_tags_by_wortart=hidden_by_wortart)
+        logger.info("%s: applied tag visibility (common stage)", label)
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("%s: apply_tag_visibility failed (continuing): %s", label, str(e))
+        logger.debug("%s: apply_tag_visibility traceback (first 800 chars):\n%s", label, tb[:800])
+        blocks_after_visibility = blocks_with_colors
+
+    return blocks_after_visibility
+
+def cached_common_stage(key: Hashable, build_fn: Callable[[], Any]) -> Any:
+    """
+    Liefert das COMMON-Ergebnis für key aus dem Speicher-Cache oder baut es mit build_fn().
+    None-Ergebnisse (z.B. kein verarbeitbarer Text) werden NICHT gecacht.
+    """
+    if key in _COMMON_CACHE:
+        _COMMON_CACHE.move_to_end(key)
+        logging.getLogger(__name__).info("pipeline: common stage cache HIT")
+        return _COMMON_CACHE[key]
+
+    value = build_fn()
+    if value is not None and COMMON_CACHE_MAX > 0:
+        _COMMON_CACHE[key] = value
+        while len(_COMMON_CACHE) > COMMON_CACHE_MAX:
+            _COMMON_CACHE.popitem(last=False)
+    return value
+
+def clear_common_cache() -> None:
+    """Leert den COMMON-Cache (z.B. nach Code-Änderungen im laufenden Prozess)."""
+    _COMMON_CACHE.clear()
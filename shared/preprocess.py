@@ -12,6 +12,10 @@ import string
 import logging
 from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 
+from . import regex_patterns as rx  # vorkompilierte Regexe (zentrale Registry)
+from .token_record import parse_token  # Token einmal zerlegen (gecacht pro Token-String)
+from .comment_index import PairIndex  # sortierter _pair_index → Block (bisect)
+
 # Reduce noisy DEBUG output from lower-level modules by default
 logging.getLogger().setLevel(logging.INFO)
 
@@ -120,11 +124,66 @@ SUB_TAGS = {'Prä','Imp','Aor','Per','Plq','Fu','Inf','Imv','Akt','Med','Pas','K
 # KRITISCH: Unicode-Normalisierung für ä und / in Tags!
 # WICHTIG: Prä und M/P müssen korrekt erkannt werden, unabhängig von der Unicode-Kodierung des ä!
 # Der Schrägstrich / in M/P ist Teil des Tag-Namens und muss im Pattern enthalten sein.
-RE_PAREN_TAG     = re.compile(r'\(([A-Za-z0-9/≈äöüßÄÖÜ]+)\)')
-RE_LEAD_BAR_COLOR= re.compile(r'^\|\s*([+\-#§$])')  # |+ |# |- |§ |$ (Farbcode NACH leitender '|')
-RE_WORD_START = re.compile(r'([(\[|]*)([\w\u0370-\u03FF\u1F00-\u1FFF\u1F00-\u1FFF]+)') # Findet den Anfang eines Wortes, auch mit Präfixen wie (, [ oder |
-RE_STEPHANUS = re.compile(r'\[(\d+[a-e])\]')  # Stephanus-Paginierungen: [543b], [546b] etc.
-STEHPANUS_RE = re.compile(r'^\s*(\[[0-9a-zA-Z]+\]|[0-9]+[a-z]?)\s*$')  # simple stephanus-like bracket forms
+RE_PAREN_TAG     = rx.RE_PAREN_TAG
+RE_LEAD_BAR_COLOR= rx.RE_LEADING_BAR_COLOR  # |+ |# |- |§ |$ (Farbcode NACH leitender '|')
+RE_WORD_START = rx.RE_WORD_START  # Findet den Anfang eines Wortes, auch mit Präfixen wie (, [ oder |
+RE_STEPHANUS = rx.RE_STEPHANUS  # Stephanus-Paginierungen: [543b], [546b] etc.
+STEHPANUS_RE = rx.RE_STEPHANUS_LIKE  # simple stephanus-like bracket forms
+
+# ======= Copy-on-Write für Blöcke =======
+# Die öffentlichen Stufen (apply_colors, apply_tag_visibility, remove_all_tags, remove_all_color_symbols)
+# verändern die übergebene Blockliste NICHT. Statt copy.deepcopy() der kompletten Liste kopiert jede Stufe
+# nur die Container, die sie selbst in-place ändert (Token-Listen, Rows, Alternativen, token_meta).
+# Strings sind unveränderlich und werden geteilt; unberührte Blöcke (Kommentare, Überschriften, …)
+# werden per Referenz durchgereicht.
+
+_COW_LIST_KEYS = ('gr_tokens', 'de_tokens', 'en_tokens', 'comment_token_mask')
+_COW_ROW_KEYS = ('_gr_rows', '_de_rows', '_en_rows',
+                 'gr_tokens_alternatives', 'de_tokens_alternatives',
+                 'en_tokens_alternatives', 'trans3_tokens_alternatives')
+
+def _cow_token_meta(meta: Any) -> Any:
+    """Kopiert einen token_meta-Eintrag flach (plus 'flags'-Dict, das in-place gesetzt wird)."""
+    if not isinstance(meta, dict):
+        return meta
+    meta_copy = dict(meta)
+    flags = meta_copy.get('flags')
+    if isinstance(flags, dict):
+        meta_copy['flags'] = dict(flags)
+    return meta_copy
+
+def cow_copy_block(block: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy-on-Write-Kopie eines pair/flow-Blocks.
+    Neues Dict + neue Listen für alle Felder, die von den Vorverarbeitungs-Stufen in-place geändert werden.
+    Alle übrigen Felder (Strings, comments, base, …) werden mit dem Original geteilt.
+    """
+    if not isinstance(block, dict):
+        return block
+    new_block = dict(block)
+    for key in _COW_LIST_KEYS:
+        value = new_block.get(key)
+        if isinstance(value, list):
+            new_block[key] = list(value)
+    for key in _COW_ROW_KEYS:
+        rows = new_block.get(key)
+        if isinstance(rows, list):
+            new_block[key] = [list(r) if isinstance(r, list) else r for r in rows]
+    token_meta = new_block.get('token_meta')
+    if isinstance(token_meta, list):
+        new_block['token_meta'] = [_cow_token_meta(m) for m in token_meta]
+    return new_block
+
+def cow_copy_blocks(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copy-on-Write-Kopie einer Blockliste: pair/flow-Blöcke werden per cow_copy_block() kopiert,
+    alle anderen Blöcke werden per Referenz übernommen.
+    """
+    return [
+        cow_copy_block(b) if isinstance(b, dict) and b.get('type') in ('pair', 'flow') else b
+        for b in blocks
+    ]
+
 
 def is_only_punctuation_or_stephanus(s: str) -> bool:
     """
@@ -156,8 +215,8 @@ def is_trivial_translation(text: str) -> bool:
     
     # Entferne Sprecher-Marker (z.B. "[Sokrates:]", "[Φύλαξ:]") - diese zählen nicht als "Wort"
     # Sprecher-Marker sind typischerweise am Anfang: [Name:] oder [Name]
-    t_no_speaker = re.sub(r'^\s*\[[^\]]+:\]\s*', '', t)  # [Name:]
-    t_no_speaker = re.sub(r'^\s*\[[^\]]+\]\s*', '', t_no_speaker)  # [Name] (ohne Doppelpunkt)
+    t_no_speaker = rx.RE_SPEAKER_LEAD_COLON.sub('', t)  # [Name:]
+    t_no_speaker = rx.RE_SPEAKER_LEAD_PLAIN.sub('', t_no_speaker)  # [Name] (ohne Doppelpunkt)
     
     # Wenn nach Entfernen des Sprechers nichts mehr übrig ist -> trivial
     if not t_no_speaker.strip():
@@ -173,7 +232,7 @@ def is_trivial_translation(text: str) -> bool:
     # Erweiterte Liste von Interpunktionszeichen und Sonderzeichen:
     # . , ; : ? ! - ( ) [ ] " ' / \ | … · • — – ‒ ― * + = < > « » ' ' " " „ " ‹ › ‐ ‑ ‧
     # Wenn nur diese Zeichen und Leerzeichen übrig bleiben -> trivial
-    if re.fullmatch(r'^[\s\.\,\;\:\?\!\-\(\)\[\]\"\'\/\\\|…·•—–‒―\*\+=<>«»''""„"‹›‐‑‧]+$', t_no_speaker):
+    if rx.RE_ONLY_PUNCT_SPACE.fullmatch(t_no_speaker):
         return True
     
     return False
@@ -234,7 +293,7 @@ def create_comment_token_mask_for_block(block: Dict[str, Any], all_blocks: Optio
 
 # ======= COMMENT EXTRACTION & MASKING HELPERS =======
 # Regex für Inline-Kommentare: "(2-4k) text..." oder "(5121k) text..."
-_RE_INLINE_COMMENT = re.compile(r'^\s*\(?\s*(\d+)(?:-(\d+))?\s*k\)\s*(.*)', flags=re.I)
+_RE_INLINE_COMMENT = rx.RE_INLINE_COMMENT
 
 def extract_inline_comments_from_blocks(blocks: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
     """
@@ -310,23 +369,17 @@ def assign_comment_ranges_to_blocks(blocks: List[Dict[str,Any]], inline_comments
             if 'comment_token_mask' not in b:
                 b['comment_token_mask'] = [False] * max(1, len(b.get('gr_tokens', [])))
     
+    # Sortierter Index _pair_index → Block (shared/comment_index.py):
+    # Zielblock und Bereich s..e per bisect statt linearer Suche über alle Blöcke
+    index = PairIndex.from_blocks(blocks)
+    
     # For each extracted inline comment, attach to appropriate block
     for cm in inline_comments:
         s = cm['start_pair']
         e = cm['end_pair']
         txt = cm['text']
-        # find block with pair_index == e (last block in range). fallback: nearest lower index
-        target = None
-        for b in blocks:
-            if isinstance(b, dict) and b.get('_pair_index') == e:
-                target = b
-                break
-        if target is None:
-            # fallback: find last block with pair_index <= e
-            for b in reversed(blocks):
-                if isinstance(b, dict) and isinstance(b.get('_pair_index'), int) and b.get('_pair_index') <= e:
-                    target = b
-                    break
+        # block with pair_index == e (last block in range). fallback: nearest lower index
+        target = index.at_or_before(e)
         if target is None:
             # give up for this comment
             continue
@@ -341,25 +394,23 @@ def assign_comment_ranges_to_blocks(blocks: List[Dict[str,Any]], inline_comments
         target.setdefault('comments', []).append(comment_obj)
         
         # Now set mask for all blocks in s..e
-        for b in blocks:
-            pi = b.get('_pair_index')
-            if isinstance(pi, int) and s <= pi <= e:
-                # ensure mask length equals token count
-                toklen = len(b.get('gr_tokens', []))
-                if toklen == 0:
-                    b['comment_token_mask'] = []
-                    continue
-                old = b.get('comment_token_mask') or [False] * toklen
-                if len(old) != toklen:
-                    # resize preserving old flags
-                    new_mask = [False] * toklen
-                    for i in range(min(len(old), toklen)):
-                        new_mask[i] = old[i]
-                    old = new_mask
-                # mark entire token range as True (comment)
-                for i in range(toklen):
-                    old[i] = True
-                b['comment_token_mask'] = old
+        for b in index.between(s, e):
+            # ensure mask length equals token count
+            toklen = len(b.get('gr_tokens', []))
+            if toklen == 0:
+                b['comment_token_mask'] = []
+                continue
+            old = b.get('comment_token_mask') or [False] * toklen
+            if len(old) != toklen:
+                # resize preserving old flags
+                new_mask = [False] * toklen
+                for i in range(min(len(old), toklen)):
+                    new_mask[i] = old[i]
+                old = new_mask
+            # mark entire token range as True (comment)
+            for i in range(toklen):
+                old[i] = True
+            b['comment_token_mask'] = old
 
 def discover_and_attach_comments(blocks: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
     """
@@ -419,7 +470,7 @@ def discover_and_attach_comments(blocks: List[Dict[str,Any]]) -> List[Dict[str,A
             continue
         
         # Normalisiere Zeilennummer (entferne Buchstaben wie "a", "b")
-        base_num = re.sub(r'[a-z]', '', str(line_num).lower())
+        base_num = rx.RE_LOWER_ASCII_LETTER.sub('', str(line_num).lower())
         try:
             base_num = int(base_num)
             pair_to_block[base_num] = idx
@@ -562,7 +613,7 @@ def _strip_all_colors(token: str) -> str:
 def _extract_tags(token: str) -> List[str]:
     if not token:
         return []
-    return RE_PAREN_TAG.findall(token)
+    return list(parse_token(token).tags)
 
 # ======= Helper: Token-Tag-Parsing =======
 def parse_token_tags(token: str):
@@ -572,9 +623,8 @@ def parse_token_tags(token: str):
     """
     if not token:
         return '', []
-    tags = RE_PAREN_TAG.findall(token)
-    base = RE_PAREN_TAG.sub('', token)
-    return base, tags
+    rec = parse_token(token)
+    return rec.core, list(rec.tags)
 
 def remove_tags_from_token(token: str, tags_to_remove: set):
     """
@@ -582,6 +632,8 @@ def remove_tags_from_token(token: str, tags_to_remove: set):
     """
     if not token or not tags_to_remove:
         return token
+    if not parse_token(token).tags:
+        return token
     
     def repl(m):
         tag = m.group(1)
@@ -593,7 +645,7 @@ def remove_all_tags_from_token(token: str):
     """Strip all parenthesized tags from token."""
     if not token:
         return token
-    return RE_PAREN_TAG.sub('', token)
+    return parse_token(token).core
 
 def _get_wortart_and_relevant_tags(token_tags: Set[str]) -> tuple[Optional[str], Set[str]]:
     """
@@ -701,6 +753,9 @@ def _remove_selected_tags(token: str,
     # Dies stellt sicher, dass ä in (Prä) konsistent erkannt wird.
     import unicodedata
     token = unicodedata.normalize('NFC', token)
+    # SCHNELLPFAD: Token ohne (Tag)-Gruppen bleibt unverändert (Record ist gecacht)
+    if not parse_token(token).tags:
+        return token
 
     def repl(m):
         tag = m.group(1)
@@ -840,30 +895,19 @@ def _apply_colors_and_placements(blocks: List[Dict[str, Any]], config: Dict[str,
             if not token:
                 continue
 
-            # Extract original tags and store them so later removal uses original tag set
-            orig_tags = set(_extract_tags(token))
+            # NEU: HideTags/HideTrans-Flags, Original-Tags und der Token ohne Hide-Marker kommen
+            # aus dem (gecachten) Token-Record – kein erneutes Durchsuchen des Token-Strings
+            record = parse_token(token)
+            hide_tags_flag = record.hide_tags
+            hide_trans_flag = record.hide_trans
             
-            # WICHTIG: Erkenne HideTags/HideTrans Flags direkt im Token-String (vor Tag-Extraktion)
-            # Prüfe sowohl im Token-String als auch in extrahierten Tags
-            hide_tags_flag = (TAG_HIDE_TAGS in token or '(HideTags)' in token or '(hidetags)' in token) or (TAG_HIDE_TAGS in orig_tags or 'hidetags' in (t.lower() for t in orig_tags))
-            hide_trans_flag = (TRANSLATION_HIDE_TAG in token or '(HideTrans)' in token or '(hidetrans)' in token) or (TRANSLATION_HIDE_TAG in orig_tags or 'hidetrans' in (t.lower() for t in orig_tags))
-            
-            # Entferne HideTags/HideTrans Marker aus dem Token-String, damit sie nicht im PDF erscheinen
-            cleaned_token = token
-            if hide_tags_flag:
-                cleaned_token = cleaned_token.replace(f'({TAG_HIDE_TAGS})', '')
-                cleaned_token = cleaned_token.replace('(HideTags)', '')
-                cleaned_token = cleaned_token.replace('(hidetags)', '')
-            if hide_trans_flag:
-                cleaned_token = cleaned_token.replace(f'({TRANSLATION_HIDE_TAG})', '')
-                cleaned_token = cleaned_token.replace('(HideTrans)', '')
-                cleaned_token = cleaned_token.replace('(hidetrans)', '')
+            # Hide-Marker entfernt, damit sie nicht im PDF erscheinen (übrige Tags bleiben an ihrer Stelle)
+            cleaned_token = record.unhidden
             # Aktualisiere token in der Liste
             new_gr_tokens[i] = cleaned_token
             
-            # Aktualisiere orig_tags nach Entfernung der Hide-Marker
-            orig_tags_clean = orig_tags - {TAG_HIDE_TAGS, TRANSLATION_HIDE_TAG}
-            orig_tags_clean = orig_tags_clean - {t for t in orig_tags if t.lower() in ('hidetags', 'hidetrans')}
+            # Original-Tags (so later removal uses original tag set) ohne die Hide-Marker
+            orig_tags_clean = {t for t in record.tags if t.lower() not in ('hidetags', 'hidetrans')}
             
             # Speichere die Original-Tags (ohne Hide-Marker) und Flags in token_meta
             if i < len(token_meta):
@@ -969,9 +1013,7 @@ def _apply_colors_and_placements(blocks: List[Dict[str, Any]], config: Dict[str,
                     token_meta[i]['force_color_en'] = True
 
             # WICHTIG: Für Farbberechnung HideTags/HideTrans entfernen, damit sie die Farbzuordnung nicht beeinflussen
-            tags_for_color = orig_tags - {TAG_HIDE_TAGS, TRANSLATION_HIDE_TAG}
-            tags_for_color = tags_for_color - {t for t in orig_tags if t.lower() in ('hidetags', 'hidetrans')}
-            token_tags = tags_for_color
+            token_tags = orig_tags_clean
             
             if not token_tags:
                 continue
@@ -1219,7 +1261,7 @@ def _process_token(token: str,
     #   - nur griechische Zeile hat Marker; deutsche Tokens bleiben stets markerfrei
     if is_greek_line:
         if versmass_mode == "REMOVE_MARKERS":
-            t = re.sub(r'[iL|]', '', t)
+            t = rx.RE_METER_MARKERS.sub('', t)
         elif versmass_mode == "KEEP_MARKERS":
             pass  # nichts tun
         else:
@@ -1575,7 +1617,8 @@ def _maybe_register_translation_rule(rules: Dict[str, Dict[str, Any]], normalize
 def apply_colors(blocks: List[Dict[str, Any]], tag_config: Dict[str, Any], disable_comment_bg: bool = False) -> List[Dict[str, Any]]:
     """
     Fügt Farbsymbole (#, +, §, $) basierend auf der tag_config hinzu.
-    Gibt eine NEUE, tief kopierte Blockliste zurück.
+    Gibt eine NEUE Blockliste zurück (Copy-on-Write: nur pair/flow-Blöcke werden kopiert,
+    die übergebene Liste bleibt unverändert).
     Die Original-Tags bleiben vollständig erhalten.
     
     WICHTIG: Versteckt auch Übersetzungen für (HideTrans) Tags NACH dem Hinzufügen der Farben.
@@ -1583,8 +1626,8 @@ def apply_colors(blocks: List[Dict[str, Any]], tag_config: Dict[str, Any], disab
     
     disable_comment_bg: Wenn True, werden Hintergrundfarben in Kommentarbereichen unterdrückt.
     """
-    import copy
-    blocks_copy = copy.deepcopy(blocks)
+    # Copy-on-Write: token_meta und Token-Listen werden in-place ergänzt → pair/flow-Blöcke kopieren
+    blocks_copy = cow_copy_blocks(blocks)
     
     # Schritt 1: Füge Farben hinzu (ZUERST, damit Farben nicht verloren gehen)
     blocks_with_colors = _apply_colors_and_placements(blocks_copy, tag_config)
@@ -1616,8 +1659,9 @@ def apply_tag_visibility(blocks: List[Dict[str, Any]], tag_config: Optional[Dict
     Filtert Tags basierend auf den 'hide' und 'placement' Regeln in tag_config.
     WICHTIG: Markiert auch, welche Tags entfernt wurden, damit Poesie_Code.py die Breite korrekt berechnen kann.
     """
-    import copy
-    blocks_copy = copy.deepcopy(blocks)
+    # Copy-on-Write: Jeder Block bekommt mindestens die _in_quote-Markierung, Blöcke innerhalb von
+    # Zitaten werden zusätzlich tokenweise geändert → COW-Kopie (für Blöcke ohne Token-Listen nur ein dict()).
+    blocks_copy = [cow_copy_block(b) for b in blocks]
     
     # Schritt 1: Bestimme globale und wortart-spezifische sup_keep / sub_keep
     global_sup_keep = set(SUP_TAGS)
@@ -1785,8 +1829,7 @@ def apply_tag_visibility(blocks: List[Dict[str, Any]], tag_config: Optional[Dict
         """
         if remove_all:
             # Remove all parenthesis tag-groups (keeps punctuation / leading markers)
-            cleaned = RE_PAREN_TAG.sub('', tok)
-            return cleaned
+            return parse_token(tok).core
         if not tags_to_remove:
             return tok
         # callback für jede Klammergruppe
@@ -1957,13 +2000,12 @@ def apply_tag_visibility(blocks: List[Dict[str, Any]], tag_config: Optional[Dict
             if TAG_HIDE_TAGS.lower() in original_tags_normalized or hide_tags_flag:
                 # Remove all tag groups like '(Adj)(G)' etc. but keep punctuation and COLOR SYMBOLS
                 # WICHTIG: COLOR_SYMBOLS (#, +, -, §, $) müssen erhalten bleiben!
-                cleaned = tok
                 # Entferne alle Tag-Klammern (Parenthesen-Gruppen), aber behalte Farbcodes
-                cleaned = RE_PAREN_TAG.sub('', cleaned)
+                cleaned = parse_token(tok).core
                 # Entferne auch HideTags/HideTrans selbst aus dem Token
                 cleaned = cleaned.replace(f'({TAG_HIDE_TAGS})', '').replace(f'({TRANSLATION_HIDE_TAG})', '')
-                cleaned = re.sub(r'\([Hh]ide[Tt]ags\)', '', cleaned)
-                cleaned = re.sub(r'\([Hh]ide[Tt]rans\)', '', cleaned)
+                cleaned = rx.RE_HIDE_TAGS_MARK.sub('', cleaned)
+                cleaned = rx.RE_HIDE_TRANS_MARK.sub('', cleaned)
                 # Debug output
                 if bi < 2 and i < 5:
                     print(f"DEBUG apply_tag_visibility: Block {bi} Token {i}: HideTags detected, removed all tags, orig_tags={sorted(list(orig_tags))[:8]}, computed_color={token_meta[i].get('computed_color') if i < len(token_meta) else None}")
@@ -2131,10 +2173,11 @@ def remove_all_tags(blocks: List[Dict[str, Any]],
                     tag_config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
     Entfernt ALLE bekannten Grammatik-Tags (SUP und SUB).
-    Gibt eine NEUE, tief kopierte Blockliste zurück.
+    Gibt eine NEUE Blockliste zurück (Copy-on-Write: die übergebene Liste bleibt unverändert).
     """
-    import copy
-    blocks_copy = copy.deepcopy(blocks)
+    # KEINE Kopie nötig: _process_pair_block erzeugt neue Blöcke mit neuen Token-Listen,
+    # alle anderen Block-Typen werden unverändert durchgereicht.
+    blocks_copy = blocks
     processed_blocks = []
     translation_rules: Dict[str, Dict[str, Any]] = {}
     if tag_config:
@@ -2162,14 +2205,13 @@ def remove_all_tags(blocks: List[Dict[str, Any]],
 def remove_all_color_symbols(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Entfernt ALLE Farbsymbole (#, +, §, $) aus allen Tokens.
-    Gibt eine NEUE, tief kopierte Blockliste zurück.
+    Gibt eine NEUE Blockliste zurück (Copy-on-Write: die übergebene Liste bleibt unverändert).
     """
-    import copy
-    blocks_copy = copy.deepcopy(blocks)
     processed_blocks = []
-    for b in blocks_copy:
+    for b in blocks:
         if isinstance(b, dict) and b.get('type') in ('pair', 'flow'):
-            processed_blocks.append(_strip_colors_from_block(b))
+            # _strip_colors_from_block ersetzt die Token-Listen/Rows komplett → flache Dict-Kopie genügt
+            processed_blocks.append(_strip_colors_from_block(dict(b)))
         else:
             processed_blocks.append(b)
     return processed_blocks
@@ -2330,14 +2372,12 @@ def _hide_manual_translations_in_block(block: Dict[str, Any]) -> Dict[str, Any]:
     de_tokens_alternatives = block.get('de_tokens_alternatives')
     en_tokens_alternatives = block.get('en_tokens_alternatives')
     
-    TRANSLATION_HIDE_TAG = '(HideTrans)'
-    
     for idx, gr_token in enumerate(gr_tokens):
         if not gr_token:
             continue
         
-        # Prüfe auf (HideTrans) Tag
-        if TRANSLATION_HIDE_TAG in gr_token or '(hidetrans)' in gr_token.lower():
+        # Prüfe auf (HideTrans) Tag (Token-Record, Groß-/Kleinschreibung egal)
+        if parse_token(gr_token).hide_trans:
             # KRITISCH: Wenn de_tokens_alternatives existiert, blende ALLE Alternativen aus!
             if de_tokens_alternatives:
                 for alt_idx in range(len(de_tokens_alternatives)):
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/regex_patterns.py
+------------------------
+Zentrale Registry aller vorkompilierten Regexe für Prosa_Code, Poesie_Code und shared/preprocess.
+
+Hintergrund:
+- tokenize(), process_input_file() und die Tabellen-Helfer in build_tables_for_stream laufen
+  pro Zeile bzw. pro Token. Inline-Aufrufe wie re.sub(r'...', ...) kosten bei jedem Aufruf
+  einen Lookup im internen re-Cache (Pattern + Flags); vorkompilierte Objekte nicht.
+- Gleiche Patterns waren in mehreren Modulen doppelt definiert (Tags, Sprecher, Überschriften).
+  Hier gibt es jedes Pattern genau einmal; die Module binden es unter ihren bisherigen Namen.
+
+Öffentliche API:
+- RE_*-Konstanten (re.Pattern), gruppiert nach Zweck (Tags, Zeilennummern, Sprecher,
+  Überschriften/Marker, Token-Klassifikation, Versmaß).
+
+Konventionen:
+- Namen beschreiben das Pattern, nicht den Aufrufer (z.B. RE_PAREN_TAG statt RE_TAG_PROSA).
+- Patterns werden 1:1 aus den bisherigen Inline-Aufrufen übernommen (gleiche Flags),
+  damit sich das Verhalten NICHT ändert.
+"""
+
+from __future__ import annotations
+
+import re
+
+# ======= Tags =======
+# WICHTIG: Der Schrägstrich / in M/P und ≈ sind Teil des Tag-Namens!
+_TAG_CHARS = r'A-Za-z0-9/≈äöüßÄÖÜ'
+
+RE_PAREN_TAG        = re.compile(rf'\(([{_TAG_CHARS}]+)\)')              # (Adj) → "Adj"
+RE_PAREN_TAG_NAKED  = re.compile(rf'\([{_TAG_CHARS}]+\)')                # (Adj) ohne Gruppe
+RE_PAREN_TAG_SPACED = re.compile(rf'\(\s*([{_TAG_CHARS}]+)\s*\)')        # ( Adj ) → "Adj"
+RE_PAREN_TAG_STRIP  = re.compile(rf'\(\s*[{_TAG_CHARS}]+\s*\)')          # zum Entfernen
+RE_PAREN_TAG_ALPHA  = re.compile(r'\(\s*([A-Za-z/≈äöüßÄÖÜ]+)\s*\)')      # Poesie: ohne Ziffern
+RE_ANY_PAREN        = re.compile(r'\([^)]*\)')                           # beliebige Klammer (Tags)
+RE_PAREN_GROUP_SUFFIX = re.compile(r'(\([^)]*\))+$')                     # Tag-Kette am Tokenende
+RE_COLOR_PREFIX_TAG = re.compile(r'^([a-zA-Z_]+[#\$§+\-])')              # Präfix vor Farbcode
+RE_HIDE_TAGS_MARK   = re.compile(r'\([Hh]ide[Tt]ags\)')
+RE_HIDE_TRANS_MARK  = re.compile(r'\([Hh]ide[Tt]rans\)')
+
+# ======= Farbcodes / Pipes =======
+RE_LEADING_BAR_COLOR = re.compile(r'^\|\s*([+\-#§$])')                   # |+ |# |- |§ |$ am Tokenanfang
+RE_TRAILING_BARS     = re.compile(r'\|+\s*$')                            # ||| am Tokenende
+RE_FONT_COLOR_ATTR   = re.compile(r'<font\s+color="([^"]+)"', re.IGNORECASE)
+
+# ======= Zeilennummern =======
+RE_LINE_NUM_PREFIX   = re.compile(r'^\s*\((\d+[a-z]?)\)')                # "(123a) ..." → "123a"
+RE_LINE_NUM_SPLIT    = re.compile(r'^(\s*\(\d+[a-z]?\)\s*)(.*)')         # (Präfix inkl. Leerraum, Rest)
+RE_LINE_NUM_STRIP    = re.compile(r'^\s*\(\d+[a-z]?\)\s*')
+RE_LINE_NUM_SPEAKER_SPLIT = re.compile(r'^(\s*\(\d+[a-z]?\)\s*)(\[.+?:\]\s*|([^\s:]+):\s*)(.*)')  # (Nr, Sprecher, Rest)
+RE_LINE_NUM_ONLY     = re.compile(r'^\s*\(\d+[a-z]?\)\s*$')              # Zeile besteht NUR aus "(123)"
+RE_LINE_NUM_TOKEN    = re.compile(r'^\(\d+[a-z]*\)$')
+RE_LINE_NUM_LEAD     = re.compile(r'^\(\d+[a-z]*\)')
+RE_LINE_NUM_AND_REST = re.compile(r'^(\(\d+[a-z]*\))\s*(.*)$')
+RE_LINE_NUM_EXTRACT  = re.compile(r'^\((\d+[a-z]?)\)\s*(.*)$', re.IGNORECASE)
+RE_LINE_RANGE_EXTRACT = re.compile(r'^\((\d+)-(\d+)([a-z]?)\)\s*(.*)$', re.IGNORECASE)
+RE_SIGNED_LINE_NUM_EXTRACT   = re.compile(r'^\((-?\d+)([a-z]?)\)\s*(.*)$', re.IGNORECASE)
+RE_SIGNED_LINE_RANGE_EXTRACT = re.compile(r'^\((-?\d+)-(-?\d+)([a-z]?)\)\s*(.*)$', re.IGNORECASE)
+RE_LEADING_INT       = re.compile(r'^(-?\d+)')
+RE_LEADING_INT_RANGE = re.compile(r'^(-?\d+)-(-?\d+)')
+RE_LEADING_UINT      = re.compile(r'^(\d+)')
+RE_COMMENT_LINE_NUM  = re.compile(r'^\((\d+(?:-\d+)?)k\)\s*(.*)')        # (12k) / (12-14k) Kommentar
+RE_COMMENT_LINE_NUM_STRIP = re.compile(r'^\(\d+(?:-\d+)?k\)\s*')
+RE_INLINE_COMMENT    = re.compile(r'^\s*\(?\s*(\d+)(?:-(\d+))?\s*k\)\s*(.*)', flags=re.I)
+RE_OUTER_PARENS      = re.compile(r'^\(|\)$')                           # "(12a)" → "12a"
+RE_INLINE_MARK       = re.compile(r'^\(\s*(?:[0-9]+[a-z]*|[a-z])\s*\)$', re.IGNORECASE)
+
+# ======= Sprecher =======
+RE_SPEAKER_GR        = re.compile(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:$')   # Λυσ:, Σωκ:
+RE_SPK_BRACKET       = re.compile(r'^\[[^\]]*:\]$')                      # [ΣΩΚ:]
+RE_SPK_BRACKET_PREFIX = re.compile(r'^\[[^\]]*:\]\s*(.*)$')              # "[Σωκ:] Rest" → "Rest"
+RE_SPEAKER_GR_PREFIX = re.compile(r'^[\u0370-\u03FF\u1F00-\u1FFF]+:\s*(.*)$')  # "Σωκ: Rest" → "Rest"
+RE_SPK_BRACKET_LEAD  = re.compile(r'^\[[^\]]*:\]')
+
+# ======= Überschriften / Titel / Marker =======
+RE_EQ_H1 = re.compile(r'^\s*={4}\s*(.+?)\s*={4}\s*$')                 # ==== Text ====
+RE_EQ_H2 = re.compile(r'^\s*={3}\s*(.+?)\s*={3}\s*$')                 # === Text ===
+RE_EQ_H3 = re.compile(r'^\s*={2}\s*(.+?)\s*={2}\s*$')                 # == Text ==
+RE_EQ_PARA = re.compile(r'^\s*=\s*§\s*([0-9IVXLCDM]+)\s*=\s*$', re.IGNORECASE)
+RE_BRACE_TITLE = re.compile(r'^\s*\{\s*(.+?)\s*\}\s*$')               # {Titel}
+RE_SECTION         = re.compile(r'^\s*\[\[\s*(.+?)\s*\]\]\s*$')
+RE_SECTION_SINGLE  = re.compile(r'^\s*\[\s*(.+?)\s*\]\s*$')
+RE_ZEILE_LOST      = re.compile(r'^\s*(\(\d+[a-z]*\))?\s*(\[[^\]]*:\])?\s*\[\[Zeile\s+Lost\]\]\s*$', re.IGNORECASE)
+
+RE_QUOTE_START   = re.compile(r'^\s*(\([^)]+\))?\s*\[Zitat\s*Anfang\]\s*$',  re.IGNORECASE)
+RE_QUOTE_END     = re.compile(r'^\s*(\([^)]+\))?\s*\[Zitat\s*Ende\]\s*$',    re.IGNORECASE)
+RE_SOURCE_START  = re.compile(r'^\s*(\([^)]+\))?\s*\[Quelle\s*Anfang\]\s*$', re.IGNORECASE)
+RE_SOURCE_END    = re.compile(r'^\s*(\([^)]+\))?\s*\[Quelle\s*Ende\]\s*$',   re.IGNORECASE)
+RE_SOURCE_INLINE = re.compile(r'^\s*(\([^)]+\))?\s*\[Quelle\s*Anfang\]\s*(.*?)\s*\[Quelle\s*Ende\]\s*$', re.IGNORECASE)
+
+# Zitat/Quelle-Marker innerhalb einer Zeile (werden in tokenize() entfernt, Reihenfolge wichtig)
+RE_QUOTE_SOURCE_MARKERS = (
+    re.compile(r'\[Zitat\s*Anfang\]', re.IGNORECASE),
+    re.compile(r'\[Zitat\s*Ende\]', re.IGNORECASE),
+    re.compile(r'\[Quelle\s*Anfang\]', re.IGNORECASE),
+    re.compile(r'\[Quelle\s*Ende\]', re.IGNORECASE),
+)
+
+RE_HTML_COMMENT_HEADER = re.compile(r'^(<!--.*?-->\s*)+', re.DOTALL | re.MULTILINE)  # <!-- META --> am Dateianfang
+
+# Label-Token wie [12], [12a], (12), (12a) – optional mit Punkt
+RE_LABEL_TOKEN     = re.compile(r'^[\[\(]\s*(-?\d+)([a-z])?\s*[\]\)]\.?$', re.IGNORECASE)
+RE_LABEL_STRIP     = re.compile(r'^(?:\[\s*-?\d+[a-z]?\s*\]\.?\s*|\(\s*-?\d+[a-z]?\s*\)\.?\s*)', re.IGNORECASE)
+
+# ======= Token-Klassifikation =======
+RE_HAS_GREEK = re.compile(r'[\u0370-\u03FF\u1F00-\u1FFF]')
+RE_WHITESPACE_RUN = re.compile(r'\s+')
+RE_WORD_START = re.compile(r'([(\[|]*)([\w\u0370-\u03FF\u1F00-\u1FFF\u1F00-\u1FFF]+)')  # Wortanfang, auch nach (, [ oder |
+RE_STEPHANUS = re.compile(r'\[(\d+[a-e])\]')                                            # [543b], [546b] …
+RE_STEPHANUS_LIKE = re.compile(r'^\s*(\[[0-9a-zA-Z]+\]|[0-9]+[a-z]?)\s*$')              # einfache Stephanus-Formen
+RE_STEPHANUS_TOKEN = re.compile(r'^\[?\d+[a-e]?\]?$')                                   # [123a] / 123a
+RE_ONLY_SYMBOLS = re.compile(r'^[\[\]\(\).,;:!?…—"\'*†‡§\s]+$')                         # nur Interpunktion/Symbole
+RE_ONLY_PUNCT_SPACE = re.compile(r'^[\s\.\,\;\:\?\!\-\(\)\[\]\"\'\/\\\|…·•—–‒―\*\+=<>«»''""„"‹›‐‑‧]+$')  # Übersetzungszeile ohne echtes Wort
+RE_SPEAKER_LEAD_COLON = re.compile(r'^\s*\[[^\]]+:\]\s*')    # [Name:]
+RE_SPEAKER_LEAD_PLAIN = re.compile(r'^\s*\[[^\]]+\]\s*')     # [Name]
+RE_LATIN_ABLATIVE_NOUN = re.compile(r'\(N\)\(Abl\)')                                    # Latein: (N)(Abl) → (Abl)
+RE_NON_WORD_RUN = re.compile(r'\W+')
+RE_LOWER_ASCII_LETTER = re.compile(r'[a-z]')
+
+# ======= Versmaß =======
+RE_METER_LETTERS = re.compile(r'[Lir]+')
+RE_METER_MARKERS = re.compile(r'[iL|]')
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/render_cache.py
+----------------------
+Inhaltsadressierter Cache für fertig gerenderte Draft-PDFs (genutzt von den Draft-Adaptern).
+
+Hintergrund:
+- Ein Entwurf in texte_drafts/ wird über worker.js oft mit IDENTISCHEM Text und identischer
+  Tag-Konfiguration erneut eingereicht; der Workflow rendert dann alle Varianten neu.
+- Der Cache-Schlüssel ist ein Hash über alles, was den PDF-Inhalt bestimmt:
+    Art (prosa/poesie), bereinigter Text, TAG_CONFIG (sortiertes JSON), HIDE_PIPES,
+    Varianten-Optionen (Sprache, Versmaß, Reduktion …) und die Renderer-Code-Version
+    (Hash über die Quelltexte von Prosa/Poesie-Code, Orchestratoren, shared/*.py + reportlab-Version).
+- Bei einem Treffer werden die PDFs nur ins Zielverzeichnis kopiert (optional Hardlink).
+
+Öffentliche API:
+- cache_enabled() -> bool
+- renderer_version() -> str
+- cache_key(kind, text, tag_config, hide_pipes, options=None) -> str
+- fetch(key, out_dir, base) -> list[Path] | None
+- store(key, paths, base) -> bool
+- cache_stats() -> dict
+
+Konventionen:
+- Ablage: RENDER_CACHE_DIR (Standard <Projekt>/.render_cache), ein Verzeichnis pro Schlüssel
+  mit manifest.json (Varianten-Suffixe in Varianten-Reihenfolge) und den PDFs.
+- Dateinamen werden OHNE Base-Name gespeichert (nur Suffix wie '_GR_Fett_Colour_Tag.pdf'),
+  damit ein erneut eingereichter Entwurf mit neuem Session-/Zeitstempel-Namen trifft.
+- LRU: Jeder Treffer setzt die mtime des Manifests; überschreitet der Cache RENDER_CACHE_MAX_MB
+  (Standard 1024), werden die am längsten nicht benutzten Einträge gelöscht.
+- Gespeichert wird immer als Kopie (der Cache besitzt eigene Inodes). RENDER_CACHE_HARDLINK=1
+  legt Treffer per Hardlink ab – nur sinnvoll, wenn Ziel-PDFs ersetzt und nie in-place
+  überschrieben werden (reportlab öffnet Zieldateien mit 'wb' und würde den Eintrag verändern).
+- Abschalten über RENDER_CACHE=0. Cache-Fehler brechen den Build nie ab (nur Ausgabe).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# ========================== Modulzustand / Defaults ==========================
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RENDER_CACHE_DIR = Path(os.environ.get("RENDER_CACHE_DIR", str(ROOT / ".render_cache")))
+RENDER_CACHE_MAX_MB = float(os.environ.get("RENDER_CACHE_MAX_MB", "1024"))
+RENDER_CACHE_HARDLINK = os.environ.get("RENDER_CACHE_HARDLINK", "0").strip().lower() in ("1", "true", "yes", "on")
+
+MANIFEST = "manifest.json"
+
+# Quelltexte, die den PDF-Inhalt bestimmen (relativ zum Projekt-Root)
+_VERSION_SOURCES = ("Prosa_Code.py", "Poesie_Code.py", "prosa_pdf.py", "poesie_pdf.py")
+
+
+# =============================== Helper =====================================
+
+def _entry_dir(key: str) -> Path:
+    return RENDER_CACHE_DIR / key[:2] / key
+
+def _place(src: Path, dst: Path, *, hardlink: bool = False) -> None:
+    """Kopie; mit hardlink=True zuerst Hardlink (Fallback Kopie, z.B. über Dateisystemgrenzen)."""
+    if dst.exists():
+        dst.unlink()
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+def _evict(max_bytes: float) -> None:
+    """Löscht die am längsten nicht benutzten Einträge, bis der Cache unter max_bytes liegt."""
+    entries = []
+    for manifest in RENDER_CACHE_DIR.glob(f"*/*/{MANIFEST}"):
+        try:
+            entries.append((manifest.stat().st_mtime, manifest.parent, _entry_size(manifest.parent)))
+        except OSError:
+            continue
+    total = sum(size for _, _, size in entries)
+    for _, entry, size in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        print(f"  → Render-Cache: LRU-Eintrag entfernt ({entry.name[:12]}…, {size / 1024:.0f} KB)")
+
+
+# =============================== Public API =================================
+
+def cache_enabled() -> bool:
+    """Render-Cache aktiv? (Standard: ja; RENDER_CACHE=0 schaltet ab)"""
+    return os.environ.get("RENDER_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+@lru_cache(maxsize=1)
+def renderer_version() -> str:
+    """Hash über die Renderer-Quelltexte + reportlab-Version (ändert sich bei jeder Code-Änderung)."""
+    import reportlab
+    h = hashlib.sha256(reportlab.Version.encode("utf-8"))
+    sources = [ROOT / name for name in _VERSION_SOURCES] + sorted((ROOT / "shared").glob("*.py"))
+    for path in sources:
+        try:
+            h.update(path.name.encode("utf-8"))
+            h.update(path.read_bytes())
+        except OSError:
+            continue
+    return h.hexdigest()
+
+def cache_key(kind: str, text: str, tag_config: Optional[Dict[str, Any]], hide_pipes: bool,
+              options: Optional[Dict[str, Any]] = None) -> str:
+    """Schlüssel über alles, was den PDF-Inhalt bestimmt (siehe Modul-Docstring)."""
+    payload = {
+        "kind": kind,
+        "text": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "tag_config": tag_config or None,
+        "hide_pipes": bool(hide_pipes),
+        "options": options or {},
+        "renderer": renderer_version(),
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def fetch(key: str, out_dir: str | os.PathLike, base: str) -> Optional[List[Path]]:
+    """
+    Treffer → legt die PDFs als '<base><suffix>' in out_dir ab und gibt die Pfade in
+    Varianten-Reihenfolge zurück. Kein Treffer (oder Cache aus/defekt) → None.
+    """
+    if not cache_enabled():
+        return None
+    entry = _entry_dir(key)
+    manifest = entry / MANIFEST
+    try:
+        raw = manifest.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    try:
+        suffixes = json.loads(raw)["suffixes"]
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for i, suffix in enumerate(suffixes):
+            dst = out / f"{base}{suffix}"
+            _place(entry / f"{i:02d}{suffix}", dst, hardlink=RENDER_CACHE_HARDLINK)
+            paths.append(dst)
+        os.utime(manifest)  # LRU: zuletzt benutzt
+    except Exception as e:
+        print(f"  ⚠ Render-Cache: Eintrag {key[:12]}… unlesbar ({e}) – wird neu gerendert")
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    print(f"  → Render-Cache HIT {key[:12]}…: {len(paths)} PDF(s) übernommen")
+    return paths
+
+def store(key: str, paths: Iterable[str | os.PathLike], base: str) -> bool:
+    """
+    Legt Kopien der gerenderten PDFs unter key ab und räumt per LRU auf.
+    Dateien, deren Name nicht mit base beginnt, werden nicht gecacht (kein Eintrag).
+    """
+    if not cache_enabled():
+        return False
+    paths = [Path(p) for p in paths]
+    if not paths or not all(p.name.startswith(base) for p in paths):
+        return False
+    entry = _entry_dir(key)
+    tmp = entry.parent / f".tmp_{key}_{uuid.uuid4().hex[:8]}"
+    try:
+        tmp.mkdir(parents=True)
+        suffixes = [p.name[len(base):] for p in paths]
+        for i, (src, suffix) in enumerate(zip(paths, suffixes)):
+            _place(src, tmp / f"{i:02d}{suffix}")
+        (tmp / MANIFEST).write_text(json.dumps({"suffixes": suffixes, "created": time.time()},
+                                               ensure_ascii=False), encoding="utf-8")
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        tmp.rename(entry)  # atomar: halbe Einträge sind nie sichtbar
+    except Exception as e:
+        print(f"  ⚠ Render-Cache: Speichern fehlgeschlagen ({e})")
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    print(f"  → Render-Cache: {len(paths)} PDF(s) gespeichert ({key[:12]}…)")
+    _evict(RENDER_CACHE_MAX_MB * 1024 * 1024)
+    return True
+
+def cache_stats() -> dict:
+    """Anzahl Einträge und Gesamtgröße des Caches."""
+    entries = [m.parent for m in RENDER_CACHE_DIR.glob(f"*/*/{MANIFEST}")]
+    size = sum(_entry_size(e) for e in entries)
+    return {"entries": len(entries), "bytes": size, "max_bytes": int(RENDER_CACHE_MAX_MB * 1024 * 1024),
+            "dir": str(RENDER_CACHE_DIR)}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/render_context.py
+------------------------
+Expliziter Render-Kontext statt modulglobaler Zustände in Prosa_Code / Poesie_Code.
+
+Hintergrund:
+- create_pdf hat bisher Modul-Globals umgesetzt (Poesie: CURRENT_IS_NOTAGS, CURRENT_IS_LATIN,
+  PLACEMENT_OVERRIDES, INTER_PAIR_GAP_MM; Prosa: INTRA_PAIR_GAP_MM, CONT_PAIR_GAP_MM,
+  SPEAKER_GAP_MM, _PLACEMENT_OVERRIDES). Zwei Varianten konnten deshalb nie gleichzeitig im
+  selben Prozess rendern (Thread-Pool, asyncio).
+- RenderContext bündelt diese Werte pro create_pdf-Aufruf. Die Builder (build_tables_for_pair,
+  build_tables_for_stream, ToplineTokenFlowable, Mess-Helfer) erhalten ihn als ctx-Parameter.
+- Tief verschachtelte Helfer (Tag-Partition, Markup, Messung) lesen den aktiven Kontext über
+  eine ContextVar – jeder Thread / jede asyncio-Task sieht nur seinen eigenen Kontext.
+
+Öffentliche API:
+- RenderContext (dataclass)
+- current_render_context() -> RenderContext | None
+- activate_render_context(ctx)          (Kontextmanager)
+- with_render_context(default_factory)  (Decorator: ctx-Parameter auflösen + aktivieren)
+
+Konventionen:
+- Felder, die ein Renderer nicht nutzt, bleiben auf dem Default (z.B. inter_pair_gap_mm in Prosa).
+- Ohne aktiven Kontext (direkter Aufruf eines Builders außerhalb von create_pdf) liefert die
+  default_factory des Moduls einen Kontext aus den Modul-Defaults – wie bisher.
+- Ein RenderContext wird nach dem Anlegen nicht mehr verändert (geteilt zwischen Flowables).
+  Ausnahme: width_tables und paragraphs füllen sich als Caches; die Einträge hängen nur von den
+  übrigen (unveränderten) Feldern und ihrem Schlüssel ab.
+"""
+
+from __future__ import annotations
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .paragraph_cache import ParagraphCache
+
+# ========================== Modulzustand / Defaults ==========================
+
+_CURRENT: ContextVar[Optional["RenderContext"]] = ContextVar("render_context", default=None)
+
+
+# =============================== Kontext ====================================
+
+@dataclass
+class RenderContext:
+    """Variantenabhängiger Zustand eines create_pdf-Aufrufs."""
+    is_notags: bool = False
+    is_latin: bool = False
+    # Tag -> "sup" | "sub" | "off" (Vorrang vor SUP_TAGS/SUB_TAGS)
+    placement_overrides: Dict[str, str] = field(default_factory=dict)
+    # Abstände in mm
+    intra_pair_gap_mm: float = 0.0   # Prosa: innerhalb eines Paars (GR → Übersetzung)
+    cont_pair_gap_mm: float = 0.0    # Prosa: zwischen Tabellenzeilen
+    inter_pair_gap_mm: float = 0.0   # Poesie: zwischen Verspaaren
+    speaker_gap_mm: float = 0.0      # Sprecher-Spalte → Text
+    # Breiten-Memos der Builder (shared/column_widths.py), Schlüssel = Mess-Konfiguration
+    width_tables: Dict[Any, Any] = field(default_factory=dict, repr=False, compare=False)
+    # Styles / geparste Token-Zellen der Builder (shared/paragraph_cache.py)
+    paragraphs: ParagraphCache = field(default_factory=ParagraphCache, repr=False, compare=False)
+
+
+# =============================== Public API =================================
+
+def current_render_context() -> Optional[RenderContext]:
+    """Der im aktuellen Thread / in der aktuellen Task aktive Kontext (oder None)."""
+    return _CURRENT.get()
+
+@contextmanager
+def activate_render_context(ctx: RenderContext) -> Iterator[RenderContext]:
+    """Setzt ctx für die Dauer des with-Blocks als aktiven Kontext."""
+    token = _CURRENT.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _CURRENT.reset(token)
+
+def with_render_context(default_factory: Callable[[], RenderContext]):
+    """
+    Decorator für Builder mit Keyword-Parameter ctx:
+    - ctx=None → aktiver Kontext, sonst default_factory()
+    - der aufgelöste Kontext wird an die Funktion übergeben UND für ihre Laufzeit aktiviert,
+      damit verschachtelte Helfer ohne ctx-Parameter denselben Zustand sehen.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, ctx: Optional[RenderContext] = None, **kwargs):
+            active = _CURRENT.get()
+            if ctx is None:
+                ctx = active if active is not None else default_factory()
+            if ctx is active:
+                return fn(*args, ctx=ctx, **kwargs)
+            token = _CURRENT.set(ctx)
+            try:
+                return fn(*args, ctx=ctx, **kwargs)
+            finally:
+                _CURRENT.reset(token)
+        return wrapper
+    return decorate
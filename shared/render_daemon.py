@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/render_daemon.py
+-----------------------
+Lokaler Render-Daemon mit warmem Interpreter für die Draft-Adapter (nur Standardbibliothek).
+
+Hintergrund:
+- Der Workflow startet pro Entwurf `python build_*_drafts_adapter.py <datei>`. Jeder Start zahlt
+  Interpreter + ReportLab-Import + Font-Registrierung + Laden der DejaVu-TTFs beim ersten Einbetten.
+- Der Daemon lädt Prosa_Code/Poesie_Code, beide Orchestratoren und beide Adapter EINMAL, hält die
+  Fonts (inkl. vollständig geladener TTF-Faces) warm und führt Jobs über adapter.run_one() aus –
+  also exakt den Code, den der Adapter auch in-process ausführt (gleiche PDFs, gleicher Render-Cache).
+- Client-Modus: Mit RENDER_DAEMON=1 schicken die Adapter ihren Job an den Daemon und geben dessen
+  Ausgabe zeilenweise aus (Fortschritt wie bisher im CI-Log). Ist kein Daemon erreichbar oder läuft
+  er mit anderem Renderer-Code, rendert der Adapter wie bisher selbst.
+
+Öffentliche API:
+- daemon_client_enabled() -> bool
+- daemon_socket_path() -> Path
+- serve(socket_path=None, *, idle_timeout=None, job_timeout=JOB_TIMEOUT_SECONDS) -> None
+- submit(kind, input_path, tag_config=None, *, socket_path=None, out=None, err=None) -> int | None
+- daemon_status(socket_path=None) -> dict | None
+- stop_daemon(socket_path=None) -> bool
+- CLI: python -m shared.render_daemon [serve|status|stop] [--socket PFAD] [--idle-timeout S]
+
+Konventionen:
+- Transport: Unix-Socket (Standard <tmp>/translinear_render_<uid>_<projekt-hash>.sock, Rechte 0600,
+  überschreibbar mit RENDER_DAEMON_SOCKET). Protokoll: eine JSON-Zeile Anfrage, danach JSON-Zeilen
+  als Antwort ({"event": "accepted"|"log"|"done"|"status"|"rejected", ...}).
+- Jobs laufen nacheinander im Hauptthread; weitere Clients warten. Timeout pro Job (Standard 360 s
+  wie der globale Timeout von prosa_pdf/poesie_pdf, RENDER_DAEMON_JOB_TIMEOUT) über einen
+  Watchdog-Thread + SIGUSR1 – SIGALRM ist ungeeignet, poesie_pdf setzt es pro Variante zurück.
+- Der Client schickt renderer_version() (render_cache) mit; weicht sie vom Stand des Daemons ab
+  (Code seit dem Start geändert), lehnt der Daemon ab und der Adapter rendert lokal.
+- Der Daemon nutzt SEINE Umgebung (RENDER_CACHE, STREAMING_BUILD …), nicht die des Clients.
+- Ein abgebrochener Client bricht den Job nicht ab (die PDFs landen trotzdem im Zielverzeichnis).
+- `stop` und SIGTERM beenden den Daemon nach dem laufenden Job; der Socket wird entfernt.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+# ========================== Modulzustand / Defaults ==========================
+
+ROOT = Path(__file__).resolve().parent.parent
+
+JOB_TIMEOUT_SECONDS = int(os.environ.get("RENDER_DAEMON_JOB_TIMEOUT", "360"))
+
+# Job-Art -> Adapter-Modul (run_one) und ob run_one eine Tag-Konfiguration annimmt
+_ADAPTERS = {
+    "prosa": ("build_prosa_drafts_adapter", True),
+    "poesie": ("build_poesie_drafts_adapter", False),
+}
+# Beim Start vollständig zu ladende Module (Orchestratoren binden sie per lazy_module)
+_WARM_MODULES = ("prosa_pdf", "poesie_pdf", "Prosa_Code", "Poesie_Code", "shared.unified_api",
+                 "shared.preprocess", "shared.pipeline", "shared.variant_pool", "shared.versmass")
+
+
+# =============================== Helper =====================================
+
+def _send(conn: socket.socket, obj: Dict[str, Any]) -> bool:
+    """Eine JSON-Zeile senden; False, wenn der Client weg ist (Job läuft trotzdem weiter)."""
+    try:
+        conn.sendall((json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8"))
+        return True
+    except OSError:
+        return False
+
+
+def _recv_line(conn: socket.socket, limit: int = 1 << 20) -> Optional[Dict[str, Any]]:
+    buf = b""
+    while b"\n" not in buf:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > limit:
+            return None
+    line = buf.split(b"\n", 1)[0]
+    try:
+        obj = json.loads(line.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+class _SocketStream:
+    """Textstrom für sys.stdout/sys.stderr während eines Jobs: vollständige Zeilen → log-Events."""
+
+    encoding = "utf-8"
+    errors = "replace"
+
+    def __init__(self, conn: socket.socket, stream: str):
+        self._conn = conn
+        self._stream = stream
+        self._buf = ""
+        self.alive = True
+
+    def write(self, s: str) -> int:
+        self._buf += s
+        if "\n" in self._buf:
+            head, self._buf = self._buf.rsplit("\n", 1)
+            self._emit(head)
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+    def close_line(self) -> None:
+        if self._buf:
+            self._emit(self._buf)
+            self._buf = ""
+
+    def isatty(self) -> bool:
+        return False
+
+    def _emit(self, text: str) -> None:
+        if self.alive:
+            self.alive = _send(self._conn, {"event": "log", "stream": self._stream, "text": text})
+
+
+def _stream_handlers():
+    """Alle StreamHandler (ohne FileHandler) – sie halten beim Import gebundene sys.stdout-Objekte."""
+    loggers = [logging.getLogger()] + [l for l in logging.Logger.manager.loggerDict.values()
+                                       if isinstance(l, logging.Logger)]
+    for lg in loggers:
+        for h in lg.handlers:
+            if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler):
+                yield h
+
+
+def _warm_up() -> None:
+    """Orchestratoren, Adapter und Renderer laden; Fonts vollständig (TTF-Faces) bereitstellen."""
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    for name in _WARM_MODULES + tuple(mod for mod, _ in _ADAPTERS.values()):
+        module = importlib.import_module(name)
+        getattr(module, "__doc__", None)  # lazy_module-Proxy → Modulcode jetzt ausführen
+    from reportlab.pdfbase import pdfmetrics
+    for font_name in pdfmetrics.getRegisteredFontNames():
+        font = pdfmetrics.getFont(font_name)
+        if hasattr(font, "full_face"):
+            font.full_face()  # LazyTTFont (glyph_metrics): TTF jetzt statt beim ersten Job laden
+
+
+def _job_timeout_handler(signum, frame):
+    # Läuft im Hauptthread (Python stellt Signale dort zu) → bricht den laufenden Job ab
+    print("render_daemon: JOB TIMEOUT – Abbruch", flush=True)
+    raise SystemExit(124)  # wie der globale Timeout von prosa_pdf/poesie_pdf
+
+
+def _run_job(conn: socket.socket, request: Dict[str, Any], job_timeout: int) -> int:
+    """Job im Hauptthread ausführen; stdout/stderr und Logging gehen als log-Events an den Client."""
+    adapter_name, takes_config = _ADAPTERS[request["kind"]]
+    adapter = sys.modules[adapter_name]
+    input_path = Path(request["input"])
+    out, err = _SocketStream(conn, "out"), _SocketStream(conn, "err")
+    saved = (sys.stdout, sys.stderr)
+    rebound = []
+    for h in _stream_handlers():
+        if h.stream in (saved[0], saved[1], sys.__stdout__, sys.__stderr__):
+            rebound.append((h, h.stream))
+            h.setStream(err if h.stream in (saved[1], sys.__stderr__) else out)
+    sys.stdout, sys.stderr = out, err
+    rc = 0
+    finished, fired = threading.Event(), threading.Event()
+
+    def _watch():
+        if finished.wait(job_timeout):
+            return
+        fired.set()
+        # Wiederholen: trifft das Signal einen Finalizer (__del__, weakref-Callback), geht die
+        # Exception dort verloren
+        while True:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            if finished.wait(1.0):
+                return
+
+    watchdog = threading.Thread(target=_watch, name="render_daemon-watchdog", daemon=True)
+    watchdog.start()
+    try:
+        if takes_config:
+            adapter.run_one(input_path, request.get("tag_config"))
+        else:
+            adapter.run_one(input_path)
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        rc = 1
+    finally:
+        finished.set()
+        watchdog.join()
+        if fired.is_set():
+            rc = 124  # auch wenn der Abbruch unterwegs in eine andere Exception umgewandelt wurde
+        out.close_line()
+        err.close_line()
+        sys.stdout, sys.stderr = saved
+        for h, stream in rebound:
+            h.setStream(stream)
+    return rc
+
+
+def _handle(conn: socket.socket, state: Dict[str, Any], job_timeout: int) -> bool:
+    """Eine Verbindung bedienen; False = Daemon soll sich beenden."""
+    request = _recv_line(conn)
+    if request is None:
+        _send(conn, {"event": "rejected", "reason": "ungültige Anfrage"})
+        return True
+    op = request.get("op", "render")
+    if op == "status":
+        _send(conn, {"event": "status", "pid": os.getpid(), "uptime": time.time() - state["started"],
+                     "jobs": state["jobs"], "renderer": state["renderer"], "root": str(ROOT)})
+        return True
+    if op == "stop":
+        _send(conn, {"event": "status", "pid": os.getpid(), "stopping": True})
+        return False
+    if op != "render" or request.get("kind") not in _ADAPTERS or not request.get("input"):
+        _send(conn, {"event": "rejected", "reason": f"unbekannter Job: op={op} kind={request.get('kind')}"})
+        return True
+    if request.get("renderer") != state["renderer"]:
+        _send(conn, {"event": "rejected", "reason": "Renderer-Code geändert – Daemon neu starten"})
+        return True
+
+    _send(conn, {"event": "accepted", "pid": os.getpid(), "job": state["jobs"] + 1})
+    t0 = time.perf_counter()
+    rc = _run_job(conn, request, job_timeout)
+    state["jobs"] += 1
+    _send(conn, {"event": "done", "exit": rc, "seconds": round(time.perf_counter() - t0, 3)})
+    print(f"render_daemon: Job {state['jobs']} ({request['kind']}) exit={rc} "
+          f"{time.perf_counter() - t0:.2f} s – {Path(request['input']).name}", flush=True)
+    gc.collect()
+    return True
+
+
+def _request(payload: Dict[str, Any], socket_path: Optional[Path], timeout: Optional[float] = 5.0):
+    """Verbindung öffnen und Anfrage senden → (socket, Datei zum zeilenweisen Lesen) oder None."""
+    path = Path(socket_path or daemon_socket_path())
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(2.0)
+        sock.connect(str(path))
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+    except OSError:
+        sock.close()
+        return None
+    return sock, sock.makefile("r", encoding="utf-8")
+
+
+# =============================== Public API =================================
+
+def daemon_client_enabled() -> bool:
+    """Adapter-Client-Modus aktiv? (Standard: nein; RENDER_DAEMON=1 schaltet ein)"""
+    return os.environ.get("RENDER_DAEMON", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def daemon_socket_path() -> Path:
+    """Socket-Pfad: RENDER_DAEMON_SOCKET oder ein Pfad pro Benutzer und Projektverzeichnis."""
+    env = os.environ.get("RENDER_DAEMON_SOCKET")
+    if env:
+        return Path(env)
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    tag = hashlib.sha1(str(ROOT).encode("utf-8")).hexdigest()[:10]
+    return Path(tempfile.gettempdir()) / f"translinear_render_{uid}_{tag}.sock"
+
+
+def daemon_status(socket_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Status des laufenden Daemons oder None (keiner erreichbar)."""
+    opened = _request({"op": "status"}, socket_path)
+    if opened is None:
+        return None
+    sock, reader = opened
+    try:
+        line = reader.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        reader.close()
+        sock.close()
+
+
+def stop_daemon(socket_path: Optional[Path] = None) -> bool:
+    """Laufenden Daemon beenden (nach dem aktuellen Job); True, wenn einer erreicht wurde."""
+    opened = _request({"op": "stop"}, socket_path)
+    if opened is None:
+        return False
+    sock, reader = opened
+    try:
+        reader.readline()
+    except OSError:
+        pass
+    finally:
+        reader.close()
+        sock.close()
+    return True
+
+
+def submit(kind: str, input_path: str | os.PathLike, tag_config: Optional[Dict[str, Any]] = None, *,
+           socket_path: Optional[Path] = None, out: Optional[TextIO] = None,
+           err: Optional[TextIO] = None) -> Optional[int]:
+    """
+    Job an den Daemon schicken und seine Ausgabe zeilenweise durchreichen.
+    Rückgabe: Exit-Code des Jobs – oder None, wenn der Aufrufer selbst rendern soll
+    (kein Daemon, Daemon mit anderem Renderer-Code, Verbindung vor dem Start abgebrochen).
+    """
+    from shared.render_cache import renderer_version
+
+    out = out or sys.stdout
+    err = err or sys.stderr
+    payload = {"op": "render", "kind": kind, "input": str(Path(input_path).resolve()),
+               "tag_config": tag_config, "renderer": renderer_version()}
+    opened = _request(payload, socket_path, timeout=None)
+    if opened is None:
+        print("→ Render-Daemon nicht erreichbar – rendere lokal", file=out, flush=True)
+        return None
+    sock, reader = opened
+    accepted = False
+    try:
+        for line in reader:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            kind_ = event.get("event")
+            if kind_ == "log":
+                print(event.get("text", ""), file=err if event.get("stream") == "err" else out, flush=True)
+            elif kind_ == "accepted":
+                accepted = True
+                print(f"→ Render-Daemon (pid {event.get('pid')}) übernimmt Job {event.get('job')}",
+                      file=out, flush=True)
+            elif kind_ == "rejected":
+                print(f"→ Render-Daemon lehnt ab ({event.get('reason')}) – rendere lokal", file=out, flush=True)
+                return None
+            elif kind_ == "done":
+                print(f"→ Render-Daemon fertig: exit={event.get('exit')} in {event.get('seconds')} s",
+                      file=out, flush=True)
+                return int(event.get("exit", 1))
+    except OSError:
+        pass
+    finally:
+        reader.close()
+        sock.close()
+    if not accepted:
+        print("→ Render-Daemon hat nicht geantwortet – rendere lokal", file=out, flush=True)
+        return None
+    print("✗ Verbindung zum Render-Daemon während des Jobs abgebrochen", file=err, flush=True)
+    return 1
+
+
+def serve(socket_path: Optional[Path] = None, *, idle_timeout: Optional[float] = None,
+          job_timeout: int = JOB_TIMEOUT_SECONDS) -> None:
+    """Daemon im Vordergrund betreiben, bis stop/SIGTERM/SIGINT oder idle_timeout ohne Job."""
+    path = Path(socket_path or daemon_socket_path())
+    if daemon_status(path) is not None:
+        raise SystemExit(f"render_daemon: läuft bereits auf {path}")
+    if path.exists():
+        path.unlink()  # verwaister Socket eines abgestürzten Daemons
+
+    t0 = time.perf_counter()
+    _warm_up()
+    signal.alarm(0)  # globalen Import-Timeout von prosa_pdf/poesie_pdf aufheben → Watchdog pro Job
+    signal.signal(signal.SIGUSR1, _job_timeout_handler)
+    from shared.render_cache import renderer_version
+    state = {"started": time.time(), "jobs": 0, "renderer": renderer_version(), "stop": False}
+    # SIGTERM: nur markieren (ein laufender Job wird fertig); die Accept-Schleife fragt das Flag ab
+    signal.signal(signal.SIGTERM, lambda signum, frame: state.update(stop=True))
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # Socket nur für den eigenen Benutzer (0600)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    server.settimeout(1.0)
+    print(f"render_daemon: bereit auf {path} (pid {os.getpid()}, Aufwärmen {time.perf_counter() - t0:.2f} s)",
+          flush=True)
+    idle_since = time.monotonic()
+    try:
+        while not state["stop"]:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                if idle_timeout and time.monotonic() - idle_since >= idle_timeout:
+                    print(f"render_daemon: {idle_timeout:.0f} s ohne Job – beende", flush=True)
+                    break
+                continue
+            with conn:
+                conn.settimeout(None)
+                if not _handle(conn, state, job_timeout):
+                    break
+            idle_since = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        print(f"render_daemon: beendet nach {state['jobs']} Jobs", flush=True)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m shared.render_daemon",
+                                 description="Lokaler Render-Daemon für die Draft-Adapter")
+    ap.add_argument("command", nargs="?", default="serve", choices=("serve", "status", "stop"))
+    ap.add_argument("--socket", type=Path, default=None, help="Socket-Pfad (Standard: RENDER_DAEMON_SOCKET/tmp)")
+    ap.add_argument("--idle-timeout", type=float, default=None, help="Beenden nach S Sekunden ohne Job")
+    ap.add_argument("--job-timeout", type=int, default=JOB_TIMEOUT_SECONDS, help="Timeout pro Job in Sekunden")
+    args = ap.parse_args(argv)
+
+    if args.command == "status":
+        status = daemon_status(args.socket)
+        print(json.dumps(status, ensure_ascii=False) if status else "render_daemon: nicht erreichbar")
+        return 0 if status else 1
+    if args.command == "stop":
+        stopped = stop_daemon(args.socket)
+        print("render_daemon: gestoppt" if stopped else "render_daemon: nicht erreichbar")
+        return 0 if stopped else 1
+    serve(args.socket, idle_timeout=args.idle_timeout, job_timeout=args.job_timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/streaming_build.py
+-------------------------
+Streamender PDF-Build: Flowables werden schon WÄHREND der Element-Erstellung gesetzt.
+
+Hintergrund:
+- create_pdf sammelte bisher ALLE Flowables (Tabellen, Paragraphen, KeepTogether …) in einer
+  Liste und rief erst am Ende doc.build(elements) auf. Bei großen Entwürfen lagen damit zehn-
+  tausende Tabellen gleichzeitig im Speicher – der Grund für die größenabhängige
+  Varianten-Reduktion in prosa_pdf.py.
+- StreamingDocBuild ersetzt die Liste: append()/extend() puffern nur ein kleines Fenster,
+  alles davor wird sofort über die normale reportlab-Maschinerie (handle_flowable) auf Seiten
+  gesetzt und danach freigegeben. Der Speicherbedarf hängt nur noch von der Fenstergröße ab.
+- Die Build-Schleife entspricht BaseDocTemplate.build bzw. SimpleDocTemplate.build; da
+  reportlab die Liste ohnehin nur von vorne abarbeitet, ist das Ergebnis identisch zum
+  klassischen doc.build(elements).
+
+Öffentliche API:
+- streaming_enabled() -> bool
+- StreamingDocBuild(doc, *, lookahead=…)   (start() / append() / extend() / finish())
+
+Konventionen:
+- Lookahead: reportlab schaut bei keepWithNext-Ketten nach vorne (handle_keepWithNext).
+  Es wird nur gesetzt, wenn das Fenster mindestens lookahead Elemente enthält UND jede
+  keepWithNext-Kette im Fenster abgeschlossen ist.
+- Abschalten über die Umgebungsvariable PROSA_STREAM_BUILD=0 (dann klassischer Listen-Build).
+- Fenstergröße über STREAM_BUILD_LOOKAHEAD (Standard 64 Flowables).
+- ReportLab wird erst in StreamingDocBuild importiert: streaming_enabled() bleibt billig
+  (Cache-Schlüssel der Draft-Adapter, ohne den platypus-Stack zu laden).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterable, List
+
+
+# ========================== Modulzustand / Defaults ==========================
+
+STREAM_BUILD_LOOKAHEAD = int(os.environ.get("STREAM_BUILD_LOOKAHEAD", "64"))
+
+
+# =============================== Helper =====================================
+
+def _chain_closed(buf: List) -> bool:
+    """True, wenn die keepWithNext-Kette ab buf[0] innerhalb des Puffers endet."""
+    i, n = 0, len(buf)
+    while i < n and buf[i] is not None and buf[i].getKeepWithNext():
+        i += 1
+    return i < n
+
+
+# =============================== Public API =================================
+
+def streaming_enabled() -> bool:
+    """Streamender Build aktiv? (Standard: ja; PROSA_STREAM_BUILD=0 schaltet ab)"""
+    return os.environ.get("PROSA_STREAM_BUILD", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class StreamingDocBuild:
+    """
+    Listen-Ersatz für die Flowables eines SimpleDocTemplate.
+
+    Ablauf:
+        stream = StreamingDocBuild(doc).start()   # legt Seitenvorlagen + Canvas an
+        stream.append(f) / stream.extend([...])   # setzt laufend alles vor dem Fenster
+        stream.finish()                           # Rest setzen, PDF schreiben
+
+    len(stream) liefert die Anzahl der bisher übergebenen Flowables (für Logs wie bei der Liste).
+    """
+
+    def __init__(self, doc, *, lookahead: int = STREAM_BUILD_LOOKAHEAD, canvasmaker=None):
+        if canvasmaker is None:
+            from reportlab.pdfgen.canvas import Canvas as canvasmaker
+        self.doc = doc
+        self.lookahead = max(1, int(lookahead))
+        self.canvasmaker = canvasmaker
+        self._buf: List = []
+        self._count = 0
+        self.handled = 0
+        self._started = False
+
+    # ------------------------------------------------------------- Listen-API
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, flowable) -> None:
+        self._buf.append(flowable)
+        self._count += 1
+        if len(self._buf) > self.lookahead:
+            self._pump(final=False)
+
+    def extend(self, flowables: Iterable) -> None:
+        for f in flowables:
+            self.append(f)
+
+    # ------------------------------------------------------------- Build
+    def start(self) -> "StreamingDocBuild":
+        """Entspricht dem Teil von SimpleDocTemplate.build / BaseDocTemplate.build VOR der Schleife."""
+        from reportlab.platypus import Frame, PageTemplate
+        doc = self.doc
+        doc._calc()
+        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+        doc.addPageTemplates([PageTemplate(id='First', frames=frame, pagesize=doc.pagesize),
+                              PageTemplate(id='Later', frames=frame, pagesize=doc.pagesize)])
+        if hasattr(doc, 'onFirstPage'):
+            doc.pageTemplates[0].beforeDrawPage = doc.onFirstPage
+        if hasattr(doc, 'onLaterPages'):
+            doc.pageTemplates[1].beforeDrawPage = doc.onLaterPages
+        doc.canvasmaker = self.canvasmaker
+        doc._startBuild(None, self.canvasmaker)
+        self._saved_info = doc.canv._doc.info
+        doc.canv._doctemplate = doc
+        self._started = True
+        return self
+
+    def _pump(self, *, final: bool) -> None:
+        """Setzt Flowables vom Pufferanfang, solange genug Lookahead vorhanden ist (final: alle)."""
+        from reportlab.platypus.doctemplate import NextPageTemplate, PageBegin, PageBreakIfNotEmpty
+        doc, buf = self.doc, self._buf
+        while buf and (final or (len(buf) > self.lookahead and _chain_closed(buf))):
+            # wie BaseDocTemplate.build: PageBreakIfNotEmpty direkt nach Seitenbeginn
+            if doc._hanging and doc._hanging[-1] is PageBegin and isinstance(buf[0], PageBreakIfNotEmpty):
+                npt = buf[0].nextTemplate
+                if npt and not doc._samePT(npt):
+                    NextPageTemplate(npt).apply(doc)
+                    doc._setPageTemplate()
+                del buf[0]
+                if not buf:
+                    break
+            doc.clean_hanging()
+            doc.handle_flowable(buf)
+            self.handled += 1
+
+    def finish(self) -> None:
+        """Setzt den Rest und schreibt das PDF (entspricht dem Ende von BaseDocTemplate.build)."""
+        doc = self.doc
+        try:
+            self._pump(final=True)
+        finally:
+            self._detach()
+        doc.canv._doc.info = self._saved_info
+        doc._endBuild()
+
+    def _detach(self) -> None:
+        if self._started:
+            self._started = False
+            canv = getattr(self.doc, 'canv', None)
+            if canv is not None and hasattr(canv, '_doctemplate'):
+                del canv._doctemplate
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/text_metrics.py
+----------------------
+Gecachte Textbreiten-Messung (Ersatz für pdfmetrics.stringWidth in den Renderern).
+
+Hintergrund:
+- Die Spaltenbreiten-Berechnung misst dieselben Tokens (Artikel, Partikel, Tags, '|', NBSP …)
+  tausendfach – pro Variante erneut. stringWidth läuft ohne C-Beschleunigung in Python.
+- Zweistufiger Cache:
+    1) LRU-Cache auf (text, font, size)  → komplette Breite, Treffer ohne jede Rechnung
+    2) Zeichenbreiten-Tabelle pro Font    → bei Cache-Miss nur noch Summe von Dict-Lookups
+- Die Summe wird in derselben Reihenfolge und mit derselben Formel gebildet wie in
+  reportlab (0.001 * size * Σ Glyphbreite), die Ergebnisse sind also bitgleich.
+
+Öffentliche API:
+- string_width(text, font, size) -> float
+- width_cache_stats() -> dict
+- print_width_cache_stats(label, since=None) -> dict
+- clear_width_cache() -> None
+
+Konventionen:
+- Nur TrueType-Fonts (DejaVu) nutzen die Zeichentabelle; Type1-Standardfonts (Helvetica …)
+  werden über pdfmetrics.stringWidth gemessen (aber ebenfalls im LRU gecacht).
+- Cache-Größe über die Umgebungsvariable TEXT_WIDTH_CACHE_MAX (Standard 65536 Einträge).
+"""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from reportlab.pdfbase import pdfmetrics
+
+# ========================== Modulzustand / Defaults ==========================
+
+WIDTH_CACHE_MAX = int(os.environ.get("TEXT_WIDTH_CACHE_MAX", "65536"))
+
+# font_name -> (Zeichen -> Glyphbreite in 1/1000 em); None = kein TTF (Fallback stringWidth)
+_CHAR_TABLES: Dict[str, Optional[Tuple[dict, object, float]]] = {}
+
+
+# =============================== Helper =====================================
+
+def _char_table(font: str):
+    """Liefert (tabelle, charWidths.get, defaultWidth) für TTF-Fonts, sonst None."""
+    try:
+        return _CHAR_TABLES[font]
+    except KeyError:
+        pass
+    entry = None
+    face = getattr(pdfmetrics.getFont(font), "face", None)
+    char_widths = getattr(face, "charWidths", None)
+    if isinstance(char_widths, dict):
+        entry = ({}, char_widths.get, face.defaultWidth)
+    _CHAR_TABLES[font] = entry
+    return entry
+
+def _compute_width(text: str, font: str, size: float) -> float:
+    entry = _char_table(font)
+    if entry is None:
+        return pdfmetrics.stringWidth(text, font, size)
+    table, glyph_width, default_width = entry
+    total = 0
+    for ch in text:
+        w = table.get(ch)
+        if w is None:
+            w = table[ch] = glyph_width(ord(ch), default_width)
+        total += w
+    # WICHTIG: Gleiche Formel wie reportlab (instanceStringWidthTTF) → bitgleiche Breiten
+    return 0.001 * size * total
+
+_cached_width = lru_cache(maxsize=WIDTH_CACHE_MAX)(_compute_width)
+
+
+# =============================== Public API =================================
+
+def string_width(text: str, font: str, size: float) -> float:
+    """Breite von text in Punkten (wie pdfmetrics.stringWidth, aber gecacht)."""
+    if not text:
+        return 0.0
+    return _cached_width(text, font, size)
+
+def width_cache_stats() -> dict:
+    """Trefferstatistik des LRU-Caches (kumuliert seit Prozessstart bzw. clear_width_cache)."""
+    info = _cached_width.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": (info.hits / lookups) if lookups else 0.0,
+        "fonts": len(_CHAR_TABLES),
+        "chars": sum(len(e[0]) for e in _CHAR_TABLES.values() if e is not None),
+    }
+
+def print_width_cache_stats(label: str, since: Optional[dict] = None) -> dict:
+    """
+    Gibt die Cache-Statistik aus; mit since (früherer width_cache_stats()-Snapshot) nur die Differenz,
+    z.B. pro Build. Gibt den aktuellen Snapshot zurück.
+    """
+    now = width_cache_stats()
+    hits, misses = now["hits"], now["misses"]
+    if since:
+        hits -= since.get("hits", 0)
+        misses -= since.get("misses", 0)
+    lookups = hits + misses
+    rate = (100.0 * hits / lookups) if lookups else 0.0
+    print(f"  → {label}: Breiten-Cache hits={hits} misses={misses} ({rate:.1f}% Treffer), "
+          f"Einträge={now['size']}, Zeichentabelle={now['chars']} Zeichen/{now['fonts']} Fonts", flush=True)
+    return now
+
+def clear_width_cache() -> None:
+    """Leert LRU und Zeichentabellen (z.B. nach erneuter Font-Registrierung unter gleichem Namen)."""
+    _cached_width.cache_clear()
+    _CHAR_TABLES.clear()
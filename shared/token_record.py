@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/token_record.py
+----------------------
+Einmaliges Zerlegen eines Token-Strings in seine Bestandteile (Kern, Tags, Flags, Versmaß).
+
+Hintergrund:
+- Ein Token wie '#ἐξελεγχθήσονται(Fu)(Pas)' wurde bisher in jeder Stufe neu mit Regexen
+  zerlegt: _extract_tags, parse_token_tags, _remove_selected_tags, get_visible_tags,
+  versmass.strip_wrappers, format_token_markup … – und das für jede Variante erneut.
+- parse_token() zerlegt jeden DISTINKTEN Token-String genau einmal und cached den Record.
+  Da Token-Strings unveränderlich sind und sich im Text ständig wiederholen (Artikel,
+  Partikel), liefern alle weiteren Aufrufe denselben Record ohne Regex-Arbeit.
+- Ändert eine Stufe den String (Farbsymbol davor, Tags entfernt), ist das ein neuer Schlüssel
+  und wird ebenfalls genau einmal zerlegt.
+
+Öffentliche API:
+- TokenRecord (mit __slots__, unveränderlich per Konvention)
+- parse_token(token) -> TokenRecord
+- parse_tokens(tokens) -> list[TokenRecord]
+- token_record_cache_info() -> dict
+- clear_token_records() -> None
+
+Konventionen:
+- Felder sind Tupel/Strings; Aufrufer dürfen sie NICHT verändern (Records werden geteilt).
+- tags folgt RE_PAREN_TAG '(Tag)' (Prosa/preprocess), loose_tags folgt RE_PAREN_TAG_SPACED
+  '( Tag )' (Poesie) – beide exakt wie die bisherigen findall-Aufrufe.
+- Cache-Größe über die Umgebungsvariable TOKEN_RECORD_CACHE_MAX (Standard 200000).
+"""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+from . import regex_patterns as rx
+
+# ========================== Modulzustand / Defaults ==========================
+
+TOKEN_RECORD_CACHE_MAX = int(os.environ.get("TOKEN_RECORD_CACHE_MAX", "200000"))
+
+COLOR_MARKERS = '#+-§$'
+METER_MARKERS = ('i', 'L', '|')
+
+# Flag-Tags (identisch zu preprocess.TAG_HIDE_TAGS / TRANSLATION_HIDE_TAG)
+_HIDE_TAGS = "HideTags"
+_HIDE_TRANS = "HideTrans"
+_HIDE_LOWER = (_HIDE_TAGS.lower(), _HIDE_TRANS.lower())
+
+
+# =============================== Record =====================================
+
+class TokenRecord:
+    """
+    Zerlegtes Token.
+
+    raw         Original-String
+    core        raw ohne (Tag)-Gruppen (Farbmarker bleiben erhalten)
+    tags        Tupel der Tags in '(Tag)'-Form
+    loose_tags  Tupel der Tags in '( Tag )'-Form (Leerraum in der Klammer erlaubt)
+    hide_tags   (HideTags) vorhanden (Groß-/Kleinschreibung egal)
+    hide_trans  (HideTrans) vorhanden (Groß-/Kleinschreibung egal)
+    unhidden    raw ohne die (HideTags)/(HideTrans)-Gruppen, alles andere an seiner Stelle
+    meter_core  Kern für die Versmaß-Erkennung (ohne führenden Farbmarker und ohne (...))
+    meter       Tupel (index, zeichen) der Versmaß-Marker i/L/| in meter_core
+    """
+    __slots__ = ("raw", "core", "tags", "loose_tags",
+                 "hide_tags", "hide_trans", "unhidden", "meter_core", "meter")
+
+    def __init__(self, raw: str, core: str, tags: Tuple[str, ...], loose_tags: Tuple[str, ...],
+                 hide_tags: bool, hide_trans: bool, unhidden: str,
+                 meter_core: str, meter: Tuple[Tuple[int, str], ...]):
+        self.raw = raw
+        self.core = core
+        self.tags = tags
+        self.loose_tags = loose_tags
+        self.hide_tags = hide_tags
+        self.hide_trans = hide_trans
+        self.unhidden = unhidden
+        self.meter_core = meter_core
+        self.meter = meter
+
+    def __repr__(self) -> str:
+        return f"TokenRecord({self.raw!r}, core={self.core!r}, tags={self.tags!r})"
+
+
+# =============================== Helper =====================================
+
+_EMPTY = TokenRecord('', '', (), (), False, False, '', '', ())
+
+def _drop_hide_tag(m) -> str:
+    return '' if m.group(1).lower() in _HIDE_LOWER else m.group(0)
+
+def _parse(token: str) -> TokenRecord:
+    if '(' in token:
+        tags = tuple(rx.RE_PAREN_TAG.findall(token))
+        core = rx.RE_PAREN_TAG.sub('', token) if tags else token
+        loose_tags = tuple(rx.RE_PAREN_TAG_SPACED.findall(token))
+    else:
+        # SCHNELLPFAD: ohne '(' gibt es keine Tags
+        tags = loose_tags = ()
+        core = token
+
+    # Versmaß-Kern: wie versmass.strip_wrappers (nur EIN führendes Steuerzeichen, alle (...) weg)
+    meter_core = token[1:] if token[0] in COLOR_MARKERS else token
+    if '(' in meter_core:
+        meter_core = rx.RE_ANY_PAREN.sub('', meter_core)
+    meter = tuple((i, ch) for i, ch in enumerate(meter_core) if ch in METER_MARKERS)
+
+    lowered = [t.lower() for t in tags]
+    hide_tags = _HIDE_TAGS.lower() in lowered
+    hide_trans = _HIDE_TRANS.lower() in lowered
+    return TokenRecord(
+        raw=token,
+        core=core,
+        tags=tags,
+        loose_tags=loose_tags,
+        hide_tags=hide_tags,
+        hide_trans=hide_trans,
+        unhidden=rx.RE_PAREN_TAG.sub(_drop_hide_tag, token) if hide_tags or hide_trans else token,
+        meter_core=meter_core,
+        meter=meter,
+    )
+
+_parse_cached = lru_cache(maxsize=TOKEN_RECORD_CACHE_MAX)(_parse)
+
+
+# =============================== Public API =================================
+
+def parse_token(token: str) -> TokenRecord:
+    """Liefert den (gecachten) Record für token. Leere/None-Tokens → leerer Record."""
+    if not token:
+        return _EMPTY
+    return _parse_cached(token)
+
+def parse_tokens(tokens: Iterable[str]) -> List[TokenRecord]:
+    """Records für eine Token-Liste (z.B. um den Cache direkt nach dem Parsen zu füllen)."""
+    return [parse_token(t) for t in tokens]
+
+def token_record_cache_info() -> dict:
+    info = _parse_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+def clear_token_records() -> None:
+    _parse_cached.cache_clear()
@@ -26,6 +26,7 @@ from dataclasses import dataclass
 from typing import Any, Optional, Literal
 
 from . import preprocess
+from .text_metrics import width_cache_stats, print_width_cache_stats
 
 
 Strength = Literal["NORMAL", "GR_FETT", "LAT_FETT", "DE_FETT"]
@@ -183,17 +184,23 @@ def create_pdf_unified(kind: Literal["poesie", "prosa"],
     pre_blocks = blocks
     placement_overrides = payload.get("place") if payload else None
     
+    # NEU: Breiten-Cache-Statistik pro Build (Differenz zum Stand vor dem Rendern)
+    width_stats_before = width_cache_stats()
+    
     # 2) Renderer-spezifischer Aufruf
-    if k == "poesie":
-        return _poesie_call(mod, pre_blocks, out_pdf, options,
-                            placement_overrides=placement_overrides,
-                            tag_config=tag_config,
-                            hide_pipes=hide_pipes)
-    if k == "prosa":
-        return _prosa_call(mod, pre_blocks, out_pdf, options,
-                           placement_overrides=placement_overrides,
-                           tag_config=tag_config,
-                           hide_pipes=hide_pipes)
+    try:
+        if k == "poesie":
+            return _poesie_call(mod, pre_blocks, out_pdf, options,
+                                placement_overrides=placement_overrides,
+                                tag_config=tag_config,
+                                hide_pipes=hide_pipes)
+        if k == "prosa":
+            return _prosa_call(mod, pre_blocks, out_pdf, options,
+                               placement_overrides=placement_overrides,
+                               tag_config=tag_config,
+                               hide_pipes=hide_pipes)
+    finally:
+        print_width_cache_stats(f"{k}: {out_pdf}", since=width_stats_before)
 
     # (sollte wegen Prüfung oben nie erreicht werden)
     raise ValueError(f"Unbekannter kind='{kind}'. Erwartet: poesie|prosa")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shared/variant_pool.py
+----------------------
+Paralleles Rendern der PDF-Varianten (strength × color × tag [× meter]) in einem Prozess-Pool.
+
+Ziele:
+- Die Eingabe wird EINMAL im Hauptprozess geparst; die fertigen Blöcke werden über den
+  Pool-Initializer an die Worker übergeben (bei fork: ohne Pickling, per Copy-on-Write geerbt).
+- Fonts werden VOR dem Fork im Hauptprozess registriert, damit jeder Worker die bereits
+  geladenen DejaVu-TTFs erbt (register_dejavu() ist idempotent, im Worker also ein No-Op).
+- Deterministische Log-Ausgabe: stdout/stderr und Logging jedes Workers werden pro Variante
+  gepuffert und im Hauptprozess in Varianten-Reihenfolge ausgegeben (kein Durcheinander).
+
+Öffentliche API:
+- resolve_jobs(jobs) -> int
+- run_variants(render_fn, shared_kwargs, variant_kwargs_list, jobs, *, label="pdf") -> list
+
+Konventionen:
+- render_fn muss eine Modul-Funktion sein (picklebar), Aufruf: render_fn(**shared_kwargs, **variant_kwargs).
+- Fehler in einem Worker werden nach Ausgabe aller Logs als RuntimeError weitergereicht
+  (wie im seriellen Modus bricht der Lauf dann ab).
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# ========================== Modulzustand (pro Worker) ==========================
+
+_WORKER_SHARED: Dict[str, Any] = {}
+
+
+# =============================== Helper =====================================
+
+def _stream_handlers() -> List[logging.StreamHandler]:
+    """Alle StreamHandler (Root + benannte Logger), die auf stdout/stderr schreiben."""
+    loggers = [logging.getLogger()]
+    for obj in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(obj, logging.Logger):
+            loggers.append(obj)
+    std_streams = (sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__)
+    handlers = []
+    for lg in loggers:
+        for h in lg.handlers:
+            if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler):
+                if getattr(h, "stream", None) in std_streams and h not in handlers:
+                    handlers.append(h)
+    return handlers
+
+@contextmanager
+def _capture_output(buf: io.StringIO):
+    """Leitet print()- und Logging-Ausgaben temporär in buf um."""
+    old_out, old_err = sys.stdout, sys.stderr
+    swapped = []
+    for h in _stream_handlers():
+        swapped.append((h, h.stream))
+        h.setStream(buf)
+    sys.stdout = sys.stderr = buf
+    try:
+        yield buf
+    finally:
+        sys.stdout, sys.stderr = old_out, old_err
+        for h, stream in swapped:
+            h.setStream(stream)
+
+def _init_worker(shared_kwargs: Dict[str, Any]) -> None:
+    """Pool-Initializer: Legt die gemeinsamen Daten einmal pro Worker ab."""
+    # WICHTIG: Globalen Timeout des Elternprozesses im Worker NICHT erneut auslösen
+    try:
+        signal.alarm(0)
+    except Exception:
+        pass
+    # Bei fork bereits registriert (No-Op); bei spawn hier einmalig laden
+    try:
+        from shared.fonts_and_styles import register_dejavu
+        register_dejavu()
+    except Exception:
+        pass
+    _WORKER_SHARED.clear()
+    _WORKER_SHARED.update(shared_kwargs)
+
+def _run_in_worker(render_fn: Callable[..., Any], variant_kwargs: Dict[str, Any]):
+    """Führt eine Variante aus und gibt (ok, ergebnis_oder_fehler, log_text) zurück."""
+    buf = io.StringIO()
+    with _capture_output(buf):
+        try:
+            result = render_fn(**_WORKER_SHARED, **variant_kwargs)
+            ok = True
+        except BaseException as e:  # auch SystemExit aus Timeout-Handlern abfangen
+            traceback.print_exc()
+            result = f"{type(e).__name__}: {e}"
+            ok = False
+    return ok, result, buf.getvalue()
+
+
+# =============================== Public API =================================
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """0 oder negativ → alle CPU-Kerne, None/ungültig → 1 (seriell)."""
+    try:
+        jobs = int(jobs)
+    except (TypeError, ValueError):
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def run_variants(render_fn: Callable[..., Any],
+                 shared_kwargs: Dict[str, Any],
+                 variant_kwargs_list: List[Dict[str, Any]],
+                 jobs: int,
+                 *,
+                 label: str = "pdf") -> List[Any]:
+    """
+    Rendert alle Varianten parallel und gibt die Ergebnisse in Eingabe-Reihenfolge zurück.
+    Die gepufferten Logs jeder Variante werden in derselben Reihenfolge ausgegeben.
+    """
+    logger = logging.getLogger(label)
+    workers = max(1, min(int(jobs), len(variant_kwargs_list)))
+
+    # Fonts im Hauptprozess registrieren, damit die Worker sie per fork erben
+    try:
+        from shared.fonts_and_styles import register_dejavu
+        register_dejavu()
+    except Exception:
+        pass
+
+    # fork bevorzugen: Blöcke, Fonts und importierte Module werden geerbt statt neu geladen
+    try:
+        mp_context = multiprocessing.get_context("fork")
+    except ValueError:
+        mp_context = multiprocessing.get_context()
+
+    logger.info("%s: parallel mode - %d variants on %d workers", label, len(variant_kwargs_list), workers)
+    print(f"→ Parallel-Modus: {len(variant_kwargs_list)} Varianten auf {workers} Prozessen", flush=True)
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        pass
+
+    results: List[Any] = []
+    first_error: Optional[str] = None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                             initializer=_init_worker, initargs=(shared_kwargs,)) as pool:
+        futures = [pool.submit(_run_in_worker, render_fn, vk) for vk in variant_kwargs_list]
+        total = len(futures)
+        # Ergebnisse (und Logs) in fester Reihenfolge einsammeln
+        for idx, (future, vk) in enumerate(zip(futures, variant_kwargs_list), 1):
+            ok, result, log_text = future.result()
+            desc = ", ".join(f"{k}={v}" for k, v in vk.items())
+            print(f"──── {label}: Variante {idx}/{total} ({desc}) ────")
+            if log_text:
+                sys.stdout.write(log_text if log_text.endswith("\n") else log_text + "\n")
+            sys.stdout.flush()
+            if ok:
+                results.append(result)
+            else:
+                results.append(None)
+                if first_error is None:
+                    first_error = f"Variante {idx}/{total} ({desc}) fehlgeschlagen: {result}"
+
+    if first_error is not None:
+        raise RuntimeError(first_error)
+    return results
@@ -27,6 +27,8 @@ API:
 from typing import List, Dict, Any, Optional
 import re
 
+from .token_record import parse_token
+
 # Typografisches Apostroph (Durchleitung; keine Logik hier)
 APOST = '’'
 
@@ -40,14 +42,10 @@ def strip_wrappers(token: str) -> str:
     """
     if not token:
         return ''
-    s = token
-    # Führendes Steuerzeichen abwerfen (inkl. neue Farbmarker § und $)
-    if s and s[0] in '#+-§$':
-        s = s[1:]
-    # Alle (...)-Tags entfernen
-    s = RE_PARENS.sub('', s)
+    # NEU: Einmal pro Token-String zerlegt (shared/token_record.py, gecacht):
+    # führendes Steuerzeichen (inkl. § und $) und alle (...)-Tags sind in meter_core bereits entfernt.
     # KEIN Entfernen/Ersetzen von '_'!
-    return s
+    return parse_token(token).meter_core
 
 def _iter_markers(core: str):
     """Erzeugt (index, zeichen) für jedes Markerzeichen in core."""
@@ -80,8 +78,7 @@ def has_meter_markers(tokens: List[str], min_markers_per_line: int = 3, min_tota
     # Zähle alle Marker in dieser Token-Liste
     marker_count = 0
     for t in tokens:
-        core = strip_wrappers(t)
-        marker_count += sum(1 for ch in core if ch in ('i', 'L', '|'))
+        marker_count += len(parse_token(t).meter)
     
     # Bedingung 1: Mindestens min_total Marker insgesamt (sehr sicher)
     if marker_count >= min_total:
@@ -106,12 +103,11 @@ def extract_meter(tokens: List[str]) -> Optional[Dict[str, Any]]:
     any_marker = False
 
     for t in tokens:
-        core = strip_wrappers(t)
         pos_i: List[int] = []
         pos_L: List[int] = []
         pos_p: List[int] = []
 
-        for idx, ch in _iter_markers(core):
+        for idx, ch in parse_token(t).meter:
             any_marker = True
             if ch == 'i':
                 pos_i.append(idx); ci += 1
@@ -167,8 +163,7 @@ def document_has_meter_markers(blocks: List[Dict[str, Any]],
             # Zähle Marker in dieser Zeile
             marker_count = 0
             for t in tokens:
-                core = strip_wrappers(t)
-                marker_count += sum(1 for ch in core if ch in ('i', 'L', '|'))
+                marker_count += len(parse_token(t).meter)
             
             # Bedingung 1: Eine Zeile mit sehr vielen Markern (>=10) → sofort True
             if marker_count >= 10:
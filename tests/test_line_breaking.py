@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+tests/test_line_breaking.py
+---------------------------
+ColumnBreaker.greedy_end muss exakt wie die bisherige Pack-Schleife umbrechen – insbesondere bei
+Zeilen, die die verfügbare Breite genau füllen (Präfixdifferenzen runden dort anders).
+
+Aufruf (aus dem Projekt-Root):
+    python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from shared.line_breaking import ColumnBreaker
+
+
+def _legacy_end(widths, i, avail_w):
+    """Pack-Schleife aus build_tables_for_stream vor ColumnBreaker."""
+    acc, j = 0.0, i
+    while j < len(widths):
+        w = widths[j]
+        if acc + w > avail_w and j > i:
+            break
+        acc += w
+        j += 1
+    return j
+
+
+def _running_sum(widths):
+    acc = 0.0
+    for w in widths:
+        acc += w
+    return acc
+
+
+def test_exact_fit_includes_last_column():
+    # 0.1 + 0.4 == 0.5 als laufende Summe, aber prefix[1] + 0.5 == 0.6 < prefix[3] == 0.6000000000000001
+    widths = [0.1, 0.1, 0.4, 0.1]
+    avail_w = _running_sum(widths[1:3])
+    breaker = ColumnBreaker(widths)
+    assert breaker.greedy_end(1, avail_w) == 3 == _legacy_end(widths, 1, avail_w)
+
+
+def test_exact_fit_matches_legacy_loop():
+    rnd = random.Random(13)
+    for _ in range(20000):
+        n = rnd.randint(1, 30)
+        widths = [rnd.choice([0.0, 0.1, 0.2, 0.3, 1 / 3, 0.7, 5.0, 12.34]) if rnd.random() < 0.4
+                  else rnd.uniform(0.0, 60.0) for _ in range(n)]
+        i = rnd.randrange(n)
+        k = rnd.randint(i + 1, n)
+        avail_w = _running_sum(widths[i:k])  # Zeile i..k-1 füllt avail_w genau
+        assert ColumnBreaker(widths).greedy_end(i, avail_w) == _legacy_end(widths, i, avail_w)
+
+
+def test_greedy_breaks_match_legacy_loop():
+    rnd = random.Random(7)
+    widths = [rnd.uniform(1.0, 40.0) for _ in range(5000)]
+    expected, i = [], 0
+    while i < len(widths):
+        i = _legacy_end(widths, i, 400.0)
+        expected.append(i)
+    assert ColumnBreaker(widths).greedy_breaks(400.0) == expected
+
+
+def test_overwide_column_forms_own_slice():
+    breaker = ColumnBreaker([50.0, 10.0])
+    assert breaker.greedy_end(0, 20.0) == 1
+    assert breaker.greedy_end(2, 20.0) == 2